@@ -23,11 +23,29 @@ from hathor import (
 PRECISION = Amount(10**20)
 MINIMUM_LIQUIDITY = Amount(10**3)  # Multiplier for minimum liquidity burn
 MAX_POOLS_TO_ITERATE = 1000  # Maximum pools in graph building methods to prevent DoS
+MAX_POOL_FEE = 50  # Highest fee create_pool accepts, so a pair has at most MAX_POOL_FEE + 1 pools
 
 # Price precision constants
 PRICE_PRECISION = 10**8  # 8 decimal places for price calculations (including TWAP)
 MAX_PRICE_IMPACT = Amount(500)  # 5% in basis points (500/10000) for single token ops
 
+# Candle (OHLCV) ring buffer configuration
+CANDLE_INTERVAL = 3600  # Seconds per candle bucket (1 hour)
+CANDLE_SLOTS = 168  # Buckets kept per pool (7 days of hourly candles)
+WINDOW_24H_BUCKETS = 24  # Candle buckets in the rolling 24h window
+WINDOW_7D_BUCKETS = CANDLE_SLOTS  # Candle buckets in the rolling 7d window (must not exceed CANDLE_SLOTS)
+
+# Multicall sub-operations (see MulticallOp)
+MULTICALL_SWAP_EXACT_IN = "swap_exact_in"
+MULTICALL_SWAP_EXACT_OUT = "swap_exact_out"
+MULTICALL_ADD_LIQUIDITY = "add_liquidity"
+MULTICALL_REMOVE_LIQUIDITY = "remove_liquidity"
+MULTICALL_WITHDRAW_CASHBACK = "withdraw_cashback"
+MAX_MULTICALL_OPS = 10
+
+# Liquidity mining: liquidity already carries PRECISION, so the reward index needs extra headroom
+REWARD_PRECISION = 10**40
+
 # Type alias for pool identifier keys
 PoolKey = str
 
@@ -150,7 +168,7 @@ class PoolApiInfo(NamedTuple):
     volume: Amount
     fee0: Amount
     fee1: Amount
-    dzr_rewards: Amount
+    dzr_rewards: Amount  # Reward tokens emitted to the pool's LPs per day
     transactions: Amount
     is_signed: Amount
     signer: str | None
@@ -227,6 +245,101 @@ class UserProfitInfo(NamedTuple):
     last_action_timestamp: int
 
 
+class UserCostBasis(NamedTuple):
+    """Token flows of a user's position in a pool, recorded on liquidity operations."""
+
+    deposited_a: Amount  # Lifetime token_a added to the position
+    deposited_b: Amount
+    withdrawn_a: Amount  # Lifetime token_a taken out of the position
+    withdrawn_b: Amount
+    basis_a: Amount  # Cost basis of the current position in token_a, scaled down on removals
+    basis_b: Amount
+
+
+EMPTY_COST_BASIS = UserCostBasis(Amount(0), Amount(0), Amount(0), Amount(0), Amount(0), Amount(0))
+
+
+class PoolCandle(NamedTuple):
+    """OHLCV bucket for a pool. Prices are token_a in token_b with PRICE_PRECISION."""
+
+    start_timestamp: int  # Bucket start, a multiple of CANDLE_INTERVAL
+    open_price: Amount
+    high_price: Amount
+    low_price: Amount
+    close_price: Amount
+    volume_a: Amount
+    volume_b: Amount
+    fee_a: Amount  # Swap fees charged on token_a inputs
+    fee_b: Amount
+    swaps: int
+
+
+class PoolWindowStats(NamedTuple):
+    """Rolling volume and fee sums for a pool, expired bucket by bucket from pool_candles."""
+
+    last_bucket: int  # Candle bucket index (timestamp // CANDLE_INTERVAL) of the last update
+    volume_a_24h: Amount
+    volume_b_24h: Amount
+    fee_a_24h: Amount
+    fee_b_24h: Amount
+    volume_a_7d: Amount
+    volume_b_7d: Amount
+    fee_a_7d: Amount
+    fee_b_7d: Amount
+
+
+class PoolWindowInfo(NamedTuple):
+    """Rolling 24h/7d pool statistics for frontend display."""
+
+    volume_a_24h: Amount
+    volume_b_24h: Amount
+    fee_a_24h: Amount
+    fee_b_24h: Amount
+    volume_a_7d: Amount
+    volume_b_7d: Amount
+    fee_a_7d: Amount
+    fee_b_7d: Amount
+    fee_apr_24h: Amount  # LP fee APR annualized from the last 24h, in basis points
+    fee_apr_7d: Amount  # LP fee APR annualized from the last 7d, in basis points
+
+
+class PoolRewardState(NamedTuple):
+    """Liquidity mining accumulator for a pool."""
+
+    reward_per_second: Amount  # Reward tokens emitted to the pool's LPs per second
+    acc_reward_per_liquidity: int  # Rewards per unit of liquidity since start, scaled by REWARD_PRECISION
+    last_reward_timestamp: int  # Timestamp the accumulator was last brought up to date
+    reward_end_timestamp: int  # Emission stops here; the whole program was reserved from reward_balance
+
+
+class MulticallOp(NamedTuple):
+    """One step of a multicall, run against the call's internal token balances.
+
+    Meaning of the amounts per op:
+    - swap_exact_in: amount_a is the input (0 = whole balance of token_in), amount_b the minimum output
+    - swap_exact_out: amount_a is the output, amount_b the maximum input
+    - add_liquidity: amount_a/amount_b are pool token_a/token_b to add (0 = whole balance)
+    - remove_liquidity: amount_a is token_a to withdraw, amount_b the minimum token_b
+    - withdraw_cashback: amount_a/amount_b are pool token_a/token_b cashback to move into the call
+    """
+
+    op: str  # One of the MULTICALL_* constants
+    pool_key: str
+    token_in: TokenUid  # Input token for swaps, ignored by the other ops
+    amount_a: Amount
+    amount_b: Amount
+
+
+class HarvestableFees(NamedTuple):
+    """Tokens the owner would receive by burning its protocol-fee liquidity in a pool."""
+
+    token_a: str
+    token_b: str
+    liquidity: Amount
+    amount_a: Amount
+    amount_b: Amount
+
+
 class SingleTokenLiquidityQuote(NamedTuple):
     """Quote information for single token liquidity addition."""
 
@@ -314,7 +427,13 @@ class DozerPoolManager(Blueprint):
     paused: bool  # For emergency pause
 
     # Token registry
-    all_pools: list[str]  # List of all pool keys
+    all_pools: list[str]  # Active pool keys; archived pools are removed so registry scans skip them
+    pool_index: dict[str, int]  # Active pool key -> its position in all_pools
+    archived_pools: dict[str, int]  # pool_key -> archive timestamp
+    owner_archived_pools: list[str]  # Pools archived by the owner; LPs may still hold liquidity in them
+    owner_archived_index: dict[str, int]  # Owner-archived pool key -> its position in owner_archived_pools
+    pool_locked_liquidity: dict[str, Amount]  # pool_key -> liquidity burned at creation (owned by nobody)
+    pool_protocol_liquidity: dict[str, Amount]  # pool_key -> protocol-fee liquidity minted to the owner, not yet harvested
     token_to_pools: dict[TokenUid, list[str]]  # Token -> list of pool keys
 
     # Signed pools for dApp listing
@@ -324,7 +443,7 @@ class DozerPoolManager(Blueprint):
     # Price calculation
     htr_token_map: dict[
         TokenUid, str
-    ]  # token -> pool_key with lowest fee (for HTR pairs)
+    ]  # token -> deepest active HTR pool_key (for HTR pairs)
 
     # Pool data
     pools: dict[str, PoolState]  # pool_key -> PoolState (primitives only)
@@ -333,8 +452,19 @@ class DozerPoolManager(Blueprint):
     pool_user_liquidity: dict[str, dict[CallerId, Amount]]  # pool_key -> user -> liquidity
     pool_change: dict[str, dict[CallerId, tuple[Amount, Amount]]]  # pool_key -> user -> (balance_a, balance_b)
     pool_accumulated_fee: dict[str, dict[TokenUid, Amount]]  # pool_key -> token -> fee
-    pool_user_deposit_price_usd: dict[str, dict[CallerId, Amount]]  # pool_key -> user -> price
+    pool_user_deposit_price_usd: dict[str, dict[CallerId, Amount]]  # pool_key -> user -> price (legacy, no longer written)
+    pool_user_cost_basis: dict[str, dict[CallerId, UserCostBasis]]  # pool_key -> user -> token flows
     pool_user_last_action_timestamp: dict[str, dict[CallerId, int]]  # pool_key -> user -> timestamp
+    pool_candles: dict[str, dict[int, PoolCandle]]  # pool_key -> ring slot -> candle
+    pool_window_stats: dict[str, PoolWindowStats]  # pool_key -> rolling 24h/7d sums
+
+    # Liquidity mining
+    reward_token: TokenUid | None  # Token paid out as LP rewards, set once by the owner
+    reward_balance: Amount  # Funded reward tokens not yet claimed
+    reward_allocated: Amount  # Part of reward_balance reserved by pool reward programs (emitted or still to emit)
+    pool_rewards: dict[str, PoolRewardState]  # pool_key -> reward accumulator
+    pool_user_reward_debt: dict[str, dict[CallerId, int]]  # pool_key -> user -> liquidity * index already accounted
+    pool_user_pending_rewards: dict[str, dict[CallerId, Amount]]  # pool_key -> user -> settled, unclaimed rewards
     # TWAP Oracle configuration
     default_twap_window: int  # Default time window for TWAP calculation (applied to new pools)
     @public
@@ -350,6 +480,12 @@ class DozerPoolManager(Blueprint):
         # Initialize dictionaries and lists
         self.authorized_signers: set[CallerId] = set()
         self.all_pools: list[str] = []
+        self.pool_index: dict[str, int] = {}
+        self.archived_pools: dict[str, int] = {}
+        self.owner_archived_pools: list[str] = []
+        self.owner_archived_index: dict[str, int] = {}
+        self.pool_locked_liquidity: dict[str, Amount] = {}
+        self.pool_protocol_liquidity: dict[str, Amount] = {}
         self.token_to_pools: dict[TokenUid, list[str]] = {}
         self.signed_pools: list[str] = []
         self.pool_signers: dict[str, CallerId] = {}
@@ -361,8 +497,18 @@ class DozerPoolManager(Blueprint):
         self.pool_change: dict[str, dict[CallerId, tuple[Amount, Amount]]] = {}
         self.pool_accumulated_fee: dict[str, dict[TokenUid, Amount]] = {}
         self.pool_user_deposit_price_usd: dict[str, dict[CallerId, Amount]] = {}
+        self.pool_user_cost_basis: dict[str, dict[CallerId, UserCostBasis]] = {}
         self.pool_user_last_action_timestamp: dict[str, dict[CallerId, int]] = {}
+        self.pool_candles: dict[str, dict[int, PoolCandle]] = {}
+        self.pool_window_stats: dict[str, PoolWindowStats] = {}
 
+        # Liquidity mining
+        self.reward_token = None
+        self.reward_balance = Amount(0)
+        self.reward_allocated = Amount(0)
+        self.pool_rewards: dict[str, PoolRewardState] = {}
+        self.pool_user_reward_debt: dict[str, dict[CallerId, int]] = {}
+        self.pool_user_pending_rewards: dict[str, dict[CallerId, Amount]] = {}
 
         # Add owner as authorized signer
         self.authorized_signers.add(self.owner)
@@ -397,6 +543,132 @@ class DozerPoolManager(Blueprint):
         if pool_key not in self.pools:
             raise PoolNotFound(f"Pool does not exist: {pool_key}")
 
+    def _validate_pool_active(self, pool_key: str) -> None:
+        """Check that a pool exists and is not archived (archived pools only allow exits)."""
+        self._validate_pool_exists(pool_key)
+        if pool_key in self.archived_pools:
+            raise InvalidState(f"Pool is archived: {pool_key}")
+
+    def _is_revivable(self, pool_key: str) -> bool:
+        """Whether new liquidity re-activates a pool: it was archived automatically after draining.
+
+        Pools archived by the owner only come back through restore_pool.
+        """
+        return pool_key in self.archived_pools and pool_key not in self.owner_archived_index
+
+    def _register_active_pool(self, pool_key: str) -> None:
+        """Append a pool to all_pools and record its position."""
+        self.pool_index[pool_key] = len(self.all_pools)
+        self.all_pools.append(pool_key)
+
+    def _swap_remove_pool(self, pools: list[str], index: dict[str, int], pool_key: str) -> None:
+        """Remove a pool key from an indexed registry list by swapping it with the last entry."""
+        i = index[pool_key]
+        last_key = pools[len(pools) - 1]
+        if last_key != pool_key:
+            pools[i] = last_key
+            index[last_key] = i
+        pools.pop()
+        del index[pool_key]
+
+    def _archive_pool(self, pool_key: str, timestamp: int) -> None:
+        """Move a pool out of all_pools (swap with last) into archived_pools."""
+        self._swap_remove_pool(self.all_pools, self.pool_index, pool_key)
+        self.archived_pools[pool_key] = timestamp
+        # Archived pools stop earning: settle what was emitted so far and release the rest
+        if pool_key in self.pool_rewards:
+            self._set_pool_reward_program(pool_key, Amount(0), 0, timestamp)
+        self._refresh_htr_token_map(pool_key)
+
+        self.log.info('pool archived',
+                      pool_key=pool_key,
+                      timestamp=timestamp)
+
+    def _refresh_htr_token_map(self, pool_key: str) -> None:
+        """Re-pick the htr_token_map entry for the non-HTR token of an HTR pool.
+
+        The entry points at the active HTR pool holding the most HTR (ties keep the lower fee),
+        so a freshly created dust pool cannot take over pricing; it is dropped when no pool with
+        reserves on both sides is left so pricing falls back to path search. Only the HTR pair's
+        own keys (one per fee) are looked up, not every pool the token is listed in.
+        """
+        pool = self.pools[pool_key]
+        if pool.token_a != HATHOR_TOKEN_UID and pool.token_b != HATHOR_TOKEN_UID:
+            return
+        token = pool.token_b if pool.token_a == HATHOR_TOKEN_UID else pool.token_a
+
+        best_key: str | None = None
+        best_depth = 0
+        fee = 0
+        while fee <= MAX_POOL_FEE:
+            candidate_key = self._get_pool_key(TokenUid(HATHOR_TOKEN_UID), token, Amount(fee))
+            fee += 1
+            candidate = self.pools.get(candidate_key)
+            if candidate is None or candidate_key in self.archived_pools:
+                continue
+            if candidate.reserve_a == 0 or candidate.reserve_b == 0:
+                continue
+            depth = candidate.reserve_a if candidate.token_a == HATHOR_TOKEN_UID else candidate.reserve_b
+            if best_key is None or depth > best_depth:
+                best_key = candidate_key
+                best_depth = depth
+
+        if best_key is None:
+            if token in self.htr_token_map:
+                del self.htr_token_map[token]
+        else:
+            self.htr_token_map[token] = best_key
+
+        self.log.debug('htr token map refreshed',
+                       token=token.hex(),
+                       pool_key=best_key)
+
+    def _refresh_htr_token_map_if_mapped(self, pool_key: str) -> None:
+        """Re-pick the htr_token_map entry when liquidity left the pool it points at."""
+        pool = self.pools[pool_key]
+        if pool.token_a != HATHOR_TOKEN_UID and pool.token_b != HATHOR_TOKEN_UID:
+            return
+        token = pool.token_b if pool.token_a == HATHOR_TOKEN_UID else pool.token_a
+        if self.htr_token_map.get(token) == pool_key:
+            self._refresh_htr_token_map(pool_key)
+
+    def _after_liquidity_removed(self, pool_key: str, timestamp: int) -> None:
+        """Run once an entry point has finished removing liquidity from a pool.
+
+        Archives the pool if it was drained (which re-picks its htr_token_map entry), otherwise
+        re-picks the entry if the pool it points at may no longer be the deepest.
+        """
+        self._archive_if_drained(pool_key, timestamp)
+        if pool_key not in self.archived_pools:
+            self._refresh_htr_token_map_if_mapped(pool_key)
+
+    def _htr_price_hops(self, token: TokenUid) -> list[str] | None:
+        """Pools from token to USD through its mapped HTR pair, or None if there is no usable pair."""
+        if token == HATHOR_TOKEN_UID:
+            return [self.htr_usd_pool_key]
+        pool_key = self.htr_token_map.get(token)
+        if pool_key is None or pool_key in self.archived_pools:
+            return None
+        pool = self.pools[pool_key]
+        if pool.reserve_a == 0 or pool.reserve_b == 0:
+            return None
+        return [pool_key, self.htr_usd_pool_key]
+
+    def _archive_if_drained(self, pool_key: str, timestamp: int) -> None:
+        """Archive a pool once the liquidity held by users is worth less than one token unit.
+
+        Liquidity is sqrt(reserve_a * reserve_b) * PRECISION, so less than PRECISION on top of the
+        creation-burned amount means the remaining positions are rounding dust.
+        """
+        if pool_key in self.archived_pools or pool_key == self.htr_usd_pool_key:
+            return
+        locked = self.pool_locked_liquidity.get(pool_key)
+        if locked is None:
+            # Pools created before locked liquidity was recorded are only archived by the owner
+            return
+        if self.pools[pool_key].total_liquidity < locked + PRECISION:
+            self._archive_pool(pool_key, timestamp)
+
     def _get_deposit_action(self, ctx: Context, token_uid: TokenUid) -> NCDepositAction:
         """Get and validate a deposit action for a token.
         """
@@ -444,10 +716,92 @@ class DozerPoolManager(Blueprint):
     def _update_user_liquidity(
         self, pool_key: PoolKey, user_address: CallerId, delta_liquidity: Amount
     ) -> None:
-        """Update user's liquidity by delta (positive or negative)."""
+        """Update user's liquidity by delta (positive or negative), settling mining rewards first.
+
+        Every pool touch accrues the reward index in _update_twap before liquidity changes,
+        so the settlement here uses an up-to-date index.
+        """
         user_liquidity = self.pool_user_liquidity[pool_key]
         current = user_liquidity.get(user_address, Amount(0))
-        user_liquidity[user_address] = Amount(current + delta_liquidity)
+        new_liquidity = Amount(current + delta_liquidity)
+        user_liquidity[user_address] = new_liquidity
+        self._settle_user_rewards(pool_key, user_address, current, new_liquidity)
+
+    def _emission_seconds(self, state: PoolRewardState, timestamp: int) -> int:
+        """Seconds of emission between the last accrual and timestamp, stopping at the program end."""
+        return max(0, min(timestamp, state.reward_end_timestamp) - state.last_reward_timestamp)
+
+    def _pool_rewards_at(self, pool_key: str, state: PoolRewardState, timestamp: int) -> PoolRewardState:
+        """Return the pool's reward accumulator advanced to timestamp, without writing it."""
+        if timestamp <= state.last_reward_timestamp:
+            return state
+        elapsed = self._emission_seconds(state, timestamp)
+        total_liquidity = self.pools[pool_key].total_liquidity
+        acc = state.acc_reward_per_liquidity
+        if elapsed > 0 and total_liquidity > 0 and state.reward_per_second > 0:
+            acc += (elapsed * state.reward_per_second * REWARD_PRECISION) // total_liquidity
+        return state._replace(acc_reward_per_liquidity=acc, last_reward_timestamp=timestamp)
+
+    def _accrue_pool_rewards(self, pool_key: str, timestamp: int) -> None:
+        """Bring the pool's reward index up to timestamp (no-op for pools without rewards).
+
+        Emission over a window with no liquidity has nobody to go to, so its reservation is released.
+        """
+        state = self.pool_rewards.get(pool_key)
+        if state is None or timestamp <= state.last_reward_timestamp:
+            return
+        if self.pools[pool_key].total_liquidity == 0:
+            unpaid = self._emission_seconds(state, timestamp) * state.reward_per_second
+            self.reward_allocated = Amount(self.reward_allocated - unpaid)
+        self.pool_rewards[pool_key] = self._pool_rewards_at(pool_key, state, timestamp)
+
+    def _set_pool_reward_program(
+        self, pool_key: str, reward_per_second: Amount, duration: int, timestamp: int
+    ) -> None:
+        """Replace the pool's reward program, reserving its full emission from reward_balance.
+
+        The unemitted remainder of the previous program is released first.
+
+        Raises:
+            InsufficientLiquidity: If the unreserved reward balance cannot cover the program
+        """
+        self._accrue_pool_rewards(pool_key, timestamp)
+        state = self.pool_rewards.get(pool_key)
+        allocated = self.reward_allocated
+        acc = 0
+        if state is not None:
+            allocated -= max(0, state.reward_end_timestamp - timestamp) * state.reward_per_second
+            acc = state.acc_reward_per_liquidity
+        allocated += reward_per_second * duration
+        if allocated > self.reward_balance:
+            raise InsufficientLiquidity("Not enough unallocated rewards for this program")
+
+        self.reward_allocated = Amount(allocated)
+        self.pool_rewards[pool_key] = PoolRewardState(
+            reward_per_second=reward_per_second,
+            acc_reward_per_liquidity=acc,
+            last_reward_timestamp=timestamp,
+            reward_end_timestamp=timestamp + duration,
+        )
+
+    def _settle_user_rewards(
+        self, pool_key: str, user_address: CallerId, liquidity_before: Amount, liquidity_after: Amount
+    ) -> None:
+        """Move rewards earned by liquidity_before into pending and reset the user's reward debt."""
+        state = self.pool_rewards.get(pool_key)
+        if state is None:
+            return
+        if pool_key not in self.pool_user_reward_debt:
+            self.pool_user_reward_debt[pool_key] = {}
+            self.pool_user_pending_rewards[pool_key] = {}
+        debts = self.pool_user_reward_debt[pool_key]
+        pending = self.pool_user_pending_rewards[pool_key]
+
+        acc = state.acc_reward_per_liquidity
+        earned = (liquidity_before * acc) // REWARD_PRECISION - debts.get(user_address, 0)
+        if earned > 0:
+            pending[user_address] = Amount(pending.get(user_address, 0) + earned)
+        debts[user_address] = (liquidity_after * acc) // REWARD_PRECISION
 
     def _calculate_protocol_fee(self, fee_amount: Amount) -> Amount:
         """Calculate protocol fee, rounding up to 1 for very small amounts."""
@@ -517,9 +871,9 @@ class DozerPoolManager(Blueprint):
         )
 
         # Mint liquidity to owner
-        user_liquidity = self.pool_user_liquidity[pool_key]
-        user_liquidity[self.owner] = Amount(
-            user_liquidity.get(self.owner, 0) + liquidity_increase
+        self._update_user_liquidity(pool_key, self.owner, liquidity_increase)
+        self.pool_protocol_liquidity[pool_key] = Amount(
+            self.pool_protocol_liquidity.get(pool_key, 0) + liquidity_increase
         )
 
         # Update pool total liquidity
@@ -745,36 +1099,258 @@ class DozerPoolManager(Blueprint):
         else:
             raise InvalidTokens(f"Token {token_in} not in pool")
 
+    def _expire_window(
+        self,
+        candles: dict[int, PoolCandle],
+        last_bucket: int,
+        current_bucket: int,
+        window: int,
+        sums: tuple[Amount, Amount, Amount, Amount],
+    ) -> tuple[Amount, Amount, Amount, Amount]:
+        """Subtract candles that left a window of `window` buckets between last_bucket and current_bucket.
+
+        sums is (volume_a, volume_b, fee_a, fee_b). Each bucket is expired once, so the
+        amortized cost per swap is O(1) and a single call never walks more than `window` buckets.
+        """
+        expire_to = min(last_bucket, current_bucket - window)
+        bucket = last_bucket - window + 1
+        if bucket > expire_to:
+            return sums
+        if expire_to == last_bucket:
+            # The whole previous window is out of range
+            return Amount(0), Amount(0), Amount(0), Amount(0)
+
+        volume_a, volume_b, fee_a, fee_b = sums
+        while bucket <= expire_to:
+            candle = candles.get(bucket % CANDLE_SLOTS)
+            if candle is not None and candle.start_timestamp == bucket * CANDLE_INTERVAL:
+                volume_a -= candle.volume_a
+                volume_b -= candle.volume_b
+                fee_a -= candle.fee_a
+                fee_b -= candle.fee_b
+            bucket += 1
+        # Candles recorded before window tracking started were never added; clamp instead of underflowing
+        return Amount(max(0, volume_a)), Amount(max(0, volume_b)), Amount(max(0, fee_a)), Amount(max(0, fee_b))
+
+    def _window_stats_at(self, pool_key: str, current_bucket: int) -> PoolWindowStats:
+        """Return the pool's window sums expired up to current_bucket, without writing them."""
+        stats = self.pool_window_stats.get(pool_key)
+        if stats is None:
+            return PoolWindowStats(
+                last_bucket=current_bucket,
+                volume_a_24h=Amount(0),
+                volume_b_24h=Amount(0),
+                fee_a_24h=Amount(0),
+                fee_b_24h=Amount(0),
+                volume_a_7d=Amount(0),
+                volume_b_7d=Amount(0),
+                fee_a_7d=Amount(0),
+                fee_b_7d=Amount(0),
+            )
+        if current_bucket <= stats.last_bucket:
+            return stats
+
+        candles = self.pool_candles.get(pool_key, {})
+        volume_a_24h, volume_b_24h, fee_a_24h, fee_b_24h = self._expire_window(
+            candles, stats.last_bucket, current_bucket, WINDOW_24H_BUCKETS,
+            (stats.volume_a_24h, stats.volume_b_24h, stats.fee_a_24h, stats.fee_b_24h),
+        )
+        volume_a_7d, volume_b_7d, fee_a_7d, fee_b_7d = self._expire_window(
+            candles, stats.last_bucket, current_bucket, WINDOW_7D_BUCKETS,
+            (stats.volume_a_7d, stats.volume_b_7d, stats.fee_a_7d, stats.fee_b_7d),
+        )
+        return PoolWindowStats(
+            last_bucket=current_bucket,
+            volume_a_24h=volume_a_24h,
+            volume_b_24h=volume_b_24h,
+            fee_a_24h=fee_a_24h,
+            fee_b_24h=fee_b_24h,
+            volume_a_7d=volume_a_7d,
+            volume_b_7d=volume_b_7d,
+            fee_a_7d=fee_a_7d,
+            fee_b_7d=fee_b_7d,
+        )
+
+    def _update_window_stats(
+        self,
+        pool_key: str,
+        current_bucket: int,
+        volume_a: Amount,
+        volume_b: Amount,
+        fee_a: Amount,
+        fee_b: Amount,
+    ) -> None:
+        """Expire stale buckets from the pool's rolling sums and add one swap to them."""
+        stats = self._window_stats_at(pool_key, current_bucket)
+        self.pool_window_stats[pool_key] = PoolWindowStats(
+            last_bucket=stats.last_bucket,
+            volume_a_24h=Amount(stats.volume_a_24h + volume_a),
+            volume_b_24h=Amount(stats.volume_b_24h + volume_b),
+            fee_a_24h=Amount(stats.fee_a_24h + fee_a),
+            fee_b_24h=Amount(stats.fee_b_24h + fee_b),
+            volume_a_7d=Amount(stats.volume_a_7d + volume_a),
+            volume_b_7d=Amount(stats.volume_b_7d + volume_b),
+            fee_a_7d=Amount(stats.fee_a_7d + fee_a),
+            fee_b_7d=Amount(stats.fee_b_7d + fee_b),
+        )
+
+    def _fee_apr(self, pool: PoolState, fee_a: Amount, fee_b: Amount, buckets: int) -> Amount:
+        """Annualize fees collected over `buckets` candle intervals into an LP APR in basis points.
+
+        Fees and TVL are both valued in token_a at the spot price; the protocol's share of
+        each fee is excluded since it is minted to the owner rather than earned by LPs.
+        """
+        if pool.reserve_a == 0 or pool.reserve_b == 0:
+            return Amount(0)
+        fee_in_a = fee_a + (fee_b * pool.reserve_a) // pool.reserve_b
+        lp_fee_in_a = fee_in_a * (100 - self.default_protocol_fee) // 100
+        tvl_in_a = 2 * pool.reserve_a
+        year_seconds = 365 * 24 * 60 * 60
+        return Amount(
+            (lp_fee_in_a * year_seconds * 10000) // (tvl_in_a * buckets * CANDLE_INTERVAL)
+        )
+
+    def _spot_price_a(self, pool: PoolState) -> Amount:
+        """Return the spot price of token_a in token_b with PRICE_PRECISION."""
+        if pool.reserve_a == 0:
+            return Amount(0)
+        return Amount((pool.reserve_b * PRICE_PRECISION) // pool.reserve_a)
+
+    def _record_swap_candle(
+        self,
+        pool_key: str,
+        ctx: Context,
+        token_in: TokenUid,
+        amount_in: Amount,
+        amount_out: Amount,
+        price_before: Amount,
+    ) -> None:
+        """Fold a swap into the pool's current candle bucket (called after reserves are updated).
+
+        Shared by every path that swaps against the reserves: both swap directions and the
+        internal swaps of add_liquidity_single_token / remove_liquidity_single_token, so
+        candles, window stats and fee APR see the same volume and fees.
+
+        The ring slot is reused once its stored bucket is older than CANDLE_SLOTS intervals,
+        so each swap costs one read and one write regardless of history length.
+        """
+        if pool_key not in self.pool_candles:
+            self.pool_candles[pool_key] = {}
+        candles = self.pool_candles[pool_key]
+
+        pool = self.pools[pool_key]
+        price_after = self._spot_price_a(pool)
+        volume_a, volume_b = self._get_volume_increments(token_in, amount_in, amount_out, pool)
+        fee_amount = self._calculate_swap_fee(amount_in, pool.fee_numerator, pool.fee_denominator)
+        fee_a = fee_amount if token_in == pool.token_a else Amount(0)
+        fee_b = fee_amount if token_in == pool.token_b else Amount(0)
+
+        bucket_start = (int(ctx.block.timestamp) // CANDLE_INTERVAL) * CANDLE_INTERVAL
+        slot = (bucket_start // CANDLE_INTERVAL) % CANDLE_SLOTS
+
+        # Expire window sums first: the slot about to be reused may still be read for expiry
+        self._update_window_stats(
+            pool_key, bucket_start // CANDLE_INTERVAL, volume_a, volume_b, fee_a, fee_b
+        )
+
+        candle = candles.get(slot)
+
+        if candle is None or candle.start_timestamp != bucket_start:
+            candles[slot] = PoolCandle(
+                start_timestamp=bucket_start,
+                open_price=price_before,
+                high_price=Amount(max(price_before, price_after)),
+                low_price=Amount(min(price_before, price_after)),
+                close_price=price_after,
+                volume_a=volume_a,
+                volume_b=volume_b,
+                fee_a=fee_a,
+                fee_b=fee_b,
+                swaps=1,
+            )
+        else:
+            candles[slot] = PoolCandle(
+                start_timestamp=bucket_start,
+                open_price=candle.open_price,
+                high_price=Amount(max(candle.high_price, price_before, price_after)),
+                low_price=Amount(min(candle.low_price, price_before, price_after)),
+                close_price=price_after,
+                volume_a=Amount(candle.volume_a + volume_a),
+                volume_b=Amount(candle.volume_b + volume_b),
+                fee_a=Amount(candle.fee_a + fee_a),
+                fee_b=Amount(candle.fee_b + fee_b),
+                swaps=candle.swaps + 1,
+            )
+
     def _update_user_profit_tracking(
-        self, user_address: CallerId, pool_key: str, ctx: Context
+        self,
+        user_address: CallerId,
+        pool_key: str,
+        ctx: Context,
+        liquidity_delta: Amount,
+        amount_a_in: Amount = Amount(0),
+        amount_b_in: Amount = Amount(0),
+        amount_a_out: Amount = Amount(0),
+        amount_b_out: Amount = Amount(0),
     ) -> None:
-        """Update user profit tracking after liquidity operations."""
-        # Calculate current USD value of user's position
-        current_usd_value = self._calculate_user_position_usd_value(user_address, pool_key)
+        """Record token flows and cost basis after a liquidity operation (called after the user's liquidity update).
 
-        # Update the stored USD price 
-        self.pool_user_deposit_price_usd[pool_key][user_address] = current_usd_value
+        Only pool-token amounts are stored; USD valuation happens in get_user_profit_info.
+        Additions raise the basis by the net tokens put in; removals scale it by the share of
+        liquidity kept. A position opened before cost-basis tracking is seeded from its current
+        token amounts on its first tracked operation.
+        """
+        if pool_key not in self.pool_user_cost_basis:
+            self.pool_user_cost_basis[pool_key] = {}
+        user_bases = self.pool_user_cost_basis[pool_key]
+
+        liquidity_after = self.pool_user_liquidity[pool_key].get(user_address, Amount(0))
+        liquidity_before = liquidity_after - liquidity_delta
+        stored = user_bases.get(user_address)
+        current = EMPTY_COST_BASIS if stored is None else stored
+
+        if stored is None and liquidity_before > 0:
+            basis_a, basis_b = self._user_position_amounts(user_address, pool_key)
+        elif liquidity_delta < 0:
+            basis_a = current.basis_a * liquidity_after // liquidity_before
+            basis_b = current.basis_b * liquidity_after // liquidity_before
+        else:
+            basis_a = max(0, current.basis_a + amount_a_in - amount_a_out)
+            basis_b = max(0, current.basis_b + amount_b_in - amount_b_out)
+
+        user_bases[user_address] = UserCostBasis(
+            deposited_a=Amount(current.deposited_a + amount_a_in),
+            deposited_b=Amount(current.deposited_b + amount_b_in),
+            withdrawn_a=Amount(current.withdrawn_a + amount_a_out),
+            withdrawn_b=Amount(current.withdrawn_b + amount_b_out),
+            basis_a=Amount(basis_a),
+            basis_b=Amount(basis_b),
+        )
 
-        # Update timestamp 
+        # Update timestamp
         self.pool_user_last_action_timestamp[pool_key][user_address] = int(ctx.block.timestamp)
 
+    def _user_position_amounts(self, user_address: CallerId, pool_key: str) -> tuple[Amount, Amount]:
+        """Return the user's share of the pool reserves as (amount_a, amount_b)."""
+        pool = self.pools[pool_key]
+        user_liquidity = self.pool_user_liquidity[pool_key].get(user_address, Amount(0))
+        if user_liquidity == 0 or pool.total_liquidity == 0:
+            return Amount(0), Amount(0)
+        return (
+            Amount((pool.reserve_a * user_liquidity) // pool.total_liquidity),
+            Amount((pool.reserve_b * user_liquidity) // pool.total_liquidity),
+        )
+
     def _calculate_user_position_usd_value(
         self, user_address: CallerId, pool_key: str
     ) -> Amount:
         """Calculate current USD value of user's position in pool."""
         pool = self.pools[pool_key]
 
-        # Get user liquidity from blueprint attribute
-        user_liquidity = self.pool_user_liquidity[pool_key].get(user_address, Amount(0))
-        if user_liquidity == 0:
-            return Amount(0)
-
-        if pool.total_liquidity == 0:
-            return Amount(0)
-
         # Calculate user's share of the pool
-        user_token_a_amount = (pool.reserve_a * user_liquidity) // pool.total_liquidity
-        user_token_b_amount = (pool.reserve_b * user_liquidity) // pool.total_liquidity
+        user_token_a_amount, user_token_b_amount = self._user_position_amounts(user_address, pool_key)
+        if user_token_a_amount == 0 and user_token_b_amount == 0:
+            return Amount(0)
 
         # Get token prices in USD
         token_a_price_usd = self.get_token_price_in_usd(pool.token_a)
@@ -844,6 +1420,9 @@ class DozerPoolManager(Blueprint):
 
         current_timestamp = int(ctx.block.timestamp)
 
+        # Every pool touch passes through here, so the reward index is accrued lazily alongside TWAP
+        self._accrue_pool_rewards(pool_key, current_timestamp)
+
         # Only update once per block to prevent intra-block manipulation
         if current_timestamp == pool.block_timestamp_last:
             return
@@ -1321,7 +1900,7 @@ class DozerPoolManager(Blueprint):
             raise PoolExists("Pool already exists")
 
         # Validate fee
-        if fee > 50:
+        if fee > MAX_POOL_FEE:
             raise InvalidFee("Fee too high")
         if fee < 0:
             raise InvalidFee("Invalid fee")
@@ -1391,14 +1970,17 @@ class DozerPoolManager(Blueprint):
         # Initialize container attributes separately
         # User receives initial_liquidity (not including burned amount)
         self.pool_user_liquidity[pool_key] = {ctx.caller_id: Amount(initial_liquidity)}
+        self.pool_locked_liquidity[pool_key] = Amount(minimum_liquidity)
         self.pool_change[pool_key] = {}
         self.pool_accumulated_fee[pool_key] = {token_a: Amount(0), token_b: Amount(0)}
         self.pool_user_deposit_price_usd[pool_key] = {}
+        self.pool_user_cost_basis[pool_key] = {}
         self.pool_user_last_action_timestamp[pool_key] = {}
+        self.pool_candles[pool_key] = {}
 
         # Update registry
         # all_pools should already be initialized by the Blueprint system
-        self.all_pools.append(pool_key)
+        self._register_active_pool(pool_key)
 
         # Update token to pools mapping
         if token_a in self.token_to_pools:
@@ -1412,22 +1994,8 @@ class DozerPoolManager(Blueprint):
         else:
             self.token_to_pools[token_b] = [pool_key]
 
-        # Update HTR token map if this is an HTR pool
-        if token_a == HATHOR_TOKEN_UID or token_b == HATHOR_TOKEN_UID:
-            other_token = token_b if token_a == HATHOR_TOKEN_UID else token_a
-
-            # If token not in map or new pool has lower fee, update the map
-            current_pool_key = self.htr_token_map.get(other_token)
-            if (
-                current_pool_key is None
-                or self.pools[pool_key].fee_numerator
-                < self.pools[current_pool_key].fee_numerator
-            ):
-                self.htr_token_map[other_token] = pool_key
-                self.log.debug('updating htr token map for pool',
-                               pool_key=pool_key,
-                               other_token=other_token.hex(),
-                               fee_numerator=fee)
+        # Update HTR token map if this is an HTR pool (no-op otherwise)
+        self._refresh_htr_token_map(pool_key)
 
         self.log.info('pool created successfully',
                       pool_key=pool_key,
@@ -1440,195 +2008,175 @@ class DozerPoolManager(Blueprint):
 
         return pool_key
 
-    @public(allow_deposit=True)
-    def add_liquidity(
+    def _add_liquidity_internal(
         self,
+        pool_key: str,
+        user_address: CallerId,
+        amount_a: Amount,
+        amount_b: Amount,
         ctx: Context,
-        fee: Amount,
-    ) -> tuple[TokenUid, Amount]:
-        """Add liquidity to an existing pool.
+    ) -> tuple[Amount, Amount, Amount]:
+        """Add the largest proportional amounts within (amount_a, amount_b) to a pool.
 
-        Args:
-            ctx: The transaction context
-            fee: Fee for the pool
+        The TWAP must already be updated. Callers decide what happens to the unused amount.
+
+        A drained pool that was archived automatically is revived instead: see _revive_pool.
 
         Returns:
-            A tuple of (token, change_amount)
+            A tuple of (used_a, used_b, liquidity_increase)
 
         Raises:
-            PoolNotFound: If the pool does not exist
-            InvalidAction: If the actions are invalid
+            InvalidAction: If the amounts cannot be matched to the pool ratio
+            InvalidState: If the pool was archived by the owner
         """
-        self._check_not_paused(ctx)
-        pool_key, pool, user_address = self._setup_pool_from_context(ctx, fee)
-
-        # Update TWAP oracle before liquidity change
-        self._update_twap(pool_key, ctx)
-
-        action_a, action_b = self._get_actions_in_in(ctx, pool_key)
+        if self._is_revivable(pool_key):
+            return self._revive_pool(pool_key, user_address, amount_a, amount_b, ctx)
+        self._validate_pool_active(pool_key)
+        pool = self.pools[pool_key]
 
         # This logic mirrors Dozer_Pool_v1_1.add_liquidity
         reserve_a = pool.reserve_a
         reserve_b = pool.reserve_b
 
-        action_a_amount = Amount(action_a.amount)
-        action_b_amount = Amount(action_b.amount)
-
-        self.log.debug('adding liquidity',
-                       pool_key=pool_key,
-                       action_a_amount=action_a_amount,
-                       action_b_amount=action_b_amount,
-                       user=str(user_address))
-
-        optimal_b = self.quote(action_a_amount, reserve_a, reserve_b)
-        if optimal_b <= action_b_amount:
-            change = action_b_amount - optimal_b
-            self._update_change(
-                user_address, change, pool.token_b, pool_key
-            )
-            pool = self.pools[pool_key]  # Refresh after _update_change
-
+        optimal_b = self.quote(amount_a, reserve_a, reserve_b)
+        if optimal_b <= amount_b:
+            used_a, used_b = amount_a, optimal_b
             self.log.debug('token a is limiting factor',
                            optimal_b=optimal_b,
-                           action_b_amount=action_b_amount,
-                           change=change)
+                           amount_b=amount_b)
+        else:
+            optimal_a = self.quote(amount_b, reserve_b, reserve_a)
 
-            # Calculate liquidity increase
-            liquidity_increase = (
-                pool.total_liquidity * action_a_amount // reserve_a
-            )
+            # Validate optimal_a is not greater than amount_a
+            if optimal_a > amount_a:
+                raise InvalidAction("Insufficient token A amount")
 
-            self.log.debug('liquidity increase calculated',
-                           liquidity_increase=liquidity_increase,
-                           total_liquidity_before=pool.total_liquidity,
-                           total_liquidity_after=pool.total_liquidity + liquidity_increase)
+            used_a, used_b = optimal_a, amount_b
+            self.log.debug('token b is limiting factor',
+                           optimal_a=optimal_a,
+                           amount_a=amount_a)
 
-            # Update user liquidity
-            self._update_user_liquidity(pool_key, user_address, Amount(liquidity_increase))
+        # Calculate liquidity increase
+        liquidity_increase = Amount(pool.total_liquidity * used_a // reserve_a)
 
-            # Update pool state with all changes
-            self._update_pool(
-                pool_key,
-                total_liquidity=Amount(pool.total_liquidity + liquidity_increase),
-                reserve_a=Amount(pool.reserve_a + action_a_amount),
-                reserve_b=Amount(pool.reserve_b + optimal_b),
-                last_activity=Timestamp(ctx.block.timestamp)
-            )
+        self.log.debug('liquidity increase calculated',
+                       liquidity_increase=liquidity_increase,
+                       total_liquidity_before=pool.total_liquidity,
+                       total_liquidity_after=pool.total_liquidity + liquidity_increase)
 
-            # Update profit tracking after liquidity has been added
-            self._update_user_profit_tracking(user_address, pool_key, ctx)
+        # Update user liquidity
+        self._update_user_liquidity(pool_key, user_address, liquidity_increase)
 
-            # Verify price ratio remains constant (proportional liquidity addition)
-            pool_after = self.pools[pool_key]
-            self._check_price_ratio(reserve_a, reserve_b, pool_after.reserve_a, pool_after.reserve_b, "add_liquidity")
+        # Update pool state with all changes
+        pool = self.pools[pool_key]
+        self._update_pool(
+            pool_key,
+            total_liquidity=Amount(pool.total_liquidity + liquidity_increase),
+            reserve_a=Amount(pool.reserve_a + used_a),
+            reserve_b=Amount(pool.reserve_b + used_b),
+            last_activity=Timestamp(ctx.block.timestamp)
+        )
 
-            self.log.info('liquidity added successfully',
-                          pool_key=pool_key,
-                          user=str(user_address),
-                          liquidity_increase=liquidity_increase,
-                          reserve_a_added=action_a_amount,
-                          reserve_b_added=optimal_b,
-                          change_token='token_b',
-                          change_amount=change)
+        # Update profit tracking after liquidity has been added
+        self._update_user_profit_tracking(
+            user_address, pool_key, ctx, liquidity_increase,
+            amount_a_in=used_a, amount_b_in=used_b,
+        )
 
-            return (pool.token_b, change)
-        else:
-            optimal_a = self.quote(action_b_amount, reserve_b, reserve_a)
+        # Verify price ratio remains constant (proportional liquidity addition)
+        pool_after = self.pools[pool_key]
+        self._check_price_ratio(reserve_a, reserve_b, pool_after.reserve_a, pool_after.reserve_b, "add_liquidity")
 
-            # Validate optimal_a is not greater than action_a.amount
-            if optimal_a > action_a_amount:
-                raise InvalidAction("Insufficient token A amount")
+        return used_a, used_b, liquidity_increase
 
-            change = action_a_amount - optimal_a
-            self._update_change(
-                user_address, change, pool.token_a, pool_key
-            )
-            pool = self.pools[pool_key]  # Refresh after _update_change
+    def _revive_pool(
+        self,
+        pool_key: str,
+        user_address: CallerId,
+        amount_a: Amount,
+        amount_b: Amount,
+        ctx: Context,
+    ) -> tuple[Amount, Amount, Amount]:
+        """Re-activate a drained, automatically archived pool with a fresh deposit.
 
-            self.log.debug('token b is limiting factor',
-                           optimal_a=optimal_a,
-                           action_a_amount=action_a_amount,
-                           change=change)
+        The leftover reserves are rounding dust with no meaningful price, so like create_pool the
+        deposit is taken in full and sets the new price. The total liquidity is reset to
+        sqrt(reserve_a * reserve_b) * PRECISION and the depositor receives all of it except the
+        liquidity that already exists (the creation-burned amount and leftover dust positions).
 
-            # Calculate liquidity increase
-            liquidity_increase = (
-                pool.total_liquidity * optimal_a // reserve_a
-            )
+        Returns:
+            A tuple of (used_a, used_b, liquidity_increase)
 
-            self.log.debug('liquidity increase calculated',
-                           liquidity_increase=liquidity_increase,
-                           total_liquidity_before=pool.total_liquidity,
-                           total_liquidity_after=pool.total_liquidity + liquidity_increase)
+        Raises:
+            InvalidAction: If either amount is zero or too small to add liquidity
+        """
+        if amount_a <= 0 or amount_b <= 0:
+            raise InvalidAction("Reviving a pool requires both tokens")
+        pool = self.pools[pool_key]
 
-            # Update user liquidity
-            self._update_user_liquidity(pool_key, user_address, liquidity_increase)
+        reserve_a = Amount(pool.reserve_a + amount_a)
+        reserve_b = Amount(pool.reserve_b + amount_b)
+        total_liquidity = Amount(self._isqrt(reserve_a * reserve_b) * PRECISION)
+        liquidity_increase = Amount(total_liquidity - pool.total_liquidity)
+        if liquidity_increase <= 0:
+            raise InvalidAction("Insufficient liquidity to revive pool")
 
-            # Update pool state with all changes
-            self._update_pool(
-                pool_key,
-                total_liquidity=Amount(pool.total_liquidity + liquidity_increase),
-                reserve_a=Amount(pool.reserve_a + optimal_a),
-                reserve_b=Amount(pool.reserve_b + action_b_amount),
-                last_activity=Timestamp(ctx.block.timestamp)
-            )
+        del self.archived_pools[pool_key]
+        self._register_active_pool(pool_key)
 
-            # Update profit tracking after liquidity has been added
-            self._update_user_profit_tracking(user_address, pool_key, ctx)
+        self._update_user_liquidity(pool_key, user_address, liquidity_increase)
+
+        # Restart the TWAP window at the new price, as create_pool does
+        self._update_pool(
+            pool_key,
+            total_liquidity=total_liquidity,
+            reserve_a=reserve_a,
+            reserve_b=reserve_b,
+            last_activity=Timestamp(ctx.block.timestamp),
+            price_a_window_sum=Amount((reserve_b * PRICE_PRECISION) // reserve_a * pool.twap_window),
+            price_b_window_sum=Amount((reserve_a * PRICE_PRECISION) // reserve_b * pool.twap_window),
+            block_timestamp_last=int(ctx.block.timestamp),
+        )
 
-            # Verify price ratio remains constant (proportional liquidity addition)
-            pool_after = self.pools[pool_key]
-            self._check_price_ratio(reserve_a, reserve_b, pool_after.reserve_a, pool_after.reserve_b, "add_liquidity")
+        self._update_user_profit_tracking(
+            user_address, pool_key, ctx, liquidity_increase,
+            amount_a_in=amount_a, amount_b_in=amount_b,
+        )
+        self._refresh_htr_token_map(pool_key)
 
-            self.log.info('liquidity added successfully',
-                          pool_key=pool_key,
-                          user=str(user_address),
-                          liquidity_increase=liquidity_increase,
-                          reserve_a_added=optimal_a,
-                          reserve_b_added=action_b_amount,
-                          change_token='token_a',
-                          change_amount=change)
+        self.log.info('pool revived',
+                      pool_key=pool_key,
+                      user=str(user_address),
+                      liquidity_increase=liquidity_increase,
+                      reserve_a=reserve_a,
+                      reserve_b=reserve_b)
 
-            return (pool.token_a, change)
+        return amount_a, amount_b, liquidity_increase
 
-    @public(allow_withdrawal=True)
-    def remove_liquidity(
+    def _remove_liquidity_internal(
         self,
+        pool_key: str,
+        user_address: CallerId,
+        amount_a: Amount,
         ctx: Context,
-        fee: Amount,
-    ) -> tuple[TokenUid, Amount]:
-        """Remove liquidity from a pool.
+    ) -> tuple[Amount, Amount]:
+        """Burn the user's liquidity for amount_a of token_a and the proportional token_b.
 
-        Args:
-            ctx: The transaction context
-            fee: Fee for the pool
+        The TWAP must already be updated. Callers decide where the tokens go and run
+        _after_liquidity_removed once their whole operation is done.
+
+        Returns:
+            A tuple of (amount_b, liquidity_decrease)
 
         Raises:
-            PoolNotFound: If the pool does not exist
             InvalidAction: If the user has no liquidity or insufficient liquidity
         """
-        self._check_not_paused(ctx)
-        pool_key, pool, user_address = self._setup_pool_from_context(ctx, fee)
-
-        # Update TWAP oracle before liquidity change
-        self._update_twap(pool_key, ctx)
+        pool = self.pools[pool_key]
 
         # Capture reserves before operation
         reserve_a_before = pool.reserve_a
         reserve_b_before = pool.reserve_b
 
-        action_a, action_b = self._get_actions_out_out(ctx, pool_key)
-
-        action_a_amount = Amount(action_a.amount)
-        action_b_amount = Amount(action_b.amount)
-
-        self.log.debug('removing liquidity',
-                       pool_key=pool_key,
-                       user=str(user_address),
-                       action_a_amount=action_a_amount,
-                       action_b_amount=action_b_amount,
-                       reserve_a_before=reserve_a_before,
-                       reserve_b_before=reserve_b_before)
-
         # Check if user has liquidity
         user_liquidity = self.pool_user_liquidity[pool_key]
         if (
@@ -1647,32 +2195,22 @@ class DozerPoolManager(Blueprint):
         self.log.debug('max withdrawal calculated',
                        user_liquidity=user_liquidity[user_address],
                        max_withdraw=max_withdraw,
-                       action_a_amount=action_a_amount)
+                       amount_a=amount_a)
 
-        if max_withdraw < action_a_amount:
+        if max_withdraw < amount_a:
             raise InvalidAction(
-                f"Insufficient liquidity: {max_withdraw} < {action_a_amount}"
+                f"Insufficient liquidity: {max_withdraw} < {amount_a}"
             )
 
         optimal_b = self.quote(
-            action_a_amount,
+            amount_a,
             pool.reserve_a,
             pool.reserve_b,
         )
 
-        if optimal_b < action_b_amount:
-            raise InvalidAction("Insufficient token B amount")
-
-        change = optimal_b - action_b_amount
-
-        self._update_change(
-            user_address, change, pool.token_b, pool_key
-        )
-        pool = self.pools[pool_key]  # Refresh after _update_change
-
         # Calculate liquidity decrease
         liquidity_decrease = self._ceil_div(
-            Amount(pool.total_liquidity * action_a_amount),
+            Amount(pool.total_liquidity * amount_a),
             pool.reserve_a
         )
 
@@ -1685,26 +2223,151 @@ class DozerPoolManager(Blueprint):
         self._update_user_liquidity(pool_key, user_address, Amount(-liquidity_decrease))
 
         # Update pool state with all changes
+        pool = self.pools[pool_key]
         self._update_pool(
             pool_key,
             total_liquidity=Amount(pool.total_liquidity - liquidity_decrease),
-            reserve_a=Amount(pool.reserve_a - action_a_amount),
+            reserve_a=Amount(pool.reserve_a - amount_a),
             reserve_b=Amount(pool.reserve_b - optimal_b),
             last_activity=Timestamp(ctx.block.timestamp)
         )
 
         # Update profit tracking after liquidity has been removed
-        self._update_user_profit_tracking(user_address, pool_key, ctx)
+        self._update_user_profit_tracking(
+            user_address, pool_key, ctx, Amount(-liquidity_decrease),
+            amount_a_out=amount_a, amount_b_out=optimal_b,
+        )
 
         # Verify price ratio remains constant (proportional liquidity removal)
         pool_after = self.pools[pool_key]
         self._check_price_ratio(reserve_a_before, reserve_b_before, pool_after.reserve_a, pool_after.reserve_b, "remove_liquidity")
 
-        self.log.info('liquidity removed successfully',
-                      pool_key=pool_key,
-                      user=str(user_address),
-                      liquidity_decrease=liquidity_decrease,
-                      amount_a_withdrawn=action_a_amount,
+        return optimal_b, liquidity_decrease
+
+    @public(allow_deposit=True)
+    def add_liquidity(
+        self,
+        ctx: Context,
+        fee: Amount,
+    ) -> tuple[TokenUid, Amount]:
+        """Add liquidity to an existing pool.
+
+        Adding to a pool that was archived automatically after its last LP left re-activates
+        it at the deposit's price.
+
+        Args:
+            ctx: The transaction context
+            fee: Fee for the pool
+
+        Returns:
+            A tuple of (token, change_amount)
+
+        Raises:
+            PoolNotFound: If the pool does not exist
+            InvalidAction: If the actions are invalid
+            InvalidState: If the pool was archived by the owner
+        """
+        self._check_not_paused(ctx)
+        pool_key, pool, user_address = self._setup_pool_from_context(ctx, fee)
+
+        # Update TWAP oracle before liquidity change
+        self._update_twap(pool_key, ctx)
+
+        action_a, action_b = self._get_actions_in_in(ctx, pool_key)
+
+        action_a_amount = Amount(action_a.amount)
+        action_b_amount = Amount(action_b.amount)
+
+        self.log.debug('adding liquidity',
+                       pool_key=pool_key,
+                       action_a_amount=action_a_amount,
+                       action_b_amount=action_b_amount,
+                       user=str(user_address))
+
+        # A revived pool takes both amounts in full, so there is no change either way
+        a_is_limiting = (
+            self._is_revivable(pool_key)
+            or self.quote(action_a_amount, pool.reserve_a, pool.reserve_b) <= action_b_amount
+        )
+
+        used_a, used_b, liquidity_increase = self._add_liquidity_internal(
+            pool_key, user_address, action_a_amount, action_b_amount, ctx
+        )
+
+        # The unused side of the deposit is kept as cashback
+        if a_is_limiting:
+            change_token = pool.token_b
+            change = Amount(action_b_amount - used_b)
+        else:
+            change_token = pool.token_a
+            change = Amount(action_a_amount - used_a)
+        self._update_change(user_address, change, change_token, pool_key)
+
+        self.log.info('liquidity added successfully',
+                      pool_key=pool_key,
+                      user=str(user_address),
+                      liquidity_increase=liquidity_increase,
+                      reserve_a_added=used_a,
+                      reserve_b_added=used_b,
+                      change_token='token_b' if a_is_limiting else 'token_a',
+                      change_amount=change)
+
+        return (change_token, change)
+
+    @public(allow_withdrawal=True)
+    def remove_liquidity(
+        self,
+        ctx: Context,
+        fee: Amount,
+    ) -> tuple[TokenUid, Amount]:
+        """Remove liquidity from a pool.
+
+        Args:
+            ctx: The transaction context
+            fee: Fee for the pool
+
+        Raises:
+            PoolNotFound: If the pool does not exist
+            InvalidAction: If the user has no liquidity or insufficient liquidity
+        """
+        self._check_not_paused(ctx)
+        pool_key, pool, user_address = self._setup_pool_from_context(ctx, fee)
+
+        # Update TWAP oracle before liquidity change
+        self._update_twap(pool_key, ctx)
+
+        action_a, action_b = self._get_actions_out_out(ctx, pool_key)
+
+        action_a_amount = Amount(action_a.amount)
+        action_b_amount = Amount(action_b.amount)
+
+        self.log.debug('removing liquidity',
+                       pool_key=pool_key,
+                       user=str(user_address),
+                       action_a_amount=action_a_amount,
+                       action_b_amount=action_b_amount,
+                       reserve_a_before=pool.reserve_a,
+                       reserve_b_before=pool.reserve_b)
+
+        optimal_b, liquidity_decrease = self._remove_liquidity_internal(
+            pool_key, user_address, action_a_amount, ctx
+        )
+
+        if optimal_b < action_b_amount:
+            raise InvalidAction("Insufficient token B amount")
+
+        change = Amount(optimal_b - action_b_amount)
+        self._update_change(
+            user_address, change, pool.token_b, pool_key
+        )
+
+        self._after_liquidity_removed(pool_key, int(ctx.block.timestamp))
+
+        self.log.info('liquidity removed successfully',
+                      pool_key=pool_key,
+                      user=str(user_address),
+                      liquidity_decrease=liquidity_decrease,
+                      amount_a_withdrawn=action_a_amount,
                       amount_b_withdrawn=optimal_b,
                       change_b=change)
 
@@ -1770,7 +2433,7 @@ class DozerPoolManager(Blueprint):
             token_a, token_b = token_in, token_out
 
         pool_key = self._get_pool_key(token_a, token_b, fee)
-        self._validate_pool_exists(pool_key)
+        self._validate_pool_active(pool_key)
 
         # Update TWAP oracle before liquidity change
         self._update_twap(pool_key, ctx)
@@ -1781,6 +2444,7 @@ class DozerPoolManager(Blueprint):
         assert set([token_in, token_out]) == set([pool.token_a, pool.token_b]), "Tokens must match pool tokens"
 
         k_before_swap = Amount(pool.reserve_a * pool.reserve_b)
+        price_before = self._spot_price_a(pool)
 
         self.log.debug('computing single token liquidity addition',
                        k_before_swap=k_before_swap,
@@ -1841,6 +2505,11 @@ class DozerPoolManager(Blueprint):
         k_after_swap = Amount(pool.reserve_a * pool.reserve_b)
         self._check_k_not_decreased(k_before_swap, k_after_swap, "add_liquidity_single_token (internal swap)")
 
+        if result.optimal_swap_amount > 0:
+            self._record_swap_candle(
+                pool_key, ctx, token_in, result.optimal_swap_amount, result.swap_output, price_before
+            )
+
         self.log.debug('k invariant maintained after internal swap',
                        k_before_swap=k_before_swap,
                        k_after_swap=k_after_swap,
@@ -1878,7 +2547,13 @@ class DozerPoolManager(Blueprint):
         if result.excess_b > 0:
             self._update_change(user_address, result.excess_b, token_b, pool_key)
 
-        self._update_user_profit_tracking(user_address, pool_key, ctx)
+        self._update_user_profit_tracking(
+            user_address, pool_key, ctx, result.liquidity_increase,
+            amount_a_in=amount_in if token_in == token_a else Amount(0),
+            amount_b_in=amount_in if token_in == token_b else Amount(0),
+            amount_a_out=result.excess_a,
+            amount_b_out=result.excess_b,
+        )
 
         self.log.info('single token liquidity added successfully',
                       pool_key=pool_key,
@@ -2239,7 +2914,8 @@ class DozerPoolManager(Blueprint):
         actual_a: Amount,
         actual_b: Amount,
         token_a: TokenUid,
-        token_b: TokenUid
+        reserve_a: Amount,
+        reserve_b: Amount,
     ) -> Amount:
         """
         Calculate the real price impact based on value difference.
@@ -2247,33 +2923,29 @@ class DozerPoolManager(Blueprint):
         This shows users the actual value loss:
         price_impact = (input_value - position_value) / input_value * 10000
 
+        Both legs live in the same pool, so values are compared in units of token_in at the
+        pre-swap spot price reserve_a/reserve_b instead of through USD oracle lookups. This
+        matches the USD valuation whenever the USD prices of token_a and token_b agree with
+        the pool's own ratio.
+
         Returns: Price impact in basis points (100 = 1%)
         """
-        # Get token prices in USD (8 decimals)
-        token_in_price = self.get_token_price_in_usd(token_in)
-        token_a_price = self.get_token_price_in_usd(token_a)
-        token_b_price = self.get_token_price_in_usd(token_b)
-
-        if token_in_price == 0:
+        if amount_in == 0 or reserve_a == 0 or reserve_b == 0:
             return Amount(0)
 
-        # Calculate input value in USD (amounts are in cents, prices have 8 decimals)
-        # Result is in cents USD
-        input_value_usd = (amount_in * token_in_price) // 100_000000
-
-        # Calculate output value based on actual tokens added to position
-        value_a_usd = (actual_a * token_a_price) // 100_000000
-        value_b_usd = (actual_b * token_b_price) // 100_000000
-        output_value_usd = Amount(value_a_usd + value_b_usd)
-
-        # Price impact = (input_value - output_value) / input_value * 10000
-        if input_value_usd == 0:
-            return Amount(0)
+        # Scale both sides by the reserve of token_in to stay in integers:
+        # input_value = amount_in, output_value = actual_in + actual_other * reserve_in / reserve_other
+        if token_in == token_a:
+            input_value = amount_in * reserve_b
+            output_value = actual_a * reserve_b + actual_b * reserve_a
+        else:
+            input_value = amount_in * reserve_a
+            output_value = actual_b * reserve_a + actual_a * reserve_b
 
-        if output_value_usd >= input_value_usd:
+        if output_value >= input_value:
             return Amount(0)  # No loss
 
-        price_impact = Amount(((input_value_usd - output_value_usd) * 10000) // input_value_usd)
+        price_impact = Amount(((input_value - output_value) * 10000) // input_value)
         return price_impact
 
     @public(allow_withdrawal=True)
@@ -2356,6 +3028,8 @@ class DozerPoolManager(Blueprint):
 
         reserve_a_before = pool.reserve_a
         reserve_b_before = pool.reserve_b
+        # Proportional removal keeps the spot price, so this is also the internal swap's opening price
+        price_before = self._spot_price_a(pool)
 
         result = self._compute_remove_liquidity_single_token(
             liquidity_to_remove=liquidity_to_remove,
@@ -2447,6 +3121,11 @@ class DozerPoolManager(Blueprint):
         k_after_swap = Amount(pool.reserve_a * pool.reserve_b)
         self._check_k_not_decreased(k_before_swap, k_after_swap, "remove_liquidity_single_token (internal swap)")
 
+        if result.swap_amount > 0:
+            self._record_swap_candle(
+                pool_key, ctx, token_in_for_swap, result.swap_amount, result.swap_output, price_before
+            )
+
         total_amount_out = result.total_amount_out
 
         # Handle slippage - if user requested less than calculated, store excess
@@ -2479,7 +3158,13 @@ class DozerPoolManager(Blueprint):
         )
 
         # Update profit tracking
-        self._update_user_profit_tracking(user_address, pool_key, ctx)
+        self._update_user_profit_tracking(
+            user_address, pool_key, ctx, Amount(-liquidity_to_remove),
+            amount_a_out=result.total_amount_out if token_out == token_a else Amount(0),
+            amount_b_out=result.total_amount_out if token_out == token_b else Amount(0),
+        )
+
+        self._after_liquidity_removed(pool_key, int(ctx.block.timestamp))
 
         self.log.info('single token liquidity removed successfully',
                       pool_key=pool_key,
@@ -2815,6 +3500,8 @@ class DozerPoolManager(Blueprint):
             pool_key: The pool key
             ctx: The execution context (for TWAP update and timestamp)
         """
+        self._validate_pool_active(pool_key)
+
         # Update TWAP oracle before swap
         self._update_twap(pool_key, ctx)
         timestamp = Timestamp(ctx.block.timestamp)
@@ -2822,8 +3509,9 @@ class DozerPoolManager(Blueprint):
         # Get pool
         pool = self.pools[pool_key]
 
-        # Capture K before swap (should increase due to fees)
+        # Capture K and spot price before swap (K should increase due to fees)
         k_before = Amount(pool.reserve_a * pool.reserve_b)
+        price_before = self._spot_price_a(pool)
 
         # Get the pool reserves
         reserve_in, reserve_out, _ = self._resolve_token_direction(pool, token_in)
@@ -2857,6 +3545,8 @@ class DozerPoolManager(Blueprint):
         k_after = Amount(pool_after.reserve_a * pool_after.reserve_b)
         self._check_k_not_decreased(k_before, k_after, "_swap_exact_out")
 
+        self._record_swap_candle(pool_key, ctx, token_in, amount_in, amount_out, price_before)
+
     def _swap(
         self,
         amount_in: Amount,
@@ -2875,14 +3565,17 @@ class DozerPoolManager(Blueprint):
         Returns:
             The amount of output tokens received
         """
+        self._validate_pool_active(pool_key)
+
         # Update TWAP oracle before swap
         self._update_twap(pool_key, ctx)
 
         # Get pool
         pool = self.pools[pool_key]
 
-        # Capture K before swap (should increase due to fees)
+        # Capture K and spot price before swap (K should increase due to fees)
         k_before = Amount(pool.reserve_a * pool.reserve_b)
+        price_before = self._spot_price_a(pool)
 
         # Get the pool reserves
         reserve_in, reserve_out, _ = self._resolve_token_direction(pool, token_in)
@@ -2925,6 +3618,8 @@ class DozerPoolManager(Blueprint):
         k_after = Amount(pool_after.reserve_a * pool_after.reserve_b)
         self._check_k_not_decreased(k_before, k_after, "_swap")
 
+        self._record_swap_candle(pool_key, ctx, token_in, amount_in, Amount(amount_out), price_before)
+
         return Amount(amount_out)
 
     @public(allow_withdrawal=True, allow_deposit=True)
@@ -3400,6 +4095,599 @@ class DozerPoolManager(Blueprint):
                       new_balance_a=new_balance_a,
                       new_balance_b=new_balance_b)
 
+    @public(allow_withdrawal=True)
+    def withdraw_cashback_multi(
+        self,
+        ctx: Context,
+        pool_keys: list[str],
+    ) -> None:
+        """Withdraw cashback accumulated across several pools in one transaction.
+
+        Each withdrawal action is covered by the caller's cashback in the given pools,
+        drained in order. Every pool is read and written at most once.
+
+        Args:
+            ctx: The transaction context (one withdrawal action per token)
+            pool_keys: The pool keys to collect cashback from
+
+        Raises:
+            PoolNotFound: If any pool does not exist
+            InvalidAction: If a pool is repeated, no withdrawal is requested or
+                there is not enough cashback for a token across the pools
+        """
+        self._check_not_paused(ctx)
+        user_address = ctx.caller_id
+
+        if len(ctx.actions) == 0:
+            raise InvalidAction("At least one token must be withdrawn")
+
+        remaining: dict[TokenUid, Amount] = {}
+        for token_uid in ctx.actions.keys():
+            action = self._get_withdrawal_action(ctx, token_uid)
+            remaining[token_uid] = Amount(action.amount)
+
+        seen: set[str] = set()
+        for pool_key in pool_keys:
+            if pool_key in seen:
+                raise InvalidAction("Duplicate pool in cashback withdrawal")
+            seen.add(pool_key)
+            self._validate_pool_exists(pool_key)
+
+            pool = self.pools[pool_key]
+            balance_a, balance_b = self.pool_change[pool_key].get(
+                user_address, (Amount(0), Amount(0))
+            )
+            withdraw_a = Amount(min(balance_a, remaining.get(pool.token_a, 0)))
+            withdraw_b = Amount(min(balance_b, remaining.get(pool.token_b, 0)))
+            if withdraw_a == 0 and withdraw_b == 0:
+                continue
+
+            if withdraw_a > 0:
+                remaining[pool.token_a] = Amount(remaining[pool.token_a] - withdraw_a)
+            if withdraw_b > 0:
+                remaining[pool.token_b] = Amount(remaining[pool.token_b] - withdraw_b)
+
+            self.pool_change[pool_key][user_address] = (
+                Amount(balance_a - withdraw_a),
+                Amount(balance_b - withdraw_b),
+            )
+            self._update_pool(
+                pool_key,
+                total_change_a=Amount(pool.total_change_a - withdraw_a),
+                total_change_b=Amount(pool.total_change_b - withdraw_b)
+            )
+
+        for token_uid, amount in remaining.items():
+            if amount > 0:
+                raise InvalidAction(f"Not enough cashback for token {token_uid.hex()}")
+
+        self.log.info('cashback withdrawn from multiple pools',
+                      user=str(user_address),
+                      pools=len(pool_keys),
+                      tokens=len(remaining))
+
+    def _multicall_debit(
+        self,
+        balances: dict[TokenUid, int],
+        last_pool: dict[TokenUid, str],
+        token: TokenUid,
+        amount: int,
+        pool_key: str,
+    ) -> None:
+        """Take amount of token from the multicall's internal balances for use in pool_key."""
+        if amount <= 0:
+            raise InvalidAction("Multicall amounts must be positive")
+        if balances.get(token, 0) < amount:
+            raise InvalidAction(f"Insufficient multicall balance for token {token.hex()}")
+        balances[token] -= amount
+        last_pool[token] = pool_key
+
+    def _multicall_credit(
+        self,
+        balances: dict[TokenUid, int],
+        last_pool: dict[TokenUid, str],
+        token: TokenUid,
+        amount: int,
+        pool_key: str,
+    ) -> None:
+        """Add amount of token to the multicall's internal balances, remembering the pool."""
+        balances[token] = balances.get(token, 0) + amount
+        last_pool[token] = pool_key
+
+    def _multicall_op(
+        self,
+        ctx: Context,
+        op: MulticallOp,
+        balances: dict[TokenUid, int],
+        last_pool: dict[TokenUid, str],
+    ) -> Amount:
+        """Run one multicall sub-operation and return its main output amount."""
+        pool_key = op.pool_key
+        self._validate_pool_exists(pool_key)
+        user_address = ctx.caller_id
+        self._update_twap(pool_key, ctx)
+        pool = self.pools[pool_key]
+
+        if op.op == MULTICALL_SWAP_EXACT_IN:
+            _, _, token_out = self._resolve_token_direction(pool, op.token_in)
+            amount_in = op.amount_a if op.amount_a > 0 else balances.get(op.token_in, 0)
+            self._multicall_debit(balances, last_pool, op.token_in, amount_in, pool_key)
+            amount_out = self._swap(Amount(amount_in), op.token_in, pool_key, ctx)
+            if amount_out < op.amount_b:
+                raise InvalidAction("Amount out is too low")
+            self._multicall_credit(balances, last_pool, token_out, amount_out, pool_key)
+            return amount_out
+
+        if op.op == MULTICALL_SWAP_EXACT_OUT:
+            reserve_in, reserve_out, token_out = self._resolve_token_direction(pool, op.token_in)
+            amount_out = op.amount_a
+            # Reserve must never reach zero
+            if reserve_out <= amount_out:
+                raise InsufficientLiquidity("Insufficient liquidity")
+            amount_in = self.get_amount_in(
+                amount_out, reserve_in, reserve_out, pool.fee_numerator, pool.fee_denominator
+            )
+            if amount_in > op.amount_b:
+                raise InvalidAction("Amount in is too high")
+            self._multicall_debit(balances, last_pool, op.token_in, amount_in, pool_key)
+            self._swap_exact_out(amount_in, op.token_in, amount_out, pool_key, ctx)
+            self._multicall_credit(balances, last_pool, token_out, amount_out, pool_key)
+            return amount_in
+
+        if op.op == MULTICALL_ADD_LIQUIDITY:
+            amount_a = op.amount_a if op.amount_a > 0 else balances.get(pool.token_a, 0)
+            amount_b = op.amount_b if op.amount_b > 0 else balances.get(pool.token_b, 0)
+            self._multicall_debit(balances, last_pool, pool.token_a, amount_a, pool_key)
+            self._multicall_debit(balances, last_pool, pool.token_b, amount_b, pool_key)
+            used_a, used_b, liquidity_increase = self._add_liquidity_internal(
+                pool_key, user_address, Amount(amount_a), Amount(amount_b), ctx
+            )
+            # The unused side stays in the call instead of becoming cashback
+            self._multicall_credit(balances, last_pool, pool.token_a, amount_a - used_a, pool_key)
+            self._multicall_credit(balances, last_pool, pool.token_b, amount_b - used_b, pool_key)
+            return liquidity_increase
+
+        if op.op == MULTICALL_REMOVE_LIQUIDITY:
+            if op.amount_a <= 0:
+                raise InvalidAction("Multicall amounts must be positive")
+            amount_b, liquidity_decrease = self._remove_liquidity_internal(
+                pool_key, user_address, op.amount_a, ctx
+            )
+            if amount_b < op.amount_b:
+                raise InvalidAction("Insufficient token B amount")
+            self._multicall_credit(balances, last_pool, pool.token_a, op.amount_a, pool_key)
+            self._multicall_credit(balances, last_pool, pool.token_b, amount_b, pool_key)
+            return liquidity_decrease
+
+        if op.op == MULTICALL_WITHDRAW_CASHBACK:
+            balance_a, balance_b = self.pool_change[pool_key].get(
+                user_address, (Amount(0), Amount(0))
+            )
+            if op.amount_a > balance_a or op.amount_b > balance_b:
+                raise InvalidAction("Not enough cashback")
+            if op.amount_a <= 0 and op.amount_b <= 0:
+                raise InvalidAction("At least one token must be withdrawn")
+            self.pool_change[pool_key][user_address] = (
+                Amount(balance_a - op.amount_a),
+                Amount(balance_b - op.amount_b),
+            )
+            self._update_pool(
+                pool_key,
+                total_change_a=Amount(pool.total_change_a - op.amount_a),
+                total_change_b=Amount(pool.total_change_b - op.amount_b)
+            )
+            self._multicall_credit(balances, last_pool, pool.token_a, op.amount_a, pool_key)
+            self._multicall_credit(balances, last_pool, pool.token_b, op.amount_b, pool_key)
+            return Amount(op.amount_a + op.amount_b)
+
+        raise InvalidAction(f"Unknown multicall op: {op.op}")
+
+    @public(allow_deposit=True, allow_withdrawal=True)
+    def multicall(
+        self,
+        ctx: Context,
+        ops: list[MulticallOp],
+        deadline: Timestamp,
+    ) -> list[Amount]:
+        """Run several swaps and liquidity operations as one transaction.
+
+        Deposits seed an internal balance per token; each op draws from and adds to it,
+        so intermediate tokens never pass through cashback. Withdrawal actions are paid
+        from the final balances, and anything left over becomes cashback in the last
+        pool that used or produced that token.
+
+        Args:
+            ctx: The transaction context (net deposits and withdrawals of the whole call)
+            ops: Ordered sub-operations, at most MAX_MULTICALL_OPS
+            deadline: Block timestamp by which transaction must be included
+
+        Returns:
+            The main output of each op: amount out for swap_exact_in, amount in for
+            swap_exact_out, liquidity change for add/remove, total cashback moved
+
+        Raises:
+            PoolNotFound: If a pool does not exist
+            InvalidAction: If an op is invalid, a limit is not met or balances do not cover it
+            InsufficientLiquidity: If a swap would empty a reserve
+        """
+        self._check_not_paused(ctx)
+
+        # Validate deadline
+        assert ctx.block.timestamp <= deadline, f"Transaction expired: block timestamp {ctx.block.timestamp} > deadline {deadline}"
+
+        if len(ops) == 0 or len(ops) > MAX_MULTICALL_OPS:
+            raise InvalidAction("Invalid number of multicall ops")
+        for op in ops:
+            if op.amount_a < 0 or op.amount_b < 0:
+                raise InvalidAction("Multicall amounts must be positive")
+
+        balances: dict[TokenUid, int] = {}
+        last_pool: dict[TokenUid, str] = {}
+        withdrawals: dict[TokenUid, Amount] = {}
+        for token_uid in ctx.actions.keys():
+            action = ctx.get_single_action(token_uid)
+            if isinstance(action, NCDepositAction):
+                balances[token_uid] = action.amount
+            elif isinstance(action, NCWithdrawalAction):
+                withdrawals[token_uid] = Amount(action.amount)
+            else:
+                raise InvalidAction("Only deposits and withdrawals are allowed")
+
+        results: list[Amount] = []
+        removed_from: list[str] = []
+        for op in ops:
+            results.append(self._multicall_op(ctx, op, balances, last_pool))
+            if op.op == MULTICALL_REMOVE_LIQUIDITY and op.pool_key not in removed_from:
+                removed_from.append(op.pool_key)
+
+        # Later ops may refill a pool an earlier op drained, so archival waits for the whole call
+        for pool_key in removed_from:
+            self._after_liquidity_removed(pool_key, int(ctx.block.timestamp))
+
+        # Settle the net withdrawals once
+        for token_uid, amount in withdrawals.items():
+            if balances.get(token_uid, 0) < amount:
+                raise InvalidAction(f"Insufficient multicall balance for token {token_uid.hex()}")
+            balances[token_uid] -= amount
+
+        # Leftovers become cashback in the pool that last touched the token
+        for token_uid, amount in balances.items():
+            if amount == 0:
+                continue
+            if token_uid not in last_pool:
+                raise InvalidAction(f"Deposit of token {token_uid.hex()} was not used")
+            self._update_change(ctx.caller_id, Amount(amount), token_uid, last_pool[token_uid])
+
+        self.log.info('multicall executed',
+                      user=str(ctx.caller_id),
+                      ops=len(ops))
+
+        return results
+
+    def _owner_harvestable_liquidity(self, pool_key: str) -> Amount:
+        """Return the protocol-fee liquidity the owner can harvest from a pool.
+
+        Only liquidity minted by _process_protocol_fee is harvested, never liquidity the owner
+        provided as an LP; it is capped at the owner's balance in case the owner removed some
+        of it directly or ownership moved to another address.
+        """
+        minted = self.pool_protocol_liquidity.get(pool_key, Amount(0))
+        owner_liquidity = self.pool_user_liquidity[pool_key].get(self.owner, Amount(0))
+        return Amount(min(minted, owner_liquidity))
+
+    def _owner_harvest_amounts(self, pool_key: str) -> tuple[Amount, Amount]:
+        """Return (amount_a, amount_b) released by burning the owner's protocol-fee liquidity in a pool."""
+        pool = self.pools[pool_key]
+        harvestable = self._owner_harvestable_liquidity(pool_key)
+        if harvestable == 0 or pool.total_liquidity == 0:
+            return Amount(0), Amount(0)
+        amount_a = Amount(harvestable * pool.reserve_a // pool.total_liquidity)
+        return amount_a, self.quote(amount_a, pool.reserve_a, pool.reserve_b)
+
+    @public(allow_withdrawal=True)
+    def harvest_protocol_fees(self, ctx: Context, pool_keys: list[str]) -> None:
+        """Burn the owner's protocol-fee liquidity across pools and withdraw the proceeds together.
+
+        Protocol fees are minted to the owner as liquidity in each pool; this realizes
+        them in one transaction and leaves any liquidity the owner provided as an LP in place. Withdrawal actions are per token and may be lower than
+        the harvested totals, in which case the rest becomes owner cashback.
+
+        Args:
+            ctx: The transaction context (at most one withdrawal per token)
+            pool_keys: The pool keys to harvest, at most MAX_POOLS_TO_ITERATE
+
+        Raises:
+            Unauthorized: If the caller is not the owner
+            PoolNotFound: If any pool does not exist
+            InvalidAction: If a pool is repeated or the withdrawals exceed the harvest
+        """
+        if ctx.caller_id != self.owner:
+            raise Unauthorized("Only the owner can harvest protocol fees")
+        if len(pool_keys) > MAX_POOLS_TO_ITERATE:
+            raise InvalidAction("Too many pools")
+
+        harvested: dict[TokenUid, int] = {}
+        last_pool: dict[TokenUid, str] = {}
+        seen: set[str] = set()
+        for pool_key in pool_keys:
+            if pool_key in seen:
+                raise InvalidAction("Duplicate pool in harvest")
+            seen.add(pool_key)
+            self._validate_pool_exists(pool_key)
+            self._update_twap(pool_key, ctx)
+
+            amount_a, _ = self._owner_harvest_amounts(pool_key)
+            if amount_a == 0:
+                continue
+            amount_b, liquidity_decrease = self._remove_liquidity_internal(
+                pool_key, self.owner, amount_a, ctx
+            )
+            self.pool_protocol_liquidity[pool_key] = Amount(
+                max(0, self.pool_protocol_liquidity.get(pool_key, 0) - liquidity_decrease)
+            )
+
+            pool = self.pools[pool_key]
+            harvested[pool.token_a] = harvested.get(pool.token_a, 0) + amount_a
+            harvested[pool.token_b] = harvested.get(pool.token_b, 0) + amount_b
+            last_pool[pool.token_a] = pool_key
+            last_pool[pool.token_b] = pool_key
+
+            self._after_liquidity_removed(pool_key, int(ctx.block.timestamp))
+
+            self.log.debug('protocol fees harvested from pool',
+                           pool_key=pool_key,
+                           liquidity_decrease=liquidity_decrease,
+                           amount_a=amount_a,
+                           amount_b=amount_b)
+
+        for token_uid in ctx.actions.keys():
+            action = self._get_withdrawal_action(ctx, token_uid)
+            if action.amount > harvested.get(token_uid, 0):
+                raise InvalidAction(f"Withdrawal exceeds harvested amount for token {token_uid.hex()}")
+            harvested[token_uid] -= action.amount
+
+        # Whatever was not withdrawn stays claimable as owner cashback
+        for token_uid, amount in harvested.items():
+            self._update_change(self.owner, Amount(amount), token_uid, last_pool[token_uid])
+
+        self.log.info('protocol fees harvested',
+                      pools=len(pool_keys),
+                      tokens=len(harvested),
+                      caller=str(ctx.caller_id))
+
+    @public
+    def archive_pool(self, ctx: Context, pool_key: str) -> None:
+        """Archive a pool so registry scans and routing skip it.
+
+        The pool stays addressable by key: LPs can still remove liquidity and withdraw
+        cashback, but swaps and new liquidity are rejected until it is restored. Since
+        LPs may still hold liquidity in it, the per-user views keep listing it.
+
+        Args:
+            ctx: The transaction context
+            pool_key: The pool key
+
+        Raises:
+            Unauthorized: If the caller is not the owner
+            PoolNotFound: If the pool does not exist
+            InvalidState: If the pool is already archived or is the HTR-USD pool
+        """
+        if ctx.caller_id != self.owner:
+            raise Unauthorized("Only the owner can archive pools")
+        self._validate_pool_active(pool_key)
+        if pool_key == self.htr_usd_pool_key:
+            raise InvalidState("Cannot archive the HTR-USD pool")
+
+        self._archive_pool(pool_key, int(ctx.block.timestamp))
+        self.owner_archived_index[pool_key] = len(self.owner_archived_pools)
+        self.owner_archived_pools.append(pool_key)
+
+    @public
+    def restore_pool(self, ctx: Context, pool_key: str) -> None:
+        """Return an archived pool to the active registry.
+
+        Args:
+            ctx: The transaction context
+            pool_key: The pool key
+
+        Raises:
+            Unauthorized: If the caller is not the owner
+            PoolNotFound: If the pool does not exist
+            InvalidState: If the pool is not archived
+        """
+        if ctx.caller_id != self.owner:
+            raise Unauthorized("Only the owner can restore pools")
+        self._validate_pool_exists(pool_key)
+        if pool_key not in self.archived_pools:
+            raise InvalidState("Pool is not archived")
+
+        del self.archived_pools[pool_key]
+        if pool_key in self.owner_archived_index:
+            self._swap_remove_pool(self.owner_archived_pools, self.owner_archived_index, pool_key)
+        self._register_active_pool(pool_key)
+        self._refresh_htr_token_map(pool_key)
+
+        self.log.info('pool restored',
+                      pool_key=pool_key,
+                      caller=str(ctx.caller_id))
+
+    @public
+    def set_reward_token(self, ctx: Context, token: TokenUid) -> None:
+        """Set the token paid out as liquidity mining rewards.
+
+        Args:
+            ctx: The transaction context
+            token: The reward token
+
+        Raises:
+            Unauthorized: If the caller is not the owner
+            InvalidState: If the reward token is already set
+        """
+        if ctx.caller_id != self.owner:
+            raise Unauthorized("Only the owner can set the reward token")
+        if self.reward_token is not None:
+            raise InvalidState("Reward token already set")
+
+        self.reward_token = token
+
+        self.log.info('reward token set',
+                      token=token.hex(),
+                      caller=str(ctx.caller_id))
+
+    @public(allow_deposit=True)
+    def fund_rewards(self, ctx: Context) -> None:
+        """Deposit reward tokens to be paid out to liquidity providers.
+
+        Args:
+            ctx: The transaction context (a single deposit of the reward token)
+
+        Raises:
+            InvalidState: If the reward token is not set
+            InvalidTokens: If the deposit is not the reward token
+        """
+        if self.reward_token is None:
+            raise InvalidState("Reward token not set")
+        if set(ctx.actions.keys()) != {self.reward_token}:
+            raise InvalidTokens("Only the reward token can be deposited")
+
+        action = self._get_deposit_action(ctx, self.reward_token)
+        self.reward_balance = Amount(self.reward_balance + action.amount)
+
+        self.log.info('rewards funded',
+                      amount=action.amount,
+                      reward_balance=self.reward_balance,
+                      caller=str(ctx.caller_id))
+
+    @public
+    def set_pool_reward_rate(
+        self, ctx: Context, pool_key: str, reward_per_second: Amount, duration: int
+    ) -> None:
+        """Start a reward program emitting reward_per_second to a pool's LPs for duration seconds.
+
+        Rewards accrued under the previous program are locked into the index first and its
+        unemitted remainder is released. The new program's whole emission is reserved from
+        the funded balance, so every reward that accrues can be claimed.
+
+        Args:
+            ctx: The transaction context
+            pool_key: The pool key
+            reward_per_second: Reward tokens emitted per second to the pool's LPs
+            duration: Seconds the program runs for
+
+        Raises:
+            Unauthorized: If the caller is not the owner
+            PoolNotFound: If the pool does not exist
+            InvalidState: If the reward token is not set or the pool is archived
+            InsufficientLiquidity: If the unreserved reward balance cannot cover the program
+        """
+        if ctx.caller_id != self.owner:
+            raise Unauthorized("Only the owner can set reward rates")
+        self._validate_pool_active(pool_key)
+        if self.reward_token is None:
+            raise InvalidState("Reward token not set")
+        assert reward_per_second >= 0, "Reward rate must be >= 0"
+        assert duration >= 0, "Reward duration must be >= 0"
+
+        timestamp = int(ctx.block.timestamp)
+        self._set_pool_reward_program(pool_key, reward_per_second, duration, timestamp)
+
+        self.log.info('pool reward rate set',
+                      pool_key=pool_key,
+                      reward_per_second=reward_per_second,
+                      reward_end_timestamp=timestamp + duration,
+                      reward_allocated=self.reward_allocated,
+                      caller=str(ctx.caller_id))
+
+    def _settle_and_get_pending(self, pool_key: str, user_address: CallerId, timestamp: int) -> Amount:
+        """Accrue the pool, settle the user and return their pending rewards."""
+        self._validate_pool_exists(pool_key)
+        self._accrue_pool_rewards(pool_key, timestamp)
+        liquidity = self.pool_user_liquidity[pool_key].get(user_address, Amount(0))
+        self._settle_user_rewards(pool_key, user_address, liquidity, liquidity)
+        if pool_key not in self.pool_user_pending_rewards:
+            return Amount(0)
+        return self.pool_user_pending_rewards[pool_key].get(user_address, Amount(0))
+
+    def _pay_rewards(self, ctx: Context) -> Amount:
+        """Validate the reward withdrawal action and debit reward_balance and its reservation, return the amount."""
+        if self.reward_token is None:
+            raise InvalidState("Reward token not set")
+        if set(ctx.actions.keys()) != {self.reward_token}:
+            raise InvalidTokens("Only the reward token can be withdrawn")
+        action = self._get_withdrawal_action(ctx, self.reward_token)
+        amount = Amount(action.amount)
+        if amount > self.reward_balance:
+            raise InsufficientLiquidity("Not enough funded rewards")
+        self.reward_balance = Amount(self.reward_balance - amount)
+        self.reward_allocated = Amount(max(0, self.reward_allocated - amount))
+        return amount
+
+    @public(allow_withdrawal=True)
+    def claim_rewards(self, ctx: Context, pool_key: str) -> None:
+        """Claim liquidity mining rewards earned in a pool.
+
+        Cost does not depend on the number of LPs in the pool.
+
+        Args:
+            ctx: The transaction context (a single withdrawal of the reward token)
+            pool_key: The pool key
+
+        Raises:
+            PoolNotFound: If the pool does not exist
+            InvalidAction: If the withdrawal exceeds the pending rewards
+            InsufficientLiquidity: If the funded reward balance is too low
+        """
+        self._check_not_paused(ctx)
+        user_address = ctx.caller_id
+        pending = self._settle_and_get_pending(pool_key, user_address, int(ctx.block.timestamp))
+        amount = self._pay_rewards(ctx)
+        if amount > pending:
+            raise InvalidAction("Not enough pending rewards")
+
+        self.pool_user_pending_rewards[pool_key][user_address] = Amount(pending - amount)
+
+        self.log.info('rewards claimed',
+                      pool_key=pool_key,
+                      user=str(user_address),
+                      amount=amount)
+
+    @public(allow_withdrawal=True)
+    def claim_rewards_multi(self, ctx: Context, pool_keys: list[str]) -> None:
+        """Claim liquidity mining rewards from several pools in one withdrawal.
+
+        The withdrawal is taken from the pools' pending rewards in the given order.
+
+        Args:
+            ctx: The transaction context (a single withdrawal of the reward token)
+            pool_keys: The pool keys to claim from
+
+        Raises:
+            PoolNotFound: If any pool does not exist
+            InvalidAction: If the withdrawal exceeds the pending rewards of all pools
+            InsufficientLiquidity: If the funded reward balance is too low
+        """
+        self._check_not_paused(ctx)
+        user_address = ctx.caller_id
+        timestamp = int(ctx.block.timestamp)
+        amount = self._pay_rewards(ctx)
+
+        remaining = amount
+        for pool_key in pool_keys:
+            if remaining == 0:
+                break
+            pending = self._settle_and_get_pending(pool_key, user_address, timestamp)
+            taken = min(pending, remaining)
+            if taken > 0:
+                self.pool_user_pending_rewards[pool_key][user_address] = Amount(pending - taken)
+                remaining -= taken
+
+        if remaining > 0:
+            raise InvalidAction("Not enough pending rewards")
+
+        self.log.info('rewards claimed from multiple pools',
+                      user=str(user_address),
+                      pools=len(pool_keys),
+                      amount=amount)
 
     @public
     def change_protocol_fee(self, ctx: Context, new_fee: int) -> None:
@@ -3664,6 +4952,7 @@ class DozerPoolManager(Blueprint):
         Raises:
             Unauthorized: If the caller is not the owner
             PoolNotFound: If the pool does not exist
+            InvalidState: If the pool is archived
             InvalidTokens: If neither token is HTR
         """
         if ctx.caller_id != self.owner:
@@ -3673,7 +4962,7 @@ class DozerPoolManager(Blueprint):
         token_a, token_b = self._order_tokens(token_a, token_b)
 
         pool_key = self._get_pool_key(token_a, token_b, fee)
-        self._validate_pool_exists(pool_key)
+        self._validate_pool_active(pool_key)
 
         # Verify that one of the tokens is HTR
         if token_a != HATHOR_TOKEN_UID and token_b != HATHOR_TOKEN_UID:
@@ -3775,6 +5064,9 @@ class DozerPoolManager(Blueprint):
     def get_user_pools(self, address: CallerId) -> list[str]:
         """Get all pools where a user has liquidity.
 
+        Active pools come first, then pools the owner archived while they still held liquidity.
+        Pools archived automatically were drained, so they only hold rounding dust.
+
         Args:
             address: The address to check
 
@@ -3782,16 +5074,19 @@ class DozerPoolManager(Blueprint):
             A list of pool keys where the user has liquidity
         """
         user_pools = []
-        for pool_key in self.all_pools:
-            user_liquidity = self.pool_user_liquidity[pool_key].get(address, 0)
-            if user_liquidity > 0:
-                user_pools.append(pool_key)
+        for pool_keys in (self.all_pools, self.owner_archived_pools):
+            for pool_key in pool_keys:
+                user_liquidity = self.pool_user_liquidity[pool_key].get(address, 0)
+                if user_liquidity > 0:
+                    user_pools.append(pool_key)
         return user_pools
 
     @view
     def get_user_positions(self, address: CallerId) -> dict[str, UserPosition]:
         """Get detailed information about all user positions across pools.
 
+        Covers the same pools as get_user_pools.
+
         Args:
             address: The address to check
 
@@ -3799,23 +5094,21 @@ class DozerPoolManager(Blueprint):
             A dictionary mapping pool keys to UserPosition information
         """
         positions = {}
-        for pool_key in self.all_pools:
-            user_liquidity = self.pool_user_liquidity[pool_key].get(address, 0)
-            if user_liquidity > 0:
-                # Get detailed information about this position
-                user_info = self.user_info(address, pool_key)
-
-                # Create UserPosition with additional fee information
-                positions[pool_key] = UserPosition(
-                    liquidity=user_info.liquidity,
-                    token0Amount=user_info.token0Amount,
-                    token1Amount=user_info.token1Amount,
-                    share=user_info.share,
-                    balance_a=user_info.balance_a,
-                    balance_b=user_info.balance_b,
-                    token_a=user_info.token_a,
-                    token_b=user_info.token_b,
-                )
+        for pool_key in self.get_user_pools(address):
+            # Get detailed information about this position
+            user_info = self.user_info(address, pool_key)
+
+            # Create UserPosition with additional fee information
+            positions[pool_key] = UserPosition(
+                liquidity=user_info.liquidity,
+                token0Amount=user_info.token0Amount,
+                token1Amount=user_info.token1Amount,
+                share=user_info.share,
+                balance_a=user_info.balance_a,
+                balance_b=user_info.balance_b,
+                token_a=user_info.token_a,
+                token_b=user_info.token_b,
+            )
         return positions
 
     @view
@@ -3878,6 +5171,9 @@ class DozerPoolManager(Blueprint):
     def get_token_price_in_usd(self, token: TokenUid) -> Amount:
         """Get the price of a token in USD using reserve ratio method.
 
+        HTR-paired tokens are priced directly through their htr_token_map pool and the HTR-USD
+        pool; other tokens fall back to the best swap path from USD.
+
         Args:
             token: The token to get the price for
 
@@ -3900,25 +5196,27 @@ class DozerPoolManager(Blueprint):
         if token == usd_token:
             return Amount(100_000000)  # 8 decimal places to match contract storage
         
-        # Find the best path from USD to target token using pathfinding
-        # This gives us the path USD → TOKEN_A (but we'll calculate in reverse)
-        ref_amount = Amount(100_00)  # Reference amount to get the path
-        swap_info = self.find_best_swap_path(ref_amount, usd_token, token, 3)
-        
-        if not swap_info.path or swap_info.amount_out == 0:
-            return Amount(0)
-        
-        # Parse the path to get pool keys
-        pool_keys = swap_info.path.split(",")
+        # Fast path: TOKEN_A → HTR through htr_token_map, then HTR → USD
+        hops = self._htr_price_hops(token)
+        if hops is None:
+            # Find the best path from USD to target token using pathfinding
+            # This gives us the path USD → TOKEN_A (but we'll calculate in reverse)
+            ref_amount = Amount(100_00)  # Reference amount to get the path
+            swap_info = self.find_best_swap_path(ref_amount, usd_token, token, 3)
+
+            if not swap_info.path or swap_info.amount_out == 0:
+                return Amount(0)
+
+            # Parse the path to get pool keys, in TOKEN_A → USD direction
+            hops = list(reversed(swap_info.path.split(",")))
         
         # Calculate cumulative price using reserve ratios with integer precision
-        # We want TOKEN_A price in USD, so we calculate in reverse direction
+        # We want TOKEN_A price in USD, so we walk the hops from TOKEN_A to USD
         # Start with 1
         final_price = 1_00000000  # 1 with 8 decimal places
         current_token = token  # Start from TOKEN_A
         
-        # Iterate through pools in reverse order (TOKEN_A → USD direction)
-        for i, pool_key_iter in enumerate(reversed(pool_keys)):
+        for pool_key_iter in hops:
             pool_iter = self.pools[pool_key_iter]
             # Determine which token is the input and output for this hop
             swap_info = self._try_resolve_token_direction(pool_iter, current_token)
@@ -4167,9 +5465,147 @@ class DozerPoolManager(Blueprint):
 
         return (pool.reserve_a, pool.reserve_b)
 
+    @view
+    def get_pool_candles(
+        self, pool_key: str, from_timestamp: int, to_timestamp: int
+    ) -> list[PoolCandle]:
+        """Get the hourly OHLCV candles of a pool between two timestamps.
+
+        Only the last CANDLE_SLOTS buckets are kept; older or swap-less buckets are
+        omitted, so callers should carry the previous close forward for gaps.
+
+        Args:
+            pool_key: The pool key
+            from_timestamp: Start of the range (inclusive, rounded down to a bucket start)
+            to_timestamp: End of the range (inclusive)
+
+        Returns:
+            Candles in ascending start_timestamp order
+
+        Raises:
+            PoolNotFound: If the pool does not exist
+        """
+        self._validate_pool_exists(pool_key)
+        result: list[PoolCandle] = []
+        if to_timestamp < from_timestamp or pool_key not in self.pool_candles:
+            return result
+
+        candles = self.pool_candles[pool_key]
+        first_bucket = from_timestamp // CANDLE_INTERVAL
+        last_bucket = to_timestamp // CANDLE_INTERVAL
+        # The ring cannot hold more than CANDLE_SLOTS buckets, so only the newest ones can match
+        first_bucket = max(first_bucket, last_bucket - CANDLE_SLOTS + 1)
+
+        bucket = first_bucket
+        while bucket <= last_bucket:
+            candle = candles.get(bucket % CANDLE_SLOTS)
+            if candle is not None and candle.start_timestamp == bucket * CANDLE_INTERVAL:
+                result.append(candle)
+            bucket += 1
+        return result
+
+    @view
+    def get_pool_window_stats(
+        self, pool_keys: list[str], current_timestamp: int
+    ) -> dict[str, PoolWindowInfo]:
+        """Get rolling 24h/7d volume, fees and LP fee APR for a list of pools.
+
+        Sums are read from the incrementally maintained accumulators, which count every
+        swap against the reserves including the internal swaps of single-token liquidity
+        calls; buckets that expired since the pool's last swap are discounted here without writing.
+
+        Args:
+            pool_keys: The pool keys to report
+            current_timestamp: Timestamp the windows end at
+
+        Returns:
+            A dictionary mapping each pool key to its PoolWindowInfo
+
+        Raises:
+            PoolNotFound: If any pool does not exist
+        """
+        current_bucket = current_timestamp // CANDLE_INTERVAL
+        result: dict[str, PoolWindowInfo] = {}
+        for pool_key in pool_keys:
+            self._validate_pool_exists(pool_key)
+            pool = self.pools[pool_key]
+            stats = self._window_stats_at(pool_key, current_bucket)
+            result[pool_key] = PoolWindowInfo(
+                volume_a_24h=stats.volume_a_24h,
+                volume_b_24h=stats.volume_b_24h,
+                fee_a_24h=stats.fee_a_24h,
+                fee_b_24h=stats.fee_b_24h,
+                volume_a_7d=stats.volume_a_7d,
+                volume_b_7d=stats.volume_b_7d,
+                fee_a_7d=stats.fee_a_7d,
+                fee_b_7d=stats.fee_b_7d,
+                fee_apr_24h=self._fee_apr(pool, stats.fee_a_24h, stats.fee_b_24h, WINDOW_24H_BUCKETS),
+                fee_apr_7d=self._fee_apr(pool, stats.fee_a_7d, stats.fee_b_7d, WINDOW_7D_BUCKETS),
+            )
+        return result
+
+    @view
+    def get_harvestable_protocol_fees(self, pool_keys: list[str]) -> dict[str, HarvestableFees]:
+        """Get what harvest_protocol_fees would release from each pool at current reserves.
+
+        Raises:
+            PoolNotFound: If any pool does not exist
+        """
+        result: dict[str, HarvestableFees] = {}
+        for pool_key in pool_keys:
+            self._validate_pool_exists(pool_key)
+            pool = self.pools[pool_key]
+            amount_a, amount_b = self._owner_harvest_amounts(pool_key)
+            result[pool_key] = HarvestableFees(
+                token_a=pool.token_a.hex(),
+                token_b=pool.token_b.hex(),
+                liquidity=self._owner_harvestable_liquidity(pool_key),
+                amount_a=amount_a,
+                amount_b=amount_b,
+            )
+        return result
+
+    @view
+    def get_pending_rewards(self, address: CallerId, pool_key: str, current_timestamp: int) -> Amount:
+        """Get the liquidity mining rewards a user can claim from a pool at a timestamp.
+
+        Raises:
+            PoolNotFound: If the pool does not exist
+        """
+        self._validate_pool_exists(pool_key)
+        state = self.pool_rewards.get(pool_key)
+        if state is None:
+            return Amount(0)
+        state = self._pool_rewards_at(pool_key, state, current_timestamp)
+
+        liquidity = self.pool_user_liquidity[pool_key].get(address, Amount(0))
+        debt = 0
+        pending = Amount(0)
+        if pool_key in self.pool_user_reward_debt:
+            debt = self.pool_user_reward_debt[pool_key].get(address, 0)
+            pending = self.pool_user_pending_rewards[pool_key].get(address, Amount(0))
+        earned = (liquidity * state.acc_reward_per_liquidity) // REWARD_PRECISION - debt
+        return Amount(pending + max(0, earned))
+
+    @view
+    def get_pool_reward_state(self, pool_key: str) -> PoolRewardState | None:
+        """Get the liquidity mining accumulator of a pool, or None if it has no rewards."""
+        self._validate_pool_exists(pool_key)
+        return self.pool_rewards.get(pool_key)
+
+    @view
+    def is_pool_archived(self, pool_key: str) -> bool:
+        """Check whether a pool has been archived.
+
+        Raises:
+            PoolNotFound: If the pool does not exist
+        """
+        self._validate_pool_exists(pool_key)
+        return pool_key in self.archived_pools
+
     @view
     def get_all_pools(self) -> list[str]:
-        """Get a list of all pools with their tokens and fees.
+        """Get a list of all active (non-archived) pools with their tokens and fees.
 
         Returns:
             A list of tuples (token_a, token_b, fee)
@@ -4249,11 +5685,13 @@ class DozerPoolManager(Blueprint):
     def front_end_api_pool(
         self,
         pool_key: str,
+        current_timestamp: int,
     ) -> PoolApiInfo:
         """Get pool information for frontend display.
 
         Args:
             pool_key: The pool key to check
+            current_timestamp: Time at which the reward program is checked; dzr_rewards is 0 once it ended
 
         Returns:
             A PoolApiInfo NamedTuple with pool information
@@ -4273,6 +5711,11 @@ class DozerPoolManager(Blueprint):
 
         pool = self.pools[pool_key]
 
+        reward_state = self.pool_rewards.get(pool_key)
+        daily_rewards = 0
+        if reward_state is not None and current_timestamp < reward_state.reward_end_timestamp:
+            daily_rewards = reward_state.reward_per_second * 86400
+
         is_signed = pool_key in self.pool_signers
         signer_address = self.pool_signers.get(pool_key, None)
         signer_str = (
@@ -4288,7 +5731,7 @@ class DozerPoolManager(Blueprint):
             volume=Amount(pool.volume_a),
             fee0=Amount(self.pool_accumulated_fee[pool_key].get(token_a, 0)),
             fee1=Amount(self.pool_accumulated_fee[pool_key].get(token_b, 0)),
-            dzr_rewards=Amount(1000),
+            dzr_rewards=Amount(daily_rewards),
             transactions=Amount(pool.transactions),
             is_signed=Amount(1 if is_signed else 0),
             signer=signer_str,
@@ -4423,8 +5866,18 @@ class DozerPoolManager(Blueprint):
         # Get current USD value of position
         current_value_usd = self._calculate_user_position_usd_value(address, pool_key)
 
-        # Get stored initial USD value
-        initial_value_usd = self.pool_user_deposit_price_usd[pool_key].get(address, 0)
+        # Value the recorded cost basis at current prices; positions last touched before
+        # cost-basis tracking fall back to the stored USD snapshot
+        cost_basis = None
+        if pool_key in self.pool_user_cost_basis:
+            cost_basis = self.pool_user_cost_basis[pool_key].get(address)
+        if cost_basis is not None:
+            pool = self.pools[pool_key]
+            value_a_usd = (cost_basis.basis_a * self.get_token_price_in_usd(pool.token_a)) // 100_000000
+            value_b_usd = (cost_basis.basis_b * self.get_token_price_in_usd(pool.token_b)) // 100_000000
+            initial_value_usd = Amount(value_a_usd + value_b_usd)
+        else:
+            initial_value_usd = self.pool_user_deposit_price_usd[pool_key].get(address, 0)
 
         # Get last action timestamp
         last_action_timestamp = self.pool_user_last_action_timestamp[pool_key].get(address, 0)
@@ -4447,6 +5900,18 @@ class DozerPoolManager(Blueprint):
         )
 
 
+    @view
+    def get_user_cost_basis(self, address: CallerId, pool_key: str) -> UserCostBasis:
+        """Get the recorded token flows and cost basis of a user's position in a pool.
+
+        Raises:
+            PoolNotFound: If the pool does not exist
+        """
+        self._validate_pool_exists(pool_key)
+        if pool_key not in self.pool_user_cost_basis:
+            return EMPTY_COST_BASIS
+        return self.pool_user_cost_basis[pool_key].get(address, EMPTY_COST_BASIS)
+
     @view
     def find_best_swap_path(
         self, amount_in: Amount, token_in: TokenUid, token_out: TokenUid, max_hops: int
@@ -4,10 +4,17 @@ from logging import getLogger
 from hathor.conf import HathorSettings
 from hathor.crypto.util import decode_address
 from hathor.nanocontracts.blueprints.dozer_pool_manager import (
+    CANDLE_INTERVAL,
+    PRICE_PRECISION,
+    REWARD_PRECISION,
     DozerPoolManager,
+    InsufficientLiquidity,
     InvalidAction,
+    InvalidState,
     InvalidTokens,
+    MulticallOp,
     PoolExists,
+    PoolNotFound,
     Unauthorized,
 )
 
@@ -674,6 +681,35 @@ class DozerPoolManagerBlueprintTestCase(BlueprintTestCase):
             total_input_used += quote.excess_amount
         self.assertEqual(total_input_used, amount_in)
 
+    def test_value_based_price_impact_uses_pool_reserves(self):
+        pool_key, _ = self._create_pool(
+            self.token_a, self.token_b, fee=3, reserve_a=10000_00, reserve_b=20000_00
+        )
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        pool = contract.pools[pool_key]
+
+        token_in = self.token_a
+        amount_in = 1000_00
+        quote = self.runner.call_view_method(
+            self.nc_id, "quote_add_liquidity_single_token", token_in, amount_in, self.token_b, 3
+        )
+        actual_a, actual_b = quote.token_a_used, quote.token_b_used
+
+        # USD prices consistent with the pool ratio: price_a / price_b == reserve_b / reserve_a
+        price = {pool.token_a: pool.reserve_b * 1_000000, pool.token_b: pool.reserve_a * 1_000000}
+        input_usd = amount_in * price[token_in] // 100_000000
+        output_usd = (
+            actual_a * price[pool.token_a] // 100_000000 + actual_b * price[pool.token_b] // 100_000000
+        )
+        expected = max(0, (input_usd - output_usd) * 10000 // input_usd)
+
+        impact = contract._calculate_value_based_price_impact(
+            amount_in, token_in, actual_a, actual_b, pool.token_a, pool.reserve_a, pool.reserve_b
+        )
+        self.assertEqual(impact, expected)
+        self.assertGreater(impact, 0)
+
     def test_remove_liquidity_single_token(self):
         # Increased pool reserves 10x to allow 100% removal while staying under 5% price impact
         pool_key, _creator_address = self._create_pool(
@@ -1061,6 +1097,60 @@ class DozerPoolManagerBlueprintTestCase(BlueprintTestCase):
 
         self._check_balance()
 
+    def test_user_cost_basis_tracks_token_flows(self):
+        """Cost basis records pool-token flows and is scaled down on removal"""
+        pool_key, _creator_address = self._create_pool(self.token_a, self.token_b)
+
+        _result, add_context = self._add_liquidity(
+            self.token_a, self.token_b, 3, 500_00
+        )
+        user = add_context.caller_id
+
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        pool = contract.pools[pool_key]
+        deposited = {
+            token: add_context.get_single_action(token).amount for token in (pool.token_a, pool.token_b)
+        }
+        liquidity_before = contract.pool_user_liquidity[pool_key][user]
+
+        basis = self.runner.call_view_method(self.nc_id, "get_user_cost_basis", user, pool_key)
+        self.assertEqual(basis.deposited_a, deposited[pool.token_a])
+        self.assertEqual(basis.deposited_b, deposited[pool.token_b])
+        self.assertEqual(basis.withdrawn_a, 0)
+        self.assertEqual(basis.withdrawn_b, 0)
+        self.assertEqual(basis.basis_a, deposited[pool.token_a])
+        self.assertEqual(basis.basis_b, deposited[pool.token_b])
+
+        remove_context, _ = self._remove_liquidity(
+            self.token_a, self.token_b, 3, 250_00, address=user
+        )
+        withdrawn = {
+            token: remove_context.get_single_action(token).amount for token in (pool.token_a, pool.token_b)
+        }
+
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        liquidity_after = contract.pool_user_liquidity[pool_key][user]
+
+        basis_after = self.runner.call_view_method(self.nc_id, "get_user_cost_basis", user, pool_key)
+        self.assertEqual(basis_after.deposited_a, basis.deposited_a)
+        self.assertEqual(basis_after.deposited_b, basis.deposited_b)
+        self.assertEqual(basis_after.withdrawn_a, withdrawn[pool.token_a])
+        self.assertEqual(basis_after.withdrawn_b, withdrawn[pool.token_b])
+        self.assertEqual(basis_after.basis_a, basis.basis_a * liquidity_after // liquidity_before)
+        self.assertEqual(basis_after.basis_b, basis.basis_b * liquidity_after // liquidity_before)
+
+        # Users without a position have an empty cost basis
+        empty_address_bytes, _ = self._get_any_address()
+        empty_basis = self.runner.call_view_method(
+            self.nc_id, "get_user_cost_basis", Address(empty_address_bytes), pool_key
+        )
+        self.assertEqual(empty_basis.basis_a, 0)
+        self.assertEqual(empty_basis.deposited_a, 0)
+
+        self._check_balance()
+
     def test_single_token_operations_edge_cases(self):
         """Test edge cases for single token operations"""
         # Create a pool
@@ -1219,6 +1309,342 @@ class DozerPoolManagerBlueprintTestCase(BlueprintTestCase):
 
         self._check_balance()
 
+    def test_pool_candles(self):
+        """Swaps are folded into hourly OHLCV candles"""
+        pool_key, _ = self._create_pool(
+            self.token_a, self.token_b, fee=3, reserve_a=10000_00, reserve_b=10000_00
+        )
+
+        def spot_price():
+            contract = self.get_readonly_contract(self.nc_id)
+            assert isinstance(contract, DozerPoolManager)
+            pool = contract.pools[pool_key]
+            return pool.reserve_b * PRICE_PRECISION // pool.reserve_a, pool
+
+        def swap(token_in, token_out, amount_in):
+            reserve_a, reserve_b = self.runner.call_view_method(
+                self.nc_id, "get_reserves", token_in, token_out, 3
+            )
+            _, pool = spot_price()
+            reserve_in, reserve_out = (reserve_a, reserve_b) if token_in == pool.token_a else (reserve_b, reserve_a)
+            amount_out = self.runner.call_view_method(
+                self.nc_id, "get_amount_out", amount_in, reserve_in, reserve_out, 3, 1000
+            )
+            self._swap_exact_tokens_for_tokens(token_in, token_out, 3, amount_in, amount_out)
+            return amount_out
+
+        open_price, pool = spot_price()
+        out_1 = swap(self.token_a, self.token_b, 100_00)
+        price_1, _ = spot_price()
+        out_2 = swap(self.token_b, self.token_a, 300_00)
+        close_price, _ = spot_price()
+
+        now = self.get_current_timestamp()
+        candles = self.runner.call_view_method(self.nc_id, "get_pool_candles", pool_key, now, now)
+        self.assertEqual(len(candles), 1)
+        candle = candles[0]
+        self.assertEqual(candle.start_timestamp, now - now % CANDLE_INTERVAL)
+        self.assertEqual(candle.swaps, 2)
+        self.assertEqual(candle.open_price, open_price)
+        self.assertEqual(candle.close_price, close_price)
+        self.assertEqual(candle.high_price, max(open_price, price_1, close_price))
+        self.assertEqual(candle.low_price, min(open_price, price_1, close_price))
+
+        in_a = 100_00 if pool.token_a == self.token_a else 300_00
+        out_a = out_2 if pool.token_a == self.token_a else out_1
+        self.assertEqual(candle.volume_a, in_a + out_a)
+        self.assertEqual(candle.volume_a + candle.volume_b, 100_00 + 300_00 + out_1 + out_2)
+        self.assertEqual(candle.fee_a + candle.fee_b, (100_00 * 3 + 999) // 1000 + (300_00 * 3 + 999) // 1000)
+
+        # A swap in the next hour opens a new candle at the previous close
+        self.clock.advance(CANDLE_INTERVAL)
+        swap(self.token_a, self.token_b, 50_00)
+        later = self.get_current_timestamp()
+        candles = self.runner.call_view_method(self.nc_id, "get_pool_candles", pool_key, now, later)
+        self.assertEqual(len(candles), 2)
+        self.assertEqual(candles[1].open_price, close_price)
+        self.assertEqual(candles[1].swaps, 1)
+
+        only_latest = self.runner.call_view_method(self.nc_id, "get_pool_candles", pool_key, later, later)
+        self.assertEqual(only_latest, [candles[1]])
+
+        self._check_balance()
+
+    def test_pool_window_stats(self):
+        """Rolling 24h/7d sums expire bucket by bucket"""
+        pool_key, _ = self._create_pool(
+            self.token_a, self.token_b, fee=3, reserve_a=10000_00, reserve_b=10000_00
+        )
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        pool = contract.pools[pool_key]
+
+        def swap_a_for_b(amount_in):
+            reserve_a, reserve_b = self.runner.call_view_method(
+                self.nc_id, "get_reserves", self.token_a, self.token_b, 3
+            )
+            reserve_in, reserve_out = (reserve_a, reserve_b) if pool.token_a == self.token_a else (reserve_b, reserve_a)
+            amount_out = self.runner.call_view_method(
+                self.nc_id, "get_amount_out", amount_in, reserve_in, reserve_out, 3, 1000
+            )
+            self._swap_exact_tokens_for_tokens(self.token_a, self.token_b, 3, amount_in, amount_out)
+
+        def fees(stats, window):
+            return getattr(stats, f"fee_a_{window}") + getattr(stats, f"fee_b_{window}")
+
+        def window_stats(timestamp):
+            return self.runner.call_view_method(
+                self.nc_id, "get_pool_window_stats", [pool_key], timestamp
+            )[pool_key]
+
+        swap_a_for_b(1000_00)
+        first_fee = (1000_00 * 3 + 999) // 1000
+        now = self.get_current_timestamp()
+        stats = window_stats(now)
+        self.assertEqual(fees(stats, "24h"), first_fee)
+        self.assertEqual(fees(stats, "7d"), first_fee)
+        self.assertGreater(stats.fee_apr_24h, 0)
+        self.assertGreater(stats.fee_apr_24h, stats.fee_apr_7d)
+
+        # One day later the first swap only counts in the 7d window
+        self.clock.advance(24 * CANDLE_INTERVAL)
+        stats = window_stats(self.get_current_timestamp())
+        self.assertEqual(fees(stats, "24h"), 0)
+        self.assertEqual(fees(stats, "7d"), first_fee)
+
+        swap_a_for_b(200_00)
+        second_fee = (200_00 * 3 + 999) // 1000
+        stats = window_stats(self.get_current_timestamp())
+        self.assertEqual(fees(stats, "24h"), second_fee)
+        self.assertEqual(fees(stats, "7d"), first_fee + second_fee)
+
+        # After seven days both windows have dropped the first swap
+        stats = window_stats(now + 7 * 24 * CANDLE_INTERVAL)
+        self.assertEqual(fees(stats, "24h"), 0)
+        self.assertEqual(fees(stats, "7d"), second_fee)
+
+        with self.assertRaises(PoolNotFound):
+            self.runner.call_view_method(self.nc_id, "get_pool_window_stats", ["missing/pool/3"], now)
+
+    def test_zap_candles_and_window_stats(self):
+        """Internal swaps of single-token liquidity calls are recorded like regular swaps"""
+        pool_key, _ = self._create_pool(
+            self.token_a, self.token_b, fee=3, reserve_a=100000_00, reserve_b=200000_00
+        )
+        now = self.get_current_timestamp()
+
+        def candles():
+            return self.runner.call_view_method(self.nc_id, "get_pool_candles", pool_key, now, now)
+
+        def window_stats():
+            return self.runner.call_view_method(
+                self.nc_id, "get_pool_window_stats", [pool_key], now
+            )[pool_key]
+
+        add_quote = self.runner.call_view_method(
+            self.nc_id, "quote_add_liquidity_single_token", self.token_a, 1000_00, self.token_b, 3
+        )
+        address_bytes, _ = self._get_any_address()
+        user = Address(address_bytes)
+        context = self.create_context(
+            actions=[NCDepositAction(token_uid=self.token_a, amount=1000_00)],
+            vertex=self._get_any_tx(),
+            caller_id=user,
+            timestamp=now,
+        )
+        self.runner.call_public_method(self.nc_id, "add_liquidity_single_token", context, self.token_b, 3)
+        add_fee = (add_quote.swap_amount * 3 + 999) // 1000
+
+        recorded = candles()
+        self.assertEqual(len(recorded), 1)
+        self.assertEqual(recorded[0].swaps, 1)
+        self.assertEqual(recorded[0].volume_a + recorded[0].volume_b, add_quote.swap_amount + add_quote.swap_output)
+        self.assertEqual(recorded[0].fee_a + recorded[0].fee_b, add_fee)
+        stats = window_stats()
+        self.assertEqual(stats.fee_a_24h + stats.fee_b_24h, add_fee)
+        self.assertGreater(stats.fee_apr_24h, 0)
+
+        remove_quote = self.runner.call_view_method(
+            self.nc_id, "quote_remove_liquidity_single_token_percentage", user, pool_key, self.token_a, 10000
+        )
+        self.assertGreater(remove_quote.swap_amount, 0)
+        context = self.create_context(
+            actions=[NCWithdrawalAction(token_uid=self.token_a, amount=remove_quote.amount_out)],
+            vertex=self._get_any_tx(),
+            caller_id=user,
+            timestamp=now,
+        )
+        self.runner.call_public_method(self.nc_id, "remove_liquidity_single_token", context, pool_key, 10000)
+        remove_fee = (remove_quote.swap_amount * 3 + 999) // 1000
+
+        recorded = candles()
+        self.assertEqual(recorded[0].swaps, 2)
+        self.assertEqual(recorded[0].fee_a + recorded[0].fee_b, add_fee + remove_fee)
+        stats = window_stats()
+        self.assertEqual(stats.fee_a_24h + stats.fee_b_24h, add_fee + remove_fee)
+        self.assertEqual(stats.fee_a_7d + stats.fee_b_7d, add_fee + remove_fee)
+
+        self._check_balance()
+
+    def _call_reward_method(self, method, caller, *args, actions=None):
+        context = self.create_context(
+            actions=actions or [],
+            vertex=self._get_any_tx(),
+            caller_id=caller,
+            timestamp=self.get_current_timestamp(),
+        )
+        return self.runner.call_public_method(self.nc_id, method, context, *args)
+
+    def test_liquidity_mining_rewards(self):
+        """Rewards accrue per unit of liquidity and are claimed in O(1)"""
+        pool_key, creator = self._create_pool(self.token_a, self.token_b)
+        other_pool_key, _ = self._create_pool(self.token_c, self.token_d)
+        reward_token = self.token_e
+
+        with self.assertRaises(Unauthorized):
+            self._call_reward_method("set_reward_token", creator, reward_token)
+        self._call_reward_method("set_reward_token", self.owner_address, reward_token)
+        self._call_reward_method(
+            "fund_rewards", creator,
+            actions=[NCDepositAction(token_uid=reward_token, amount=1_000_000)],
+        )
+        self._call_reward_method("set_pool_reward_rate", self.owner_address, pool_key, 10, 10_000)
+
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        creator_liquidity = contract.pool_user_liquidity[pool_key][creator]
+        total_liquidity = contract.pools[pool_key].total_liquidity
+
+        # Only the creator provides liquidity for the first 100 seconds
+        self.clock.advance(100)
+        acc = 100 * 10 * REWARD_PRECISION // total_liquidity
+        expected_creator = creator_liquidity * acc // REWARD_PRECISION
+        self.assertEqual(
+            self.runner.call_view_method(
+                self.nc_id, "get_pending_rewards", creator, pool_key, self.get_current_timestamp()
+            ),
+            expected_creator,
+        )
+        self.assertLessEqual(expected_creator, 1000)
+
+        # A new LP only earns from the moment it joins
+        _result, add_context = self._add_liquidity(self.token_a, self.token_b, 3, 1000_00)
+        lp = add_context.caller_id
+        self.assertEqual(
+            self.runner.call_view_method(
+                self.nc_id, "get_pending_rewards", lp, pool_key, self.get_current_timestamp()
+            ),
+            0,
+        )
+
+        self.clock.advance(100)
+        now = self.get_current_timestamp()
+        creator_pending = self.runner.call_view_method(self.nc_id, "get_pending_rewards", creator, pool_key, now)
+        lp_pending = self.runner.call_view_method(self.nc_id, "get_pending_rewards", lp, pool_key, now)
+        self.assertGreater(lp_pending, 0)
+        self.assertLessEqual(creator_pending + lp_pending, 2000)
+        self.assertGreater(creator_pending + lp_pending, 1990)
+
+        # Claiming more than pending fails; claiming everything resets pending
+        with self.assertRaises(InvalidAction):
+            self._call_reward_method(
+                "claim_rewards", lp, pool_key,
+                actions=[NCWithdrawalAction(token_uid=reward_token, amount=lp_pending + 1)],
+            )
+        self._call_reward_method(
+            "claim_rewards", lp, pool_key,
+            actions=[NCWithdrawalAction(token_uid=reward_token, amount=lp_pending)],
+        )
+        self.assertEqual(
+            self.runner.call_view_method(self.nc_id, "get_pending_rewards", lp, pool_key, now), 0
+        )
+
+        # Batch claim skips pools without rewards for the caller
+        self._call_reward_method(
+            "claim_rewards_multi", creator, [other_pool_key, pool_key],
+            actions=[NCWithdrawalAction(token_uid=reward_token, amount=creator_pending)],
+        )
+        self.assertEqual(
+            self.runner.call_view_method(self.nc_id, "get_pending_rewards", creator, pool_key, now), 0
+        )
+
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        self.assertEqual(contract.reward_balance, 1_000_000 - lp_pending - creator_pending)
+        self.assertEqual(
+            self.runner.call_view_method(
+                self.nc_id, "front_end_api_pool", pool_key, self.get_current_timestamp()
+            ).dzr_rewards,
+            10 * 86400,
+        )
+
+    def test_reward_programs_are_funded_and_stop_on_archive(self):
+        """Emission is reserved from the funded balance, ends on schedule and stops when a pool is archived"""
+        pool_key, creator = self._create_pool(self.token_a, self.token_b)
+        other_pool_key, other_creator = self._create_pool(self.token_c, self.token_d)
+        reward_token = self.token_e
+        self._call_reward_method("set_reward_token", self.owner_address, reward_token)
+        self._call_reward_method(
+            "fund_rewards", creator,
+            actions=[NCDepositAction(token_uid=reward_token, amount=1000)],
+        )
+
+        def pending(user, key):
+            return self.runner.call_view_method(
+                self.nc_id, "get_pending_rewards", user, key, self.get_current_timestamp()
+            )
+
+        def allocated():
+            contract = self.get_readonly_contract(self.nc_id)
+            assert isinstance(contract, DozerPoolManager)
+            return contract.reward_allocated
+
+        # A program cannot promise more than the funded balance
+        with self.assertRaises(InsufficientLiquidity):
+            self._call_reward_method("set_pool_reward_rate", self.owner_address, pool_key, 10, 101)
+        self._call_reward_method("set_pool_reward_rate", self.owner_address, pool_key, 10, 100)
+        self.assertEqual(allocated(), 1000)
+        with self.assertRaises(InsufficientLiquidity):
+            self._call_reward_method("set_pool_reward_rate", self.owner_address, other_pool_key, 1, 1)
+
+        # Emission ends with the program
+        self.clock.advance(100)
+        at_end = pending(creator, pool_key)
+        self.assertGreater(at_end, 990)
+        self.assertLessEqual(at_end, 1000)
+        self.clock.advance(100)
+        self.assertEqual(pending(creator, pool_key), at_end)
+        self.assertEqual(
+            self.runner.call_view_method(
+                self.nc_id, "front_end_api_pool", pool_key, self.get_current_timestamp()
+            ).dzr_rewards,
+            0,
+        )
+
+        # Archiving a pool stops its emission and releases the unemitted reservation
+        self._call_reward_method(
+            "fund_rewards", creator,
+            actions=[NCDepositAction(token_uid=reward_token, amount=1000)],
+        )
+        self._call_reward_method("set_pool_reward_rate", self.owner_address, other_pool_key, 1, 1000)
+        self.assertEqual(allocated(), 2000)
+        self.clock.advance(10)
+        self._call_reward_method("archive_pool", self.owner_address, other_pool_key)
+        self.assertEqual(allocated(), 1010)
+        at_archive = pending(other_creator, other_pool_key)
+        self.assertGreater(at_archive, 0)
+        self.clock.advance(100)
+        self.assertEqual(pending(other_creator, other_pool_key), at_archive)
+        with self.assertRaises(InvalidState):
+            self._call_reward_method("set_pool_reward_rate", self.owner_address, other_pool_key, 1, 10)
+
+        # Claims consume the reservation along with the balance
+        self._call_reward_method(
+            "claim_rewards", creator, pool_key,
+            actions=[NCWithdrawalAction(token_uid=reward_token, amount=at_end)],
+        )
+        self.assertEqual(allocated(), 1010 - at_end)
+
     def test_get_reserves(self):
         """Test getting pool reserves"""
         # Create a pool
@@ -1524,6 +1950,412 @@ class DozerPoolManagerBlueprintTestCase(BlueprintTestCase):
 
         self._check_balance()
 
+    def test_withdraw_cashback_multi(self):
+        """Cashback in a shared token is collected from several pools at once"""
+        pool_ab, _ = self._create_pool(
+            self.token_a, self.token_b, fee=3, reserve_a=10000_00, reserve_b=10000_00
+        )
+        pool_bc, _ = self._create_pool(
+            self.token_b, self.token_c, fee=3, reserve_a=10000_00, reserve_b=10000_00
+        )
+        tx = self._get_any_tx()
+        user = Address(self._get_any_address()[0])
+
+        # Over-deposit token_b in both pools to leave change behind
+        for other_token in (self.token_a, self.token_c):
+            context = self.create_context(
+                actions=[
+                    NCDepositAction(token_uid=other_token, amount=500_00),
+                    NCDepositAction(token_uid=self.token_b, amount=700_00),
+                ],
+                vertex=tx,
+                caller_id=user,
+                timestamp=self.get_current_timestamp()
+            )
+            self.runner.call_public_method(self.nc_id, "add_liquidity", context, 3)
+
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        change_ab = contract.pool_change[pool_ab].get(user, (0, 0))
+        change_bc = contract.pool_change[pool_bc].get(user, (0, 0))
+        b_in_ab = change_ab[1] if contract.pools[pool_ab].token_b == self.token_b else change_ab[0]
+        b_in_bc = change_bc[1] if contract.pools[pool_bc].token_b == self.token_b else change_bc[0]
+        self.assertGreater(b_in_ab, 0)
+        self.assertGreater(b_in_bc, 0)
+
+        def withdraw(amount, pool_keys):
+            context = self.create_context(
+                [NCWithdrawalAction(token_uid=self.token_b, amount=amount)],
+                tx,
+                user,
+                timestamp=self.get_current_timestamp()
+            )
+            self.runner.call_public_method(self.nc_id, "withdraw_cashback_multi", context, pool_keys)
+
+        with self.assertRaises(InvalidAction):
+            withdraw(b_in_ab + b_in_bc + 1, [pool_ab, pool_bc])
+        with self.assertRaises(InvalidAction):
+            withdraw(b_in_ab, [pool_ab, pool_ab])
+
+        withdraw(b_in_ab + b_in_bc, [pool_ab, pool_bc])
+
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        self.assertEqual(contract.pool_change[pool_ab].get(user, (0, 0)), (0, 0))
+        self.assertEqual(contract.pool_change[pool_bc].get(user, (0, 0)), (0, 0))
+
+        self._check_balance()
+
+    def test_multicall_zap_and_exit(self):
+        """Swap-then-add and remove-then-swap each settle in one transaction"""
+        pool_key, _ = self._create_pool(
+            self.token_a, self.token_b, fee=3, reserve_a=10000_00, reserve_b=10000_00
+        )
+        tx = self._get_any_tx()
+        user = Address(self._get_any_address()[0])
+        deadline = self.get_current_timestamp() + 60
+
+        def multicall(actions, ops):
+            context = self.create_context(
+                actions=actions, vertex=tx, caller_id=user, timestamp=self.get_current_timestamp()
+            )
+            return self.runner.call_public_method(self.nc_id, "multicall", context, ops, deadline)
+
+        # Zap: half of a single-token deposit is swapped and everything is added as liquidity
+        results = multicall(
+            [NCDepositAction(token_uid=self.token_a, amount=1000_00)],
+            [
+                MulticallOp("swap_exact_in", pool_key, self.token_a, 500_00, 1),
+                MulticallOp("add_liquidity", pool_key, self.token_a, 0, 0),
+            ],
+        )
+        self.assertEqual(len(results), 2)
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        liquidity = contract.pool_user_liquidity[pool_key][user]
+        self.assertEqual(liquidity, results[1])
+        self._check_balance()
+
+        # Exit: remove liquidity and swap the token_b side back, withdrawing only token_a
+        pool = contract.pools[pool_key]
+        amount_a = liquidity * pool.reserve_a // pool.total_liquidity // 2
+        results = multicall(
+            [NCWithdrawalAction(token_uid=pool.token_a, amount=amount_a)],
+            [
+                MulticallOp("remove_liquidity", pool_key, pool.token_a, amount_a, 0),
+                MulticallOp("swap_exact_in", pool_key, pool.token_b, 0, 0),
+            ],
+        )
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        self.assertLess(contract.pool_user_liquidity[pool_key][user], liquidity)
+        # The swapped token_a that was not withdrawn stays as cashback
+        change_a, _change_b = contract.pool_change[pool_key].get(user, (0, 0))
+        self.assertGreaterEqual(change_a, results[1])
+        self._check_balance()
+
+        # Withdrawals must be covered by the call's balances
+        with self.assertRaises(InvalidAction):
+            multicall(
+                [
+                    NCDepositAction(token_uid=self.token_a, amount=100_00),
+                    NCWithdrawalAction(token_uid=self.token_b, amount=100_00),
+                ],
+                [MulticallOp("swap_exact_in", pool_key, self.token_a, 0, 0)],
+            )
+
+        # A negative amount on either side is rejected, even next to a positive one
+        with self.assertRaises(InvalidAction):
+            multicall(
+                [NCWithdrawalAction(token_uid=pool.token_a, amount=1)],
+                [MulticallOp("withdraw_cashback", pool_key, pool.token_a, 1, -100_00)],
+            )
+
+    def test_harvest_protocol_fees(self):
+        """Owner LP from protocol fees is burned across pools in one call"""
+        pool_ab, _ = self._create_pool(
+            self.token_a, self.token_b, fee=3, reserve_a=10000_00, reserve_b=10000_00
+        )
+        pool_bc, _ = self._create_pool(
+            self.token_b, self.token_c, fee=3, reserve_a=10000_00, reserve_b=10000_00
+        )
+        # The owner also provides liquidity as a regular LP; harvesting must leave it alone
+        seed_context = self.create_context(
+            actions=[
+                NCDepositAction(token_uid=self.token_a, amount=1000_00),
+                NCDepositAction(token_uid=self.token_b, amount=1000_00),
+            ],
+            vertex=self._get_any_tx(),
+            caller_id=self.owner_address,
+            timestamp=self.get_current_timestamp(),
+        )
+        self.runner.call_public_method(self.nc_id, "add_liquidity", seed_context, 3)
+        seeded = self.runner.call_view_method(
+            self.nc_id, "liquidity_of", self.owner_address, pool_ab
+        )
+        for token_in, token_out in ((self.token_a, self.token_b), (self.token_c, self.token_b)):
+            for _ in range(3):
+                reserve_in, reserve_out = self.runner.call_view_method(
+                    self.nc_id, "get_reserves", token_in, token_out, 3
+                )
+                if token_in > token_out:
+                    reserve_in, reserve_out = reserve_out, reserve_in
+                amount_out = self.runner.call_view_method(
+                    self.nc_id, "get_amount_out", 1000_00, reserve_in, reserve_out, 3, 1000
+                )
+                self._swap_exact_tokens_for_tokens(token_in, token_out, 3, 1000_00, amount_out)
+
+        harvestable = self.runner.call_view_method(
+            self.nc_id, "get_harvestable_protocol_fees", [pool_ab, pool_bc]
+        )
+        totals: dict[bytes, int] = {}
+        for info in harvestable.values():
+            self.assertGreater(info.liquidity, 0)
+            totals[bytes.fromhex(info.token_a)] = totals.get(bytes.fromhex(info.token_a), 0) + info.amount_a
+            totals[bytes.fromhex(info.token_b)] = totals.get(bytes.fromhex(info.token_b), 0) + info.amount_b
+        self.assertGreater(totals[self.token_b], 0)
+
+        def harvest(caller, amounts):
+            context = self.create_context(
+                actions=[
+                    NCWithdrawalAction(token_uid=TokenUid(token), amount=amount)
+                    for token, amount in amounts.items()
+                ],
+                vertex=self._get_any_tx(),
+                caller_id=caller,
+                timestamp=self.get_current_timestamp(),
+            )
+            self.runner.call_public_method(
+                self.nc_id, "harvest_protocol_fees", context, [pool_ab, pool_bc]
+            )
+
+        with self.assertRaises(Unauthorized):
+            harvest(Address(self._get_any_address()[0]), totals)
+        with self.assertRaises(InvalidAction):
+            harvest(self.owner_address, {self.token_b: totals[self.token_b] + 1})
+
+        harvest(self.owner_address, totals)
+
+        harvestable_after = self.runner.call_view_method(
+            self.nc_id, "get_harvestable_protocol_fees", [pool_ab, pool_bc]
+        )
+        for pool_key, info in harvestable_after.items():
+            self.assertLess(info.liquidity, harvestable[pool_key].liquidity)
+            self.assertLessEqual(info.amount_a, 1)
+        self.assertGreaterEqual(
+            self.runner.call_view_method(self.nc_id, "liquidity_of", self.owner_address, pool_ab),
+            seeded,
+        )
+        self.assertFalse(self.runner.call_view_method(self.nc_id, "is_pool_archived", pool_ab))
+
+        self._check_balance()
+
+    def test_archive_pool(self):
+        """Archived pools leave the registry but stay addressable for exits"""
+        pool_key, _ = self._create_pool(
+            self.token_a, self.token_b, fee=3, reserve_a=10000_00, reserve_b=10000_00
+        )
+        pool = self.runner.call_view_method(self.nc_id, "pool_info", pool_key)
+        token_a = TokenUid(bytes.fromhex(pool.token_a))
+        token_b = TokenUid(bytes.fromhex(pool.token_b))
+        _result, add_context = self._add_liquidity(token_a, token_b, 3, 100_00)
+        lp = add_context.caller_id
+
+        archive_context = self.create_context(
+            actions=[], vertex=self._get_any_tx(), caller_id=lp, timestamp=self.get_current_timestamp()
+        )
+        with self.assertRaises(Unauthorized):
+            self.runner.call_public_method(self.nc_id, "archive_pool", archive_context, pool_key)
+
+        owner_context = self.create_context(
+            actions=[], vertex=self._get_any_tx(), caller_id=self.owner_address, timestamp=self.get_current_timestamp()
+        )
+        self.runner.call_public_method(self.nc_id, "archive_pool", owner_context, pool_key)
+        self.assertTrue(self.runner.call_view_method(self.nc_id, "is_pool_archived", pool_key))
+        self.assertNotIn(pool_key, self.runner.call_view_method(self.nc_id, "get_all_pools"))
+
+        # LPs still see the archived pool they hold liquidity in
+        self.assertIn(pool_key, self.runner.call_view_method(self.nc_id, "get_user_pools", lp))
+        self.assertIn(pool_key, self.runner.call_view_method(self.nc_id, "get_user_positions", lp))
+
+        # Swaps and new liquidity are rejected, exits still work
+        with self.assertRaises(InvalidState):
+            self._swap_exact_tokens_for_tokens(token_a, token_b, 3, 10_00, 1)
+        with self.assertRaises(InvalidState):
+            self._add_liquidity(token_a, token_b, 3, 100_00)
+        self._remove_liquidity(token_a, token_b, 3, 50_00, address=lp)
+
+        self.runner.call_public_method(self.nc_id, "restore_pool", owner_context, pool_key)
+        self.assertFalse(self.runner.call_view_method(self.nc_id, "is_pool_archived", pool_key))
+        self.assertIn(pool_key, self.runner.call_view_method(self.nc_id, "get_all_pools"))
+        self.assertEqual(
+            self.runner.call_view_method(self.nc_id, "get_user_pools", lp).count(pool_key), 1
+        )
+
+        self._check_balance()
+
+    def test_pool_archived_when_drained(self):
+        """Removing the last meaningful liquidity archives the pool automatically"""
+        pool_key, creator = self._create_pool(self.token_a, self.token_b)
+        other_pool_key, _ = self._create_pool(self.token_c, self.token_d)
+
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        pool = contract.pools[pool_key]
+        liquidity = contract.pool_user_liquidity[pool_key][creator]
+        max_withdraw = liquidity * pool.reserve_a // pool.total_liquidity
+        token_a = pool.token_a
+        token_b = pool.token_b
+
+        self._remove_liquidity(token_a, token_b, 3, max_withdraw, address=creator)
+
+        self.assertTrue(self.runner.call_view_method(self.nc_id, "is_pool_archived", pool_key))
+        all_pools = self.runner.call_view_method(self.nc_id, "get_all_pools")
+        self.assertNotIn(pool_key, all_pools)
+        self.assertIn(other_pool_key, all_pools)
+        self.assertFalse(self.runner.call_view_method(self.nc_id, "is_pool_archived", other_pool_key))
+
+        # The swap-removed slot is reused by the last pool and the index follows it
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        for i, key in enumerate(contract.all_pools):
+            self.assertEqual(contract.pool_index[key], i)
+        self.assertNotIn(pool_key, contract.pool_index)
+
+        # Archived pools cannot become the HTR-USD reference
+        owner_context = self.create_context(
+            [], self._get_any_tx(), Address(self.owner_address), timestamp=self.get_current_timestamp()
+        )
+        with self.assertRaises(InvalidState):
+            self.runner.call_public_method(self.nc_id, "set_htr_usd_pool", owner_context, token_a, token_b, 3)
+
+        # New liquidity revives the drained pool at the deposit's price
+        result, add_context = self._add_liquidity(token_a, token_b, 3, 500_00, 2000_00)
+        self.assertEqual(result[1], 0)
+        self.assertFalse(self.runner.call_view_method(self.nc_id, "is_pool_archived", pool_key))
+        self.assertIn(pool_key, self.runner.call_view_method(self.nc_id, "get_all_pools"))
+        reserve_a, reserve_b = self.runner.call_view_method(self.nc_id, "get_reserves", token_a, token_b, 3)
+        self.assertGreaterEqual(reserve_a, 500_00)
+        self.assertLess(reserve_a, 500_00 + 10)
+        self.assertGreaterEqual(reserve_b, 2000_00)
+        self.assertLess(reserve_b, 2000_00 + 10)
+        self.assertGreater(
+            self.runner.call_view_method(self.nc_id, "liquidity_of", add_context.caller_id, pool_key), 0
+        )
+        self._swap_exact_tokens_for_tokens(token_a, token_b, 3, 10_00, 1)
+
+        self._check_balance()
+
+    def test_multicall_refill_after_drain_keeps_pool_active(self):
+        """Archival runs after the whole multicall, so a drained pool can be refilled in the same call"""
+        pool_key, creator = self._create_pool(self.token_a, self.token_b)
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        pool = contract.pools[pool_key]
+        liquidity = contract.pool_user_liquidity[pool_key][creator]
+        max_withdraw = liquidity * pool.reserve_a // pool.total_liquidity
+
+        context = self.create_context(
+            actions=[], vertex=self._get_any_tx(), caller_id=creator, timestamp=self.get_current_timestamp()
+        )
+        self.runner.call_public_method(
+            self.nc_id, "multicall", context,
+            [
+                MulticallOp("remove_liquidity", pool_key, pool.token_a, max_withdraw, 0),
+                MulticallOp("add_liquidity", pool_key, pool.token_a, 0, 0),
+            ],
+            self.get_current_timestamp() + 60,
+        )
+
+        self.assertFalse(self.runner.call_view_method(self.nc_id, "is_pool_archived", pool_key))
+        self.assertIn(pool_key, self.runner.call_view_method(self.nc_id, "get_all_pools"))
+        self.assertGreater(
+            self.runner.call_view_method(self.nc_id, "liquidity_of", creator, pool_key), 0
+        )
+
+        self._check_balance()
+
+    def test_token_price_uses_htr_token_map(self):
+        """HTR-paired tokens are priced through their mapped pool, which follows archival"""
+        usd_token = self.token_a
+        self._create_pool(HTR_UID, usd_token, fee=3, reserve_a=1000_00, reserve_b=10000_00)
+        cheap_pool_key, creator = self._create_pool(
+            HTR_UID, self.token_b, fee=3, reserve_a=2000_00, reserve_b=10000_00
+        )
+        expensive_pool_key, _ = self._create_pool(
+            HTR_UID, self.token_b, fee=10, reserve_a=1000_00, reserve_b=1000_00
+        )
+        owner_context = self.create_context(
+            [], self._get_any_tx(), Address(self.owner_address), timestamp=self.get_current_timestamp()
+        )
+        self.runner.call_public_method(
+            self.nc_id, "set_htr_usd_pool", owner_context, HTR_UID, usd_token, 3
+        )
+
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        self.assertEqual(contract.htr_token_map[self.token_b], cheap_pool_key)
+
+        # 1 TOKEN_B = 0.2 HTR and 1 HTR = 10 USD through the deepest HTR pool
+        price = self.runner.call_view_method(self.nc_id, "get_token_price_in_usd", self.token_b)
+        self.assertEqual(price, 200_000000)
+
+        # Draining the mapped pool archives it and moves the map to the next HTR pool
+        pool = contract.pools[cheap_pool_key]
+        liquidity = contract.pool_user_liquidity[cheap_pool_key][creator]
+        max_withdraw = liquidity * pool.reserve_a // pool.total_liquidity
+        self._remove_liquidity(HTR_UID, self.token_b, 3, max_withdraw, address=creator)
+
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        self.assertEqual(contract.htr_token_map[self.token_b], expensive_pool_key)
+        price = self.runner.call_view_method(self.nc_id, "get_token_price_in_usd", self.token_b)
+        self.assertEqual(price, 1000_000000)
+
+        # With no active HTR pool left the entry is dropped and pricing falls back to path search
+        self.runner.call_public_method(self.nc_id, "archive_pool", owner_context, expensive_pool_key)
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        self.assertNotIn(self.token_b, contract.htr_token_map)
+        price = self.runner.call_view_method(self.nc_id, "get_token_price_in_usd", self.token_b)
+        self.assertEqual(price, 0)
+
+        self._check_balance()
+
+    def test_dust_htr_pool_does_not_take_over_pricing(self):
+        """The fast path follows the HTR pool with the most HTR, not the cheapest fee"""
+        usd_token = self.token_a
+        self._create_pool(HTR_UID, usd_token, fee=3, reserve_a=1000_00, reserve_b=10000_00)
+        deep_pool_key, deep_creator = self._create_pool(
+            HTR_UID, self.token_b, fee=10, reserve_a=2000_00, reserve_b=10000_00
+        )
+        owner_context = self.create_context(
+            [], self._get_any_tx(), Address(self.owner_address), timestamp=self.get_current_timestamp()
+        )
+        self.runner.call_public_method(
+            self.nc_id, "set_htr_usd_pool", owner_context, HTR_UID, usd_token, 3
+        )
+
+        # A lower-fee pool with a skewed dust price is ignored
+        dust_pool_key, _ = self._create_pool(HTR_UID, self.token_b, fee=1, reserve_a=10_00, reserve_b=1_00)
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        self.assertEqual(contract.htr_token_map[self.token_b], deep_pool_key)
+        price = self.runner.call_view_method(self.nc_id, "get_token_price_in_usd", self.token_b)
+        self.assertEqual(price, 200_000000)
+
+        # Once the mapped pool is shallower than another HTR pool the entry moves
+        pool = contract.pools[deep_pool_key]
+        liquidity = contract.pool_user_liquidity[deep_pool_key][deep_creator]
+        withdraw = liquidity * pool.reserve_a // pool.total_liquidity * 999 // 1000
+        self._remove_liquidity(HTR_UID, self.token_b, 10, withdraw, address=deep_creator)
+        contract = self.get_readonly_contract(self.nc_id)
+        assert isinstance(contract, DozerPoolManager)
+        self.assertFalse(self.runner.call_view_method(self.nc_id, "is_pool_archived", deep_pool_key))
+        self.assertEqual(contract.htr_token_map[self.token_b], dust_pool_key)
+
+        self._check_balance()
+
     def test_token_price_calculation(self):
         """Test token price calculation in USD and HTR"""
         # Create HTR-USD pool
@@ -0,0 +1,1001 @@
+from typing import NamedTuple
+
+from hathor import (
+    Context,
+    Blueprint,
+    BlueprintId,
+    CallerId,
+    HATHOR_TOKEN_UID,
+    NCFail,
+    Address,
+    Amount,
+    Timestamp,
+    ContractId,
+    TokenUid,
+    NCAction,
+    NCActionType,
+    NCDepositAction,
+    NCWithdrawalAction,
+    export,
+    public,
+    view,
+)
+
+MIN_DEPOSIT = 10000_00
+PRECISION = 10**20
+PRICE_PRECISION = 10**8  # For decimal price handling (8 decimal places)
+MONTHS_IN_SECONDS = 60*60*24*30
+MIN_TIMELOCK_AFTER_DEPOSIT = 4 * MONTHS_IN_SECONDS  # 4 months minimum lock after any deposit
+MAX_TOKENS = 200  # Maximum number of listed token_b pools
+
+
+class UserPositionEntry(NamedTuple):
+    """Initial position entry data for a user deposit."""
+
+    htr_price_in_deposit: Amount
+    token_price_in_htr_in_deposit: Amount
+    withdrawal_time: int
+
+EMPTY_USER_POSITION = UserPositionEntry(Amount(0), Amount(0), 0)
+
+class UserBalances(NamedTuple):
+    """Per-user balances of HTR and one listed token_b, stored as a single record."""
+
+    htr: Amount
+    token_b: Amount
+
+EMPTY_USER_BALANCES = UserBalances(Amount(0), Amount(0))
+
+
+class TokenListing(NamedTuple):
+    """Configuration and treasury usage of one listed token_b."""
+
+    pool_fee: Amount  # Fee of the HTR/token_b DozerPoolManager pool
+    htr_cap: Amount  # Maximum HTR the listing may have allocated from the shared treasury
+    htr_allocated: Amount  # HTR currently allocated to open positions (paired liquidity + bonus)
+    total_liquidity: Amount  # Total liquidity shares of the listing
+    active: bool  # Whether new deposits are accepted
+
+
+class MultiOasisUserInfo(NamedTuple):
+    """Detailed information about a user's position for one token_b."""
+
+    token_b: str  # Token UID of the paired token (hex encoded)
+    user_deposit_b: Amount  # Total amount of token_b deposited by the user
+    user_liquidity: Amount  # User's share of the listing's liquidity
+    user_withdrawal_time: int  # Timestamp when the user can withdraw (timelock expiration)
+    oasis_htr_balance: Amount  # Shared HTR treasury balance
+    total_liquidity: Amount  # Total liquidity of the listing
+    user_balance_a: Amount  # User's HTR balance from bonuses and cashback
+    user_balance_b: Amount  # User's token_b balance from cashback
+    closed_balance_a: Amount  # HTR available for withdrawal after position closed
+    closed_balance_b: Amount  # Token_b available for withdrawal after position closed
+    user_lp_b: Amount  # User's token_b amount in the liquidity pool
+    user_lp_htr: Amount  # User's HTR amount in the liquidity pool
+    max_withdraw_b: Amount  # Maximum token_b that can be withdrawn
+    max_withdraw_htr: Amount  # Maximum HTR that can be withdrawn
+    htr_price_in_deposit: Amount  # HTR price at the time of deposit (for IL calculation)
+    token_price_in_htr_in_deposit: Amount  # Token_b price in HTR at deposit (for IL calculation)
+    position_closed: bool  # Whether the user's position has been closed
+
+
+class MultiOasisInfo(NamedTuple):
+    """General information about the shared treasury."""
+
+    oasis_htr_balance: Amount  # HTR available in the shared treasury
+    protocol_fee: Amount  # Protocol fee in thousandths (e.g., 50 = 5%)
+    dev_deposit_amount: Amount  # Amount of HTR deposited by dev/owner
+    tokens_count: int  # Number of listed token_b pools
+
+
+class MultiOasisTokenInfo(NamedTuple):
+    """Information about one listed token_b."""
+
+    token_b: str  # Token UID (hex encoded)
+    pool_key: str  # DozerPoolManager pool key
+    pool_fee: Amount
+    htr_cap: Amount
+    htr_allocated: Amount
+    total_liquidity: Amount
+    active: bool
+
+
+class OasisRemoveLiquidityQuote(NamedTuple):
+    """Quote information for removing liquidity from Oasis."""
+
+    user_lp_b: Amount
+    user_lp_htr: Amount
+    max_withdraw_b: Amount
+    max_withdraw_htr: Amount
+    loss_htr: Amount
+    position_closed: bool
+
+
+class _PoolSnapshot(NamedTuple):
+    """Pool manager state read once and shared by position closure calculations."""
+
+    oasis_lp_htr: int  # HTR owned by the contract in the pool
+    reserve_htr: int  # Pool HTR reserve
+    reserve_b: int  # Pool token_b reserve
+    token_b_price_in_htr: int  # TWAP price of token_b in HTR (0 when the listing holds no liquidity)
+
+
+@export
+class MultiOasis(Blueprint):
+    """Oasis serving many token_b pools from one shared HTR treasury.
+
+    Positions are keyed by (token_b, user) and routed to the token's
+    HTR/token_b pool on the Dozer Pool Manager. Bonuses and paired HTR
+    liquidity are drawn from a single treasury, limited per token by htr_cap.
+    """
+
+    # Version control
+    contract_version: str
+
+    dozer_pool_manager: ContractId
+    protocol_fee: Amount
+
+    owner_address: CallerId
+    dev_address: CallerId
+    oasis_htr_balance: Amount
+    dev_deposit_amount: Amount
+
+    # Listed tokens
+    tokens: list[TokenUid]
+    listings: dict[TokenUid, TokenListing]
+
+    # Per-token, per-user state: token_b -> user -> value
+    user_deposit_b: dict[TokenUid, dict[CallerId, Amount]]
+    user_liquidity: dict[TokenUid, dict[CallerId, Amount]]
+    user_htr_allocated: dict[TokenUid, dict[CallerId, Amount]]
+    user_balances: dict[TokenUid, dict[CallerId, UserBalances]]
+    user_position_closed: dict[TokenUid, dict[CallerId, bool]]
+    closed_position_balances: dict[TokenUid, dict[CallerId, UserBalances]]
+    user_position_entry: dict[TokenUid, dict[CallerId, UserPositionEntry]]
+
+    # Emergency pause state
+    paused: bool
+
+    @public(allow_deposit=True)
+    def initialize(
+        self,
+        ctx: Context,
+        dozer_pool_manager: ContractId,
+        protocol_fee: int,
+    ) -> None:
+        """Initialize the contract with dozer pool manager set and the initial HTR treasury."""
+        self.contract_version = "1.0.0"
+        action = self._get_single_token_action(ctx, NCActionType.DEPOSIT, TokenUid(HATHOR_TOKEN_UID))
+
+        if action.amount < MIN_DEPOSIT:
+            raise NCFail("Deposit amount too low")
+        if protocol_fee < 0 or protocol_fee > 500:
+            raise NCFail("Protocol fee must be between 0 and 500")
+
+        self.dev_address = Address(ctx.caller_id)
+        self.owner_address = Address(ctx.caller_id)
+        self.dozer_pool_manager = dozer_pool_manager
+        self.protocol_fee = Amount(protocol_fee)
+        self.oasis_htr_balance = Amount(action.amount)
+        self.dev_deposit_amount = Amount(action.amount)
+
+        # Initialize all container fields
+        self.tokens = []
+        self.listings = {}
+        self.user_deposit_b = {}
+        self.user_liquidity = {}
+        self.user_htr_allocated = {}
+        self.user_balances = {}
+        self.user_position_closed = {}
+        self.closed_position_balances = {}
+        self.user_position_entry = {}
+        self.paused = False
+
+        self.log.info("MultiOasis initialized",
+                     protocol_fee=protocol_fee,
+                     dev_deposit=action.amount)
+
+    @public
+    def add_token(self, ctx: Context, token_b: TokenUid, pool_fee: Amount, htr_cap: Amount) -> None:
+        """List a new token_b, routed to the HTR/token_b pool with the given fee.
+
+        Args:
+            ctx: Execution context
+            token_b: Token to list
+            pool_fee: Fee of the DozerPoolManager pool to provide liquidity to
+            htr_cap: Maximum HTR the listing may have allocated from the treasury
+
+        Raises:
+            NCFail: If caller is not dev, token is already listed or the pool does not exist
+        """
+        if Address(ctx.caller_id) != self.dev_address:
+            raise NCFail("Only dev can add tokens")
+        if token_b == HATHOR_TOKEN_UID:
+            raise NCFail("token_b cannot be HTR")
+        if token_b in self.listings:
+            raise NCFail("Token already listed")
+        if len(self.tokens) >= MAX_TOKENS:
+            raise NCFail("Too many tokens")
+        if htr_cap < 0:
+            raise NCFail("HTR cap must be non-negative")
+
+        # Raises PoolNotFound if the pool does not exist
+        self._get_pool_manager().view().get_reserves(HATHOR_TOKEN_UID, token_b, pool_fee)
+
+        self.tokens.append(token_b)
+        self.listings[token_b] = TokenListing(
+            pool_fee=pool_fee,
+            htr_cap=htr_cap,
+            htr_allocated=Amount(0),
+            total_liquidity=Amount(0),
+            active=True,
+        )
+        self.user_deposit_b[token_b] = {}
+        self.user_liquidity[token_b] = {}
+        self.user_htr_allocated[token_b] = {}
+        self.user_balances[token_b] = {}
+        self.user_position_closed[token_b] = {}
+        self.closed_position_balances[token_b] = {}
+        self.user_position_entry[token_b] = {}
+
+        self.log.info("Token listed",
+                     token_b=token_b.hex(),
+                     pool_fee=pool_fee,
+                     htr_cap=htr_cap)
+
+    @public
+    def update_token(self, ctx: Context, token_b: TokenUid, htr_cap: Amount, active: bool) -> None:
+        """Update a listing's HTR cap and whether it accepts new deposits.
+
+        Lowering the cap below the currently allocated HTR only blocks new deposits;
+        open positions are unaffected.
+        """
+        if Address(ctx.caller_id) != self.dev_address:
+            raise NCFail("Only dev can update tokens")
+        if htr_cap < 0:
+            raise NCFail("HTR cap must be non-negative")
+        listing = self._get_listing(token_b)
+        self.listings[token_b] = TokenListing(
+            pool_fee=listing.pool_fee,
+            htr_cap=htr_cap,
+            htr_allocated=listing.htr_allocated,
+            total_liquidity=listing.total_liquidity,
+            active=active,
+        )
+
+        self.log.info("Token updated",
+                     token_b=token_b.hex(),
+                     htr_cap=htr_cap,
+                     active=active)
+
+    def _get_listing(self, token_b: TokenUid) -> TokenListing:
+        listing = self.listings.get(token_b)
+        if listing is None:
+            raise NCFail(f"Token {token_b.hex()} is not listed")
+        return listing
+
+    def _get_pool_key(self, token_b: TokenUid, pool_fee: Amount) -> str:
+        """Generate the pool key for the HTR/token_b pair.
+
+        Token ordering must match DozerPoolManager's convention: tokens are sorted
+        lexicographically by their UID bytes to ensure consistent pool identification.
+        """
+        token_a = TokenUid(HATHOR_TOKEN_UID)
+
+        # Ensure tokens are ordered lexicographically (smaller UID first)
+        if token_a > token_b:
+            token_a, token_b = token_b, token_a
+
+        return f"{token_a.hex()}/{token_b.hex()}/{pool_fee}"
+
+    @public(allow_deposit=True)
+    def owner_deposit(self, ctx: Context) -> None:
+        self._check_not_paused(ctx)
+        action = self._get_single_token_action(ctx, NCActionType.DEPOSIT, TokenUid(HATHOR_TOKEN_UID))
+
+        if Address(ctx.caller_id) not in [self.dev_address, self.owner_address]:
+            raise NCFail("Only dev or owner can deposit")
+
+        self.oasis_htr_balance = Amount(self.oasis_htr_balance + action.amount)
+        self.dev_deposit_amount = Amount(self.dev_deposit_amount + action.amount)
+
+        self.log.info("Owner deposit",
+                     amount=action.amount,
+                     new_balance=self.oasis_htr_balance)
+
+    @public(allow_deposit=True)
+    def user_deposit(self, ctx: Context, timelock: int) -> None:
+        """Deposits a listed token_b with a timelock period for bonus rewards.
+
+        The token is taken from the single deposit action.
+
+        Args:
+            ctx: Execution context
+            timelock: Lock period in months (6, 9, or 12)
+
+        Raises:
+            NCFail: If deposit requirements not met, token not listed or cap exceeded
+        """
+        caller = Address(ctx.caller_id)
+        self._check_not_paused(ctx)
+        self._assert_action_count(ctx, 1)
+
+        token_b = TokenUid(list(ctx.actions.keys())[0])
+        listing = self._get_listing(token_b)
+        if not listing.active:
+            raise NCFail("Token is not accepting deposits")
+        action = self._get_single_token_action(ctx, NCActionType.DEPOSIT, token_b)
+
+        # Once a position is closed, new deposits are blocked until fully withdrawn
+        if self.user_position_closed[token_b].get(caller, False):
+            raise NCFail("Need to withdraw before making a new deposit")
+
+        pool_manager = self._get_pool_manager()
+        htr_price = pool_manager.view().get_token_price_in_usd(HATHOR_TOKEN_UID)
+        if htr_price == 0:
+            raise NCFail("HTR price not available from pool manager")
+
+        # Calculate and deduct protocol fee
+        amount = action.amount
+        fee_amount = self._ceil_div(Amount(amount * self.protocol_fee), Amount(1000))
+        deposit_amount = Amount(amount - fee_amount)
+        self._add_user_balance(token_b, Address(self.dev_address), token_b, Amount(fee_amount))
+
+        assert deposit_amount > 0, "Deposit amount must be greater than 0"
+
+        pool_key = self._get_pool_key(token_b, listing.pool_fee)
+        htr_amount = pool_manager.view().front_quote_add_liquidity_in(deposit_amount, token_b, pool_key)
+        assert htr_amount > 0, "htr_amount must be greater than 0"
+
+        # Use TWAP price for the bonus to prevent price manipulation attacks
+        token_price_in_htr = pool_manager.view().get_twap_price(
+            HATHOR_TOKEN_UID,
+            token_b,
+            listing.pool_fee,
+            current_timestamp=int(ctx.block.timestamp),
+        )
+        htr_amount_for_bonus = (deposit_amount * token_price_in_htr) // PRICE_PRECISION
+        bonus = self._get_user_bonus(timelock, htr_amount_for_bonus)
+
+        if htr_amount + bonus > self.oasis_htr_balance:
+            raise NCFail("Not enough balance")
+        if listing.htr_allocated + htr_amount + bonus > listing.htr_cap:
+            raise NCFail("Token HTR cap exceeded")
+
+        if listing.total_liquidity == 0:
+            liquidity_increase = Amount(deposit_amount * PRECISION)
+        else:
+            oasis_lp_amount_b = pool_manager.view().user_info(
+                self.syscall.get_contract_id(), pool_key
+            ).token1Amount
+            assert oasis_lp_amount_b > 0, "Oasis has no token_b liquidity on pool"
+            liquidity_increase = Amount(
+                listing.total_liquidity * deposit_amount // oasis_lp_amount_b
+            )
+
+        user_liquidity = self.user_liquidity[token_b]
+        user_liquidity[caller] = Amount(user_liquidity.get(caller, 0) + liquidity_increase)
+
+        now = Timestamp(ctx.block.timestamp)
+        withdrawal_time = self._calculate_new_withdrawal_time(
+            token_b, caller, now, timelock, deposit_amount
+        )
+
+        # Update position entry prices with weighted average if existing position
+        position_entries = self.user_position_entry[token_b]
+        user_deposits = self.user_deposit_b[token_b]
+        if caller in position_entries:
+            old_deposit = user_deposits[caller]
+            old_entry = position_entries[caller]
+            new_htr_price = Amount(self._calculate_weighted_average(
+                old_entry.htr_price_in_deposit, old_deposit, htr_price, deposit_amount
+            ))
+            new_token_price = Amount(self._calculate_weighted_average(
+                old_entry.token_price_in_htr_in_deposit, old_deposit, token_price_in_htr, deposit_amount
+            ))
+        else:
+            new_htr_price = htr_price
+            new_token_price = Amount(token_price_in_htr)
+
+        position_entries[caller] = UserPositionEntry(
+            htr_price_in_deposit=new_htr_price,
+            token_price_in_htr_in_deposit=new_token_price,
+            withdrawal_time=withdrawal_time,
+        )
+
+        self.oasis_htr_balance = Amount(self.oasis_htr_balance - bonus - htr_amount)
+        self._add_user_balance(token_b, caller, TokenUid(HATHOR_TOKEN_UID), bonus)
+        user_deposits[caller] = Amount(user_deposits.get(caller, 0) + deposit_amount)
+
+        htr_allocated = self.user_htr_allocated[token_b]
+        htr_allocated[caller] = Amount(htr_allocated.get(caller, 0) + htr_amount + bonus)
+        self.listings[token_b] = TokenListing(
+            pool_fee=listing.pool_fee,
+            htr_cap=listing.htr_cap,
+            htr_allocated=Amount(listing.htr_allocated + htr_amount + bonus),
+            total_liquidity=Amount(listing.total_liquidity + liquidity_increase),
+            active=listing.active,
+        )
+
+        self.log.info("User deposit completed",
+                     token_b=token_b.hex(),
+                     deposit_amount=deposit_amount,
+                     htr_amount=htr_amount,
+                     bonus=bonus,
+                     withdrawal_time=withdrawal_time,
+                     liquidity_increase=liquidity_increase)
+
+        actions: list[NCAction] = [
+            NCDepositAction(amount=deposit_amount, token_uid=token_b),
+            NCDepositAction(amount=htr_amount, token_uid=TokenUid(HATHOR_TOKEN_UID)),
+        ]
+        token_uid, cashback_amount = pool_manager.public(*actions).add_liquidity(listing.pool_fee)
+
+        if cashback_amount > 0:
+            assert token_uid == token_b, "Withdrawal token must be token_b"
+            pool_manager.public(
+                NCWithdrawalAction(amount=cashback_amount, token_uid=token_b)
+            ).withdraw_cashback(pool_key)
+            self._add_user_balance(token_b, caller, token_uid, cashback_amount)
+
+    @public
+    def close_position(self, ctx: Context, token_b: TokenUid) -> None:
+        """Close a user's position for token_b, removing liquidity from its pool.
+
+        Args:
+            ctx: Execution context
+            token_b: Listed token of the position
+
+        Raises:
+            NCFail: If position is still locked, already closed or does not exist
+        """
+        caller = Address(ctx.caller_id)
+        self._check_not_paused(ctx)
+        listing = self._get_listing(token_b)
+
+        withdrawal_time = self.user_position_entry[token_b].get(caller, EMPTY_USER_POSITION).withdrawal_time
+        if ctx.block.timestamp < withdrawal_time:
+            raise NCFail("Position is still locked")
+        if self.user_position_closed[token_b].get(caller, False):
+            raise NCFail("Position already closed")
+        user_liquidity = self.user_liquidity[token_b].get(caller, 0)
+        if user_liquidity == 0:
+            raise NCFail("No position to close")
+
+        oasis_quote = self._calculate_position_closure(
+            token_b, caller, self._get_pool_snapshot(token_b, int(ctx.block.timestamp))
+        )
+        user_lp_htr = oasis_quote.user_lp_htr
+        user_lp_b = oasis_quote.user_lp_b
+        loss_htr = oasis_quote.loss_htr
+
+        actions: list[NCAction] = [
+            NCWithdrawalAction(amount=user_lp_htr, token_uid=TokenUid(HATHOR_TOKEN_UID)),
+            NCWithdrawalAction(amount=user_lp_b, token_uid=token_b),
+        ]
+        pool_manager = self._get_pool_manager()
+        token_uid, change = pool_manager.public(*actions).remove_liquidity(listing.pool_fee)
+
+        user_balance = self.user_balances[token_b].get(caller, EMPTY_USER_BALANCES)
+        user_htr_current_balance = user_balance.htr
+        user_token_b_balance = user_balance.token_b
+        if change > 0:
+            pool_manager.public(
+                NCWithdrawalAction(amount=change, token_uid=token_uid)
+            ).withdraw_cashback(self._get_pool_key(token_b, listing.pool_fee))
+            if token_uid == token_b:
+                user_token_b_balance = Amount(user_token_b_balance + change)
+            else:
+                user_htr_current_balance = Amount(user_htr_current_balance + change)
+
+        # Return the user's pool HTR, net of IL compensation, to the shared treasury
+        self.oasis_htr_balance = Amount(self.oasis_htr_balance + user_lp_htr - loss_htr)
+
+        closed_balances = UserBalances(
+            htr=Amount(user_htr_current_balance + loss_htr),
+            token_b=Amount(user_token_b_balance + user_lp_b),
+        )
+        self.closed_position_balances[token_b][caller] = closed_balances
+        if caller in self.user_balances[token_b]:
+            del self.user_balances[token_b][caller]
+
+        self.user_position_closed[token_b][caller] = True
+
+        # Release the position's HTR allocation from the listing cap
+        htr_allocated = self.user_htr_allocated[token_b]
+        released = htr_allocated.get(caller, 0)
+        if caller in htr_allocated:
+            del htr_allocated[caller]
+        self.listings[token_b] = TokenListing(
+            pool_fee=listing.pool_fee,
+            htr_cap=listing.htr_cap,
+            htr_allocated=Amount(listing.htr_allocated - released),
+            total_liquidity=Amount(listing.total_liquidity - user_liquidity),
+            active=listing.active,
+        )
+
+        # Keep the deposit amounts for reference, but reset liquidity
+        del self.user_liquidity[token_b][caller]
+        del self.user_position_entry[token_b][caller]
+
+        self.log.info("Position closed",
+                     token_b=token_b.hex(),
+                     available_token_b=closed_balances.token_b,
+                     available_htr=closed_balances.htr)
+
+    @public(allow_withdrawal=True)
+    def user_withdraw(self, ctx: Context, token_b: TokenUid) -> None:
+        """Withdraw funds after the position for token_b is closed.
+
+        Args:
+            ctx: Execution context (token_b withdrawal, optional HTR withdrawal)
+            token_b: Listed token of the position
+
+        Raises:
+            NCFail: If position is not closed or insufficient funds
+        """
+        caller = Address(ctx.caller_id)
+        self._check_not_paused(ctx)
+        self._get_listing(token_b)
+
+        if len(ctx.actions) == 1:
+            action_token_b = self._get_single_token_action(ctx, NCActionType.WITHDRAWAL, token_b)
+            htr_withdrawn = 0
+        elif len(ctx.actions) == 2:
+            action_token_b, action_htr = self._get_two_token_actions(
+                ctx, NCActionType.WITHDRAWAL, token_b, TokenUid(HATHOR_TOKEN_UID)
+            )
+            htr_withdrawn = action_htr.amount
+        else:
+            raise NCFail("Expected 1 or 2 withdrawal actions")
+
+        if self.user_liquidity[token_b].get(caller, 0) > 0:
+            raise NCFail("Position must be closed before withdrawal")
+
+        closed_balances = self.closed_position_balances[token_b].get(caller, EMPTY_USER_BALANCES)
+        if action_token_b.amount > closed_balances.token_b:
+            raise NCFail(
+                f"Not enough balance. Available: {closed_balances.token_b}, Requested: {action_token_b.amount}"
+            )
+        if htr_withdrawn > closed_balances.htr:
+            raise NCFail(
+                f"Not enough HTR balance. Available: {closed_balances.htr}, Requested: {htr_withdrawn}"
+            )
+
+        remaining = UserBalances(
+            htr=Amount(closed_balances.htr - htr_withdrawn),
+            token_b=Amount(closed_balances.token_b - action_token_b.amount),
+        )
+
+        self.log.info("User withdrawal",
+                     token_b=token_b.hex(),
+                     token_b_amount=action_token_b.amount,
+                     htr_amount=htr_withdrawn,
+                     remaining_token_b=remaining.token_b,
+                     remaining_htr=remaining.htr)
+
+        # Update closed position balances, or clean up user data if all funds withdrawn
+        if remaining.token_b > 0 or remaining.htr > 0:
+            self.closed_position_balances[token_b][caller] = remaining
+        else:
+            if caller in self.closed_position_balances[token_b]:
+                del self.closed_position_balances[token_b][caller]
+            if caller in self.user_deposit_b[token_b]:
+                del self.user_deposit_b[token_b][caller]
+            if caller in self.user_position_closed[token_b]:
+                del self.user_position_closed[token_b][caller]
+
+    @public(allow_withdrawal=True)
+    def user_withdraw_bonus(self, ctx: Context, token_b: TokenUid) -> None:
+        """Withdraw HTR bonus accrued on an open position for token_b."""
+        self._check_not_paused(ctx)
+        self._get_listing(token_b)
+        action = self._get_single_token_action(ctx, NCActionType.WITHDRAWAL, TokenUid(HATHOR_TOKEN_UID))
+
+        available_bonus = self.user_balances[token_b].get(Address(ctx.caller_id), EMPTY_USER_BALANCES).htr
+        if action.amount > available_bonus:
+            raise NCFail("Withdrawal amount too high")
+
+        self._add_user_balance(token_b, Address(ctx.caller_id), TokenUid(HATHOR_TOKEN_UID), Amount(-action.amount))
+
+        self.log.info("Bonus withdrawal",
+                     token_b=token_b.hex(),
+                     amount=action.amount,
+                     remaining=available_bonus - action.amount)
+
+    @public(allow_withdrawal=True)
+    def dev_withdraw_fee(self, ctx: Context, token_b: TokenUid) -> None:
+        """Allows dev to withdraw protocol fees collected in token_b."""
+        if Address(ctx.caller_id) != self.dev_address:
+            raise NCFail("Only dev can withdraw fees")
+        self._get_listing(token_b)
+
+        action = self._get_single_token_action(ctx, NCActionType.WITHDRAWAL, token_b)
+        if action.amount > self.user_balances[token_b].get(self.dev_address, EMPTY_USER_BALANCES).token_b:
+            raise NCFail("Withdrawal amount too high")
+
+        self._add_user_balance(token_b, Address(self.dev_address), token_b, Amount(-action.amount))
+
+    @public(allow_withdrawal=True)
+    def owner_withdraw(self, ctx: Context) -> None:
+        """Allows owner to withdraw HTR from the shared treasury."""
+        self._check_not_paused(ctx)
+        if Address(ctx.caller_id) != self.owner_address:
+            raise NCFail("Only owner can withdraw")
+        action = self._get_single_token_action(ctx, NCActionType.WITHDRAWAL, TokenUid(HATHOR_TOKEN_UID))
+        if action.amount > self.oasis_htr_balance:
+            raise NCFail("Withdrawal amount too high")
+        self.oasis_htr_balance = Amount(self.oasis_htr_balance - action.amount)
+        self.dev_deposit_amount = Amount(self.dev_deposit_amount - action.amount)
+
+    @public
+    def update_protocol_fee(self, ctx: Context, new_fee: int) -> None:
+        """Update the protocol fee percentage (in thousandths)."""
+        if Address(ctx.caller_id) != self.dev_address:
+            raise NCFail("Only dev can update protocol fee")
+        if new_fee > 500 or new_fee < 0:
+            raise NCFail(f"Protocol fee out of range: {new_fee} (must be between 0 and 500)")
+
+        old_fee = self.protocol_fee
+        self.protocol_fee = Amount(new_fee)
+
+        self.log.info("Protocol fee updated",
+                     old_fee=old_fee,
+                     new_fee=new_fee)
+
+    @public
+    def update_owner_address(self, ctx: Context, new_owner: Address) -> None:
+        """Updates the owner address. Can be called by dev or current owner."""
+        if Address(ctx.caller_id) not in [self.dev_address, self.owner_address]:
+            raise NCFail("Only dev or owner can update owner address")
+        self.owner_address = new_owner
+
+    @public
+    def pause(self, ctx: Context) -> None:
+        """Emergency pause functionality. Only the dev can pause the contract."""
+        if Address(ctx.caller_id) != self.dev_address:
+            raise NCFail("Only dev can pause")
+        self.paused = True
+        self.log.info("Contract paused")
+
+    @public
+    def unpause(self, ctx: Context) -> None:
+        """Unpause functionality. Only the dev can unpause the contract."""
+        if Address(ctx.caller_id) != self.dev_address:
+            raise NCFail("Only dev can unpause")
+        self.paused = False
+        self.log.info("Contract unpaused")
+
+    def _check_not_paused(self, ctx: Context) -> None:
+        """Raise NCFail if paused and caller is not dev."""
+        if self.paused and Address(ctx.caller_id) != self.dev_address:
+            raise NCFail("Contract is paused")
+
+    def _get_pool_manager(self):
+        """Helper method to get the Dozer Pool Manager contract instance."""
+        return self.syscall.get_contract(
+            self.dozer_pool_manager, blueprint_id=None
+        )
+
+    def _get_pool_snapshot(self, token_b: TokenUid, current_timestamp: int) -> _PoolSnapshot:
+        """Read the contract's LP amount, pool reserves and TWAP for token_b's pool once."""
+        listing = self.listings[token_b]
+        pool_manager = self._get_pool_manager().view()
+        oasis_lp_htr = pool_manager.user_info(
+            self.syscall.get_contract_id(),
+            self._get_pool_key(token_b, listing.pool_fee)
+        ).token0Amount
+        reserves = pool_manager.get_reserves(HATHOR_TOKEN_UID, token_b, listing.pool_fee)
+
+        token_b_price_in_htr = 0
+        if listing.total_liquidity > 0:
+            # Use TWAP price instead of spot price for IL compensation
+            token_b_price_in_htr = pool_manager.get_twap_price(
+                HATHOR_TOKEN_UID,
+                token_b,
+                listing.pool_fee,
+                current_timestamp=current_timestamp,
+            )
+
+        return _PoolSnapshot(
+            oasis_lp_htr=oasis_lp_htr,
+            reserve_htr=reserves[0],
+            reserve_b=reserves[1],
+            token_b_price_in_htr=token_b_price_in_htr,
+        )
+
+    def _calculate_weighted_average(
+        self, old_value: int, old_weight: int, new_value: int, new_weight: int
+    ) -> int:
+        """Weighted average: (old_value * old_weight + new_value * new_weight) / (old_weight + new_weight)"""
+        return (old_value * old_weight + new_value * new_weight) // (old_weight + new_weight)
+
+    def _calculate_new_withdrawal_time(
+        self,
+        token_b: TokenUid,
+        address: Address,
+        now: Timestamp,
+        timelock: int,
+        deposit_amount: Amount
+    ) -> int:
+        """Calculate withdrawal time for a deposit considering existing position with minimum timelock floor."""
+        position_entries = self.user_position_entry[token_b]
+        if address in position_entries:
+            delta = position_entries[address].withdrawal_time - now
+            if delta > 0:
+                old_deposit = self.user_deposit_b[token_b][address]
+                weighted_time = self._calculate_weighted_average(
+                    delta, old_deposit, timelock * MONTHS_IN_SECONDS, deposit_amount
+                )
+                new_withdrawal_time = int(now + weighted_time + 1)
+
+                # SECURITY: Enforce minimum timelock period after any deposit
+                minimum_withdrawal_time = int(now + MIN_TIMELOCK_AFTER_DEPOSIT)
+                if new_withdrawal_time < minimum_withdrawal_time:
+                    return minimum_withdrawal_time
+                return new_withdrawal_time
+        return int(now + timelock * MONTHS_IN_SECONDS)
+
+    def _get_user_bonus(self, timelock: int, amount: Amount) -> Amount:
+        """Calculates the bonus for a user based on the timelock and amount"""
+        if timelock not in [6, 9, 12]:
+            raise NCFail("Invalid timelock value")
+        # Basis points (10000 = 100%): 6 months = 10%, 9 months = 15%, 12 months = 20%
+        bonus_multiplier = {6: 1000, 9: 1500, 12: 2000}
+
+        return Amount((amount * bonus_multiplier[timelock]) // 10000)
+
+    def _calculate_impermanent_loss_compensation(
+        self, loss_in_token_b: int, user_lp_htr: int, token_b_price_in_htr: int
+    ) -> int:
+        """Calculate HTR compensation for impermanent loss in token_b, capped at user_lp_htr."""
+        loss_htr = (loss_in_token_b * token_b_price_in_htr) // PRICE_PRECISION
+        if loss_htr > user_lp_htr:
+            loss_htr = user_lp_htr
+        return loss_htr
+
+    def _add_user_balance(
+        self, token_b: TokenUid, address: Address, token_id: TokenUid, amount: Amount
+    ) -> Amount:
+        """Add amount (can be negative) to a user's HTR or token_b balance for a listing."""
+        token_balances = self.user_balances[token_b]
+        balances = token_balances.get(address, EMPTY_USER_BALANCES)
+        if token_id == token_b:
+            new_value = Amount(balances.token_b + amount)
+            token_balances[address] = UserBalances(htr=balances.htr, token_b=new_value)
+        else:
+            assert token_id == HATHOR_TOKEN_UID, "Listing only holds HTR and token_b"
+            new_value = Amount(balances.htr + amount)
+            token_balances[address] = UserBalances(htr=new_value, token_b=balances.token_b)
+        return new_value
+
+    def _assert_action_count(self, ctx: Context, expected: int) -> None:
+        """Assert the exact number of actions matches expected count."""
+        if len(ctx.actions) != expected:
+            raise NCFail(f"Expected exactly {expected} action(s), got {len(ctx.actions)}")
+
+    def _get_single_token_action(
+        self,
+        ctx: Context,
+        action_type: NCActionType,
+        token: TokenUid,
+    ) -> NCDepositAction | NCWithdrawalAction:
+        """Get exactly one action for a specific token with full validation."""
+        self._assert_action_count(ctx, 1)
+        output = ctx.get_single_action(token)
+        if not output:
+            raise NCFail(f"No action found for token {token.hex()}")
+        if output.type != action_type:
+            raise NCFail(f"Wrong action type: expected {action_type}, got {output.type}")
+
+        if isinstance(output, (NCDepositAction, NCWithdrawalAction)):
+            return output
+        raise NCFail("Invalid action type")
+
+    def _get_two_token_actions(
+        self,
+        ctx: Context,
+        action_type: NCActionType,
+        token1: TokenUid,
+        token2: TokenUid,
+    ) -> tuple[NCDepositAction | NCWithdrawalAction, NCDepositAction | NCWithdrawalAction]:
+        """Get exactly two actions for two specific tokens with validation."""
+        self._assert_action_count(ctx, 2)
+        action1 = ctx.get_single_action(token1)
+        action2 = ctx.get_single_action(token2)
+
+        if not action1 or not action2:
+            raise NCFail(f"Expected actions for both {token1.hex()} and {token2.hex()}")
+        if action1.type != action_type or action2.type != action_type:
+            raise NCFail(f"Wrong action type: expected {action_type}")
+        if not isinstance(action1, (NCDepositAction, NCWithdrawalAction)) or \
+           not isinstance(action2, (NCDepositAction, NCWithdrawalAction)):
+            raise NCFail("Invalid action type")
+
+        return action1, action2
+
+    def _ceil_div(self, numerator: Amount, denominator: Amount) -> Amount:
+        """Calculate ceiling division using (numerator + denominator - 1) // denominator."""
+        return Amount((numerator + denominator - 1) // denominator)
+
+    def _calculate_position_closure(
+        self, token_b: TokenUid, address: Address, snapshot: _PoolSnapshot | None
+    ) -> OasisRemoveLiquidityQuote:
+        """Internal helper to calculate position closure values.
+
+        The snapshot may only be None for closed positions, which need no pool data.
+        """
+        if self.user_position_closed[token_b].get(address, False):
+            closed_balance = self.closed_position_balances[token_b].get(address, EMPTY_USER_BALANCES)
+            return OasisRemoveLiquidityQuote(
+                user_lp_b=Amount(0),
+                user_lp_htr=Amount(0),
+                max_withdraw_b=closed_balance.token_b,
+                max_withdraw_htr=closed_balance.htr,
+                loss_htr=Amount(0),
+                position_closed=True,
+            )
+
+        assert snapshot is not None, "Pool snapshot required for open positions"
+        total_liquidity = self.listings[token_b].total_liquidity
+        user_liquidity = self.user_liquidity[token_b].get(address, 0)
+
+        if total_liquidity > 0:
+            user_lp_htr = user_liquidity * snapshot.oasis_lp_htr // total_liquidity
+        else:
+            user_lp_htr = 0
+
+        user_lp_b = (user_lp_htr * snapshot.reserve_b) // snapshot.reserve_htr
+
+        user_balance = self.user_balances[token_b].get(address, EMPTY_USER_BALANCES)
+        max_withdraw_b = user_lp_b + user_balance.token_b
+
+        # Calculate impermanent loss compensation if needed
+        loss_htr = 0
+        user_deposit_b = self.user_deposit_b[token_b].get(address, 0)
+        if user_deposit_b > max_withdraw_b:
+            loss_htr = self._calculate_impermanent_loss_compensation(
+                user_deposit_b - max_withdraw_b, user_lp_htr, snapshot.token_b_price_in_htr
+            )
+
+        return OasisRemoveLiquidityQuote(
+            user_lp_b=Amount(user_lp_b),
+            user_lp_htr=Amount(user_lp_htr),
+            max_withdraw_b=Amount(max_withdraw_b),
+            max_withdraw_htr=Amount(user_balance.htr + loss_htr),
+            loss_htr=Amount(loss_htr),
+            position_closed=False,
+        )
+
+    @view
+    def get_remove_liquidity_oasis_quote(
+        self, address: Address, token_b: TokenUid, current_timestamp: int
+    ) -> OasisRemoveLiquidityQuote:
+        self._get_listing(token_b)
+        snapshot = None
+        if not self.user_position_closed[token_b].get(address, False):
+            snapshot = self._get_pool_snapshot(token_b, current_timestamp)
+        return self._calculate_position_closure(token_b, address, snapshot)
+
+    @view
+    def user_info(
+        self,
+        address: Address,
+        token_b: TokenUid,
+        current_timestamp: int,
+    ) -> MultiOasisUserInfo:
+        quote = self.get_remove_liquidity_oasis_quote(address, token_b, current_timestamp)
+        user_balance = self.user_balances[token_b].get(address, EMPTY_USER_BALANCES)
+        closed_balance = self.closed_position_balances[token_b].get(address, EMPTY_USER_BALANCES)
+        position_entry = self.user_position_entry[token_b].get(address, EMPTY_USER_POSITION)
+
+        return MultiOasisUserInfo(
+            token_b=token_b.hex(),
+            user_deposit_b=Amount(self.user_deposit_b[token_b].get(address, 0)),
+            user_liquidity=Amount(self.user_liquidity[token_b].get(address, 0)),
+            user_withdrawal_time=position_entry.withdrawal_time,
+            oasis_htr_balance=self.oasis_htr_balance,
+            total_liquidity=self.listings[token_b].total_liquidity,
+            user_balance_a=user_balance.htr,
+            user_balance_b=user_balance.token_b,
+            closed_balance_a=closed_balance.htr,
+            closed_balance_b=closed_balance.token_b,
+            user_lp_b=quote.user_lp_b,
+            user_lp_htr=quote.user_lp_htr,
+            max_withdraw_b=quote.max_withdraw_b,
+            max_withdraw_htr=quote.max_withdraw_htr,
+            htr_price_in_deposit=position_entry.htr_price_in_deposit,
+            token_price_in_htr_in_deposit=position_entry.token_price_in_htr_in_deposit,
+            position_closed=self.user_position_closed[token_b].get(address, False),
+        )
+
+    @view
+    def oasis_info(self) -> MultiOasisInfo:
+        return MultiOasisInfo(
+            oasis_htr_balance=self.oasis_htr_balance,
+            protocol_fee=self.protocol_fee,
+            dev_deposit_amount=self.dev_deposit_amount,
+            tokens_count=len(self.tokens),
+        )
+
+    @view
+    def token_info(self, token_b: TokenUid) -> MultiOasisTokenInfo:
+        listing = self._get_listing(token_b)
+        return MultiOasisTokenInfo(
+            token_b=token_b.hex(),
+            pool_key=self._get_pool_key(token_b, listing.pool_fee),
+            pool_fee=listing.pool_fee,
+            htr_cap=listing.htr_cap,
+            htr_allocated=listing.htr_allocated,
+            total_liquidity=listing.total_liquidity,
+            active=listing.active,
+        )
+
+    @view
+    def get_tokens(self) -> list[str]:
+        """List all listed token UIDs (hex encoded)."""
+        result: list[str] = []
+        for token_b in self.tokens:
+            result.append(token_b.hex())
+        return result
+
+    @public
+    def upgrade_contract(self, ctx: Context, new_blueprint_id: BlueprintId, new_version: str) -> None:
+        """Upgrade the contract to a new blueprint version.
+
+        Args:
+            ctx: Transaction context
+            new_blueprint_id: The blueprint ID to upgrade to
+            new_version: Version string for the new blueprint (e.g., "1.1.0")
+
+        Raises:
+            NCFail: If caller is not the dev
+        """
+        if ctx.caller_id != self.dev_address:
+            raise NCFail("Only dev can upgrade contract")
+        if not self._is_version_higher(new_version, self.contract_version):
+            raise InvalidVersion(f"New version {new_version} must be higher than current {self.contract_version}")
+
+        old_version = self.contract_version
+        self.contract_version = new_version
+
+        self.log.info("Contract upgrade",
+                     old_version=old_version,
+                     new_version=new_version,
+                     new_blueprint_id=new_blueprint_id.hex())
+
+        self.syscall.change_blueprint(new_blueprint_id)
+
+    def _parse_version(self, version: str) -> tuple[int, int, int] | None:
+        """Parse a semantic version string into a tuple of integers."""
+        parts_str = version.split('.')
+        parts: list[int] = []
+
+        for part in parts_str:
+            if not part or not all(c in '0123456789' for c in part):
+                return None  # Invalid format
+            parts.append(int(part))
+
+        while len(parts) < 3:
+            parts.append(0)
+
+        return (parts[0], parts[1], parts[2])
+
+    def _is_version_higher(self, new_version: str, current_version: str) -> bool:
+        """Returns True if new_version > current_version, False if malformed or not higher."""
+        new_parts = self._parse_version(new_version)
+        current_parts = self._parse_version(current_version)
+
+        if new_parts is None or current_parts is None:
+            return False
+
+        return new_parts > current_parts
+
+    @view
+    def get_contract_version(self) -> str:
+        """Get the current contract version."""
+        return self.contract_version
+
+
+class InvalidVersion(NCFail):
+    pass
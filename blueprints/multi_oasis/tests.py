@@ -0,0 +1,283 @@
+import os
+
+from hathor.crypto.util import decode_address
+from hathor.nanocontracts.blueprints.dozer_pool_manager import DozerPoolManager
+from hathor.nanocontracts.blueprints.multi_oasis import MultiOasis
+from hathor.nanocontracts.types import (
+    Address,
+    CallerId,
+    NCDepositAction,
+    NCWithdrawalAction,
+    Amount,
+    TokenUid,
+)
+from hathor.transaction.token_info import TokenVersion
+from hathor.util import not_none
+from hathor.conf import HathorSettings
+from hathor.wallet import KeyPair
+from hathor_tests.nanocontracts.blueprints.unittest import BlueprintTestCase
+from hathor.nanocontracts.exception import NCFail
+
+settings = HathorSettings()
+PRECISION = 10**20
+PRICE_PRECISION = 10**8  # For decimal price handling (8 decimal places)
+MONTHS_IN_SECONDS = 60 * 60 * 24 * 30  # Approximate number of seconds in a month
+HTR_UID = settings.HATHOR_TOKEN_UID
+
+
+class MultiOasisTestCase(BlueprintTestCase):
+    _enable_sync_v1 = True
+    _enable_sync_v2 = True
+
+    def setUp(self):
+        super().setUp()
+
+        self.oasis_blueprint_id = self.gen_random_blueprint_id()
+        self.oasis_id = self.gen_random_contract_id()
+        self._register_blueprint_class(MultiOasis, self.oasis_blueprint_id)
+
+        self.dozer_manager_blueprint_id = self.gen_random_blueprint_id()
+        self.dozer_manager_id = self.gen_random_contract_id()
+        self._register_blueprint_class(
+            DozerPoolManager, self.dozer_manager_blueprint_id
+        )
+
+        self.dev_address = self._get_any_address()[0]
+        self.token_b = self.gen_random_token_uid()
+        self.create_token(self.token_b, "token_b", "TKB", TokenVersion.DEPOSIT)
+        self.token_c = self.gen_random_token_uid()
+        self.create_token(self.token_c, "token_c", "TKC", TokenVersion.DEPOSIT)
+        self.usd_token = self.gen_random_token_uid()
+        self.create_token(self.usd_token, "usd", "USD", TokenVersion.DEPOSIT)
+        self.pool_fee = Amount(3)
+        self.tx = self._get_any_tx()
+
+    def _get_any_tx(self):
+        genesis = self.manager.tx_storage.get_all_genesis()
+        tx = [t for t in genesis if t.is_transaction][0]
+        return tx
+
+    def _get_any_address(self) -> tuple[Address, KeyPair]:
+        password = os.urandom(12)
+        key = KeyPair.create(password)
+        address_b58 = key.address
+        address_bytes = decode_address(not_none(address_b58))
+        return Address(address_bytes), key
+
+    def get_current_timestamp(self):
+        return int(self.clock.seconds())
+
+    def _call(self, contract_id, method: str, caller, *args, actions=None, timestamp=None):
+        ctx = self.create_context(
+            actions=actions or [],
+            vertex=self.tx,
+            caller_id=caller,
+            timestamp=timestamp or self.get_current_timestamp(),
+        )
+        return self.runner.call_public_method(contract_id, method, ctx, *args)
+
+    def _user_info(self, address: CallerId, token_b: TokenUid, timestamp: int | None = None):
+        if timestamp is None:
+            timestamp = self.get_current_timestamp()
+        return self.runner.call_view_method(
+            self.oasis_id, "user_info", address, token_b, timestamp
+        )
+
+    def _create_pool(self, token_a, token_b, amount_a: int, amount_b: int) -> None:
+        self._call(
+            self.dozer_manager_id, "create_pool", self.dev_address, self.pool_fee,
+            actions=[
+                NCDepositAction(amount=amount_a, token_uid=TokenUid(token_a)),
+                NCDepositAction(amount=amount_b, token_uid=TokenUid(token_b)),
+            ],
+        )
+        self._call(
+            self.dozer_manager_id, "sign_pool", self.dev_address,
+            token_a, token_b, self.pool_fee,
+        )
+
+    def initialize_pools(self) -> None:
+        """Create the pool manager, the HTR-USD reference pool and two HTR/token pools"""
+        ctx = self.create_context(
+            actions=[],
+            vertex=self.tx,
+            caller_id=self.dev_address,
+            timestamp=self.get_current_timestamp(),
+        )
+        self.runner.create_contract(self.dozer_manager_id, self.dozer_manager_blueprint_id, ctx)
+
+        self._create_pool(HTR_UID, self.usd_token, 1000_00, 500_00)
+        self._call(
+            self.dozer_manager_id, "set_htr_usd_pool", self.dev_address,
+            HTR_UID, self.usd_token, self.pool_fee,
+        )
+        self._create_pool(HTR_UID, self.token_b, 1000000, 7000000)
+        self._create_pool(HTR_UID, self.token_c, 2000000, 1000000)
+
+    def initialize_oasis(self, amount: int = 10_000_000_00, protocol_fee: int = 0) -> None:
+        ctx = self.create_context(
+            actions=[NCDepositAction(token_uid=HTR_UID, amount=amount)],  # type: ignore
+            vertex=self.tx,
+            caller_id=self.dev_address,
+            timestamp=self.get_current_timestamp(),
+        )
+        self.runner.create_contract(
+            self.oasis_id,
+            self.oasis_blueprint_id,
+            ctx,
+            self.dozer_manager_id,
+            protocol_fee,
+        )
+        self.oasis_storage = self.runner.get_storage(self.oasis_id)
+
+    def add_token(self, token_b: TokenUid, htr_cap: int = 10_000_000_00) -> None:
+        self._call(self.oasis_id, "add_token", self.dev_address, token_b, self.pool_fee, htr_cap)
+
+    def _deposit(self, user: Address, token_b: TokenUid, amount: int, timelock: int = 6) -> None:
+        self._call(
+            self.oasis_id, "user_deposit", user, timelock,
+            actions=[NCDepositAction(token_uid=token_b, amount=amount)],
+        )
+
+    def _setup(self) -> None:
+        self.initialize_pools()
+        self.initialize_oasis()
+        self.add_token(self.token_b)
+        self.add_token(self.token_c)
+
+    def test_add_token(self) -> None:
+        self._setup()
+
+        tokens = self.runner.call_view_method(self.oasis_id, "get_tokens")
+        self.assertEqual(tokens, [self.token_b.hex(), self.token_c.hex()])
+        info = self.runner.call_view_method(self.oasis_id, "token_info", self.token_b)
+        self.assertEqual(info.pool_fee, self.pool_fee)
+        self.assertEqual(info.htr_allocated, 0)
+        self.assertTrue(info.active)
+
+        # Duplicates, non-dev callers and missing pools are rejected
+        with self.assertRaises(NCFail):
+            self.add_token(self.token_b)
+        with self.assertRaises(NCFail):
+            self._call(
+                self.oasis_id, "add_token", self._get_any_address()[0],
+                self.usd_token, self.pool_fee, 1000,
+            )
+        missing = self.gen_random_token_uid()
+        self.create_token(missing, "missing", "MIS", TokenVersion.DEPOSIT)
+        with self.assertRaises(NCFail):
+            self.add_token(missing)
+
+    def test_deposits_share_treasury(self) -> None:
+        self._setup()
+        user = self._get_any_address()[0]
+        initial_balance = self.runner.call_view_method(self.oasis_id, "oasis_info").oasis_htr_balance
+
+        self._deposit(user, self.token_b, 1_000_00)
+        self._deposit(user, self.token_c, 2_000_00, timelock=12)
+
+        info_b = self._user_info(user, self.token_b)
+        info_c = self._user_info(user, self.token_c)
+        self.assertEqual(info_b.user_deposit_b, 1_000_00)
+        self.assertEqual(info_c.user_deposit_b, 2_000_00)
+        self.assertEqual(info_b.user_liquidity, 1_000_00 * PRECISION)
+        self.assertEqual(info_c.user_liquidity, 2_000_00 * PRECISION)
+
+        token_b_info = self.runner.call_view_method(self.oasis_id, "token_info", self.token_b)
+        token_c_info = self.runner.call_view_method(self.oasis_id, "token_info", self.token_c)
+        oasis_htr_balance = self.runner.call_view_method(self.oasis_id, "oasis_info").oasis_htr_balance
+        self.assertEqual(
+            initial_balance - oasis_htr_balance,
+            token_b_info.htr_allocated + token_c_info.htr_allocated,
+        )
+        self.assertEqual(
+            self.oasis_storage.get_balance(HTR_UID).value,
+            oasis_htr_balance + info_b.user_balance_a + info_c.user_balance_a,
+        )
+
+    def test_deposit_unlisted_token(self) -> None:
+        self._setup()
+        with self.assertRaises(NCFail):
+            self._deposit(self._get_any_address()[0], self.usd_token, 1_000_00)
+
+    def test_token_htr_cap(self) -> None:
+        self.initialize_pools()
+        self.initialize_oasis()
+        self.add_token(self.token_b, htr_cap=100_00)
+        user = self._get_any_address()[0]
+
+        # 1_000_00 token_b quotes to about 142_85 HTR in the pool, above the cap
+        with self.assertRaises(NCFail):
+            self._deposit(user, self.token_b, 1_000_00)
+
+        self._deposit(user, self.token_b, 500_00)
+        info = self.runner.call_view_method(self.oasis_id, "token_info", self.token_b)
+        self.assertLessEqual(info.htr_allocated, 100_00)
+
+        # Deactivated listings do not accept deposits
+        self._call(self.oasis_id, "update_token", self.dev_address, self.token_b, 10_000_00, False)
+        with self.assertRaises(NCFail):
+            self._deposit(user, self.token_b, 10_00)
+
+    def test_close_and_withdraw_per_token(self) -> None:
+        self._setup()
+        user = self._get_any_address()[0]
+        self._deposit(user, self.token_b, 1_000_00)
+        self._deposit(user, self.token_c, 1_000_00)
+
+        unlock = self.get_current_timestamp() + 6 * MONTHS_IN_SECONDS + 1
+        with self.assertRaises(NCFail):
+            self._call(self.oasis_id, "close_position", user, self.token_b)
+        self._call(self.oasis_id, "close_position", user, self.token_b, timestamp=unlock)
+
+        # Closing token_b leaves the token_c position and its allocation untouched
+        info_b = self._user_info(user, self.token_b, unlock)
+        info_c = self._user_info(user, self.token_c, unlock)
+        self.assertTrue(info_b.position_closed)
+        self.assertFalse(info_c.position_closed)
+        self.assertEqual(
+            self.runner.call_view_method(self.oasis_id, "token_info", self.token_b).htr_allocated, 0
+        )
+        self.assertGreater(
+            self.runner.call_view_method(self.oasis_id, "token_info", self.token_c).htr_allocated, 0
+        )
+
+        self._call(
+            self.oasis_id, "user_withdraw", user, self.token_b,
+            actions=[
+                NCWithdrawalAction(token_uid=self.token_b, amount=info_b.closed_balance_b),
+                NCWithdrawalAction(token_uid=HTR_UID, amount=info_b.closed_balance_a),
+            ],
+            timestamp=unlock,
+        )
+        info_b = self._user_info(user, self.token_b, unlock)
+        self.assertFalse(info_b.position_closed)
+        self.assertEqual(info_b.closed_balance_b, 0)
+        self.assertEqual(info_b.user_deposit_b, 0)
+
+        # The token_c position is still open, so its funds cannot be withdrawn yet
+        with self.assertRaises(NCFail):
+            self._call(
+                self.oasis_id, "user_withdraw", user, self.token_c,
+                actions=[NCWithdrawalAction(token_uid=self.token_c, amount=1)],
+                timestamp=unlock,
+            )
+
+    def test_dev_withdraw_fee_per_token(self) -> None:
+        self.initialize_pools()
+        self.initialize_oasis(protocol_fee=50)
+        self.add_token(self.token_b)
+        self.add_token(self.token_c)
+        user = self._get_any_address()[0]
+        self._deposit(user, self.token_b, 1_000_00)
+
+        fee = (1_000_00 * 50 + 999) // 1000
+        self._call(
+            self.oasis_id, "dev_withdraw_fee", self.dev_address, self.token_b,
+            actions=[NCWithdrawalAction(token_uid=self.token_b, amount=fee)],
+        )
+        with self.assertRaises(NCFail):
+            self._call(
+                self.oasis_id, "dev_withdraw_fee", self.dev_address, self.token_c,
+                actions=[NCWithdrawalAction(token_uid=self.token_c, amount=1)],
+            )
@@ -27,6 +27,7 @@ PRECISION = 10**20
 PRICE_PRECISION = 10**8  # For decimal price handling (8 decimal places)
 MONTHS_IN_SECONDS = 60*60*24*30
 MIN_TIMELOCK_AFTER_DEPOSIT = 4 * MONTHS_IN_SECONDS  # 4 months minimum lock after any deposit
+MAX_PAGE_SIZE = 200  # Maximum number of users returned by paginated / batch views
 
 class UserPositionEntry(NamedTuple):
     """Initial position entry data for a user deposit."""
@@ -37,6 +38,14 @@ class UserPositionEntry(NamedTuple):
 
 EMPTY_USER_POSITION = UserPositionEntry(Amount(0), Amount(0), 0)
 
+class UserBalances(NamedTuple):
+    """Per-user balances of the two tokens Oasis holds, stored as a single record."""
+
+    htr: Amount
+    token_b: Amount
+
+EMPTY_USER_BALANCES = UserBalances(Amount(0), Amount(0))
+
 class OasisUserInfo(NamedTuple):
     """Detailed information about a user's position in the Oasis contract."""
 
@@ -98,6 +107,37 @@ class PoolLiquidityInfo(NamedTuple):
     user_lp_b: Amount  # Token_b amount in the pool
 
 
+class OasisUsersPage(NamedTuple):
+    """A page of registered Oasis user addresses."""
+
+    cursor_in: int  # Index into the user registry this page starts at
+    limit: int
+    next_cursor: int  # 0 when there is no more data
+    users: list[Address]
+
+
+class OasisRiskInfo(NamedTuple):
+    """Aggregate treasury exposure of the Oasis contract, computed from running totals."""
+
+    oasis_htr_balance: Amount  # HTR available in the Oasis treasury
+    total_deposit_b: Amount  # Token_b deposited across all open positions
+    total_bonus_paid: Amount  # Cumulative HTR bonus credited to users
+    total_il_compensation: Amount  # Cumulative HTR paid as IL compensation on close
+    avg_token_price_in_htr_in_deposit: Amount  # Deposit-weighted average entry price of token_b in HTR
+    token_b_price_in_htr: Amount  # Current TWAP price of token_b in HTR
+    net_il_liability_htr: Amount  # Net IL compensation if all open positions closed at the TWAP (see oasis_risk_info)
+    max_il_liability_htr: Amount  # Upper bound: every open token_b deposit lost, valued at the TWAP
+
+
+class _PoolSnapshot(NamedTuple):
+    """Pool manager state read once and shared by position closure calculations."""
+
+    oasis_lp_htr: int  # HTR owned by Oasis in the pool
+    reserve_htr: int  # Pool HTR reserve
+    reserve_b: int  # Pool token_b reserve
+    token_b_price_in_htr: int  # TWAP price of token_b in HTR (0 when Oasis holds no liquidity)
+
+
 @export
 class Oasis(Blueprint):
     """Oasis contract that interacts with Dozer Pool Manager contract."""
@@ -116,14 +156,23 @@ class Oasis(Blueprint):
     user_deposit_b: dict[CallerId, Amount]
     user_liquidity: dict[CallerId, Amount]
     total_liquidity: Amount
-    user_balances: dict[CallerId, dict[TokenUid, Amount]]
+    user_balances: dict[CallerId, UserBalances]
     token_b: TokenUid
     # Track if a user's position has been closed and is ready for withdrawal
     user_position_closed: dict[CallerId, bool]
     # Track withdrawn balances separately from cashback/rewards
-    closed_position_balances: dict[CallerId, dict[TokenUid, Amount]]
+    closed_position_balances: dict[CallerId, UserBalances]
     # Track user position entry (price at deposit, withdrawal time)
     user_position_entry: dict[CallerId, UserPositionEntry]
+    # Registry of every address that ever deposited, in first-deposit order
+    user_addresses: list[CallerId]
+    user_registered: set[CallerId]
+    # Running aggregates over open positions for treasury risk monitoring
+    total_deposit_b: Amount
+    total_bonus_paid: Amount
+    total_il_compensation: Amount
+    total_entry_value_htr: int  # Sum of user_deposit_b * token_price_in_htr_in_deposit
+    total_entry_sqrt_value: int  # Sum of user_deposit_b * _sqrt_price(token_price_in_htr_in_deposit)
     # Emergency pause state
     paused: bool
 
@@ -162,6 +211,13 @@ class Oasis(Blueprint):
         self.user_position_closed = {}
         self.closed_position_balances = {}
         self.user_position_entry = {}
+        self.user_addresses = []
+        self.user_registered = set()
+        self.total_deposit_b = Amount(0)
+        self.total_bonus_paid = Amount(0)
+        self.total_il_compensation = Amount(0)
+        self.total_entry_value_htr = 0
+        self.total_entry_sqrt_value = 0
         self.paused = False
 
         self.log.info("Oasis initialized",
@@ -296,8 +352,11 @@ class Oasis(Blueprint):
         )
 
         # Update position entry prices with weighted average if existing position
+        old_deposit = 0
+        old_token_price = 0
         if caller in self.user_position_entry:
             old_deposit = self.user_deposit_b[caller]
+            old_token_price = self.user_position_entry[caller].token_price_in_htr_in_deposit
 
             new_htr_price = Amount(
                 self._calculate_weighted_average(
@@ -331,6 +390,21 @@ class Oasis(Blueprint):
         self.user_deposit_b[caller] = Amount(
             self.user_deposit_b.get(caller, 0) + deposit_amount
         )
+        self._register_user(caller)
+
+        # Keep treasury risk aggregates in sync with the updated position
+        self.total_deposit_b = Amount(self.total_deposit_b + deposit_amount)
+        self.total_bonus_paid = Amount(self.total_bonus_paid + bonus)
+        self.total_entry_value_htr = (
+            self.total_entry_value_htr
+            - old_deposit * old_token_price
+            + (old_deposit + deposit_amount) * new_token_price
+        )
+        self.total_entry_sqrt_value = (
+            self.total_entry_sqrt_value
+            - old_deposit * self._sqrt_price(old_token_price)
+            + (old_deposit + deposit_amount) * self._sqrt_price(new_token_price)
+        )
 
         self.log.info("User deposit completed",
                      deposit_amount=deposit_amount,
@@ -383,7 +457,9 @@ class Oasis(Blueprint):
         if self.user_liquidity.get(caller, 0) == 0:
             raise NCFail("No position to close")
 
-        oasis_quote = self._calculate_position_closure(caller, int(ctx.block.timestamp))
+        oasis_quote = self._calculate_position_closure(
+            caller, self._get_pool_snapshot(int(ctx.block.timestamp))
+        )
         user_lp_htr = oasis_quote.user_lp_htr
         user_lp_b = oasis_quote.user_lp_b
         loss_htr = oasis_quote.loss_htr
@@ -418,44 +494,49 @@ class Oasis(Blueprint):
 
             self._get_pool_manager().public(*adjust_actions).withdraw_cashback(self._get_pool_key())
 
-            # Add change to user balance
-            self._add_user_balance(caller, token_uid, change)
-
-        # Get existing cashback balances
-        user_current_balance = self.user_balances.get(caller, {})
-        user_htr_current_balance = Amount(user_current_balance.get(TokenUid(HATHOR_TOKEN_UID), 0))
+        # Get existing cashback balances, including the change just received
+        user_balance = self.user_balances.get(caller, EMPTY_USER_BALANCES)
+        user_htr_current_balance = user_balance.htr
+        user_token_b_balance = user_balance.token_b
+        if change > 0:
+            if token_uid == self.token_b:
+                user_token_b_balance = Amount(user_token_b_balance + change)
+            else:
+                user_htr_current_balance = Amount(user_htr_current_balance + change)
 
         # First, return the user_lp_htr back to oasis_htr_balance
         self.oasis_htr_balance = Amount(self.oasis_htr_balance + user_lp_htr - loss_htr)
 
-        # Then update closed balances without adding user_lp_htr again
-        closed_balances: dict[TokenUid, Amount] = {}
-        # We need to fetch the fresh balance again because it might have changed
-        user_token_b_balance = self.user_balances.get(caller, {}).get(
-            self.token_b, 0
+        # Then move cashback balances into closed balances without adding user_lp_htr again
+        closed_balances = UserBalances(
+            htr=Amount(user_htr_current_balance + loss_htr),
+            token_b=Amount(user_token_b_balance + user_lp_b),
         )
-        closed_balances[self.token_b] = Amount(user_token_b_balance + user_lp_b)
-        closed_balances[TokenUid(HATHOR_TOKEN_UID)] = Amount(user_htr_current_balance + loss_htr)
         self.closed_position_balances[caller] = closed_balances
-
-        # Clear user cashback balances after moving them
-        if user_token_b_balance > 0 or user_htr_current_balance > 0:
-            user_balance = self.user_balances.get(caller, {})
-            user_balance[TokenUid(HATHOR_TOKEN_UID)] = Amount(0)
-            user_balance[self.token_b] = Amount(0)
-            self.user_balances[caller] = user_balance
+        if caller in self.user_balances:
+            del self.user_balances[caller]
 
         # Mark position as closed
         self.user_position_closed[caller] = True
 
+        # Remove the position from the treasury risk aggregates
+        user_deposit_b = self.user_deposit_b.get(caller, 0)
+        entry_token_price = self.user_position_entry[caller].token_price_in_htr_in_deposit
+        self.total_deposit_b = Amount(self.total_deposit_b - user_deposit_b)
+        self.total_entry_value_htr = self.total_entry_value_htr - user_deposit_b * entry_token_price
+        self.total_entry_sqrt_value = (
+            self.total_entry_sqrt_value - user_deposit_b * self._sqrt_price(entry_token_price)
+        )
+        self.total_il_compensation = Amount(self.total_il_compensation + loss_htr)
+
         # Keep the deposit amounts for reference, but reset liquidity
         self.total_liquidity = Amount(self.total_liquidity - self.user_liquidity[caller])
         del self.user_liquidity[caller]
         del self.user_position_entry[caller]
 
         self.log.info("Position closed",
-                     available_token_b=closed_balances.get(self.token_b, 0),
-                     available_htr=closed_balances.get(TokenUid(HATHOR_TOKEN_UID), 0))
+                     available_token_b=closed_balances.token_b,
+                     available_htr=closed_balances.htr)
 
     @public(allow_withdrawal=True)
     def user_withdraw(self, ctx: Context) -> None:
@@ -492,46 +573,40 @@ class Oasis(Blueprint):
         if self.user_liquidity.get(Address(ctx.caller_id), 0) > 0:
             raise NCFail("Position must be closed before withdrawal")
 
+        closed_balances = self.closed_position_balances.get(Address(ctx.caller_id), EMPTY_USER_BALANCES)
+
         # Check token_b withdrawal amount from closed_position_balances
-        available_token_b = self.closed_position_balances.get(Address(ctx.caller_id), {}).get(
-            self.token_b, 0
-        )
+        available_token_b = closed_balances.token_b
         if action_token_b.amount > available_token_b:
             raise NCFail(
                 f"Not enough balance. Available: {available_token_b}, Requested: {action_token_b.amount}"
             )
 
-        # Update token_b balance in closed_position_balances
-        closed_balances = self.closed_position_balances.get(Address(ctx.caller_id), {})
-        closed_balances[self.token_b] = Amount(available_token_b - action_token_b.amount)
-
         # Check HTR withdrawal if requested
-        if action_htr:
-            available_htr = self.closed_position_balances.get(Address(ctx.caller_id), {}).get(
-                TokenUid(HATHOR_TOKEN_UID), Amount(0)
+        available_htr = closed_balances.htr
+        htr_withdrawn = action_htr.amount if action_htr else 0
+        if htr_withdrawn > available_htr:
+            raise NCFail(
+                f"Not enough HTR balance. Available: {available_htr}, Requested: {htr_withdrawn}"
             )
-            if action_htr.amount > available_htr:
-                raise NCFail(
-                    f"Not enough HTR balance. Available: {available_htr}, Requested: {action_htr.amount}"
-                )
 
-            closed_balances[TokenUid(HATHOR_TOKEN_UID)] = Amount(available_htr - action_htr.amount)
-
-        # Update closed position balances
-        self.closed_position_balances[Address(ctx.caller_id)] = closed_balances
+        remaining = UserBalances(
+            htr=Amount(available_htr - htr_withdrawn),
+            token_b=Amount(available_token_b - action_token_b.amount),
+        )
 
-        htr_withdrawn = action_htr.amount if action_htr else 0
         self.log.info("User withdrawal",
                      token_b_amount=action_token_b.amount,
                      htr_amount=htr_withdrawn,
-                     remaining_token_b=closed_balances.get(self.token_b, 0),
-                     remaining_htr=closed_balances.get(TokenUid(HATHOR_TOKEN_UID), 0))
-
-        # If all funds withdrawn, clean up user data
-        if (
-            closed_balances.get(self.token_b, 0) == 0
-            and closed_balances.get(TokenUid(HATHOR_TOKEN_UID), 0) == 0
-        ):
+                     remaining_token_b=remaining.token_b,
+                     remaining_htr=remaining.htr)
+
+        # Update closed position balances, or clean up user data if all funds withdrawn
+        if remaining.token_b > 0 or remaining.htr > 0:
+            self.closed_position_balances[Address(ctx.caller_id)] = remaining
+        else:
+            if Address(ctx.caller_id) in self.closed_position_balances:
+                del self.closed_position_balances[Address(ctx.caller_id)]
             del self.user_deposit_b[Address(ctx.caller_id)]
             del self.user_position_entry[Address(ctx.caller_id)]
             del self.user_position_closed[Address(ctx.caller_id)]
@@ -541,9 +616,7 @@ class Oasis(Blueprint):
         self._check_not_paused(ctx)
         action = self._get_single_token_action(ctx, NCActionType.WITHDRAWAL, TokenUid(HATHOR_TOKEN_UID), auth=False)
 
-        available_bonus = self.user_balances.get(Address(ctx.caller_id), {HATHOR_TOKEN_UID: 0}).get(
-            HATHOR_TOKEN_UID, 0
-        )
+        available_bonus = self.user_balances.get(Address(ctx.caller_id), EMPTY_USER_BALANCES).htr
         if action.amount > available_bonus:
             raise NCFail("Withdrawal amount too high")
 
@@ -597,18 +670,6 @@ class Oasis(Blueprint):
             amount, self.token_b, pool_key
         )
 
-    def _quote_remove_liquidity_oasis(self) -> PoolLiquidityInfo:
-        # Get user info for this contract from the pool manager
-        pool_key = self._get_pool_key()
-        user_info = self._get_pool_manager().view().user_info(
-            self.syscall.get_contract_id(),
-            pool_key
-        )
-        return PoolLiquidityInfo(
-            max_withdraw_a=user_info.token0Amount,  # HTR amount
-            user_lp_b=user_info.token1Amount,       # token_b amount
-        )
-
     def _calculate_weighted_average(
         self, old_value: int, old_weight: int, new_value: int, new_weight: int
     ) -> int:
@@ -693,29 +754,18 @@ class Oasis(Blueprint):
         return Amount((amount * bonus_multiplier[timelock]) // 10000)
 
     def _calculate_impermanent_loss_compensation(
-        self, loss_in_token_b: int, user_lp_htr: int, current_timestamp: int
+        self, loss_in_token_b: int, user_lp_htr: int, token_b_price_in_htr: int
     ) -> int:
         """Calculate HTR compensation for impermanent loss in token_b.
 
         Args:
             loss_in_token_b: Amount of token_b loss
             user_lp_htr: User's HTR in liquidity pool (max compensation)
-            current_timestamp: Current block timestamp for TWAP calculation
+            token_b_price_in_htr: TWAP price of token_b in HTR (PRICE_PRECISION scaled)
 
         Returns:
             HTR amount to compensate for loss (capped at user_lp_htr)
         """
-        pool_manager = self._get_pool_manager()
-
-        # Use TWAP price instead of spot price for IL compensation
-        # This prevents manipulation where user swaps to inflate IL, gets compensated, then undoes swap
-        token_b_price_in_htr = pool_manager.view().get_twap_price(
-            HATHOR_TOKEN_UID,
-            self.token_b,
-            self.pool_fee,
-            current_timestamp=current_timestamp,
-        )
-
         # Calculate HTR equivalent of token_b loss using TWAP price
         # price is token_b/HTR, so HTR = token_b * price / PRICE_PRECISION
         loss_htr = (loss_in_token_b * token_b_price_in_htr) // PRICE_PRECISION
@@ -730,33 +780,71 @@ class Oasis(Blueprint):
 
         return loss_htr
 
-    def _quote_token_b_from_htr(self, user_lp_htr: int) -> int:
-        """Calculate token_b amount from HTR amount using pool reserves with correct token ordering"""
+    def _quote_token_b_from_htr(self, user_lp_htr: int, snapshot: _PoolSnapshot) -> int:
+        """Calculate token_b amount from HTR amount using the snapshot pool reserves.
+
+        Mirrors DozerPoolManager.quote so no extra cross-contract call is needed.
+        """
+        return (user_lp_htr * snapshot.reserve_b) // snapshot.reserve_htr
+
+    def _get_pool_snapshot(self, current_timestamp: int) -> _PoolSnapshot:
+        """Read Oasis LP amount, pool reserves and TWAP from the pool manager once.
+
+        The TWAP is only fetched while Oasis holds liquidity, since it is only needed
+        to compensate impermanent loss on open positions.
+        """
         pool_manager = self._get_pool_manager().view()
+        oasis_lp_htr = pool_manager.user_info(
+            self.syscall.get_contract_id(),
+            self._get_pool_key()
+        ).token0Amount
         reserves = pool_manager.get_reserves(HATHOR_TOKEN_UID, self.token_b, self.pool_fee)
 
-        return pool_manager.quote(user_lp_htr, reserves[0], reserves[1])
+        token_b_price_in_htr = 0
+        if self.total_liquidity > 0:
+            # Use TWAP price instead of spot price for IL compensation
+            # This prevents manipulation where user swaps to inflate IL, gets compensated, then undoes swap
+            token_b_price_in_htr = pool_manager.get_twap_price(
+                HATHOR_TOKEN_UID,
+                self.token_b,
+                self.pool_fee,
+                current_timestamp=current_timestamp,
+            )
+
+        return _PoolSnapshot(
+            oasis_lp_htr=oasis_lp_htr,
+            reserve_htr=reserves[0],
+            reserve_b=reserves[1],
+            token_b_price_in_htr=token_b_price_in_htr,
+        )
+
+    def _register_user(self, address: Address) -> None:
+        """Append an address to the user registry on its first deposit."""
+        if address in self.user_registered:
+            return
+        self.user_registered.add(address)
+        self.user_addresses.append(address)
 
     def _add_user_balance(self, address: Address, token_id: TokenUid, amount: Amount) -> Amount:
         """Add amount to user's balance for a given token.
 
         Args:
             address: User address
-            token_id: Token UID to update
+            token_id: Token UID to update (HTR or token_b)
             amount: Amount to add (can be negative for subtraction)
 
         Returns:
             The new balance after addition
         """
-        if address not in self.user_balances:
-            self.user_balances[address] = {token_id: amount}
-            return amount
+        balances = self.user_balances.get(address, EMPTY_USER_BALANCES)
+        if token_id == self.token_b:
+            new_value = Amount(balances.token_b + amount)
+            self.user_balances[address] = UserBalances(htr=balances.htr, token_b=new_value)
         else:
-            partial = self.user_balances[address]
-            new_value = Amount(partial.get(token_id, 0) + amount)
-            partial[token_id] = new_value
-            self.user_balances[address] = partial
-            return new_value
+            assert token_id == HATHOR_TOKEN_UID, "Oasis only holds HTR and token_b"
+            new_value = Amount(balances.htr + amount)
+            self.user_balances[address] = UserBalances(htr=new_value, token_b=balances.token_b)
+        return new_value
 
     @public(allow_withdrawal=True)
     def owner_withdraw(self, ctx: Context) -> None:
@@ -796,9 +884,7 @@ class Oasis(Blueprint):
         token_b_action = self._get_single_token_action(
             ctx, NCActionType.WITHDRAWAL, self.token_b
         )
-        if token_b_action.amount > self.user_balances.get(self.dev_address, {}).get(
-            self.token_b, 0
-        ):
+        if token_b_action.amount > self.user_balances.get(self.dev_address, EMPTY_USER_BALANCES).token_b:
             raise NCFail("Withdrawal amount too high")
 
         self._add_user_balance(Address(self.dev_address), self.token_b, Amount(-token_b_action.amount))
@@ -913,6 +999,28 @@ class Oasis(Blueprint):
         """Calculate ceiling division using (numerator + denominator - 1) // denominator."""
         return Amount((numerator + denominator - 1) // denominator)
 
+    def _isqrt(self, n: int) -> int:
+        """Integer square root using Newton's method.
+
+        Returns the largest integer x such that x² ≤ n.
+        """
+        assert n >= 0, "Cannot calculate square root of negative number"
+        if n == 0:
+            return 0
+        if n <= 3:
+            return 1
+
+        z = n
+        x = n // 2 + 1
+        while x < z:
+            z = x
+            x = (n // x + x) // 2
+        return z
+
+    def _sqrt_price(self, price: int) -> int:
+        """Square root of a PRICE_PRECISION-scaled price, itself scaled by PRICE_PRECISION."""
+        return self._isqrt(price * PRICE_PRECISION)
+
     @view
     def user_info(
         self,
@@ -922,23 +1030,81 @@ class Oasis(Blueprint):
         remove_liquidity_oasis_quote = self.get_remove_liquidity_oasis_quote(
             address, current_timestamp
         )
+        return self._build_user_info(address, remove_liquidity_oasis_quote)
+
+    @view
+    def users_info_batch(
+        self,
+        addresses: list[Address],
+        current_timestamp: int,
+    ) -> list[OasisUserInfo]:
+        """Get user_info for many addresses reading the pool manager state only once.
 
-        # Safely access nested dicts using 'in' check to avoid state changes
-        user_balance_a = 0
-        if address in self.user_balances:
-            user_balance_a = self.user_balances[address].get(HATHOR_TOKEN_UID, 0)
+        Args:
+            addresses: Addresses to query (at most MAX_PAGE_SIZE)
+            current_timestamp: Current timestamp for TWAP-based IL compensation
 
-        user_balance_b = 0
-        if address in self.user_balances:
-            user_balance_b = self.user_balances[address].get(self.token_b, 0)
+        Returns:
+            One OasisUserInfo per address, in the same order
 
-        closed_balance_a = 0
-        if address in self.closed_position_balances:
-            closed_balance_a = self.closed_position_balances[address].get(HATHOR_TOKEN_UID, 0)
+        Raises:
+            NCFail: If too many addresses are requested
+        """
+        if len(addresses) > MAX_PAGE_SIZE:
+            raise NCFail(f"Too many addresses: {len(addresses)} (max {MAX_PAGE_SIZE})")
+
+        snapshot: _PoolSnapshot | None = None
+        result: list[OasisUserInfo] = []
+        for address in addresses:
+            if snapshot is None and not self.user_position_closed.get(address, False):
+                snapshot = self._get_pool_snapshot(current_timestamp)
+            quote = self._calculate_position_closure(address, snapshot)
+            result.append(self._build_user_info(address, quote))
+        return result
 
-        closed_balance_b = 0
-        if address in self.closed_position_balances:
-            closed_balance_b = self.closed_position_balances[address].get(self.token_b, 0)
+    @view
+    def get_users_page(self, cursor: int, limit: int) -> OasisUsersPage:
+        """Return a page of registered user addresses.
+
+        - cursor is an index into the user registry (first-deposit order)
+        - next_cursor is 0 when no more data
+        - addresses stay registered after fully withdrawing
+        """
+        if cursor < 0:
+            cursor = 0
+        if limit <= 0:
+            raise NCFail("limit must be > 0")
+        if limit > MAX_PAGE_SIZE:
+            raise NCFail("limit too large")
+
+        total = len(self.user_addresses)
+        if cursor >= total:
+            return OasisUsersPage(cursor_in=cursor, limit=limit, next_cursor=0, users=[])
+
+        end = cursor + limit
+        if end > total:
+            end = total
+
+        users: list[Address] = []
+        i = cursor
+        while i < end:
+            users.append(Address(self.user_addresses[i]))
+            i += 1
+
+        next_cursor = 0 if end >= total else end
+        return OasisUsersPage(cursor_in=cursor, limit=limit, next_cursor=next_cursor, users=users)
+
+    @view
+    def get_users_count(self) -> int:
+        """Number of addresses in the user registry."""
+        return len(self.user_addresses)
+
+    def _build_user_info(
+        self, address: Address, remove_liquidity_oasis_quote: OasisRemoveLiquidityQuote
+    ) -> OasisUserInfo:
+        """Assemble OasisUserInfo from local state and a position closure quote."""
+        user_balance = self.user_balances.get(address, EMPTY_USER_BALANCES)
+        closed_balance = self.closed_position_balances.get(address, EMPTY_USER_BALANCES)
 
         # Get position entry data
         position_entry = self.user_position_entry.get(address, EMPTY_USER_POSITION)
@@ -949,10 +1115,10 @@ class Oasis(Blueprint):
             user_withdrawal_time=position_entry.withdrawal_time,
             oasis_htr_balance=self.oasis_htr_balance,
             total_liquidity=self.total_liquidity,
-            user_balance_a=Amount(user_balance_a),
-            user_balance_b=Amount(user_balance_b),
-            closed_balance_a=Amount(closed_balance_a),
-            closed_balance_b=Amount(closed_balance_b),
+            user_balance_a=user_balance.htr,
+            user_balance_b=user_balance.token_b,
+            closed_balance_a=closed_balance.htr,
+            closed_balance_b=closed_balance.token_b,
             user_lp_b=Amount(remove_liquidity_oasis_quote.user_lp_b),
             user_lp_htr=Amount(remove_liquidity_oasis_quote.user_lp_htr),
             max_withdraw_b=Amount(remove_liquidity_oasis_quote.max_withdraw_b),
@@ -972,6 +1138,62 @@ class Oasis(Blueprint):
             dev_deposit_amount=self.dev_deposit_amount,
         )
 
+    @view
+    def oasis_risk_info(self, current_timestamp: int) -> OasisRiskInfo:
+        """Constant-cost treasury health check from the running position aggregates.
+
+        For a constant-product pool, a position entered at price p_entry and closed at
+        p_now loses deposit_b * (1 - sqrt(p_entry / p_now)) token_b, which Oasis
+        compensates at p_now. Summed over positions this is
+        total_deposit_b * p_now - sqrt(p_now) * sum(deposit_b * sqrt(p_entry)), and the
+        second sum is kept as a running total, so no averaging of entry prices is involved.
+
+        Positions with p_entry > p_now are in profit and are owed nothing, but a running sum
+        cannot clamp them individually: they offset the losses of other positions. The net
+        figure (floored at zero) is therefore exact while no open position is in profit and
+        a lower estimate otherwise; max_il_liability_htr is the matching upper bound.
+
+        Args:
+            current_timestamp: Current timestamp for the TWAP price
+
+        Returns:
+            OasisRiskInfo with aggregates and IL liability estimates in HTR
+        """
+        avg_entry_price = 0
+        if self.total_deposit_b > 0:
+            avg_entry_price = self.total_entry_value_htr // self.total_deposit_b
+
+        token_b_price_in_htr = 0
+        if self.total_liquidity > 0:
+            token_b_price_in_htr = self._get_pool_manager().view().get_twap_price(
+                HATHOR_TOKEN_UID,
+                self.token_b,
+                self.pool_fee,
+                current_timestamp=current_timestamp,
+            )
+
+        net_il_liability = 0
+        if token_b_price_in_htr > 0:
+            loss_value = (
+                self.total_deposit_b * token_b_price_in_htr
+                - self._sqrt_price(token_b_price_in_htr) * self.total_entry_sqrt_value // PRICE_PRECISION
+            )
+            if loss_value > 0:
+                net_il_liability = loss_value // PRICE_PRECISION
+
+        return OasisRiskInfo(
+            oasis_htr_balance=self.oasis_htr_balance,
+            total_deposit_b=self.total_deposit_b,
+            total_bonus_paid=self.total_bonus_paid,
+            total_il_compensation=self.total_il_compensation,
+            avg_token_price_in_htr_in_deposit=Amount(avg_entry_price),
+            token_b_price_in_htr=Amount(token_b_price_in_htr),
+            net_il_liability_htr=Amount(net_il_liability),
+            max_il_liability_htr=Amount(
+                (self.total_deposit_b * token_b_price_in_htr) // PRICE_PRECISION
+            ),
+        )
+
     @view
     def front_quote_add_liquidity_in(
         self, amount: int, timelock: int, now: Timestamp, address: Address
@@ -1002,33 +1224,34 @@ class Oasis(Blueprint):
     def get_remove_liquidity_oasis_quote(
         self, address: Address, current_timestamp: int
     ) -> OasisRemoveLiquidityQuote:
-        return self._calculate_position_closure(address, current_timestamp)
+        snapshot = None
+        if not self.user_position_closed.get(address, False):
+            snapshot = self._get_pool_snapshot(current_timestamp)
+        return self._calculate_position_closure(address, snapshot)
 
     def _calculate_position_closure(
-        self, address: Address, current_timestamp: int
+        self, address: Address, snapshot: _PoolSnapshot | None
     ) -> OasisRemoveLiquidityQuote:
-        """Internal helper to calculate position closure values."""
+        """Internal helper to calculate position closure values.
+
+        The snapshot may only be None for closed positions, which need no pool data.
+        """
         # If position is already closed, return the available balances from closed_position_balances
         if self.user_position_closed.get(address, False):
-            if address in self.closed_position_balances:
-                closed_balance_b = self.closed_position_balances[address].get(self.token_b, 0)
-                closed_balance_htr = self.closed_position_balances[address].get(HATHOR_TOKEN_UID, 0)
-            else:
-                closed_balance_b = 0
-                closed_balance_htr = 0
+            closed_balance = self.closed_position_balances.get(address, EMPTY_USER_BALANCES)
 
             return OasisRemoveLiquidityQuote(
                 user_lp_b=Amount(0),
                 user_lp_htr=Amount(0),
-                max_withdraw_b=Amount(closed_balance_b),
-                max_withdraw_htr=Amount(closed_balance_htr),
+                max_withdraw_b=closed_balance.token_b,
+                max_withdraw_htr=closed_balance.htr,
                 loss_htr=Amount(0),
                 position_closed=True,
             )
 
         # Otherwise calculate withdrawal amounts based on current pool state
-        oasis_quote = self._quote_remove_liquidity_oasis()
-        htr_oasis_amount = oasis_quote.max_withdraw_a
+        assert snapshot is not None, "Pool snapshot required for open positions"
+        htr_oasis_amount = snapshot.oasis_lp_htr
         user_liquidity = self.user_liquidity.get(address, 0)
 
         if self.total_liquidity > 0:
@@ -1036,18 +1259,12 @@ class Oasis(Blueprint):
         else:
             user_lp_htr = 0
 
-        user_lp_b = self._quote_token_b_from_htr(user_lp_htr)
+        user_lp_b = self._quote_token_b_from_htr(user_lp_htr, snapshot)
 
         # Calculate total available amounts including existing balances
-        if address in self.user_balances:
-            user_balance_b = self.user_balances[address].get(self.token_b, 0)
-        else:
-            user_balance_b = 0
-
-        if address in self.user_balances:
-            user_balance_htr = self.user_balances[address].get(HATHOR_TOKEN_UID, 0)
-        else:
-            user_balance_htr = 0
+        user_balance = self.user_balances.get(address, EMPTY_USER_BALANCES)
+        user_balance_b = user_balance.token_b
+        user_balance_htr = user_balance.htr
 
         max_withdraw_b = user_lp_b + user_balance_b
 
@@ -1056,7 +1273,7 @@ class Oasis(Blueprint):
         if self.user_deposit_b.get(address, 0) > max_withdraw_b:
             loss = self.user_deposit_b.get(address, 0) - max_withdraw_b
             loss_htr = self._calculate_impermanent_loss_compensation(
-                loss, user_lp_htr, current_timestamp
+                loss, user_lp_htr, snapshot.token_b_price_in_htr
             )
             max_withdraw_htr = user_balance_htr + loss_htr
         else:
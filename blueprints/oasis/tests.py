@@ -5,7 +5,7 @@ import pytest
 
 from hathor.crypto.util import decode_address
 from hathor.nanocontracts.blueprints.dozer_pool_manager import DozerPoolManager
-from hathor.nanocontracts.blueprints.oasis import Oasis
+from hathor.nanocontracts.blueprints.oasis import Oasis, UserBalances
 from hathor.nanocontracts.types import (
     Address,
     CallerId,
@@ -1711,6 +1711,35 @@ class OasisTestCase(BlueprintTestCase):
         self.assertEqual(user_info.position_closed, True)
         self.assertEqual(user_info.user_liquidity, 0)
 
+    def test_user_balances_record_storage(self):
+        """Test that cashback and closed balances are stored as one record per user"""
+        user_address, timelock, htr_amount, initial_timestamp = self.test_user_deposit(
+            timelock=6
+        )
+        bonus = self._get_user_bonus(timelock, htr_amount)
+
+        oasis_contract = self.get_readonly_contract(self.oasis_id)
+        assert isinstance(oasis_contract, Oasis)
+        balances = oasis_contract.user_balances[user_address]
+        self.assertIsInstance(balances, UserBalances)
+        self.assertEqual(balances.htr, bonus)
+
+        unlock_time = initial_timestamp + (timelock * MONTHS_IN_SECONDS) + 1
+        close_ctx = self.create_context(
+            actions=[], vertex=self.tx, caller_id=user_address, timestamp=unlock_time
+        )
+        self.runner.call_public_method(self.oasis_id, "close_position", close_ctx)
+
+        # Cashback balances are moved into the closed balances record
+        oasis_contract = self.get_readonly_contract(self.oasis_id)
+        assert isinstance(oasis_contract, Oasis)
+        self.assertNotIn(user_address, oasis_contract.user_balances)
+        closed = oasis_contract.closed_position_balances[user_address]
+        user_info = self._user_info(user_address)
+        self.assertEqual(closed, UserBalances(user_info.closed_balance_a, user_info.closed_balance_b))
+        self.assertGreaterEqual(closed.htr, bonus)
+        self.check_balances([user_address])
+
     def test_withdraw_from_closed_position(self):
         """Test withdrawing funds from a closed position"""
         # Create and close a position
@@ -4150,3 +4179,93 @@ class OasisTestCase(BlueprintTestCase):
 
         self.assertEqual(pool1_after.price_a_window_sum, expected_sum_a_pool1)
         self.assertEqual(pool2_after.price_a_window_sum, expected_sum_a_pool2)
+
+    def test_users_page_and_info_batch(self):
+        """Test user registry pagination and batched user_info"""
+        self.initialize_pool()
+        self.initialize_oasis()
+        initial_time = self.get_current_timestamp()
+        user_addresses = [self._get_any_address()[0] for _ in range(5)]
+        for user_address in user_addresses + [user_addresses[0]]:
+            ctx = self.create_context(
+                actions=[NCDepositAction(amount=1_000_00, token_uid=self.token_b)],  # type: ignore
+                vertex=self.tx,
+                caller_id=user_address,
+                timestamp=initial_time,
+            )
+            self.runner.call_public_method(self.oasis_id, "user_deposit", ctx, 6)
+
+        # Repeated deposits do not register the user twice
+        self.assertEqual(
+            self.runner.call_view_method(self.oasis_id, "get_users_count"), 5
+        )
+
+        page = self.runner.call_view_method(self.oasis_id, "get_users_page", 0, 2)
+        self.assertEqual(page.users, user_addresses[:2])
+        self.assertEqual(page.next_cursor, 2)
+        page = self.runner.call_view_method(self.oasis_id, "get_users_page", 4, 2)
+        self.assertEqual(page.users, user_addresses[4:])
+        self.assertEqual(page.next_cursor, 0)
+        with self.assertRaises(NCFail):
+            self.runner.call_view_method(self.oasis_id, "get_users_page", 0, 0)
+
+        # Close one position so the batch mixes open and closed users
+        unlock_time = initial_time + 6 * MONTHS_IN_SECONDS + 1
+        close_ctx = self.create_context(
+            actions=[], vertex=self.tx, caller_id=user_addresses[1], timestamp=unlock_time
+        )
+        self.runner.call_public_method(self.oasis_id, "close_position", close_ctx)
+
+        batch = self.runner.call_view_method(
+            self.oasis_id, "users_info_batch", user_addresses, unlock_time
+        )
+        self.assertEqual(len(batch), len(user_addresses))
+        for user_address, info in zip(user_addresses, batch):
+            self.assertEqual(info, self._user_info(user_address, unlock_time))
+        self.assertTrue(batch[1].position_closed)
+
+    def test_oasis_risk_info_aggregates(self):
+        """Test running risk aggregates across deposits and closes"""
+        self.initialize_pool()
+        self.initialize_oasis()
+        initial_time = self.get_current_timestamp()
+        user_addresses = [self._get_any_address()[0] for _ in range(3)]
+        deposits = [1_000_00, 2_500_00, 700_00, 1_300_00]
+        depositors = user_addresses + [user_addresses[0]]
+        for user_address, amount in zip(depositors, deposits):
+            ctx = self.create_context(
+                actions=[NCDepositAction(amount=amount, token_uid=self.token_b)],  # type: ignore
+                vertex=self.tx,
+                caller_id=user_address,
+                timestamp=initial_time,
+            )
+            self.runner.call_public_method(self.oasis_id, "user_deposit", ctx, 6)
+
+        infos = [self._user_info(address, initial_time) for address in user_addresses]
+        risk = self.runner.call_view_method(self.oasis_id, "oasis_risk_info", initial_time)
+        self.assertEqual(risk.total_deposit_b, sum(deposits))
+        self.assertEqual(risk.total_bonus_paid, sum(info.user_balance_a for info in infos))
+        self.assertEqual(
+            risk.avg_token_price_in_htr_in_deposit,
+            sum(info.user_deposit_b * info.token_price_in_htr_in_deposit for info in infos)
+            // sum(deposits),
+        )
+        # No price movement since entry, so no IL is owed
+        self.assertEqual(risk.net_il_liability_htr, 0)
+        self.assertEqual(
+            risk.max_il_liability_htr,
+            sum(deposits) * risk.token_b_price_in_htr // PRICE_PRECISION,
+        )
+
+        # Closing a position removes it from the aggregates
+        unlock_time = initial_time + 6 * MONTHS_IN_SECONDS + 1
+        close_ctx = self.create_context(
+            actions=[], vertex=self.tx, caller_id=user_addresses[1], timestamp=unlock_time
+        )
+        self.runner.call_public_method(self.oasis_id, "close_position", close_ctx)
+        risk = self.runner.call_view_method(self.oasis_id, "oasis_risk_info", unlock_time)
+        self.assertEqual(risk.total_deposit_b, sum(deposits) - deposits[1])
+        self.assertEqual(
+            risk.avg_token_price_in_htr_in_deposit,
+            infos[0].token_price_in_htr_in_deposit,
+        )
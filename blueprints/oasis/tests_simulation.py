@@ -0,0 +1,242 @@
+import importlib.util
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from hathor.crypto.util import decode_address
+import hathor.nanocontracts.blueprints.dozer_pool_manager as dozer_pool_manager_module
+import hathor.nanocontracts.blueprints.oasis as oasis_module
+from hathor.nanocontracts.blueprints.dozer_pool_manager import DozerPoolManager
+from hathor.nanocontracts.blueprints.oasis import Oasis
+from hathor.nanocontracts.types import (
+    Address,
+    Amount,
+    NCDepositAction,
+    NCWithdrawalAction,
+    TokenUid,
+)
+from hathor.transaction.token_info import TokenVersion
+from hathor.util import not_none
+from hathor.conf import HathorSettings
+from hathor.wallet import KeyPair
+from hathor_tests.nanocontracts.blueprints.unittest import BlueprintTestCase
+
+# The simulator is an off-chain tool, not a blueprint, so it is loaded from tools/ by path
+_SIMULATION_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "tools", "oasis_simulation.py")
+_spec = importlib.util.spec_from_file_location("oasis_simulation", _SIMULATION_PATH)
+oasis_simulation = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(oasis_simulation)
+
+ScheduledDeposit = oasis_simulation.ScheduledDeposit
+SimulationConfig = oasis_simulation.SimulationConfig
+arbitrage_trade = oasis_simulation.arbitrage_trade
+gbm_price_paths = oasis_simulation.gbm_price_paths
+simulate = oasis_simulation.simulate
+
+settings = HathorSettings()
+HTR_UID = settings.HATHOR_TOKEN_UID
+OWNER_DEPOSIT = 10_000_000_00
+N_SAMPLED_PATHS = 4
+
+
+class OasisSimulationTestCase(BlueprintTestCase):
+    """Validate the off-chain simulator against the real blueprints on sampled paths."""
+
+    def setUp(self):
+        super().setUp()
+
+        self.oasis_blueprint_id = self.gen_random_blueprint_id()
+        self.oasis_id = self.gen_random_contract_id()
+        self._register_blueprint_class(Oasis, self.oasis_blueprint_id)
+
+        self.dozer_manager_blueprint_id = self.gen_random_blueprint_id()
+        self.dozer_manager_id = self.gen_random_contract_id()
+        self._register_blueprint_class(DozerPoolManager, self.dozer_manager_blueprint_id)
+
+        self.dev_address = self._get_any_address()[0]
+        self.trader_address = self._get_any_address()[0]
+        self.token_b = self.gen_random_token_uid()
+        self.create_token(self.token_b, "token_b", "TKB", TokenVersion.DEPOSIT)
+        self.usd_token = self.gen_random_token_uid()
+        self.create_token(self.usd_token, "usd", "USD", TokenVersion.DEPOSIT)
+        self.pool_fee = Amount(3)
+        self.tx = [t for t in self.manager.tx_storage.get_all_genesis() if t.is_transaction][0]
+
+        self.config = SimulationConfig(
+            reserve_htr=1_000_000_00,
+            reserve_b=7_000_000_00,
+            deposits=[
+                ScheduledDeposit(step=1, amount=1_000_00, timelock=6),
+                ScheduledDeposit(step=2, amount=2_500_00, timelock=6),
+                ScheduledDeposit(step=5, amount=700_00, timelock=9),
+                ScheduledDeposit(step=5, amount=4_000_00, timelock=12),
+            ],
+            n_steps=5 + 360,
+            volatility=1.5,
+            step_seconds=24 * 60 * 60,
+            start_timestamp=int(self.clock.seconds()),
+            pool_fee=int(self.pool_fee),
+        )
+
+    def _get_any_address(self) -> tuple[Address, KeyPair]:
+        key = KeyPair.create(os.urandom(12))
+        return Address(decode_address(not_none(key.address))), key
+
+    def _call(self, contract_id, method: str, caller, timestamp: int, *args, actions=None):
+        ctx = self.create_context(
+            actions=actions or [],
+            vertex=self.tx,
+            caller_id=caller,
+            timestamp=timestamp,
+        )
+        return self.runner.call_public_method(contract_id, method, ctx, *args)
+
+    def _setup_contracts(self) -> None:
+        start = self.config.start_timestamp
+        ctx = self.create_context(actions=[], vertex=self.tx, caller_id=self.dev_address, timestamp=start)
+        self.runner.create_contract(self.dozer_manager_id, self.dozer_manager_blueprint_id, ctx)
+
+        # HTR-USD reference pool, required for the HTR price read in user_deposit
+        self._call(
+            self.dozer_manager_id, "create_pool", self.dev_address, start, Amount(3),
+            actions=[
+                NCDepositAction(token_uid=TokenUid(HTR_UID), amount=1000_00),
+                NCDepositAction(token_uid=self.usd_token, amount=500_00),
+            ],
+        )
+        self._call(self.dozer_manager_id, "set_htr_usd_pool", self.dev_address, start, HTR_UID, self.usd_token, Amount(3))
+        self._call(self.dozer_manager_id, "sign_pool", self.dev_address, start, HTR_UID, self.usd_token, Amount(3))
+
+        self._call(
+            self.dozer_manager_id, "create_pool", self.dev_address, start, self.pool_fee,
+            actions=[
+                NCDepositAction(token_uid=TokenUid(HTR_UID), amount=self.config.reserve_htr),
+                NCDepositAction(token_uid=self.token_b, amount=self.config.reserve_b),
+            ],
+        )
+
+        ctx = self.create_context(
+            actions=[NCDepositAction(token_uid=HTR_UID, amount=OWNER_DEPOSIT)],  # type: ignore
+            vertex=self.tx,
+            caller_id=self.dev_address,
+            timestamp=start,
+        )
+        self.runner.create_contract(
+            self.oasis_id, self.oasis_blueprint_id, ctx,
+            self.dozer_manager_id, self.token_b, self.pool_fee, self.config.oasis_protocol_fee,
+        )
+
+    def _arbitrage(self, timestamp: int, target_price: float) -> None:
+        reserve_a, reserve_b = self.runner.call_view_method(
+            self.dozer_manager_id, "get_reserves", HTR_UID, self.token_b, self.pool_fee
+        )
+        htr_in, b_in = arbitrage_trade(
+            np.array([reserve_a], dtype=object),
+            np.array([reserve_b], dtype=object),
+            np.array([target_price]),
+            self.config.pool_fee,
+        )
+        if htr_in[0] > 0:
+            token_in, amount_in, token_out, reserve_in, reserve_out = HTR_UID, int(htr_in[0]), self.token_b, reserve_a, reserve_b
+        elif b_in[0] > 0:
+            token_in, amount_in, token_out, reserve_in, reserve_out = self.token_b, int(b_in[0]), HTR_UID, reserve_b, reserve_a
+        else:
+            return
+
+        amount_out = self.runner.call_view_method(
+            self.dozer_manager_id, "get_amount_out", amount_in, reserve_in, reserve_out, self.pool_fee, 1000
+        )
+        self._call(
+            self.dozer_manager_id, "swap_exact_tokens_for_tokens", self.trader_address, timestamp,
+            self.pool_fee, timestamp,
+            actions=[
+                NCDepositAction(token_uid=TokenUid(token_in), amount=amount_in),
+                NCWithdrawalAction(token_uid=TokenUid(token_out), amount=amount_out),
+            ],
+        )
+
+    def _run_blueprint_path(self, target_prices) -> tuple[list, int, int]:
+        """Replay one price path through the real contracts.
+
+        Returns (per-user closed user_info, final oasis_htr_balance, total bonus paid).
+        """
+        self._setup_contracts()
+        config = self.config
+        users = [self._get_any_address()[0] for _ in config.deposits]
+        closes: dict[int, list[int]] = {}
+        for user, deposit in enumerate(config.deposits):
+            unlock_step = deposit.step + -(-deposit.timelock * 30 * 24 * 60 * 60 // config.step_seconds)
+            closes.setdefault(unlock_step, []).append(user)
+
+        for step in range(1, config.n_steps + 1):
+            timestamp = config.start_timestamp + step * config.step_seconds
+            for user in closes.get(step, []):
+                self._call(self.oasis_id, "close_position", users[user], timestamp)
+            for user, deposit in enumerate(config.deposits):
+                if deposit.step == step:
+                    self._call(
+                        self.oasis_id, "user_deposit", users[user], timestamp, deposit.timelock,
+                        actions=[NCDepositAction(token_uid=self.token_b, amount=deposit.amount)],
+                    )
+            self._arbitrage(timestamp, float(target_prices[step - 1]))
+
+        end = config.start_timestamp + config.n_steps * config.step_seconds
+        infos = [self.runner.call_view_method(self.oasis_id, "user_info", user, end) for user in users]
+        risk = self.runner.call_view_method(self.oasis_id, "oasis_risk_info", end)
+        return infos, risk.oasis_htr_balance, risk.total_bonus_paid
+
+    def _assert_path_matches(self, path: int) -> None:
+        prices = gbm_price_paths(self.config, N_SAMPLED_PATHS, np.random.default_rng(2024))
+        target_prices = prices[:, path:path + 1]
+        result = simulate(self.config, 1, target_prices=target_prices)
+
+        infos, oasis_htr_balance, total_bonus_paid = self._run_blueprint_path(target_prices[:, 0])
+
+        self.assertEqual(OWNER_DEPOSIT - result.final_net_cost[0], oasis_htr_balance)
+        self.assertEqual(result.total_bonus[0], total_bonus_paid)
+        for user, info in enumerate(infos):
+            self.assertTrue(info.position_closed)
+            self.assertEqual(result.user_closed_balance_b[user][0], info.closed_balance_b)
+        # Bonus plus IL compensation ends up in the closed HTR balances
+        self.assertEqual(
+            sum(info.closed_balance_a for info in infos),
+            result.total_bonus[0] + result.total_il_compensation[0],
+        )
+
+    def test_simulator_matches_blueprint_path_0(self):
+        self._assert_path_matches(0)
+
+    def test_simulator_matches_blueprint_path_1(self):
+        self._assert_path_matches(1)
+
+    def test_simulator_matches_blueprint_path_2(self):
+        self._assert_path_matches(2)
+
+    def test_simulator_matches_blueprint_path_3(self):
+        self._assert_path_matches(3)
+
+    def test_simulation_batch_shapes(self):
+        result = simulate(self.config, 64, seed=7)
+        self.assertEqual(result.required_treasury.shape, (64,))
+        self.assertEqual(result.user_il_compensation.shape, (len(self.config.deposits), 64))
+        self.assertTrue((result.required_treasury >= result.total_bonus).all())
+
+    def test_simulator_constants_match_blueprints(self):
+        """The constants hand-copied into the simulator must track the blueprints."""
+        self.assertEqual(oasis_simulation.PRECISION, oasis_module.PRECISION)
+        self.assertEqual(oasis_simulation.PRICE_PRECISION, oasis_module.PRICE_PRECISION)
+        self.assertEqual(oasis_simulation.MONTHS_IN_SECONDS, oasis_module.MONTHS_IN_SECONDS)
+        self.assertEqual(oasis_simulation.MINIMUM_LIQUIDITY, dozer_pool_manager_module.MINIMUM_LIQUIDITY)
+        for timelock, bonus_bps in oasis_simulation.BONUS_MULTIPLIER.items():
+            # _get_user_bonus does not touch contract state, so it can be called unbound
+            self.assertEqual(Oasis._get_user_bonus(None, timelock, Amount(10000)), bonus_bps)
+
+        self._setup_contracts()
+        dozer = self.get_readonly_contract(self.dozer_manager_id)
+        assert isinstance(dozer, DozerPoolManager)
+        self.assertEqual(oasis_simulation.DEFAULT_PROTOCOL_FEE, dozer.default_protocol_fee)
+        self.assertEqual(oasis_simulation.DEFAULT_TWAP_WINDOW, dozer.default_twap_window)
+        pool = dozer.pools[dozer.all_pools[0]]
+        self.assertEqual(oasis_simulation.FEE_DENOMINATOR, pool.fee_denominator)
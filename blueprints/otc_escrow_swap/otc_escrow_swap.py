@@ -32,6 +32,14 @@ from hathor import (
 MAX_PROTOCOL_FEE_BPS = 200  # 2.00%
 
 
+#
+# === BATCH CONSTANTS ===
+#
+
+MAX_BATCH_ESCROWS = 50      # open_escrows_batch() size limit
+MAX_PAGE_SCAN = 1000        # entries a paged view may skip (archived / expired) before returning a short page
+
+
 #
 # === EXPIRY CONSTANTS (defaults; can be overridden at initialize / by owner) ===
 #
@@ -41,6 +49,8 @@ DEFAULT_MAKER_FUNDED_EXPIRY_SECS = 7 * 24 * 60 * 60   # 7 days
 DEFAULT_MIN_EXPIRY_SECS = 60                           # 1 minute
 DEFAULT_MAX_EXPIRY_SECS = 365 * 24 * 60 * 60          # 365 days
 
+EXPIRY_BUCKET_SECS = 60 * 60                           # expiry index bucket width (1 hour)
+
 
 #
 # === STATUS CONSTANTS ===
@@ -55,6 +65,93 @@ STATUS_REFUNDED = 5        # terminal: all funded sides refunded after expiry
 STATUS_CANCELLED = -2      # maker cancelled before any funding
 
 
+#
+# === ESCROW RECORD FLAGS (bitfield in EscrowRecord.flags) ===
+#
+
+FLAG_DIRECTED = 1 << 0         # only directed_taker may accept/fund
+FLAG_HAS_TAKER = 1 << 1        # taker has accepted; EscrowRecord.taker is meaningful
+FLAG_MAKER_FUNDED = 1 << 2
+FLAG_TAKER_FUNDED = 1 << 3
+FLAG_MAKER_WITHDRAWN = 1 << 4
+FLAG_TAKER_WITHDRAWN = 1 << 5
+FLAG_MAKER_REFUNDED = 1 << 6
+FLAG_TAKER_REFUNDED = 1 << 7
+
+
+#
+# === STORAGE TYPES ===
+#
+
+class EscrowRecord(NamedTuple):
+    """All per-escrow state, read and written as a single storage entry."""
+    maker: Address
+    taker: Address              # equals maker until FLAG_HAS_TAKER is set
+    directed_taker: Address     # equals maker unless FLAG_DIRECTED is set
+    maker_token: TokenUid
+    maker_amount: int
+    taker_token: TokenUid
+    taker_amount: int
+    open_expiry_timestamp: int
+    maker_funded_expiry_timestamp: int  # 0 until the maker side is funded
+    status: int
+    flags: int
+    closed_timestamp: int       # block timestamp of the terminal transition; 0 while live
+
+
+class ArchivedEscrow(NamedTuple):
+    """Compact record kept for a terminal escrow after compaction."""
+    terms_fingerprint: int      # FNV-1a 64-bit over parties, tokens, amounts and open expiry
+    maker: Address
+    status: int                 # final status (EXECUTED / REFUNDED / CANCELLED)
+    closed_timestamp: int       # 0 if the escrow closed before closed_timestamp was tracked
+
+
+class PartialFillRecord(NamedTuple):
+    """
+    A maker-funded order filled in portions by any number of takers at a fixed price.
+
+    Fill history is kept as running totals; each fill is its own transaction on chain.
+    """
+    maker: Address
+    maker_token: TokenUid
+    maker_amount: int           # total size deposited at open
+    taker_token: TokenUid
+    taker_amount: int           # taker_token asked for the full size (fixes the price)
+    min_fill_amount: int        # smallest maker_token fill, except the final one
+    expiry_timestamp: int       # fills are rejected from this timestamp on
+    filled_maker_amount: int    # maker_token sold so far (gross of fees)
+    filled_taker_amount: int    # taker_token paid so far (gross of fees)
+    maker_claimable: int        # taker_token proceeds, net of fees, not yet claimed by the maker
+    fill_count: int
+    last_fill_timestamp: int
+    status: int                 # STATUS_OPEN, STATUS_EXECUTED (fully filled) or STATUS_CANCELLED
+
+
+class ExpiryEntry(NamedTuple):
+    """Expiry-index entry: an escrow and the expiry of its current stage."""
+    expiry_timestamp: int
+    escrow_id: int
+
+
+class EscrowTerms(NamedTuple):
+    """One escrow of an open_escrows_batch() call; directed_taker None opens a public escrow."""
+    maker_token: TokenUid
+    maker_amount: int
+    taker_token: TokenUid
+    taker_amount: int
+    expiry_timestamp: int       # 0 = default open expiry, else absolute unix timestamp
+    directed_taker: Address | None
+
+
+class OpenOrderEntry(NamedTuple):
+    """Open-book entry for a public escrow with no taker; stale once accepted, closed or expired."""
+    escrow_id: int
+    maker_amount: int
+    taker_amount: int
+    open_expiry_timestamp: int
+
+
 #
 # === VIEW RETURN TYPES (JSON-friendly) ===
 #
@@ -126,6 +223,67 @@ class EscrowIdsPage(NamedTuple):
     next_cursor: int
     ids: list[int]
 
+class EscrowsFullPage(NamedTuple):
+    cursor_in: int
+    limit: int
+    next_cursor: int
+    ids: list[int]
+    escrows: list[EscrowDetailsFull]   # escrows[i] is the detail of ids[i]
+
+class OpenOrdersCursor(NamedTuple):
+    """Book position just after an order: its price terms and escrow id (escrow_id -1 = book start)."""
+    maker_amount: int
+    taker_amount: int
+    escrow_id: int
+
+OPEN_BOOK_START = OpenOrdersCursor(0, 0, -1)
+
+class OpenOrdersPage(NamedTuple):
+    cursor_in: OpenOrdersCursor
+    limit: int
+    next_cursor: OpenOrdersCursor  # OPEN_BOOK_START when no more data
+    orders: list[OpenOrderEntry]   # best (lowest taker_amount/maker_amount) first
+
+class ExpiringEscrowsPage(NamedTuple):
+    cursor_in: int
+    limit: int
+    next_cursor: int
+    entries: list[ExpiryEntry]   # ascending by expiry_timestamp
+
+class ArchivedEscrowView(NamedTuple):
+    terms_fingerprint: str   # 16 hex chars
+    maker: str
+    status: int              # -1 means "not archived"
+    closed_timestamp: int
+
+class PartialFillDetails(NamedTuple):
+    maker: str
+    maker_token: str
+    maker_amount: int
+    taker_token: str
+    taker_amount: int
+    min_fill_amount: int
+    expiry_timestamp: int
+    is_expired: bool
+    remaining_maker_amount: int
+    filled_maker_amount: int
+    filled_taker_amount: int
+    maker_claimable: int
+    fill_count: int
+    last_fill_timestamp: int
+    status: int                 # -1 means "not found"
+
+class PartialFillQuote(NamedTuple):
+    taker_pay: int              # taker_token to deposit for the fill
+    maker_fee: int              # fee on the maker_token fill
+    taker_fee: int              # fee on the taker_token payment
+    taker_net_receive: int      # maker_token the taker withdraws
+    maker_net_receive: int      # taker_token credited to the maker
+
+class ProtocolFeeBalance(NamedTuple):
+    token_uid: str
+    amount: int
+
 class CountersView(NamedTuple):
     total_escrows: int
     count_open: int
@@ -137,6 +295,27 @@ class CountersView(NamedTuple):
     count_cancelled: int
     count_public: int
     count_directed: int
+    count_archived: int
+    total_partial_fill_escrows: int
+
+
+#
+# === ARCHIVE CONSTANTS ===
+#
+
+TERMINAL_STATUSES = (STATUS_EXECUTED, STATUS_REFUNDED, STATUS_CANCELLED)
+FNV64_OFFSET = 0xcbf29ce484222325
+FNV64_PRIME = 0x100000001b3
+FNV64_MASK = (1 << 64) - 1
+
+
+#
+# === PAGE FILTER CONSTANTS (get_escrows_full_page) ===
+#
+
+DIRECTED_FILTER_ANY = 0
+DIRECTED_FILTER_PUBLIC = 1
+DIRECTED_FILTER_DIRECTED = 2
 
 
 #
@@ -187,6 +366,11 @@ class OtcEscrowSwap(Blueprint):
       - maker_funded_expiry_timestamp applies to STATUS_FUNDED_MAKER
       - once STATUS_FUNDED_BOTH, expiry is no longer checked (settlement expected)
       - refund() is allowed when the escrow is expired for its current stage.
+
+    Storage model:
+      - each escrow is one EscrowRecord in `escrows`, boolean state packed into `flags`
+      - the layout is not compatible with the earlier parallel-dict storage; existing
+        instances move to it by redeploying
     """
 
  # === Contract-level roles/config ===
@@ -201,38 +385,44 @@ class OtcEscrowSwap(Blueprint):
     max_expiry_secs: int
 
  # === Per-escrow state ===
-    makers: dict[int, Address]
-    takers: dict[int, Address]
-
- # Directed escrow addon
-    is_directed: dict[int, bool]            # escrow_id -> True if directed
-    directed_takers: dict[int, Address]     # escrow_id -> allowed taker if directed
-
-    maker_tokens: dict[int, TokenUid]
-    maker_amounts: dict[int, int]
-
-    taker_tokens: dict[int, TokenUid]
-    taker_amounts: dict[int, int]
-
-    maker_funded: dict[int, bool]
-    taker_funded: dict[int, bool]
-
-    maker_withdrawn: dict[int, bool]
-    taker_withdrawn: dict[int, bool]
-
-    maker_refunded: dict[int, bool]
-    taker_refunded: dict[int, bool]
-
- # Stage expiries (unix seconds; 0 means not set)
-    open_expiry_timestamps: dict[int, int]
-    maker_funded_expiry_timestamps: dict[int, int]
-
-    statuses: dict[int, int]
+    escrows: dict[int, EscrowRecord]
     next_escrow_id: int
 
- # For website paging
+ # For website paging: every escrow id, ascending. Archived ids stay as tombstones
+ # (their record lives in archived_escrows) so index cursors never shift
     escrow_ids: list[int]
 
+ # Terminal escrows moved out of `escrows` by compact_terminal_escrows()
+    archived_escrows: dict[int, ArchivedEscrow]
+    count_archived: int
+
+ # Per-party indexes (wallet "my escrows" paging)
+    maker_escrow_ids: dict[Address, list[int]]   # maker -> escrow ids they opened
+    taker_escrow_ids: dict[Address, list[int]]   # taker or current directed taker -> escrow ids
+
+ # Open-order book: "maker_token_hex/taker_token_hex" -> public escrows with no taker yet,
+ # sorted by (implied price taker_amount/maker_amount, escrow_id). Entries are inserted in
+ # place when opened and removed on accept, cancel and refund; entries whose stage expired
+ # are skipped by the view until refund_expired_batch or prune_open_book removes them
+    open_books: dict[str, list[OpenOrderEntry]]
+    open_book_cursors: dict[str, int]   # pair -> book index where prune_open_book resumes
+
+ # Stage-expiry index: bucket start timestamp -> entries expiring in that EXPIRY_BUCKET_SECS window.
+ # Entries are appended when an escrow enters OPEN/ACCEPTED (open expiry) or FUNDED_MAKER
+ # (maker-funded expiry) and deleted lazily: an entry whose expiry no longer matches the
+ # escrow's current stage is stale, skipped by views and dropped by refund_expired_batch
+    expiry_buckets: dict[int, list[ExpiryEntry]]
+    expiry_bucket_count: int    # non-empty buckets
+    expiry_scan_bucket: int     # no entries below this bucket; refund_expired_batch resumes here
+    expiry_last_bucket: int     # highest bucket ever used
+
+ # Refunds credited by refund_expired_batch: party -> token -> amount, pulled via claim_refund_credit
+    refund_credits: dict[Address, dict[TokenUid, int]]
+
+ # Partial-fill escrows (own id space, see open_partial_fill_escrow)
+    partial_fills: dict[int, PartialFillRecord]
+    next_partial_fill_id: int
+
  # === Counters (website stats) ===
     total_escrows: int
     count_open: int
@@ -247,6 +437,7 @@ class OtcEscrowSwap(Blueprint):
 
  # === Aggregated protocol fee balances (per token uid) ===
     protocol_fee_balances: dict[TokenUid, int]
+    fee_tokens: list[TokenUid]   # tokens with a nonzero protocol_fee_balances entry, unordered
 
  #
  # === INITIALIZE ===
@@ -300,36 +491,26 @@ class OtcEscrowSwap(Blueprint):
         self.max_expiry_secs = max_expiry_secs
 
  # --- Core escrow storage ---
-        self.makers = {}
-        self.takers = {}
-
- # --- Directed escrow addon storage ---
-        self.is_directed = {}
-        self.directed_takers = {}
-
-        self.maker_tokens = {}
-        self.maker_amounts = {}
-
-        self.taker_tokens = {}
-        self.taker_amounts = {}
-
-        self.maker_funded = {}
-        self.taker_funded = {}
-
-        self.maker_withdrawn = {}
-        self.taker_withdrawn = {}
-
-        self.maker_refunded = {}
-        self.taker_refunded = {}
-
-        self.open_expiry_timestamps = {}
-        self.maker_funded_expiry_timestamps = {}
-
-        self.statuses = {}
+        self.escrows = {}
         self.next_escrow_id = 0
 
         self.escrow_ids = []
 
+        self.archived_escrows = {}
+        self.count_archived = 0
+
+        self.maker_escrow_ids = {}
+        self.taker_escrow_ids = {}
+        self.open_books = {}
+        self.open_book_cursors = {}
+        self.expiry_buckets = {}
+        self.expiry_bucket_count = 0
+        self.expiry_scan_bucket = 0
+        self.expiry_last_bucket = 0
+        self.refund_credits = {}
+        self.partial_fills = {}
+        self.next_partial_fill_id = 0
+
  # --- Counters ---
         self.total_escrows = 0
         self.count_open = 0
@@ -343,6 +524,7 @@ class OtcEscrowSwap(Blueprint):
         self.count_directed = 0
 
         self.protocol_fee_balances = {}
+        self.fee_tokens = []
 
  #
  # === OWNER-ONLY ADMIN ===
@@ -426,20 +608,83 @@ class OtcEscrowSwap(Blueprint):
         elif status == STATUS_CANCELLED:
             self.count_cancelled += delta
 
-    def _set_status(self, escrow_id: int, new_status: int) -> None:
-        """Set escrow status and keep counters consistent."""
-        old_status = self.statuses.get(escrow_id)
+    def _count_status_change(self, old_status: int, new_status: int) -> None:
+        """Keep counters consistent with a status transition on a stored record."""
         if old_status == new_status:
             return
-        if old_status is not None:
-            self._inc_status_counter(old_status, -1)
-        self.statuses[escrow_id] = new_status
+        self._inc_status_counter(old_status, -1)
         self._inc_status_counter(new_status, 1)
 
-    def _maybe_finalize_status(self, escrow_id: int) -> None:
-        """Set STATUS_EXECUTED once maker and taker have withdrawn their swap outputs."""
-        if self.maker_withdrawn.get(escrow_id, False) and self.taker_withdrawn.get(escrow_id, False):
-            self._set_status(escrow_id, STATUS_EXECUTED)
+    def _has_flag(self, record: EscrowRecord, flag: int) -> bool:
+        return (record.flags & flag) != 0
+
+    def _update_record(
+        self,
+        record: EscrowRecord,
+        *,
+        taker: Address | None = None,
+        directed_taker: Address | None = None,
+        maker_funded_expiry_timestamp: int | None = None,
+        status: int | None = None,
+        set_flags: int = 0,
+        now: int = 0,
+    ) -> EscrowRecord:
+        """
+        Return a copy of record with the given mutable fields replaced and flags set.
+
+        A transition into a terminal status stamps closed_timestamp with now.
+        """
+        closed_timestamp = record.closed_timestamp
+        if status is not None:
+            self._count_status_change(record.status, status)
+            if status in TERMINAL_STATUSES and status != record.status:
+                closed_timestamp = now
+        return EscrowRecord(
+            maker=record.maker,
+            taker=record.taker if taker is None else taker,
+            directed_taker=record.directed_taker if directed_taker is None else directed_taker,
+            maker_token=record.maker_token,
+            maker_amount=record.maker_amount,
+            taker_token=record.taker_token,
+            taker_amount=record.taker_amount,
+            open_expiry_timestamp=record.open_expiry_timestamp,
+            maker_funded_expiry_timestamp=(
+                record.maker_funded_expiry_timestamp
+                if maker_funded_expiry_timestamp is None
+                else maker_funded_expiry_timestamp
+            ),
+            status=record.status if status is None else status,
+            flags=record.flags | set_flags,
+            closed_timestamp=closed_timestamp,
+        )
+
+    def _finalize_status(self, record: EscrowRecord) -> int:
+        """STATUS_EXECUTED once maker and taker have withdrawn their swap outputs."""
+        if self._has_flag(record, FLAG_MAKER_WITHDRAWN) and self._has_flag(record, FLAG_TAKER_WITHDRAWN):
+            return STATUS_EXECUTED
+        return record.status
+
+    def _accrue_protocol_fee(self, token_uid: TokenUid, amount: int) -> None:
+        if amount <= 0:
+            return
+        balance = self.protocol_fee_balances.get(token_uid, 0)
+        if balance == 0:
+            self.fee_tokens.append(token_uid)
+        self.protocol_fee_balances[token_uid] = balance + amount
+
+    def _clear_protocol_fee(self, token_uid: TokenUid) -> None:
+        """Zero a token's fee balance and drop it from fee_tokens (swap with last)."""
+        self.protocol_fee_balances[token_uid] = 0
+        tokens = self.fee_tokens
+        last = len(tokens) - 1
+        i = 0
+        while i <= last:
+            if tokens[i] == token_uid:
+                if i != last:
+                    tokens[i] = tokens[last]
+                tokens.pop()
+                return
+            i += 1
 
     def _process_withdraw(self, ctx: Context, token_uid: TokenUid, expected_amount: int) -> None:
         """Validate that this call withdraws exactly expected_amount of token_uid."""
@@ -473,28 +718,28 @@ class OtcEscrowSwap(Blueprint):
             raise InvalidConfig("Expiry timestamp exceeds max_expiry_secs from now")
         return expiry_timestamp
 
-    def _is_open_expired(self, ctx: Context, escrow_id: int) -> bool:
-        ts = self.open_expiry_timestamps.get(escrow_id, 0)
-        return (ts > 0) and (ctx.block.timestamp >= ts)
+    def _is_open_expired(self, record: EscrowRecord, timestamp: int) -> bool:
+        ts = record.open_expiry_timestamp
+        return (ts > 0) and (timestamp >= ts)
 
-    def _is_maker_funded_expired(self, ctx: Context, escrow_id: int) -> bool:
-        ts = self.maker_funded_expiry_timestamps.get(escrow_id, 0)
-        return (ts > 0) and (ctx.block.timestamp >= ts)
+    def _is_maker_funded_expired(self, record: EscrowRecord, timestamp: int) -> bool:
+        ts = record.maker_funded_expiry_timestamp
+        return (ts > 0) and (timestamp >= ts)
 
-    def _is_expired_for_current_stage(self, ctx: Context, escrow_id: int) -> bool:
-        status = self.statuses.get(escrow_id, -999)
+    def _is_expired_for_current_stage(self, record: EscrowRecord, timestamp: int) -> bool:
+        status = record.status
         if status in (STATUS_OPEN, STATUS_ACCEPTED):
-            return self._is_open_expired(ctx, escrow_id)
+            return self._is_open_expired(record, timestamp)
         if status == STATUS_FUNDED_MAKER:
-            return self._is_maker_funded_expired(ctx, escrow_id)
+            return self._is_maker_funded_expired(record, timestamp)
         # FUNDED_BOTH and later do not check expiry for settlement, but refund is blocked anyway by status checks.
         return False
 
-    def _assert_not_expired_for_actions(self, ctx: Context, escrow_id: int) -> None:
+    def _assert_not_expired_for_actions(self, ctx: Context, record: EscrowRecord) -> None:
         """
         For "forward" actions (accept, funding, withdraw), enforce stage expiry.
         """
-        if self._is_expired_for_current_stage(ctx, escrow_id):
+        if self._is_expired_for_current_stage(record, ctx.block.timestamp):
             raise InvalidEscrow("Escrow has expired")
 
     def _assert_exists(self, escrow_id: int) -> None:
@@ -503,35 +748,465 @@ class OtcEscrowSwap(Blueprint):
         if escrow_id >= self.next_escrow_id:
             raise InvalidEscrow("Escrow ID does not exist")
 
- #
- # === OPEN ESCROW (PUBLIC) ===
- #
+    def _read_escrow(self, escrow_id: int) -> EscrowRecord | None:
+        """Return the escrow record, or None if not found."""
+        if escrow_id < 0:
+            return None
+        return self.escrows.get(escrow_id)
 
-    @public
-    def open_escrow(
+    def _load_escrow(self, escrow_id: int) -> EscrowRecord:
+        """Return the escrow record for a state-changing call."""
+        self._assert_exists(escrow_id)
+        record = self.escrows.get(escrow_id)
+        if record is None:
+            if escrow_id in self.archived_escrows:
+                raise InvalidEscrow("Escrow is already closed")
+            raise InvalidEscrow("Escrow ID does not exist")
+        return record
+
+    def _index_append(self, index: dict[Address, list[int]], address: Address, escrow_id: int) -> None:
+        if address in index:
+            index[address].append(escrow_id)
+        else:
+            index[address] = [escrow_id]
+
+    def _index_remove(self, index: dict[Address, list[int]], address: Address, escrow_id: int) -> None:
+        """Remove escrow_id from address's index, keeping order (searches from the newest entry)."""
+        ids = index.get(address)
+        if ids is None:
+            return
+        n = len(ids)
+        j = n - 1
+        while j >= 0 and ids[j] != escrow_id:
+            j -= 1
+        if j < 0:
+            return
+        while j < n - 1:
+            ids[j] = ids[j + 1]
+            j += 1
+        ids.pop()
+        if n == 1:
+            del index[address]
+
+    def _pair_key(self, maker_token: TokenUid, taker_token: TokenUid) -> str:
+        return f"{maker_token.hex()}/{taker_token.hex()}"
+
+    def _book_lt(self, a: OpenOrderEntry, b: OpenOrderEntry) -> bool:
+        """Book order: lower implied price (taker_amount/maker_amount) first, then lower escrow id."""
+        lhs = a.taker_amount * b.maker_amount
+        rhs = b.taker_amount * a.maker_amount
+        if lhs != rhs:
+            return lhs < rhs
+        return a.escrow_id < b.escrow_id
+
+    def _book_lower_bound(self, book: list[OpenOrderEntry], probe: OpenOrderEntry) -> int:
+        """First index whose entry does not sort before probe."""
+        lo = 0
+        hi = len(book)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._book_lt(book[mid], probe):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _book_entry(self, escrow_id: int, record: EscrowRecord) -> OpenOrderEntry:
+        return OpenOrderEntry(
+            escrow_id=escrow_id,
+            maker_amount=record.maker_amount,
+            taker_amount=record.taker_amount,
+            open_expiry_timestamp=record.open_expiry_timestamp,
+        )
+
+    def _book_insert(self, escrow_id: int, record: EscrowRecord) -> None:
+        """Insert a public escrow into its pair book at its sorted position."""
+        entry = self._book_entry(escrow_id, record)
+        key = self._pair_key(record.maker_token, record.taker_token)
+        if key not in self.open_books:
+            self.open_books[key] = [entry]
+            return
+
+        book = self.open_books[key]
+        n = len(book)
+        j = self._book_lower_bound(book, entry)
+        book.append(entry)
+        while n > j:
+            book[n] = book[n - 1]
+            n -= 1
+        book[j] = entry
+
+    def _book_listed(self, record: EscrowRecord) -> bool:
+        """True while the escrow sits in its pair book: public, no taker, OPEN or FUNDED_MAKER."""
+        if record.status not in (STATUS_OPEN, STATUS_FUNDED_MAKER):
+            return False
+        return not self._has_flag(record, FLAG_DIRECTED) and not self._has_flag(record, FLAG_HAS_TAKER)
+
+    def _book_remove_if_listed(self, escrow_id: int, record: EscrowRecord) -> None:
+        """Remove the escrow from its pair book, keeping order; record is its state before the change."""
+        if not self._book_listed(record):
+            return
+        key = self._pair_key(record.maker_token, record.taker_token)
+        book = self.open_books.get(key)
+        if book is None:
+            return
+        n = len(book)
+        j = self._book_lower_bound(book, self._book_entry(escrow_id, record))
+        if j >= n or book[j].escrow_id != escrow_id:
+            return  # already pruned after expiring
+        while j < n - 1:
+            book[j] = book[j + 1]
+            j += 1
+        book.pop()
+        if n == 1:
+            del self.open_books[key]
+            if key in self.open_book_cursors:
+                del self.open_book_cursors[key]
+
+    def _book_entry_live(self, entry: OpenOrderEntry, timestamp: int) -> bool:
+        """
+        True while a taker can still take the entry's escrow. Listed escrows are public,
+        OPEN or FUNDED_MAKER (maker already funded) and have no taker, so only the
+        current stage's expiry is left to check.
+        """
+        record = self.escrows.get(entry.escrow_id)
+        if record is None:
+            return False
+        return not self._is_expired_for_current_stage(record, timestamp)
+
+    def _empty_escrow_full(self) -> EscrowDetailsFull:
+        return EscrowDetailsFull(
+            maker="",
+            taker="",
+            maker_token="",
+            maker_amount=0,
+            taker_token="",
+            taker_amount=0,
+            maker_funded=False,
+            taker_funded=False,
+            maker_withdrawn=False,
+            taker_withdrawn=False,
+            maker_refunded=False,
+            taker_refunded=False,
+            open_expiry_timestamp=0,
+            maker_funded_expiry_timestamp=0,
+            is_open_expired=False,
+            is_maker_funded_expired=False,
+            is_expired=False,
+            is_directed=False,
+            directed_taker="",
+            is_cancelled=False,
+            is_refunded=False,
+            status=-1,
+        )
+
+    def _archived_escrow_full(self, archived: ArchivedEscrow) -> EscrowDetailsFull:
+        executed = archived.status == STATUS_EXECUTED
+        refunded = archived.status == STATUS_REFUNDED
+        return EscrowDetailsFull(
+            maker=str(archived.maker),
+            taker="",
+            maker_token="",
+            maker_amount=0,
+            taker_token="",
+            taker_amount=0,
+            maker_funded=archived.status != STATUS_CANCELLED,
+            taker_funded=executed,
+            maker_withdrawn=executed,
+            taker_withdrawn=executed,
+            maker_refunded=refunded,
+            taker_refunded=False,
+            open_expiry_timestamp=0,
+            maker_funded_expiry_timestamp=0,
+            is_open_expired=False,
+            is_maker_funded_expired=False,
+            is_expired=False,
+            is_directed=False,
+            directed_taker="",
+            is_cancelled=(archived.status == STATUS_CANCELLED),
+            is_refunded=refunded,
+            status=archived.status,
+        )
+
+    def _fingerprint_hex(self, fingerprint: int) -> str:
+        digits = "0123456789abcdef"
+        out = ""
+        i = 0
+        while i < 16:
+            out = digits[fingerprint & 0xF] + out
+            fingerprint >>= 4
+            i += 1
+        return out
+
+    def _build_escrow_full(self, record: EscrowRecord, current_timestamp: int) -> EscrowDetailsFull:
+        status = record.status
+        directed = self._has_flag(record, FLAG_DIRECTED)
+
+        return EscrowDetailsFull(
+            maker=str(record.maker),
+            taker=str(record.taker) if self._has_flag(record, FLAG_HAS_TAKER) else "",
+            maker_token=record.maker_token.hex(),
+            maker_amount=record.maker_amount,
+            taker_token=record.taker_token.hex(),
+            taker_amount=record.taker_amount,
+            maker_funded=self._has_flag(record, FLAG_MAKER_FUNDED),
+            taker_funded=self._has_flag(record, FLAG_TAKER_FUNDED),
+            maker_withdrawn=self._has_flag(record, FLAG_MAKER_WITHDRAWN),
+            taker_withdrawn=self._has_flag(record, FLAG_TAKER_WITHDRAWN),
+            maker_refunded=self._has_flag(record, FLAG_MAKER_REFUNDED),
+            taker_refunded=self._has_flag(record, FLAG_TAKER_REFUNDED),
+            open_expiry_timestamp=record.open_expiry_timestamp,
+            maker_funded_expiry_timestamp=record.maker_funded_expiry_timestamp,
+            is_open_expired=self._is_open_expired(record, current_timestamp),
+            is_maker_funded_expired=self._is_maker_funded_expired(record, current_timestamp),
+            is_expired=self._is_expired_for_current_stage(record, current_timestamp),
+            is_directed=directed,
+            directed_taker=str(record.directed_taker) if directed else "",
+            is_cancelled=(status == STATUS_CANCELLED),
+            is_refunded=(status == STATUS_REFUNDED),
+            status=status,
+        )
+
+    def _fnv_mix_bytes(self, h: int, data: bytes) -> int:
+        for b in data:
+            h = ((h ^ b) * FNV64_PRIME) & FNV64_MASK
+        return h
+
+    def _fnv_mix_int(self, h: int, value: int) -> int:
+        """Mix a non-negative integer as 8 little-endian bytes."""
+        i = 0
+        while i < 8:
+            h = ((h ^ (value & 0xFF)) * FNV64_PRIME) & FNV64_MASK
+            value >>= 8
+            i += 1
+        return h
+
+    def _terms_fingerprint(self, record: EscrowRecord) -> int:
+        """Deterministic 64-bit fingerprint of the escrow terms, recomputable off-chain."""
+        h = FNV64_OFFSET
+        h = self._fnv_mix_bytes(h, bytes(record.maker))
+        h = self._fnv_mix_bytes(h, bytes(record.taker) if self._has_flag(record, FLAG_HAS_TAKER) else b"")
+        h = self._fnv_mix_bytes(h, bytes(record.maker_token))
+        h = self._fnv_mix_int(h, record.maker_amount)
+        h = self._fnv_mix_bytes(h, bytes(record.taker_token))
+        h = self._fnv_mix_int(h, record.taker_amount)
+        h = self._fnv_mix_int(h, record.open_expiry_timestamp)
+        return h
+
+    def _stage_expiry(self, record: EscrowRecord) -> int:
+        """Expiry of the record's current stage, or 0 if the stage does not expire."""
+        if record.status in (STATUS_OPEN, STATUS_ACCEPTED):
+            return record.open_expiry_timestamp
+        if record.status == STATUS_FUNDED_MAKER:
+            return record.maker_funded_expiry_timestamp
+        return 0
+
+    def _expiry_bucket(self, timestamp: int) -> int:
+        return timestamp - timestamp % EXPIRY_BUCKET_SECS
+
+    def _expiry_entry_live(self, entry: ExpiryEntry) -> bool:
+        """An expiry entry is live while its escrow is unarchived and still in the stage it indexes."""
+        record = self.escrows.get(entry.escrow_id)
+        return record is not None and self._stage_expiry(record) == entry.expiry_timestamp
+
+    def _expiry_insert(self, escrow_id: int, expiry_timestamp: int) -> None:
+        if expiry_timestamp <= 0:
+            return
+        bucket = self._expiry_bucket(expiry_timestamp)
+        entry = ExpiryEntry(expiry_timestamp=expiry_timestamp, escrow_id=escrow_id)
+        entries = self.expiry_buckets.get(bucket)
+        if entries is not None:
+            entries.append(entry)
+            return
+        self.expiry_buckets[bucket] = [entry]
+        if self.expiry_bucket_count == 0 or bucket < self.expiry_scan_bucket:
+            self.expiry_scan_bucket = bucket
+        if bucket > self.expiry_last_bucket:
+            self.expiry_last_bucket = bucket
+        self.expiry_bucket_count += 1
+
+    def _sync_expiry_index(self, escrow_id: int, old: EscrowRecord, new: EscrowRecord) -> None:
+        """Index the escrow's new stage expiry; the old entry goes stale and is dropped lazily."""
+        old_ts = self._stage_expiry(old)
+        new_ts = self._stage_expiry(new)
+        if old_ts == new_ts:
+            return
+        self._expiry_insert(escrow_id, new_ts)
+
+    def _credit_refund(self, party: Address, token_uid: TokenUid, amount: int) -> None:
+        if party not in self.refund_credits:
+            self.refund_credits[party] = {token_uid: amount}
+            return
+        credits = self.refund_credits[party]
+        credits[token_uid] = credits.get(token_uid, 0) + amount
+
+    def _partial_fill_amounts(self, order: PartialFillRecord, fill_amount: int) -> PartialFillQuote:
+        """
+        Price a maker_token fill against the order's fixed price.
+
+        The taker payment is the ceil of the cumulative price minus what was already paid, so
+        rounding always favours the maker and a complete fill pays exactly taker_amount.
+        """
+        filled = order.filled_maker_amount + fill_amount
+        cumulative_pay = (filled * order.taker_amount + order.maker_amount - 1) // order.maker_amount
+        taker_pay = cumulative_pay - order.filled_taker_amount
+        maker_fee = self._ceil_fee(fill_amount)
+        taker_fee = self._ceil_fee(taker_pay)
+        return PartialFillQuote(
+            taker_pay=taker_pay,
+            maker_fee=maker_fee,
+            taker_fee=taker_fee,
+            taker_net_receive=fill_amount - maker_fee,
+            maker_net_receive=taker_pay - taker_fee,
+        )
+
+    def _load_partial_fill(self, fill_id: int) -> PartialFillRecord:
+        order = self.partial_fills.get(fill_id)
+        if order is None:
+            raise InvalidEscrow("Partial-fill escrow does not exist")
+        return order
+
+    def _update_partial_fill(
         self,
-        ctx: Context,
+        order: PartialFillRecord,
+        *,
+        filled_maker_amount: int | None = None,
+        filled_taker_amount: int | None = None,
+        maker_claimable: int | None = None,
+        fill_count: int | None = None,
+        last_fill_timestamp: int | None = None,
+        status: int | None = None,
+    ) -> PartialFillRecord:
+        """Return a copy of order with the given mutable fields replaced."""
+        return PartialFillRecord(
+            maker=order.maker,
+            maker_token=order.maker_token,
+            maker_amount=order.maker_amount,
+            taker_token=order.taker_token,
+            taker_amount=order.taker_amount,
+            min_fill_amount=order.min_fill_amount,
+            expiry_timestamp=order.expiry_timestamp,
+            filled_maker_amount=order.filled_maker_amount if filled_maker_amount is None else filled_maker_amount,
+            filled_taker_amount=order.filled_taker_amount if filled_taker_amount is None else filled_taker_amount,
+            maker_claimable=order.maker_claimable if maker_claimable is None else maker_claimable,
+            fill_count=order.fill_count if fill_count is None else fill_count,
+            last_fill_timestamp=order.last_fill_timestamp if last_fill_timestamp is None else last_fill_timestamp,
+            status=order.status if status is None else status,
+        )
+
+    def _escrow_matches(self, escrow_id: int, statuses: list[int], directed_filter: int, token_filter: str) -> bool:
+        """get_escrows_full_page filters; archived escrows never match."""
+        record = self._read_escrow(escrow_id)
+        if record is None:
+            return False
+        if len(statuses) > 0 and record.status not in statuses:
+            return False
+        directed = self._has_flag(record, FLAG_DIRECTED)
+        if directed_filter == DIRECTED_FILTER_PUBLIC and directed:
+            return False
+        if directed_filter == DIRECTED_FILTER_DIRECTED and not directed:
+            return False
+        if token_filter != "" and token_filter not in (record.maker_token.hex(), record.taker_token.hex()):
+            return False
+        return True
+
+    def _check_page_limit(self, limit: int) -> None:
+        if limit <= 0:
+            raise InvalidConfig("limit must be > 0")
+        if limit > 200:
+            raise InvalidConfig("limit too large")
+
+    def _page_ids(self, source: list[int], cursor: int, limit: int) -> EscrowIdsPage:
+        """
+        Page through an escrow-id list.
+
+        NOTE: Avoid list slicing in PythonVM (some environments reject slicing on typed lists).
+        """
+        if cursor < 0:
+            cursor = 0
+        self._check_page_limit(limit)
+
+        total = len(source)
+        if cursor >= total:
+            return EscrowIdsPage(cursor_in=cursor, limit=limit, next_cursor=0, ids=[])
+
+        end = cursor + limit
+        if end > total:
+            end = total
+
+        ids: list[int] = []
+        i = cursor
+        while i < end:
+            ids.append(source[i])
+            i += 1
+
+        next_cursor = 0 if end >= total else end
+        return EscrowIdsPage(cursor_in=cursor, limit=limit, next_cursor=next_cursor, ids=ids)
+
+    def _check_terms(
+        self,
+        maker: Address,
         maker_token: TokenUid,
         maker_amount: int,
         taker_token: TokenUid,
         taker_amount: int,
-    ) -> int:
+        directed_taker: Address | None,
+    ) -> None:
+        if directed_taker is not None and directed_taker == maker:
+            raise InvalidConfig("Maker and directed taker must be different identities")
+        if maker_amount <= 0:
+            raise InvalidConfig("Maker amount must be > 0")
+        if taker_amount <= 0:
+            raise InvalidConfig("Taker amount must be > 0")
+        if maker_token == taker_token:
+            raise InvalidConfig("Maker and taker tokens must differ")
+
+    def _store_new_escrow(
+        self,
+        escrow_id: int,
+        maker: Address,
+        maker_token: TokenUid,
+        maker_amount: int,
+        taker_token: TokenUid,
+        taker_amount: int,
+        open_expiry_ts: int,
+        directed_taker: Address | None,
+        maker_funded_expiry_ts: int,
+    ) -> None:
         """
-        Open escrow using the contract's default open expiry.
+        Write a new escrow record and index it; counters are left to the caller.
 
-        NOTE: Open escrows always get an expiry by default.
+        maker_funded_expiry_ts > 0 stores the escrow as already maker-funded (STATUS_FUNDED_MAKER).
         """
-        return self.open_escrow_with_expiry(
-            ctx=ctx,
+        funded = maker_funded_expiry_ts > 0
+        flags = 0 if directed_taker is None else FLAG_DIRECTED
+        if funded:
+            flags |= FLAG_MAKER_FUNDED
+        record = EscrowRecord(
+            maker=maker,
+            taker=maker,
+            directed_taker=maker if directed_taker is None else directed_taker,
             maker_token=maker_token,
             maker_amount=maker_amount,
             taker_token=taker_token,
             taker_amount=taker_amount,
-            expiry_timestamp=0,  # 0 = use default
+            open_expiry_timestamp=open_expiry_ts,
+            maker_funded_expiry_timestamp=maker_funded_expiry_ts,
+            status=STATUS_FUNDED_MAKER if funded else STATUS_OPEN,
+            flags=flags,
+            closed_timestamp=0,
         )
+        self.escrows[escrow_id] = record
+        if directed_taker is None:
+            self._book_insert(escrow_id, record)
+        self._expiry_insert(escrow_id, self._stage_expiry(record))
 
-    @public
-    def open_escrow_with_expiry(
+        self.escrow_ids.append(escrow_id)
+        self._index_append(self.maker_escrow_ids, maker, escrow_id)
+        if directed_taker is not None:
+            self._index_append(self.taker_escrow_ids, directed_taker, escrow_id)
+
+    def _create_escrow(
         self,
         ctx: Context,
         maker_token: TokenUid,
@@ -539,90 +1214,76 @@ class OtcEscrowSwap(Blueprint):
         taker_token: TokenUid,
         taker_amount: int,
         expiry_timestamp: int,
+        directed_taker: Address | None,
+        fund_maker: bool = False,
     ) -> int:
         """
-        Open escrow with an explicit expiry timestamp.
+        Validate terms and store a new escrow record.
 
-        Convention:
-          - expiry_timestamp == 0 => use default_open_expiry_secs from "now"
-          - else => absolute unix timestamp, validated against min/max bounds
+        With fund_maker the call must deposit exactly maker_amount of maker_token and the escrow
+        is stored as STATUS_FUNDED_MAKER, as if fund_maker() had followed in the same call.
         """
         maker = self._get_caller_id(ctx)
-
-        if maker_amount <= 0:
-            raise InvalidConfig("Maker amount must be > 0")
-        if taker_amount <= 0:
-            raise InvalidConfig("Taker amount must be > 0")
-        if maker_token == taker_token:
-            raise InvalidConfig("Maker and taker tokens must differ")
+        self._check_terms(maker, maker_token, maker_amount, taker_token, taker_amount, directed_taker)
 
         open_expiry_ts = self._validate_expiry_timestamp_or_default(ctx, expiry_timestamp)
 
-        escrow_id = self.next_escrow_id
-        self.makers[escrow_id] = maker
-
-        # Public escrow: not directed
-        self.is_directed[escrow_id] = False
-        if escrow_id in self.directed_takers:
-            del self.directed_takers[escrow_id]
-        if escrow_id in self.takers:
-            del self.takers[escrow_id]
-
-        self.maker_tokens[escrow_id] = maker_token
-        self.maker_amounts[escrow_id] = maker_amount
-
-        self.taker_tokens[escrow_id] = taker_token
-        self.taker_amounts[escrow_id] = taker_amount
-
-        self.maker_funded[escrow_id] = False
-        self.taker_funded[escrow_id] = False
-
-        self.maker_withdrawn[escrow_id] = False
-        self.taker_withdrawn[escrow_id] = False
-
-        self.maker_refunded[escrow_id] = False
-        self.taker_refunded[escrow_id] = False
-
-        self.open_expiry_timestamps[escrow_id] = open_expiry_ts
-        self.maker_funded_expiry_timestamps[escrow_id] = 0
-
-        self._set_status(escrow_id, STATUS_OPEN)
+        maker_funded_expiry_ts = 0
+        if fund_maker:
+            if set(ctx.actions.keys()) != {maker_token}:
+                raise InvalidToken("Deposit must include exactly the expected token")
+            action = ctx.get_single_action(maker_token)
+            if not isinstance(action, NCDepositAction):
+                raise InvalidActions("Maker funding must be a deposit")
+            if action.amount != maker_amount:
+                raise InvalidActions("Incorrect maker deposit amount")
+            maker_funded_expiry_ts = ctx.block.timestamp + self.default_maker_funded_expiry_secs
 
+        escrow_id = self.next_escrow_id
+        self._store_new_escrow(
+            escrow_id, maker, maker_token, maker_amount, taker_token, taker_amount,
+            open_expiry_ts, directed_taker, maker_funded_expiry_ts,
+        )
         self.next_escrow_id = escrow_id + 1
-        self.escrow_ids.append(escrow_id)
 
  # Counters
+        self._inc_status_counter(STATUS_FUNDED_MAKER if fund_maker else STATUS_OPEN, 1)
         self.total_escrows += 1
-        self.count_public += 1
+        if directed_taker is None:
+            self.count_public += 1
+        else:
+            self.count_directed += 1
         return escrow_id
 
  #
- # === OPEN ESCROW (DIRECTED) ===
+ # === OPEN ESCROW (PUBLIC) ===
  #
 
     @public
-    def open_escrow_directed(
+    def open_escrow(
         self,
         ctx: Context,
         maker_token: TokenUid,
         maker_amount: int,
         taker_token: TokenUid,
         taker_amount: int,
-        directed_taker: Address,
     ) -> int:
-        """Open directed escrow using the contract's default open expiry."""
-        return self.open_escrow_directed_with_expiry(
+        """
+        Open escrow using the contract's default open expiry.
+
+        NOTE: Open escrows always get an expiry by default.
+        """
+        return self.open_escrow_with_expiry(
             ctx=ctx,
             maker_token=maker_token,
             maker_amount=maker_amount,
             taker_token=taker_token,
             taker_amount=taker_amount,
             expiry_timestamp=0,  # 0 = use default
-            directed_taker=directed_taker,
         )
 
     @public
-    def open_escrow_directed_with_expiry(
+    def open_escrow_with_expiry(
         self,
         ctx: Context,
         maker_token: TokenUid,
@@ -630,7 +1291,53 @@ class OtcEscrowSwap(Blueprint):
         taker_token: TokenUid,
         taker_amount: int,
         expiry_timestamp: int,
-        directed_taker: Address,
+    ) -> int:
+        """
+        Open escrow with an explicit expiry timestamp.
+
+        Convention:
+          - expiry_timestamp == 0 => use default_open_expiry_secs from "now"
+          - else => absolute unix timestamp, validated against min/max bounds
+        """
+        return self._create_escrow(
+            ctx, maker_token, maker_amount, taker_token, taker_amount, expiry_timestamp, None
+        )
+
+ #
+ # === OPEN ESCROW (DIRECTED) ===
+ #
+
+    @public
+    def open_escrow_directed(
+        self,
+        ctx: Context,
+        maker_token: TokenUid,
+        maker_amount: int,
+        taker_token: TokenUid,
+        taker_amount: int,
+        directed_taker: Address,
+    ) -> int:
+        """Open directed escrow using the contract's default open expiry."""
+        return self.open_escrow_directed_with_expiry(
+            ctx=ctx,
+            maker_token=maker_token,
+            maker_amount=maker_amount,
+            taker_token=taker_token,
+            taker_amount=taker_amount,
+            expiry_timestamp=0,  # 0 = use default
+            directed_taker=directed_taker,
+        )
+
+    @public
+    def open_escrow_directed_with_expiry(
+        self,
+        ctx: Context,
+        maker_token: TokenUid,
+        maker_amount: int,
+        taker_token: TokenUid,
+        taker_amount: int,
+        expiry_timestamp: int,
+        directed_taker: Address,
     ) -> int:
         """
         Open directed escrow with an explicit expiry timestamp.
@@ -639,55 +1346,235 @@ class OtcEscrowSwap(Blueprint):
           - expiry_timestamp == 0 => use default_open_expiry_secs from "now"
           - else => absolute unix timestamp, validated against min/max bounds
         """
-        maker = self._get_caller_id(ctx)
+        return self._create_escrow(
+            ctx, maker_token, maker_amount, taker_token, taker_amount, expiry_timestamp, directed_taker
+        )
 
-        if directed_taker == maker:
-            raise InvalidConfig("Maker and directed taker must be different identities")
-        if maker_amount <= 0:
-            raise InvalidConfig("Maker amount must be > 0")
-        if taker_amount <= 0:
-            raise InvalidConfig("Taker amount must be > 0")
-        if maker_token == taker_token:
-            raise InvalidConfig("Maker and taker tokens must differ")
+ #
+ # === OPEN + FUND (MAKER FAST PATH) ===
+ #
 
-        open_expiry_ts = self._validate_expiry_timestamp_or_default(ctx, expiry_timestamp)
+    @public(allow_deposit=True)
+    def open_funded_escrow(
+        self,
+        ctx: Context,
+        maker_token: TokenUid,
+        maker_amount: int,
+        taker_token: TokenUid,
+        taker_amount: int,
+        expiry_timestamp: int,
+    ) -> int:
+        """
+        open_escrow_with_expiry + fund_maker in one call; starts as STATUS_FUNDED_MAKER.
 
-        escrow_id = self.next_escrow_id
-        self.makers[escrow_id] = maker
+        The call must deposit exactly maker_amount of maker_token.
+        """
+        return self._create_escrow(
+            ctx, maker_token, maker_amount, taker_token, taker_amount, expiry_timestamp, None, True
+        )
+
+    @public(allow_deposit=True)
+    def open_funded_escrow_directed(
+        self,
+        ctx: Context,
+        maker_token: TokenUid,
+        maker_amount: int,
+        taker_token: TokenUid,
+        taker_amount: int,
+        expiry_timestamp: int,
+        directed_taker: Address,
+    ) -> int:
+        """open_escrow_directed_with_expiry + fund_maker in one call; starts as STATUS_FUNDED_MAKER."""
+        return self._create_escrow(
+            ctx, maker_token, maker_amount, taker_token, taker_amount, expiry_timestamp, directed_taker, True
+        )
+
+ #
+ # === OPEN ESCROWS (BATCH) ===
+ #
+
+    @public(allow_deposit=True)
+    def open_escrows_batch(self, ctx: Context, terms: list[EscrowTerms]) -> int:
+        """
+        Open up to MAX_BATCH_ESCROWS escrows in one call; returns the first escrow id.
+
+        - ids are allocated contiguously: first_id .. first_id + len(terms) - 1, in terms order
+        - each entry follows the open_escrow_with_expiry / open_escrow_directed_with_expiry rules
+        - without actions every escrow is opened as STATUS_OPEN
+        - with actions the maker side of every escrow is funded at once: the call must deposit
+          exactly the per-token sum of maker_amount, and all escrows start as STATUS_FUNDED_MAKER
+        """
+        n = len(terms)
+        if n == 0:
+            raise InvalidConfig("Batch must contain at least one escrow")
+        if n > MAX_BATCH_ESCROWS:
+            raise InvalidConfig("Batch too large")
 
-        if escrow_id in self.takers:
-            del self.takers[escrow_id]
+        maker = self._get_caller_id(ctx)
+        now = ctx.block.timestamp
+        default_expiry_ts = now + self.default_open_expiry_secs
+        min_expiry_ts = now + self.min_expiry_secs
+        max_expiry_ts = now + self.max_expiry_secs
+
+        open_expiries: list[int] = []
+        maker_totals: dict[TokenUid, int] = {}
+        public_count = 0
+        for t in terms:
+            self._check_terms(maker, t.maker_token, t.maker_amount, t.taker_token, t.taker_amount, t.directed_taker)
+            if t.expiry_timestamp == 0:
+                open_expiries.append(default_expiry_ts)
+            elif t.expiry_timestamp < 0:
+                raise InvalidConfig("Expiry timestamp must be >= 0")
+            elif t.expiry_timestamp < min_expiry_ts:
+                raise InvalidConfig("Expiry timestamp is below min_expiry_secs from now")
+            elif t.expiry_timestamp > max_expiry_ts:
+                raise InvalidConfig("Expiry timestamp exceeds max_expiry_secs from now")
+            else:
+                open_expiries.append(t.expiry_timestamp)
+            maker_totals[t.maker_token] = maker_totals.get(t.maker_token, 0) + t.maker_amount
+            if t.directed_taker is None:
+                public_count += 1
+
+        maker_funded_expiry_ts = 0
+        if len(ctx.actions) > 0:
+            if set(ctx.actions.keys()) != set(maker_totals.keys()):
+                raise InvalidToken("Deposits must cover exactly the batch maker tokens")
+            for token_uid, total in maker_totals.items():
+                action = ctx.get_single_action(token_uid)
+                if not isinstance(action, NCDepositAction):
+                    raise InvalidActions("Maker funding must be a deposit")
+                if action.amount != total:
+                    raise InvalidActions("Incorrect maker deposit amount")
+            maker_funded_expiry_ts = now + self.default_maker_funded_expiry_secs
+
+        first_id = self.next_escrow_id
+        i = 0
+        while i < n:
+            t = terms[i]
+            self._store_new_escrow(
+                first_id + i, maker, t.maker_token, t.maker_amount, t.taker_token, t.taker_amount,
+                open_expiries[i], t.directed_taker, maker_funded_expiry_ts,
+            )
+            i += 1
+        self.next_escrow_id = first_id + n
 
-        self.is_directed[escrow_id] = True
-        self.directed_takers[escrow_id] = directed_taker
+ # Counters
+        self._inc_status_counter(STATUS_FUNDED_MAKER if maker_funded_expiry_ts > 0 else STATUS_OPEN, n)
+        self.total_escrows += n
+        self.count_public += public_count
+        self.count_directed += n - public_count
+        return first_id
 
-        self.maker_tokens[escrow_id] = maker_token
-        self.maker_amounts[escrow_id] = maker_amount
+ #
+ # === OPEN BOOK MAINTENANCE (PERMISSIONLESS) ===
+ #
 
-        self.taker_tokens[escrow_id] = taker_token
-        self.taker_amounts[escrow_id] = taker_amount
+    @public
+    def prune_open_book(self, ctx: Context, maker_token: TokenUid, taker_token: TokenUid, max_checks: int) -> int:
+        """
+        Drop entries whose escrow expired for its current stage from a pair's open book.
 
-        self.maker_funded[escrow_id] = False
-        self.taker_funded[escrow_id] = False
+        Accepted, cancelled and refunded escrows leave the book as they change state, so only
+        expired ones linger. Anyone may call this; it only drops index entries, escrow state is
+        untouched. Checks at most max_checks entries, resuming where the previous call on the
+        pair stopped, keeps the book order, and returns how many were removed.
+        """
+        if max_checks <= 0:
+            raise InvalidConfig("max_checks must be > 0")
+        if max_checks > 200:
+            raise InvalidConfig("max_checks too large")
+
+        key = self._pair_key(maker_token, taker_token)
+        book = self.open_books.get(key)
+        if book is None:
+            return 0
 
-        self.maker_withdrawn[escrow_id] = False
-        self.taker_withdrawn[escrow_id] = False
+        now = ctx.block.timestamp
+        n = len(book)
+        i = self.open_book_cursors.get(key, 0)
+        if i >= n:
+            i = 0
+        # Compact live entries down over removed ones within the checked window
+        w = i
+        checks = 0
+        while checks < max_checks and i < n:
+            checks += 1
+            entry = book[i]
+            i += 1
+            if self._book_entry_live(entry, now):
+                if w != i - 1:
+                    book[w] = entry
+                w += 1
+        removed = i - w
+        resume = w
+
+        if removed > 0:
+            # Shift the unchecked tail down over the gap, then trim
+            while i < n:
+                book[w] = book[i]
+                w += 1
+                i += 1
+            while len(book) > w:
+                book.pop()
+
+        n -= removed
+        if n == 0:
+            del self.open_books[key]
+            if key in self.open_book_cursors:
+                del self.open_book_cursors[key]
+        else:
+            self.open_book_cursors[key] = 0 if resume >= n else resume
+        return removed
 
-        self.maker_refunded[escrow_id] = False
-        self.taker_refunded[escrow_id] = False
+ #
+ # === ARCHIVAL COMPACTION (PERMISSIONLESS) ===
+ #
 
-        self.open_expiry_timestamps[escrow_id] = open_expiry_ts
-        self.maker_funded_expiry_timestamps[escrow_id] = 0
+    @public
+    def compact_terminal_escrows(self, ctx: Context, cursor: int, max_checks: int) -> int:
+        """
+        Archive terminal escrows among escrow_ids[cursor:cursor + max_checks].
 
-        self._set_status(escrow_id, STATUS_OPEN)
+        - cursor is an index into the escrow_ids array (NOT an escrow_id)
+        - each EXECUTED / REFUNDED / CANCELLED escrow is replaced by a compact ArchivedEscrow
+          and removed from `escrows`; its id stays in escrow_ids as a tombstone, so paging
+          cursors held by clients remain valid across compaction
+        - returns the cursor to continue from, 0 when the end was reached
+        """
+        if cursor < 0:
+            cursor = 0
+        if max_checks <= 0:
+            raise InvalidConfig("max_checks must be > 0")
+        if max_checks > 200:
+            raise InvalidConfig("max_checks too large")
+
+        ids = self.escrow_ids
+        n = len(ids)
+        if cursor >= n:
+            return 0
+        end = cursor + max_checks
+        if end > n:
+            end = n
 
-        self.next_escrow_id = escrow_id + 1
-        self.escrow_ids.append(escrow_id)
+        archived = 0
+        i = cursor
+        while i < end:
+            escrow_id = ids[i]
+            i += 1
+            record = self.escrows.get(escrow_id)
+            if record is None or record.status not in TERMINAL_STATUSES:
+                continue  # already archived, or still live
+            self.archived_escrows[escrow_id] = ArchivedEscrow(
+                terms_fingerprint=self._terms_fingerprint(record),
+                maker=record.maker,
+                status=record.status,
+                closed_timestamp=record.closed_timestamp,
+            )
+            del self.escrows[escrow_id]
+            archived += 1
 
- # Counters
-        self.total_escrows += 1
-        self.count_directed += 1
-        return escrow_id
+        self.count_archived += archived
+        return 0 if end >= n else end
 
  #
  # === DIRECTED TAKER ADMIN (MAKER-ONLY, OPEN ONLY) ===
@@ -696,30 +1583,30 @@ class OtcEscrowSwap(Blueprint):
     @public
     def set_directed_taker(self, ctx: Context, escrow_id: int, new_directed_taker: Address) -> None:
         """Maker-only: update directed taker identity while escrow is still OPEN."""
-        self._assert_exists(escrow_id)
+        record = self._load_escrow(escrow_id)
 
         caller = self._get_caller_id(ctx)
-        maker = self.makers[escrow_id]
+        maker = record.maker
         if caller != maker:
             raise Unauthorized("Only maker can update directed taker")
 
-        if not self.is_directed.get(escrow_id, False):
+        if not self._has_flag(record, FLAG_DIRECTED):
             raise InvalidEscrow("Escrow is not directed")
 
-        status = self.statuses[escrow_id]
-        if status != STATUS_OPEN:
+        if record.status != STATUS_OPEN:
             raise InvalidEscrow("Directed taker can only be updated while escrow is OPEN")
 
-        self._assert_not_expired_for_actions(ctx, escrow_id)
+        self._assert_not_expired_for_actions(ctx, record)
 
         if new_directed_taker == maker:
             raise InvalidConfig("Maker and directed taker must be different identities")
 
-        self.directed_takers[escrow_id] = new_directed_taker
+ # No taker can be recorded while still OPEN, so only the directed taker changes
+        self.escrows[escrow_id] = self._update_record(record, directed_taker=new_directed_taker)
 
- # Defensive: ensure no taker is recorded while still OPEN
-        if escrow_id in self.takers:
-            del self.takers[escrow_id]
+        if new_directed_taker != record.directed_taker:
+            self._index_remove(self.taker_escrow_ids, record.directed_taker, escrow_id)
+            self._index_append(self.taker_escrow_ids, new_directed_taker, escrow_id)
 
  #
  # === ACCEPT ESCROW (TAKER = CALLERID) ===
@@ -728,40 +1615,45 @@ class OtcEscrowSwap(Blueprint):
     @public
     def accept_escrow(self, ctx: Context, escrow_id: int) -> None:
         """The taker accepts the terms; no tokens move here."""
-        self._assert_exists(escrow_id)
+        record = self._load_escrow(escrow_id)
 
         taker = self._get_caller_id(ctx)
-        maker = self.makers[escrow_id]
+        maker = record.maker
 
  # Directed escrow gate
-        if self.is_directed.get(escrow_id, False):
-            directed = self.directed_takers.get(escrow_id)
-            if directed is None:
-                raise InvalidEscrow("Directed taker not configured")
-            if taker != directed:
+        if self._has_flag(record, FLAG_DIRECTED):
+            if taker != record.directed_taker:
                 raise Unauthorized("Only the directed taker can accept this escrow")
 
         if taker == maker:
             raise InvalidConfig("Maker and taker must be different identities")
 
-        status = self.statuses[escrow_id]
+        status = record.status
         if status == STATUS_CANCELLED:
             raise InvalidEscrow("Escrow has been cancelled")
 
-        self._assert_not_expired_for_actions(ctx, escrow_id)
+        self._assert_not_expired_for_actions(ctx, record)
 
         if status not in (STATUS_OPEN, STATUS_FUNDED_MAKER, STATUS_ACCEPTED):
             raise InvalidEscrow("Escrow is not in an acceptable state")
 
-        existing_taker = self.takers.get(escrow_id)
-        if existing_taker is None:
-            self.takers[escrow_id] = taker
-        else:
-            if taker != existing_taker:
+        if self._has_flag(record, FLAG_HAS_TAKER):
+            if taker != record.taker:
                 raise InvalidEscrow("Escrow already accepted by another taker")
+            if status != STATUS_OPEN:
+                return
+
+        self._book_remove_if_listed(escrow_id, record)
+        self.escrows[escrow_id] = self._update_record(
+            record,
+            taker=taker,
+            status=STATUS_ACCEPTED if status == STATUS_OPEN else status,
+            set_flags=FLAG_HAS_TAKER,
+        )
 
-        if status == STATUS_OPEN:
-            self._set_status(escrow_id, STATUS_ACCEPTED)
+ # Directed escrows are indexed under the directed taker (== taker) since open
+        if not self._has_flag(record, FLAG_HAS_TAKER) and not self._has_flag(record, FLAG_DIRECTED):
+            self._index_append(self.taker_escrow_ids, taker, escrow_id)
 
  #
  # === CANCEL BEFORE FUNDING (MAKER-ONLY) ===
@@ -770,20 +1662,22 @@ class OtcEscrowSwap(Blueprint):
     @public
     def cancel_before_funding(self, ctx: Context, escrow_id: int) -> None:
         """Maker-only cancellation before any funding has occurred."""
-        self._assert_exists(escrow_id)
+        record = self._load_escrow(escrow_id)
 
         caller = self._get_caller_id(ctx)
-        if caller != self.makers[escrow_id]:
+        if caller != record.maker:
             raise Unauthorized("Only maker can cancel this escrow")
 
-        status = self.statuses[escrow_id]
-        if status not in (STATUS_OPEN, STATUS_ACCEPTED):
+        if record.status not in (STATUS_OPEN, STATUS_ACCEPTED):
             raise InvalidEscrow("Escrow cannot be cancelled in its current state")
 
-        if self.maker_funded[escrow_id] or self.taker_funded[escrow_id]:
+        if self._has_flag(record, FLAG_MAKER_FUNDED) or self._has_flag(record, FLAG_TAKER_FUNDED):
             raise InvalidEscrow("Cannot cancel after funding has occurred")
 
-        self._set_status(escrow_id, STATUS_CANCELLED)
+        self._book_remove_if_listed(escrow_id, record)
+        self.escrows[escrow_id] = self._update_record(
+            record, status=STATUS_CANCELLED, now=ctx.block.timestamp
+        )
 
  #
  # === FUNDING METHODS ===
@@ -792,25 +1686,25 @@ class OtcEscrowSwap(Blueprint):
     @public(allow_deposit=True)
     def fund_maker(self, ctx: Context, escrow_id: int) -> None:
         """Maker deposits maker_token into the contract."""
-        self._assert_exists(escrow_id)
+        record = self._load_escrow(escrow_id)
 
-        status = self.statuses[escrow_id]
+        status = record.status
         if status == STATUS_CANCELLED:
             raise InvalidEscrow("Escrow has been cancelled")
         if status not in (STATUS_OPEN, STATUS_ACCEPTED):
             raise InvalidEscrow("Escrow is not in a state that allows maker funding")
 
-        self._assert_not_expired_for_actions(ctx, escrow_id)
+        self._assert_not_expired_for_actions(ctx, record)
 
-        if self.maker_funded[escrow_id]:
+        if self._has_flag(record, FLAG_MAKER_FUNDED):
             raise InvalidEscrow("Maker side is already funded")
 
         caller = self._get_caller_id(ctx)
-        if caller != self.makers[escrow_id]:
+        if caller != record.maker:
             raise Unauthorized("Only maker can fund maker side")
 
-        maker_amount = self.maker_amounts[escrow_id]
-        expected_token = self.maker_tokens[escrow_id]
+        maker_amount = record.maker_amount
+        expected_token = record.maker_token
 
         if set(ctx.actions.keys()) != {expected_token}:
             raise InvalidToken("Deposit must include exactly the expected token")
@@ -821,46 +1715,46 @@ class OtcEscrowSwap(Blueprint):
         if action.amount != maker_amount:
             raise InvalidActions("Incorrect maker deposit amount")
 
-        self.maker_funded[escrow_id] = True
-        self._set_status(escrow_id, STATUS_FUNDED_MAKER)
-
  # Set maker-funded expiry timestamp relative to now (bounded by config).
-        self.maker_funded_expiry_timestamps[escrow_id] = ctx.block.timestamp + self.default_maker_funded_expiry_secs
+        funded = self._update_record(
+            record,
+            maker_funded_expiry_timestamp=ctx.block.timestamp + self.default_maker_funded_expiry_secs,
+            status=STATUS_FUNDED_MAKER,
+            set_flags=FLAG_MAKER_FUNDED,
+        )
+        self._sync_expiry_index(escrow_id, record, funded)
+        self.escrows[escrow_id] = funded
 
     @public(allow_deposit=True)
     def fund_taker(self, ctx: Context, escrow_id: int) -> None:
         """Taker deposits taker_token into the contract."""
-        self._assert_exists(escrow_id)
+        record = self._load_escrow(escrow_id)
 
-        status = self.statuses[escrow_id]
+        status = record.status
         if status == STATUS_CANCELLED:
             raise InvalidEscrow("Escrow has been cancelled")
         if status != STATUS_FUNDED_MAKER:
             raise InvalidEscrow("Maker must fund before taker can fund")
 
-        self._assert_not_expired_for_actions(ctx, escrow_id)
+        self._assert_not_expired_for_actions(ctx, record)
 
-        if self.taker_funded[escrow_id]:
+        if self._has_flag(record, FLAG_TAKER_FUNDED):
             raise InvalidEscrow("Taker side is already funded")
 
         caller = self._get_caller_id(ctx)
 
  # Directed escrow gate: only directed taker may fund.
-        if self.is_directed.get(escrow_id, False):
-            directed = self.directed_takers.get(escrow_id)
-            if directed is None:
-                raise InvalidEscrow("Directed taker not configured")
-            if caller != directed:
+        if self._has_flag(record, FLAG_DIRECTED):
+            if caller != record.directed_taker:
                 raise Unauthorized("Only the directed taker can fund taker side")
 
-        taker = self.takers.get(escrow_id)
-        if taker is None:
+        if not self._has_flag(record, FLAG_HAS_TAKER):
             raise InvalidEscrow("Escrow has not been accepted by a taker")
-        if caller != taker:
+        if caller != record.taker:
             raise Unauthorized("Only taker can fund taker side")
 
-        taker_amount = self.taker_amounts[escrow_id]
-        expected_token = self.taker_tokens[escrow_id]
+        taker_amount = record.taker_amount
+        expected_token = record.taker_token
 
         if set(ctx.actions.keys()) != {expected_token}:
             raise InvalidToken("Deposit must include exactly the expected token")
@@ -871,8 +1765,9 @@ class OtcEscrowSwap(Blueprint):
         if action.amount != taker_amount:
             raise InvalidActions("Incorrect taker deposit amount")
 
-        self.taker_funded[escrow_id] = True
-        self._set_status(escrow_id, STATUS_FUNDED_BOTH)
+        self.escrows[escrow_id] = self._update_record(
+            record, status=STATUS_FUNDED_BOTH, set_flags=FLAG_TAKER_FUNDED
+        )
 
  #
  # === WITHDRAW (SWAP COMPLETION + FEES) ===
@@ -904,13 +1799,13 @@ class OtcEscrowSwap(Blueprint):
                 raise InvalidEscrow("No protocol fees available for this token")
 
             self._process_withdraw(ctx, token_uid, balance)
-            self.protocol_fee_balances[token_uid] = 0
+            self._clear_protocol_fee(token_uid)
             return
 
  # --- Maker / Taker withdrawals are escrow-specific ---
-        self._assert_exists(escrow_id)
+        record = self._load_escrow(escrow_id)
 
-        status = self.statuses[escrow_id]
+        status = record.status
         if status == STATUS_CANCELLED:
             raise InvalidEscrow("Escrow has been cancelled")
         if status in (STATUS_EXECUTED, STATUS_REFUNDED):
@@ -920,54 +1815,149 @@ class OtcEscrowSwap(Blueprint):
         if status != STATUS_FUNDED_BOTH:
             raise InvalidEscrow("Escrow is not fully funded")
 
-        maker = self.makers[escrow_id]
-        taker = self.takers.get(escrow_id)
-        if taker is None:
+        if not self._has_flag(record, FLAG_HAS_TAKER):
             raise InvalidEscrow("Escrow has not been accepted by a taker")
 
-        maker_fee = self._ceil_fee(self.maker_amounts[escrow_id])
-        taker_fee = self._ceil_fee(self.taker_amounts[escrow_id])
+        maker_fee = self._ceil_fee(record.maker_amount)
+        taker_fee = self._ceil_fee(record.taker_amount)
 
  # --- Maker withdraws taker_token net of taker_fee ---
-        if caller == maker:
-            if self.maker_withdrawn[escrow_id]:
+        if caller == record.maker:
+            if self._has_flag(record, FLAG_MAKER_WITHDRAWN):
                 raise InvalidEscrow("Maker has already withdrawn")
 
-            target_token = self.taker_tokens[escrow_id]
-            target_amount = self.taker_amounts[escrow_id] - taker_fee
+            target_token = record.taker_token
+            target_amount = record.taker_amount - taker_fee
             if target_amount < 0:
                 raise InvalidEscrow("Fee exceeds taker amount")
 
             self._process_withdraw(ctx, target_token, target_amount)
-            self.maker_withdrawn[escrow_id] = True
+            record = self._update_record(record, set_flags=FLAG_MAKER_WITHDRAWN)
 
-            if taker_fee > 0:
-                self.protocol_fee_balances[target_token] = self.protocol_fee_balances.get(target_token, 0) + taker_fee
+            self._accrue_protocol_fee(target_token, taker_fee)
 
-            self._maybe_finalize_status(escrow_id)
+            self.escrows[escrow_id] = self._update_record(
+                record, status=self._finalize_status(record), now=ctx.block.timestamp
+            )
             return
 
  # --- Taker withdraws maker_token net of maker_fee ---
-        if caller == taker:
-            if self.taker_withdrawn[escrow_id]:
+        if caller == record.taker:
+            if self._has_flag(record, FLAG_TAKER_WITHDRAWN):
                 raise InvalidEscrow("Taker has already withdrawn")
 
-            target_token = self.maker_tokens[escrow_id]
-            target_amount = self.maker_amounts[escrow_id] - maker_fee
+            target_token = record.maker_token
+            target_amount = record.maker_amount - maker_fee
             if target_amount < 0:
                 raise InvalidEscrow("Fee exceeds maker amount")
 
             self._process_withdraw(ctx, target_token, target_amount)
-            self.taker_withdrawn[escrow_id] = True
+            record = self._update_record(record, set_flags=FLAG_TAKER_WITHDRAWN)
 
-            if maker_fee > 0:
-                self.protocol_fee_balances[target_token] = self.protocol_fee_balances.get(target_token, 0) + maker_fee
+            self._accrue_protocol_fee(target_token, maker_fee)
 
-            self._maybe_finalize_status(escrow_id)
+            self.escrows[escrow_id] = self._update_record(
+                record, status=self._finalize_status(record), now=ctx.block.timestamp
+            )
             return
 
         raise Unauthorized("Caller is neither maker, taker, nor fee recipient")
 
+ #
+ # === ACCEPT + FUND + WITHDRAW (TAKER FAST PATH) ===
+ #
+
+    @public(allow_deposit=True, allow_withdrawal=True)
+    def accept_fund_and_withdraw(self, ctx: Context, escrow_id: int) -> None:
+        """
+        accept_escrow + fund_taker + taker withdraw() in one call, on a maker-funded escrow.
+
+        Actions: deposit exactly taker_amount of taker_token and withdraw maker_amount - maker_fee
+        of maker_token. The escrow ends in STATUS_FUNDED_BOTH with the taker side settled; it
+        becomes STATUS_EXECUTED once the maker withdraws.
+        """
+        record = self._load_escrow(escrow_id)
+        taker = self._get_caller_id(ctx)
+
+ # Directed escrow gate
+        if self._has_flag(record, FLAG_DIRECTED):
+            if taker != record.directed_taker:
+                raise Unauthorized("Only the directed taker can accept this escrow")
+
+        if taker == record.maker:
+            raise InvalidConfig("Maker and taker must be different identities")
+
+        status = record.status
+        if status == STATUS_CANCELLED:
+            raise InvalidEscrow("Escrow has been cancelled")
+        if status != STATUS_FUNDED_MAKER:
+            raise InvalidEscrow("Maker must fund before taker can fund")
+
+        self._assert_not_expired_for_actions(ctx, record)
+
+        had_taker = self._has_flag(record, FLAG_HAS_TAKER)
+        if had_taker and taker != record.taker:
+            raise InvalidEscrow("Escrow already accepted by another taker")
+
+        maker_fee = self._ceil_fee(record.maker_amount)
+        taker_receive = record.maker_amount - maker_fee
+        if taker_receive < 0:
+            raise InvalidEscrow("Fee exceeds maker amount")
+
+        if set(ctx.actions.keys()) != {record.taker_token, record.maker_token}:
+            raise InvalidToken("Must deposit taker_token and withdraw maker_token")
+        deposit = ctx.get_single_action(record.taker_token)
+        if not isinstance(deposit, NCDepositAction):
+            raise InvalidActions("Taker funding must be a deposit")
+        if deposit.amount != record.taker_amount:
+            raise InvalidActions("Incorrect taker deposit amount")
+        withdrawal = ctx.get_single_action(record.maker_token)
+        if not isinstance(withdrawal, NCWithdrawalAction):
+            raise InvalidActions("Expected a withdrawal action")
+        if withdrawal.amount != taker_receive:
+            raise InvalidActions("Incorrect withdrawal amount")
+
+        self._accrue_protocol_fee(record.maker_token, maker_fee)
+        self._book_remove_if_listed(escrow_id, record)
+        self.escrows[escrow_id] = self._update_record(
+            record,
+            taker=taker,
+            status=STATUS_FUNDED_BOTH,
+            set_flags=FLAG_HAS_TAKER | FLAG_TAKER_FUNDED | FLAG_TAKER_WITHDRAWN,
+        )
+
+ # Directed escrows are indexed under the directed taker (== taker) since open
+        if not had_taker and not self._has_flag(record, FLAG_DIRECTED):
+            self._index_append(self.taker_escrow_ids, taker, escrow_id)
+
+ #
+ # === PROTOCOL FEE SWEEP (FEE RECIPIENT) ===
+ #
+
+    @public(allow_withdrawal=True)
+    def sweep_protocol_fees(self, ctx: Context) -> None:
+        """
+        Fee-recipient-only: withdraw the protocol fee balances of several tokens in one call.
+
+        Every action must be a withdrawal of a token's full, nonzero balance
+        (see get_protocol_fee_balances); each swept balance is zeroed.
+        """
+        if self._get_caller_id(ctx) != self.fee_recipient:
+            raise Unauthorized("Only fee recipient can sweep protocol fees")
+        if len(ctx.actions) == 0:
+            raise InvalidActions("Sweep must include at least one withdrawal")
+
+        for token_uid in ctx.actions.keys():
+            action = ctx.get_single_action(token_uid)
+            if not isinstance(action, NCWithdrawalAction):
+                raise InvalidActions("Expected a withdrawal action")
+            balance = self.protocol_fee_balances.get(token_uid, 0)
+            if balance <= 0:
+                raise InvalidEscrow("No protocol fees available for this token")
+            if action.amount != balance:
+                raise InvalidActions("Incorrect withdrawal amount")
+            self._clear_protocol_fee(token_uid)
+
  #
  # === REFUND (AFTER EXPIRY) ===
  #
@@ -982,52 +1972,269 @@ class OtcEscrowSwap(Blueprint):
         - Each side withdraws only their own deposited token.
         - No protocol fees are charged on refunds.
         """
-        self._assert_exists(escrow_id)
+        record = self._load_escrow(escrow_id)
 
-        status = self.statuses[escrow_id]
+        status = record.status
         if status == STATUS_CANCELLED:
             raise InvalidEscrow("Escrow has been cancelled")
         if status in (STATUS_EXECUTED, STATUS_REFUNDED):
             raise InvalidEscrow("Escrow is already closed")
 
-        if not self._is_expired_for_current_stage(ctx, escrow_id):
+        if not self._is_expired_for_current_stage(record, ctx.block.timestamp):
             raise InvalidEscrow("Escrow has not expired")
 
         caller = self._get_caller_id(ctx)
 
-        if caller == self.makers[escrow_id]:
-            if not self.maker_funded[escrow_id]:
+        if caller == record.maker:
+            if not self._has_flag(record, FLAG_MAKER_FUNDED):
                 raise InvalidEscrow("Maker side is not funded")
-            if self.maker_refunded[escrow_id]:
+            if self._has_flag(record, FLAG_MAKER_REFUNDED):
                 raise InvalidEscrow("Maker has already been refunded")
-            if self.maker_withdrawn[escrow_id]:
+            if self._has_flag(record, FLAG_MAKER_WITHDRAWN):
                 raise InvalidEscrow("Maker has already withdrawn")
 
-            token_uid = self.maker_tokens[escrow_id]
-            amount = self.maker_amounts[escrow_id]
-            self._process_withdraw(ctx, token_uid, amount)
-            self.maker_refunded[escrow_id] = True
+            self._process_withdraw(ctx, record.maker_token, record.maker_amount)
+            record = self._update_record(record, set_flags=FLAG_MAKER_REFUNDED)
 
-        elif caller == self.takers.get(escrow_id):
-            if not self.taker_funded[escrow_id]:
+        elif self._has_flag(record, FLAG_HAS_TAKER) and caller == record.taker:
+            if not self._has_flag(record, FLAG_TAKER_FUNDED):
                 raise InvalidEscrow("Taker side is not funded")
-            if self.taker_refunded[escrow_id]:
+            if self._has_flag(record, FLAG_TAKER_REFUNDED):
                 raise InvalidEscrow("Taker has already been refunded")
-            if self.taker_withdrawn[escrow_id]:
+            if self._has_flag(record, FLAG_TAKER_WITHDRAWN):
                 raise InvalidEscrow("Taker has already withdrawn")
 
-            token_uid = self.taker_tokens[escrow_id]
-            amount = self.taker_amounts[escrow_id]
-            self._process_withdraw(ctx, token_uid, amount)
-            self.taker_refunded[escrow_id] = True
+            self._process_withdraw(ctx, record.taker_token, record.taker_amount)
+            record = self._update_record(record, set_flags=FLAG_TAKER_REFUNDED)
 
         else:
             raise Unauthorized("Caller is neither maker nor taker for this escrow")
 
-        maker_done = (not self.maker_funded[escrow_id]) or self.maker_refunded[escrow_id]
-        taker_done = (not self.taker_funded[escrow_id]) or self.taker_refunded[escrow_id]
+        maker_done = (not self._has_flag(record, FLAG_MAKER_FUNDED)) or self._has_flag(record, FLAG_MAKER_REFUNDED)
+        taker_done = (not self._has_flag(record, FLAG_TAKER_FUNDED)) or self._has_flag(record, FLAG_TAKER_REFUNDED)
         if maker_done and taker_done:
-            self._set_status(escrow_id, STATUS_REFUNDED)
+            self._book_remove_if_listed(escrow_id, record)
+            record = self._update_record(record, status=STATUS_REFUNDED, now=ctx.block.timestamp)
+        self.escrows[escrow_id] = record
+
+    @public
+    def refund_expired_batch(self, ctx: Context, max_count: int) -> int:
+        """
+        Keeper entrypoint: settle expired escrows bucket by bucket from expiry_scan_bucket.
+
+        - FUNDED_MAKER escrows past their maker-funded expiry are marked refunded and the
+          maker deposit is credited to the maker's refund credit (claim_refund_credit)
+        - OPEN/ACCEPTED escrows past their open expiry hold no funds and are only dropped
+          from the expiry index
+        - expired escrows are also removed from their pair's open book
+        - stale entries (escrow no longer in the indexed stage) are dropped without effect
+        - max_count bounds the work: every bucket visited and every entry checked counts once
+        - anyone may call this; credits are only claimable by the funded party
+        Returns the number of index entries dropped.
+        """
+        if max_count <= 0:
+            raise InvalidConfig("max_count must be > 0")
+        if max_count > 200:
+            raise InvalidConfig("max_count too large")
+
+        now = ctx.block.timestamp
+        last_bucket = self._expiry_bucket(now)
+        bucket = self.expiry_scan_bucket
+        checks = 0
+        processed = 0
+        while checks < max_count and self.expiry_bucket_count > 0 and bucket <= last_bucket:
+            entries = self.expiry_buckets.get(bucket)
+            if entries is None:
+                bucket += EXPIRY_BUCKET_SECS
+                checks += 1
+                continue
+
+            i = 0
+            while i < len(entries) and checks < max_count:
+                entry = entries[i]
+                checks += 1
+                # Only the current bucket can hold entries that have not expired yet
+                if now < entry.expiry_timestamp:
+                    i += 1
+                    continue
+                if self._expiry_entry_live(entry):
+                    record = self.escrows[entry.escrow_id]
+                    # Expired escrows can no longer be taken
+                    self._book_remove_if_listed(entry.escrow_id, record)
+                    if record.status == STATUS_FUNDED_MAKER and self._has_flag(record, FLAG_MAKER_FUNDED) \
+                            and not self._has_flag(record, FLAG_MAKER_REFUNDED):
+                        self._credit_refund(record.maker, record.maker_token, record.maker_amount)
+                        self.escrows[entry.escrow_id] = self._update_record(
+                            record, status=STATUS_REFUNDED, set_flags=FLAG_MAKER_REFUNDED, now=now
+                        )
+                # Swap-remove: order within a bucket does not matter
+                entries[i] = entries[len(entries) - 1]
+                entries.pop()
+                processed += 1
+
+            if len(entries) > 0:
+                break  # budget exhausted, or the current bucket still has pending entries
+            del self.expiry_buckets[bucket]
+            self.expiry_bucket_count -= 1
+            bucket += EXPIRY_BUCKET_SECS
+
+        self.expiry_scan_bucket = bucket
+        return processed
+
+    @public(allow_withdrawal=True)
+    def claim_refund_credit(self, ctx: Context) -> None:
+        """Withdraw the caller's full refund credit for the single token in the actions."""
+        caller = self._get_caller_id(ctx)
+        action_tokens = set(ctx.actions.keys())
+        if len(action_tokens) != 1:
+            raise InvalidActions("Withdraw must operate on exactly one expected token")
+        token_uid = next(iter(action_tokens))
+
+        credits = self.refund_credits.get(caller)
+        amount = 0 if credits is None else credits.get(token_uid, 0)
+        if amount <= 0:
+            raise InvalidEscrow("No refund credit available for this token")
+
+        self._process_withdraw(ctx, token_uid, amount)
+        del credits[token_uid]
+        if len(credits) == 0:
+            del self.refund_credits[caller]
+
+ #
+ # === PARTIAL-FILL ESCROWS ===
+ #
+
+    @public(allow_deposit=True)
+    def open_partial_fill_escrow(
+        self,
+        ctx: Context,
+        taker_token: TokenUid,
+        taker_amount: int,
+        min_fill_amount: int,
+        expiry_timestamp: int,
+    ) -> int:
+        """
+        Open and fund a partial-fill escrow in one call; returns its id.
+
+        - the single deposit action is the maker side (maker_token and maker_amount)
+        - the price is fixed at taker_amount / maker_amount
+        - expiry_timestamp follows the open_escrow_with_expiry convention (0 = default)
+        - ids are separate from regular escrow ids
+        """
+        maker = self._get_caller_id(ctx)
+        action_tokens = set(ctx.actions.keys())
+        if len(action_tokens) != 1:
+            raise InvalidToken("Deposit must include exactly one token")
+        maker_token = next(iter(action_tokens))
+        action = ctx.get_single_action(maker_token)
+        if not isinstance(action, NCDepositAction):
+            raise InvalidActions("Maker funding must be a deposit")
+        maker_amount = action.amount
+
+        self._check_terms(maker, maker_token, maker_amount, taker_token, taker_amount, None)
+        if min_fill_amount <= 0 or min_fill_amount > maker_amount:
+            raise InvalidConfig("min_fill_amount must be in (0, maker_amount]")
+        expiry_ts = self._validate_expiry_timestamp_or_default(ctx, expiry_timestamp)
+
+        fill_id = self.next_partial_fill_id
+        self.partial_fills[fill_id] = PartialFillRecord(
+            maker=maker,
+            maker_token=maker_token,
+            maker_amount=maker_amount,
+            taker_token=taker_token,
+            taker_amount=taker_amount,
+            min_fill_amount=min_fill_amount,
+            expiry_timestamp=expiry_ts,
+            filled_maker_amount=0,
+            filled_taker_amount=0,
+            maker_claimable=0,
+            fill_count=0,
+            last_fill_timestamp=0,
+            status=STATUS_OPEN,
+        )
+        self.next_partial_fill_id = fill_id + 1
+        return fill_id
+
+    @public(allow_deposit=True, allow_withdrawal=True)
+    def fill_partial_escrow(self, ctx: Context, fill_id: int, fill_amount: int) -> None:
+        """
+        Buy fill_amount of maker_token from a partial-fill escrow; settles in the same call.
+
+        Actions: deposit taker_pay of taker_token and withdraw fill_amount - maker_fee of
+        maker_token (see get_partial_fill_quote). The maker's proceeds, net of taker_fee,
+        accrue on the order and are pulled with claim_partial_fill_proceeds().
+        """
+        order = self._load_partial_fill(fill_id)
+        if order.status != STATUS_OPEN:
+            raise InvalidEscrow("Partial-fill escrow is closed")
+        if ctx.block.timestamp >= order.expiry_timestamp:
+            raise InvalidEscrow("Escrow has expired")
+
+        taker = self._get_caller_id(ctx)
+        if taker == order.maker:
+            raise InvalidConfig("Maker and taker must be different identities")
+
+        remaining = order.maker_amount - order.filled_maker_amount
+        if fill_amount <= 0 or fill_amount > remaining:
+            raise InvalidConfig("fill_amount must be in (0, remaining]")
+        if fill_amount < order.min_fill_amount and fill_amount != remaining:
+            raise InvalidConfig("fill_amount is below min_fill_amount")
+
+        quote = self._partial_fill_amounts(order, fill_amount)
+
+        if set(ctx.actions.keys()) != {order.maker_token, order.taker_token}:
+            raise InvalidToken("Fill must deposit taker_token and withdraw maker_token")
+        deposit = ctx.get_single_action(order.taker_token)
+        if not isinstance(deposit, NCDepositAction):
+            raise InvalidActions("Expected a deposit of taker_token")
+        if deposit.amount != quote.taker_pay:
+            raise InvalidActions("Incorrect taker deposit amount")
+        withdrawal = ctx.get_single_action(order.maker_token)
+        if not isinstance(withdrawal, NCWithdrawalAction):
+            raise InvalidActions("Expected a withdrawal of maker_token")
+        if withdrawal.amount != quote.taker_net_receive:
+            raise InvalidActions("Incorrect withdrawal amount")
+
+        self._accrue_protocol_fee(order.maker_token, quote.maker_fee)
+        self._accrue_protocol_fee(order.taker_token, quote.taker_fee)
+
+        self.partial_fills[fill_id] = self._update_partial_fill(
+            order,
+            filled_maker_amount=order.filled_maker_amount + fill_amount,
+            filled_taker_amount=order.filled_taker_amount + quote.taker_pay,
+            maker_claimable=order.maker_claimable + quote.maker_net_receive,
+            fill_count=order.fill_count + 1,
+            last_fill_timestamp=ctx.block.timestamp,
+            status=STATUS_EXECUTED if fill_amount == remaining else STATUS_OPEN,
+        )
+
+    @public(allow_withdrawal=True)
+    def claim_partial_fill_proceeds(self, ctx: Context, fill_id: int) -> None:
+        """Maker-only: withdraw all accrued taker_token proceeds of a partial-fill escrow."""
+        order = self._load_partial_fill(fill_id)
+        if self._get_caller_id(ctx) != order.maker:
+            raise Unauthorized("Only maker can claim fill proceeds")
+        if order.maker_claimable <= 0:
+            raise InvalidEscrow("No fill proceeds to claim")
+
+        self._process_withdraw(ctx, order.taker_token, order.maker_claimable)
+        self.partial_fills[fill_id] = self._update_partial_fill(order, maker_claimable=0)
+
+    @public(allow_withdrawal=True)
+    def cancel_partial_fill_escrow(self, ctx: Context, fill_id: int) -> None:
+        """
+        Maker-only: close an open partial-fill escrow and withdraw the unfilled maker_token.
+
+        Allowed before or after expiry; accrued proceeds stay claimable.
+        """
+        order = self._load_partial_fill(fill_id)
+        if self._get_caller_id(ctx) != order.maker:
+            raise Unauthorized("Only maker can cancel")
+        if order.status != STATUS_OPEN:
+            raise InvalidEscrow("Partial-fill escrow is closed")
+
+        self._process_withdraw(ctx, order.maker_token, order.maker_amount - order.filled_maker_amount)
+        self.partial_fills[fill_id] = self._update_partial_fill(order, status=STATUS_CANCELLED)
 
  #
  # === VIEWS ===
@@ -1050,6 +2257,20 @@ class OtcEscrowSwap(Blueprint):
         """Return the aggregated protocol fee balance for a given token uid."""
         return self.protocol_fee_balances.get(token_uid, 0)
 
+    @view
+    def get_protocol_fee_balances(self) -> list[ProtocolFeeBalance]:
+        """Return every token with a nonzero protocol fee balance, for building a sweep."""
+        tokens = self.fee_tokens
+        balances: list[ProtocolFeeBalance] = []
+        i = 0
+        while i < len(tokens):
+            token_uid = tokens[i]
+            balances.append(
+                ProtocolFeeBalance(token_uid=token_uid.hex(), amount=self.protocol_fee_balances[token_uid])
+            )
+            i += 1
+        return balances
+
     @view
     def get_fee_quote(self, maker_amount: int, taker_amount: int) -> FeeQuoteView:
         """Quote protocol fees given hypothetical amounts (base units)."""
@@ -1074,25 +2295,30 @@ class OtcEscrowSwap(Blueprint):
 
     @view
     def get_escrow(self, escrow_id: int) -> EscrowDetails:
-        """Safe, JSON-friendly view (summary)."""
-        if escrow_id < 0:
-            return EscrowDetails(
-                maker="",
-                taker="",
-                maker_token="",
-                maker_amount=0,
-                taker_token="",
-                taker_amount=0,
-                maker_funded=False,
-                taker_funded=False,
-                maker_withdrawn=False,
-                taker_withdrawn=False,
-                is_cancelled=False,
-                status=-1,
-            )
+        """
+        Safe, JSON-friendly view (summary).
 
-        maker_addr = self.makers.get(escrow_id)
-        if maker_addr is None:
+        Archived escrows return maker and final status only; terms are reduced to their fingerprint.
+        """
+        record = self._read_escrow(escrow_id)
+        if record is None:
+            archived = self.archived_escrows.get(escrow_id)
+            if archived is not None:
+                executed = archived.status == STATUS_EXECUTED
+                return EscrowDetails(
+                    maker=str(archived.maker),
+                    taker="",
+                    maker_token="",
+                    maker_amount=0,
+                    taker_token="",
+                    taker_amount=0,
+                    maker_funded=archived.status != STATUS_CANCELLED,
+                    taker_funded=executed,
+                    maker_withdrawn=executed,
+                    taker_withdrawn=executed,
+                    is_cancelled=(archived.status == STATUS_CANCELLED),
+                    status=archived.status,
+                )
             return EscrowDetails(
                 maker="",
                 taker="",
@@ -1108,22 +2334,18 @@ class OtcEscrowSwap(Blueprint):
                 status=-1,
             )
 
-        taker_addr = self.takers.get(escrow_id)
-        maker_token = self.maker_tokens[escrow_id]
-        taker_token = self.taker_tokens[escrow_id]
-        status = self.statuses[escrow_id]
-
+        status = record.status
         return EscrowDetails(
-            maker=str(maker_addr),
-            taker="" if taker_addr is None else str(taker_addr),
-            maker_token=maker_token.hex(),
-            maker_amount=self.maker_amounts[escrow_id],
-            taker_token=taker_token.hex(),
-            taker_amount=self.taker_amounts[escrow_id],
-            maker_funded=self.maker_funded[escrow_id],
-            taker_funded=self.taker_funded[escrow_id],
-            maker_withdrawn=self.maker_withdrawn[escrow_id],
-            taker_withdrawn=self.taker_withdrawn[escrow_id],
+            maker=str(record.maker),
+            taker=str(record.taker) if self._has_flag(record, FLAG_HAS_TAKER) else "",
+            maker_token=record.maker_token.hex(),
+            maker_amount=record.maker_amount,
+            taker_token=record.taker_token.hex(),
+            taker_amount=record.taker_amount,
+            maker_funded=self._has_flag(record, FLAG_MAKER_FUNDED),
+            taker_funded=self._has_flag(record, FLAG_TAKER_FUNDED),
+            maker_withdrawn=self._has_flag(record, FLAG_MAKER_WITHDRAWN),
+            taker_withdrawn=self._has_flag(record, FLAG_TAKER_WITHDRAWN),
             is_cancelled=(status == STATUS_CANCELLED),
             status=status,
         )
@@ -1135,121 +2357,91 @@ class OtcEscrowSwap(Blueprint):
 
         NOTE: @view cannot access Context, so caller must pass current_timestamp.
         """
-        if escrow_id < 0:
-            return EscrowDetailsFull(
-                maker="",
-                taker="",
-                maker_token="",
-                maker_amount=0,
-                taker_token="",
-                taker_amount=0,
-                maker_funded=False,
-                taker_funded=False,
-                maker_withdrawn=False,
-                taker_withdrawn=False,
-                maker_refunded=False,
-                taker_refunded=False,
-                open_expiry_timestamp=0,
-                maker_funded_expiry_timestamp=0,
-                is_open_expired=False,
-                is_maker_funded_expired=False,
-                is_expired=False,
-                is_directed=False,
-                directed_taker="",
-                is_cancelled=False,
-                is_refunded=False,
-                status=-1,
-            )
+        record = self._read_escrow(escrow_id)
+        if record is None:
+            archived = self.archived_escrows.get(escrow_id)
+            if archived is not None:
+                return self._archived_escrow_full(archived)
+            return self._empty_escrow_full()
+        return self._build_escrow_full(record, current_timestamp)
+
+    @view
+    def get_escrow_exists(self, escrow_id: int) -> bool:
+        """Return True if an escrow exists (live or archived)."""
+        if self._read_escrow(escrow_id) is not None:
+            return True
+        return escrow_id in self.archived_escrows
+
+    @view
+    def get_escrow_status(self, escrow_id: int) -> int:
+        """Return escrow status, or -1 if escrow not found."""
+        record = self._read_escrow(escrow_id)
+        if record is None:
+            archived = self.archived_escrows.get(escrow_id)
+            return -1 if archived is None else archived.status
+        return record.status
+
+    @view
+    def get_archived_escrow(self, escrow_id: int) -> ArchivedEscrowView:
+        """Return the archive record of a compacted escrow (status -1 if not archived)."""
+        archived = self.archived_escrows.get(escrow_id)
+        if archived is None:
+            return ArchivedEscrowView(terms_fingerprint="", maker="", status=-1, closed_timestamp=0)
+        return ArchivedEscrowView(
+            terms_fingerprint=self._fingerprint_hex(archived.terms_fingerprint),
+            maker=str(archived.maker),
+            status=archived.status,
+            closed_timestamp=archived.closed_timestamp,
+        )
 
-        maker_addr = self.makers.get(escrow_id)
-        if maker_addr is None:
-            return EscrowDetailsFull(
+    @view
+    def get_partial_fill_escrow(self, fill_id: int, current_timestamp: int) -> PartialFillDetails:
+        """Partial-fill escrow state with remaining size and fill totals (status -1 if not found)."""
+        order = self.partial_fills.get(fill_id)
+        if order is None:
+            return PartialFillDetails(
                 maker="",
-                taker="",
                 maker_token="",
                 maker_amount=0,
                 taker_token="",
                 taker_amount=0,
-                maker_funded=False,
-                taker_funded=False,
-                maker_withdrawn=False,
-                taker_withdrawn=False,
-                maker_refunded=False,
-                taker_refunded=False,
-                open_expiry_timestamp=0,
-                maker_funded_expiry_timestamp=0,
-                is_open_expired=False,
-                is_maker_funded_expired=False,
+                min_fill_amount=0,
+                expiry_timestamp=0,
                 is_expired=False,
-                is_directed=False,
-                directed_taker="",
-                is_cancelled=False,
-                is_refunded=False,
+                remaining_maker_amount=0,
+                filled_maker_amount=0,
+                filled_taker_amount=0,
+                maker_claimable=0,
+                fill_count=0,
+                last_fill_timestamp=0,
                 status=-1,
             )
-
-        taker_addr = self.takers.get(escrow_id)
-        maker_token = self.maker_tokens[escrow_id]
-        taker_token = self.taker_tokens[escrow_id]
-        status = self.statuses[escrow_id]
-
-        open_ts = self.open_expiry_timestamps.get(escrow_id, 0)
-        mf_ts = self.maker_funded_expiry_timestamps.get(escrow_id, 0)
-
-        is_open_expired = (open_ts > 0) and (current_timestamp >= open_ts)
-        is_mf_expired = (mf_ts > 0) and (current_timestamp >= mf_ts)
-
- # expired "for stage"
-        is_expired = False
-        if status in (STATUS_OPEN, STATUS_ACCEPTED):
-            is_expired = is_open_expired
-        elif status == STATUS_FUNDED_MAKER:
-            is_expired = is_mf_expired
-
-        directed = self.is_directed.get(escrow_id, False)
-        directed_taker_addr = self.directed_takers.get(escrow_id)
-
-        return EscrowDetailsFull(
-            maker=str(maker_addr),
-            taker="" if taker_addr is None else str(taker_addr),
-            maker_token=maker_token.hex(),
-            maker_amount=self.maker_amounts[escrow_id],
-            taker_token=taker_token.hex(),
-            taker_amount=self.taker_amounts[escrow_id],
-            maker_funded=self.maker_funded[escrow_id],
-            taker_funded=self.taker_funded[escrow_id],
-            maker_withdrawn=self.maker_withdrawn[escrow_id],
-            taker_withdrawn=self.taker_withdrawn[escrow_id],
-            maker_refunded=self.maker_refunded.get(escrow_id, False),
-            taker_refunded=self.taker_refunded.get(escrow_id, False),
-            open_expiry_timestamp=open_ts,
-            maker_funded_expiry_timestamp=mf_ts,
-            is_open_expired=is_open_expired,
-            is_maker_funded_expired=is_mf_expired,
-            is_expired=is_expired,
-            is_directed=directed,
-            directed_taker="" if directed_taker_addr is None else str(directed_taker_addr),
-            is_cancelled=(status == STATUS_CANCELLED),
-            is_refunded=(status == STATUS_REFUNDED),
-            status=status,
+        return PartialFillDetails(
+            maker=str(order.maker),
+            maker_token=order.maker_token.hex(),
+            maker_amount=order.maker_amount,
+            taker_token=order.taker_token.hex(),
+            taker_amount=order.taker_amount,
+            min_fill_amount=order.min_fill_amount,
+            expiry_timestamp=order.expiry_timestamp,
+            is_expired=current_timestamp >= order.expiry_timestamp,
+            remaining_maker_amount=order.maker_amount - order.filled_maker_amount,
+            filled_maker_amount=order.filled_maker_amount,
+            filled_taker_amount=order.filled_taker_amount,
+            maker_claimable=order.maker_claimable,
+            fill_count=order.fill_count,
+            last_fill_timestamp=order.last_fill_timestamp,
+            status=order.status,
         )
 
-
-    @view
-    def get_escrow_exists(self, escrow_id: int) -> bool:
-        """Return True if an escrow exists (has a maker recorded)."""
-        if escrow_id < 0:
-            return False
-        return self.makers.get(escrow_id) is not None
-
     @view
-    def get_escrow_status(self, escrow_id: int) -> int:
-        """Return escrow status, or -1 if escrow not found."""
-        if escrow_id < 0:
-            return -1
-        if self.makers.get(escrow_id) is None:
-            return -1
-        return self.statuses.get(escrow_id, -1)
+    def get_partial_fill_quote(self, fill_id: int, fill_amount: int) -> PartialFillQuote:
+        """Amounts for filling fill_amount of maker_token from a partial-fill escrow right now."""
+        order = self._load_partial_fill(fill_id)
+        remaining = order.maker_amount - order.filled_maker_amount
+        if fill_amount <= 0 or fill_amount > remaining:
+            raise InvalidConfig("fill_amount must be in (0, remaining]")
+        return self._partial_fill_amounts(order, fill_amount)
 
     @view
     def get_counters(self) -> CountersView:
@@ -1265,6 +2457,8 @@ class OtcEscrowSwap(Blueprint):
             count_cancelled=self.count_cancelled,
             count_public=self.count_public,
             count_directed=self.count_directed,
+            count_archived=self.count_archived,
+            total_partial_fill_escrows=self.next_partial_fill_id,
         )
 
     @view
@@ -1272,31 +2466,253 @@ class OtcEscrowSwap(Blueprint):
         """
         Return a page of escrow IDs suitable for website pagination.
 
-        - cursor is an index into the escrow_ids array (NOT an escrow_id)
-        - next_cursor is 0 when no more data
+        - cursor is an index into the escrow_ids array (NOT an escrow_id); it stays valid
+          across compact_terminal_escrows()
+        - archived ids are skipped and the scan continues until limit ids are found, so a
+          page is only short at the end or after skipping MAX_PAGE_SCAN archived ids;
+          next_cursor is 0 when no more data
+        """
+        if cursor < 0:
+            cursor = 0
+        self._check_page_limit(limit)
 
-        NOTE: Avoid list slicing in PythonVM (some environments reject slicing on typed lists).
+        ids: list[int] = []
+        total = len(self.escrow_ids)
+        i = cursor
+        skipped = 0
+        while i < total and len(ids) < limit and skipped < MAX_PAGE_SCAN:
+            escrow_id = self.escrow_ids[i]
+            i += 1
+            if escrow_id in self.escrows:
+                ids.append(escrow_id)
+            else:
+                skipped += 1
+
+        next_cursor = 0 if i >= total else i
+        return EscrowIdsPage(cursor_in=cursor, limit=limit, next_cursor=next_cursor, ids=ids)
+
+    @view
+    def get_escrows_full_page(
+        self,
+        cursor: int,
+        limit: int,
+        current_timestamp: int,
+        statuses: list[int],
+        directed_filter: int,
+        token_filter: str,
+    ) -> EscrowsFullPage:
+        """
+        Return a page of full escrow details in one call, filtered server-side.
+
+        - cursor is an index into the escrow_ids array (NOT an escrow_id); it stays valid
+          across compact_terminal_escrows()
+        - archived and filtered-out escrows are skipped and the scan continues until limit
+          escrows match, so a page is only short at the end or after skipping MAX_PAGE_SCAN
+          escrows; next_cursor is 0 when no more data
+        - statuses: keep only these statuses (empty list = any)
+        - directed_filter: DIRECTED_FILTER_ANY / _PUBLIC / _DIRECTED
+        - token_filter: token uid hex matched against maker or taker token ("" = any)
         """
+        if directed_filter not in (DIRECTED_FILTER_ANY, DIRECTED_FILTER_PUBLIC, DIRECTED_FILTER_DIRECTED):
+            raise InvalidConfig("Invalid directed_filter")
         if cursor < 0:
             cursor = 0
+        self._check_page_limit(limit)
+
+        ids: list[int] = []
+        escrows: list[EscrowDetailsFull] = []
+        total = len(self.escrow_ids)
+        i = cursor
+        skipped = 0
+        while i < total and len(ids) < limit and skipped < MAX_PAGE_SCAN:
+            escrow_id = self.escrow_ids[i]
+            i += 1
+            if self._escrow_matches(escrow_id, statuses, directed_filter, token_filter):
+                ids.append(escrow_id)
+                escrows.append(self._build_escrow_full(self.escrows[escrow_id], current_timestamp))
+            else:
+                skipped += 1
+
+        return EscrowsFullPage(
+            cursor_in=cursor,
+            limit=limit,
+            next_cursor=0 if i >= total else i,
+            ids=ids,
+            escrows=escrows,
+        )
+
+    @view
+    def get_open_escrows_for_pair(
+        self,
+        maker_token: TokenUid,
+        taker_token: TokenUid,
+        current_timestamp: int,
+        cursor: OpenOrdersCursor,
+        limit: int,
+    ) -> OpenOrdersPage:
+        """
+        Return public escrows a taker can still take (OPEN or FUNDED_MAKER with no taker)
+        for a token pair, best price first.
+
+        - price is taker_amount/maker_amount (what a taker pays per maker unit); equal
+          prices keep opening order
+        - cursor is the (price, escrow_id) position of the last order already seen
+          (OPEN_BOOK_START for the first page); orders opened or removed between calls
+          do not shift it
+        - entries expired for their stage at current_timestamp are skipped, at most
+          MAX_PAGE_SCAN per call; next_cursor is OPEN_BOOK_START when no more data
+        """
         if limit <= 0:
             raise InvalidConfig("limit must be > 0")
         if limit > 200:
             raise InvalidConfig("limit too large")
+        if cursor.escrow_id >= 0 and (cursor.maker_amount <= 0 or cursor.taker_amount <= 0):
+            raise InvalidConfig("Invalid cursor")
+
+        orders: list[OpenOrderEntry] = []
+        book = self.open_books.get(self._pair_key(maker_token, taker_token))
+        if book is None:
+            return OpenOrdersPage(cursor_in=cursor, limit=limit, next_cursor=OPEN_BOOK_START, orders=orders)
+
+        n = len(book)
+        i = 0
+        if cursor.escrow_id >= 0:
+            probe = OpenOrderEntry(
+                escrow_id=cursor.escrow_id,
+                maker_amount=cursor.maker_amount,
+                taker_amount=cursor.taker_amount,
+                open_expiry_timestamp=0,
+            )
+            i = self._book_lower_bound(book, probe)
+            if i < n and book[i].escrow_id == cursor.escrow_id:
+                i += 1
+
+        skipped = 0
+        last: OpenOrderEntry | None = None
+        while i < n and len(orders) < limit and skipped < MAX_PAGE_SCAN:
+            entry = book[i]
+            i += 1
+            last = entry
+            if self._book_entry_live(entry, current_timestamp):
+                orders.append(entry)
+            else:
+                skipped += 1
+
+        next_cursor = OPEN_BOOK_START
+        if i < n and last is not None:
+            next_cursor = OpenOrdersCursor(
+                maker_amount=last.maker_amount,
+                taker_amount=last.taker_amount,
+                escrow_id=last.escrow_id,
+            )
+        return OpenOrdersPage(cursor_in=cursor, limit=limit, next_cursor=next_cursor, orders=orders)
 
-        total = len(self.escrow_ids)
-        if cursor >= total:
-            return EscrowIdsPage(cursor_in=cursor, limit=limit, next_cursor=0, ids=[])
+    @view
+    def get_expiring_escrows(
+        self,
+        from_timestamp: int,
+        to_timestamp: int,
+        cursor: int,
+        limit: int,
+    ) -> ExpiringEscrowsPage:
+        """
+        Return escrows whose current-stage expiry falls in [from_timestamp, to_timestamp).
+
+        - only the buckets overlapping the window are read; stale entries are skipped
+        - entries are ordered by (expiry_timestamp, escrow_id); cursor is an index into that
+          ordering (NOT an escrow_id)
+        - next_cursor is 0 when no more data
+        """
+        if cursor < 0:
+            cursor = 0
+        if limit <= 0:
+            raise InvalidConfig("limit must be > 0")
+        if limit > 200:
+            raise InvalidConfig("limit too large")
 
+        entries: list[ExpiryEntry] = []
+        if self.expiry_bucket_count == 0 or to_timestamp <= from_timestamp:
+            return ExpiringEscrowsPage(cursor_in=cursor, limit=limit, next_cursor=0, entries=entries)
+
+        bucket = self._expiry_bucket(from_timestamp)
+        if bucket < self.expiry_scan_bucket:
+            bucket = self.expiry_scan_bucket
+        last_bucket = self._expiry_bucket(to_timestamp - 1)
+        if last_bucket > self.expiry_last_bucket:
+            last_bucket = self.expiry_last_bucket
+
+        # Collect one entry past the page so has_more needs no second pass
+        wanted = cursor + limit + 1
+        ordered: list[ExpiryEntry] = []
+        while bucket <= last_bucket and len(ordered) < wanted:
+            stored = self.expiry_buckets.get(bucket)
+            bucket += EXPIRY_BUCKET_SECS
+            if stored is None:
+                continue
+            # Buckets are unsorted: order this bucket's live entries, then append them
+            live: list[ExpiryEntry] = []
+            n = len(stored)
+            j = 0
+            while j < n:
+                entry = stored[j]
+                j += 1
+                if entry.expiry_timestamp < from_timestamp or entry.expiry_timestamp >= to_timestamp:
+                    continue
+                if not self._expiry_entry_live(entry):
+                    continue
+                lo = 0
+                hi = len(live)
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if live[mid] < entry:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                live.insert(lo, entry)
+            ordered.extend(live)
+
+        total = len(ordered)
         end = cursor + limit
         if end > total:
             end = total
-
-        ids: list[int] = []
         i = cursor
         while i < end:
-            ids.append(self.escrow_ids[i])
+            entries.append(ordered[i])
             i += 1
 
-        next_cursor = 0 if end >= total else end
-        return EscrowIdsPage(cursor_in=cursor, limit=limit, next_cursor=next_cursor, ids=ids)
+        next_cursor = end if total > end else 0
+        return ExpiringEscrowsPage(cursor_in=cursor, limit=limit, next_cursor=next_cursor, entries=entries)
+
+    @view
+    def get_refund_credit(self, party: Address, token_uid: TokenUid) -> int:
+        """Return the refund credit claimable by party for token_uid."""
+        credits = self.refund_credits.get(party)
+        if credits is None:
+            return 0
+        return credits.get(token_uid, 0)
+
+    @view
+    def get_maker_escrow_ids_page(self, maker: Address, cursor: int, limit: int) -> EscrowIdsPage:
+        """
+        Return a page of escrow IDs opened by maker, oldest first.
+
+        - cursor is an index into the maker's id list (NOT an escrow_id)
+        - next_cursor is 0 when no more data
+        """
+        ids = self.maker_escrow_ids.get(maker)
+        if ids is None:
+            return self._page_ids([], cursor, limit)
+        return self._page_ids(ids, cursor, limit)
+
+    @view
+    def get_taker_escrow_ids_page(self, taker: Address, cursor: int, limit: int) -> EscrowIdsPage:
+        """
+        Return a page of escrow IDs accepted by taker or currently directed to taker.
+
+        - cursor is an index into the taker's id list (NOT an escrow_id)
+        - next_cursor is 0 when no more data
+        """
+        ids = self.taker_escrow_ids.get(taker)
+        if ids is None:
+            return self._page_ids([], cursor, limit)
+        return self._page_ids(ids, cursor, limit)
@@ -6,6 +6,9 @@ from hathor_tests.nanocontracts.blueprints.unittest import BlueprintTestCase
 # Import the blueprint from the submission folder (as it will exist in hathor-core)
 from blueprints.otc_escrow_swap.otc_escrow_swap import (
     OtcEscrowSwap,
+    EscrowTerms,
+    OpenOrdersCursor,
+    OPEN_BOOK_START,
     InvalidConfig,
     Unauthorized,
     InvalidEscrow,
@@ -19,6 +22,15 @@ from blueprints.otc_escrow_swap.otc_escrow_swap import (
     STATUS_REFUNDED,
     STATUS_CANCELLED,
     MAX_PROTOCOL_FEE_BPS,
+    FLAG_DIRECTED,
+    FLAG_HAS_TAKER,
+    FLAG_MAKER_FUNDED,
+    FLAG_TAKER_FUNDED,
+    FLAG_MAKER_WITHDRAWN,
+    FLAG_TAKER_WITHDRAWN,
+    DIRECTED_FILTER_ANY,
+    DIRECTED_FILTER_PUBLIC,
+    DIRECTED_FILTER_DIRECTED,
 )
 
 
@@ -30,7 +42,7 @@ class TestOtcEscrowSwap(BlueprintTestCase):
       S6, S7, S9, S11 were replaced by S13-S16
       
     Additional Unit Test Extras:
-        UTE-01 - UTE-07
+        UTE-01 - UTE-17
     """
 
     def setUp(self) -> None:
@@ -718,5 +730,554 @@ class TestOtcEscrowSwap(BlueprintTestCase):
         self._withdraw(self.bob, escrow_id, self.token_m, quote.taker_net_receive, ts=2606)
 
         with pytest.raises(InvalidEscrow):
-            self._refund(self.alice, escrow_id, self.token_m, 10, ts=2607) 
- 
+            self._refund(self.alice, escrow_id, self.token_m, 10, ts=2607)
+
+
+    # -----------------------
+    # UTE-08 — packed escrow record
+    # -----------------------
+
+    def test_ute_08_escrow_record_flags(self):
+        escrow_id = self._open_directed(self.alice, self.bob, 10, 20, ts=2700)
+
+        contract = self.get_readonly_contract(self.contract_id)
+        record = contract.escrows[escrow_id]
+        assert record.maker == self.alice
+        assert record.directed_taker == self.bob
+        assert record.flags == FLAG_DIRECTED
+        assert record.status == STATUS_OPEN
+
+        self._accept(self.bob, escrow_id, ts=2701)
+        self._fund_maker(self.alice, escrow_id, 10, ts=2702)
+        self._fund_taker(self.bob, escrow_id, 20, ts=2703)
+
+        record = self.get_readonly_contract(self.contract_id).escrows[escrow_id]
+        assert record.taker == self.bob
+        assert record.flags == FLAG_DIRECTED | FLAG_HAS_TAKER | FLAG_MAKER_FUNDED | FLAG_TAKER_FUNDED
+        assert record.maker_funded_expiry_timestamp == 2702 + self.default_maker_funded_expiry_secs
+
+        quote = self.runner.call_view_method(self.contract_id, "get_fee_quote", 10, 20)
+        self._withdraw(self.alice, escrow_id, self.token_t, quote.maker_net_receive, ts=2704)
+        self._withdraw(self.bob, escrow_id, self.token_m, quote.taker_net_receive, ts=2705)
+
+        record = self.get_readonly_contract(self.contract_id).escrows[escrow_id]
+        assert record.flags & (FLAG_MAKER_WITHDRAWN | FLAG_TAKER_WITHDRAWN) == FLAG_MAKER_WITHDRAWN | FLAG_TAKER_WITHDRAWN
+        assert record.status == STATUS_EXECUTED
+
+        counters = self.runner.call_view_method(self.contract_id, "get_counters")
+        assert counters.count_executed == 1
+        assert counters.count_open == 0
+
+    # -----------------------
+    # UTE-09 — per-maker / per-taker escrow index paging
+    # -----------------------
+
+    def test_ute_09_maker_and_taker_index_pages(self):
+        e0 = self._open_public(self.alice, 10, 20, ts=2800)
+        e1 = self._open_directed(self.alice, self.bob, 11, 21, ts=2801)
+        e2 = self._open_public(self.bob, 12, 22, ts=2802)
+        e3 = self._open_public(self.alice, 13, 23, ts=2803)
+
+        page = self.runner.call_view_method(self.contract_id, "get_maker_escrow_ids_page", self.alice, 0, 2)
+        assert page.ids == [e0, e1]
+        assert page.next_cursor == 2
+        page = self.runner.call_view_method(self.contract_id, "get_maker_escrow_ids_page", self.alice, 2, 2)
+        assert page.ids == [e3]
+        assert page.next_cursor == 0
+
+        # Directed escrows are indexed for the directed taker from open
+        page = self.runner.call_view_method(self.contract_id, "get_taker_escrow_ids_page", self.bob, 0, 10)
+        assert page.ids == [e1]
+
+        # Accepting a public escrow indexes it for the taker, once
+        self._accept(self.bob, e0, ts=2804)
+        self._accept(self.bob, e0, ts=2805)
+        self._accept(self.genesis, e2, ts=2806)
+        page = self.runner.call_view_method(self.contract_id, "get_taker_escrow_ids_page", self.bob, 0, 10)
+        assert page.ids == [e1, e0]
+        page = self.runner.call_view_method(self.contract_id, "get_taker_escrow_ids_page", self.genesis, 0, 10)
+        assert page.ids == [e2]
+
+        # Retargeting a directed escrow moves it between taker indexes
+        self._set_directed_taker(self.alice, e1, self.genesis, ts=2807)
+        page = self.runner.call_view_method(self.contract_id, "get_taker_escrow_ids_page", self.bob, 0, 10)
+        assert page.ids == [e0]
+        page = self.runner.call_view_method(self.contract_id, "get_taker_escrow_ids_page", self.genesis, 0, 10)
+        assert page.ids == [e2, e1]
+
+        page = self.runner.call_view_method(self.contract_id, "get_maker_escrow_ids_page", self.genesis, 0, 10)
+        assert page.ids == []
+        assert page.next_cursor == 0
+        with pytest.raises(InvalidConfig):
+            self.runner.call_view_method(self.contract_id, "get_maker_escrow_ids_page", self.alice, 0, 201)
+
+    # -----------------------
+    # UTE-10 — open-order book by token pair
+    # -----------------------
+
+    def _open_book_ids(self, ts: int, maker_token=None, taker_token=None) -> list[int]:
+        page = self.runner.call_view_method(
+            self.contract_id,
+            "get_open_escrows_for_pair",
+            maker_token or self.token_m,
+            taker_token or self.token_t,
+            ts,
+            OPEN_BOOK_START,
+            200,
+        )
+        return [order.escrow_id for order in page.orders]
+
+    def test_ute_10_open_book_by_pair(self):
+        e0 = self._open_public(self.alice, 100, 300, ts=2900)    # price 3.0
+        e1 = self._open_public(self.bob, 100, 150, ts=2901)      # price 1.5
+        e2 = self._open_public(self.alice, 200, 600, ts=2902)    # price 3.0 (after e0)
+        e3 = self._open_public(self.genesis, 10, 20, ts=2903)    # price 2.0
+        self._open_directed(self.alice, self.bob, 100, 100, ts=2904)  # directed: not listed
+
+        assert self._open_book_ids(2905) == [e1, e3, e0, e2]
+        assert self._open_book_ids(2905, self.token_t, self.token_m) == []
+
+        page = self.runner.call_view_method(
+            self.contract_id, "get_open_escrows_for_pair", self.token_m, self.token_t, 2905, OPEN_BOOK_START, 2
+        )
+        assert [o.escrow_id for o in page.orders] == [e1, e3]
+        assert (page.orders[0].maker_amount, page.orders[0].taker_amount) == (100, 150)
+        assert page.next_cursor == OpenOrdersCursor(10, 20, e3)
+
+        # The cursor is a (price, escrow_id) position: a better order opened in between does not shift it
+        e4 = self._open_public(self.bob, 100, 100, ts=2905)      # price 1.0
+        page = self.runner.call_view_method(
+            self.contract_id, "get_open_escrows_for_pair", self.token_m, self.token_t, 2906, page.next_cursor, 2
+        )
+        assert [o.escrow_id for o in page.orders] == [e0, e2]
+        assert page.next_cursor == OPEN_BOOK_START
+        with pytest.raises(InvalidConfig):
+            self.runner.call_view_method(
+                self.contract_id, "get_open_escrows_for_pair", self.token_m, self.token_t, 2906,
+                OpenOrdersCursor(0, 20, e3), 2,
+            )
+
+        # Accept and cancel take escrows out of the book; a maker-funded escrow stays listed
+        self._accept(self.genesis, e1, ts=2906)
+        self._cancel_before_funding(self.alice, e2, ts=2907)
+        self._fund_maker(self.genesis, e3, 10, ts=2908)
+        assert self._open_book_ids(2909) == [e4, e3, e0]
+        book_key = f"{self.token_m.hex()}/{self.token_t.hex()}"
+        book = self.get_readonly_contract(self.contract_id).open_books[book_key]
+        assert [entry.escrow_id for entry in book] == [e4, e3, e0]
+
+        # Stage-expired entries are hidden by the view; pruning is bounded by max_checks
+        expired_at = 2905 + self.default_open_expiry_secs
+        assert self._open_book_ids(expired_at) == []
+        ctx = self.create_context(caller_id=self.bob, timestamp=expired_at)
+        removed = self.runner.call_public_method(
+            self.contract_id, "prune_open_book", ctx, self.token_m, self.token_t, 1
+        )
+        assert removed == 1
+        removed = self.runner.call_public_method(
+            self.contract_id, "prune_open_book", ctx, self.token_m, self.token_t, 10
+        )
+        assert removed == 2
+        assert book_key not in self.get_readonly_contract(self.contract_id).open_books
+
+    # -----------------------
+    # UTE-11 — batched full-detail page with server-side filters
+    # -----------------------
+
+    def _full_page(self, cursor, limit, statuses, directed_filter, token_filter, ts=3010):
+        return self.runner.call_view_method(
+            self.contract_id,
+            "get_escrows_full_page",
+            cursor,
+            limit,
+            ts,
+            statuses,
+            directed_filter,
+            token_filter,
+        )
+
+    def test_ute_11_escrows_full_page_filters(self):
+        e0 = self._open_public(self.alice, 10, 20, ts=3000)
+        e1 = self._open_directed(self.alice, self.bob, 11, 21, ts=3001)
+        e2 = self._open_public(self.bob, 12, 22, ts=3002)
+        self._accept(self.genesis, e2, ts=3003)
+
+        page = self._full_page(0, 10, [], DIRECTED_FILTER_ANY, "")
+        assert page.ids == [e0, e1, e2]
+        assert [d.maker_amount for d in page.escrows] == [10, 11, 12]
+        assert page.escrows[1] == self.runner.call_view_method(self.contract_id, "get_escrow_full", e1, 3010)
+        assert page.next_cursor == 0
+
+        assert self._full_page(0, 10, [STATUS_OPEN], DIRECTED_FILTER_ANY, "").ids == [e0, e1]
+        assert self._full_page(0, 10, [STATUS_OPEN], DIRECTED_FILTER_PUBLIC, "").ids == [e0]
+        assert self._full_page(0, 10, [], DIRECTED_FILTER_DIRECTED, "").ids == [e1]
+        assert self._full_page(0, 10, [STATUS_ACCEPTED], DIRECTED_FILTER_ANY, self.token_t.hex()).ids == [e2]
+        assert self._full_page(0, 10, [], DIRECTED_FILTER_ANY, "00").ids == []
+
+        # limit counts matches; filtered-out rows are skipped without ending the page
+        page = self._full_page(0, 1, [STATUS_ACCEPTED], DIRECTED_FILTER_ANY, "")
+        assert page.ids == [e2]
+        assert page.next_cursor == 0
+        page = self._full_page(0, 1, [STATUS_OPEN], DIRECTED_FILTER_ANY, "")
+        assert page.ids == [e0]
+        assert page.next_cursor == 1
+        assert self._full_page(1, 1, [STATUS_OPEN], DIRECTED_FILTER_ANY, "").ids == [e1]
+
+        with pytest.raises(InvalidConfig):
+            self._full_page(0, 10, [], 3, "")
+
+    # -----------------------
+    # UTE-12 — expiry index, keeper batch refund and refund credits
+    # -----------------------
+
+    def test_ute_12_expiry_index_and_batch_refund(self):
+        e0 = self._open_public(self.alice, 10, 20, ts=3100)        # open expiry 3700
+        e1 = self._open_public(self.bob, 11, 21, ts=3101)          # open expiry 3701
+        self._accept(self.genesis, e1, ts=3102)
+        self._fund_maker(self.bob, e1, 11, ts=3103)                # maker-funded expiry 3343
+        e2 = self._open_public(self.alice, 12, 22, ts=3104)
+        self._accept(self.bob, e2, ts=3105)
+        self._fund_maker(self.alice, e2, 12, ts=3106)
+        self._fund_taker(self.bob, e2, 22, ts=3107)                # FUNDED_BOTH: not indexed
+        e3 = self._open_public(self.bob, 13, 23, ts=3108)          # open expiry 3708
+        self._cancel_before_funding(self.bob, e3, ts=3109)         # entry goes stale
+
+        mf_expiry = 3103 + self.default_maker_funded_expiry_secs
+        page = self.runner.call_view_method(self.contract_id, "get_expiring_escrows", 0, 10**9, 0, 10)
+        assert [(en.escrow_id, en.expiry_timestamp) for en in page.entries] == [
+            (e1, mf_expiry),
+            (e0, 3100 + self.default_open_expiry_secs),
+        ]
+        page = self.runner.call_view_method(self.contract_id, "get_expiring_escrows", 0, mf_expiry + 1, 0, 10)
+        assert [en.escrow_id for en in page.entries] == [e1]
+        assert page.next_cursor == 0
+
+        # Nothing has expired yet
+        ctx = self.create_context(caller_id=self.genesis, timestamp=3200)
+        assert self.runner.call_public_method(self.contract_id, "refund_expired_batch", ctx, 10) == 0
+
+        # A keeper settles the expired maker-funded escrow; the maker pulls the credit
+        ctx = self.create_context(caller_id=self.genesis, timestamp=mf_expiry)
+        assert self.runner.call_public_method(self.contract_id, "refund_expired_batch", ctx, 10) == 1
+        assert self._status(e1) == STATUS_REFUNDED
+        assert self.runner.call_view_method(self.contract_id, "get_refund_credit", self.bob, self.token_m) == 11
+        page = self.runner.call_view_method(self.contract_id, "get_expiring_escrows", 0, 10**9, 0, 10)
+        assert [en.escrow_id for en in page.entries] == [e0]
+
+        with pytest.raises(InvalidEscrow):
+            self._refund(self.bob, e1, self.token_m, 11, ts=mf_expiry + 1)
+        ctx = self.create_context(
+            caller_id=self.genesis,
+            timestamp=mf_expiry + 1,
+            actions=[NCWithdrawalAction(token_uid=self.token_m, amount=11)],
+        )
+        with pytest.raises(InvalidEscrow):
+            self.runner.call_public_method(self.contract_id, "claim_refund_credit", ctx)
+        ctx = self.create_context(
+            caller_id=self.bob,
+            timestamp=mf_expiry + 1,
+            actions=[NCWithdrawalAction(token_uid=self.token_m, amount=11)],
+        )
+        self.runner.call_public_method(self.contract_id, "claim_refund_credit", ctx)
+        assert self.runner.call_view_method(self.contract_id, "get_refund_credit", self.bob, self.token_m) == 0
+
+        # Expired unfunded escrows are just dropped from the indexes
+        ctx = self.create_context(caller_id=self.genesis, timestamp=3100 + self.default_open_expiry_secs)
+        assert self.runner.call_public_method(self.contract_id, "refund_expired_batch", ctx, 10) == 1
+        assert self._status(e0) == STATUS_OPEN
+        page = self.runner.call_view_method(self.contract_id, "get_expiring_escrows", 0, 10**9, 0, 10)
+        assert page.entries == []
+
+        # Stale entries (e1 and e2 left their open stage, e3 was cancelled) are dropped lazily
+        # once their bucket is reached; max_count bounds the entries checked per call
+        ctx = self.create_context(caller_id=self.genesis, timestamp=3108 + self.default_open_expiry_secs)
+        assert self.runner.call_public_method(self.contract_id, "refund_expired_batch", ctx, 2) == 2
+        assert self.runner.call_public_method(self.contract_id, "refund_expired_batch", ctx, 10) == 1
+        assert self.runner.call_public_method(self.contract_id, "refund_expired_batch", ctx, 10) == 0
+        assert self._status(e3) == STATUS_CANCELLED
+
+    def test_ute_13_compact_terminal_escrows(self):
+        e0 = self._open_public(self.alice, 100, 125, ts=4000)
+        self._accept(self.bob, e0, ts=4001)
+        self._fund_maker(self.alice, e0, 100, ts=4002)
+        self._fund_taker(self.bob, e0, 125, ts=4003)
+        self._withdraw(self.alice, e0, self.token_t, 123, ts=4004)
+        self._withdraw(self.bob, e0, self.token_m, 99, ts=4005)    # EXECUTED at 4005
+        e1 = self._open_public(self.alice, 10, 20, ts=4006)       # stays OPEN
+        e2 = self._open_public(self.bob, 11, 21, ts=4007)
+        self._cancel_before_funding(self.bob, e2, ts=4008)         # CANCELLED at 4008
+        e3 = self._open_public(self.bob, 12, 22, ts=4009)          # stays OPEN
+
+        first_page = self.runner.call_view_method(self.contract_id, "get_escrow_ids_page", 0, 2)
+        assert list(first_page.ids) == [e0, e1]
+
+        # The first call only looks at e0 and e1; ids are archived in place, so cursors do not shift
+        ctx = self.create_context(caller_id=self.genesis, timestamp=4010)
+        assert self.runner.call_public_method(self.contract_id, "compact_terminal_escrows", ctx, 0, 2) == 2
+        ctx = self.create_context(caller_id=self.genesis, timestamp=4011)
+        assert self.runner.call_public_method(self.contract_id, "compact_terminal_escrows", ctx, 2, 10) == 0
+
+        page = self.runner.call_view_method(self.contract_id, "get_escrow_ids_page", 0, 10)
+        assert list(page.ids) == [e1, e3]
+        # A cursor handed out before compaction still resumes at the same position
+        page = self.runner.call_view_method(self.contract_id, "get_escrow_ids_page", first_page.next_cursor, 10)
+        assert list(page.ids) == [e3]
+        # Pages keep scanning past archived ids until they are full
+        page = self.runner.call_view_method(self.contract_id, "get_escrow_ids_page", 0, 1)
+        assert list(page.ids) == [e1]
+        assert page.next_cursor == 2
+        page = self.runner.call_view_method(self.contract_id, "get_escrow_ids_page", page.next_cursor, 1)
+        assert list(page.ids) == [e3]
+        assert page.next_cursor == 0
+        ctx = self.create_context(caller_id=self.genesis, timestamp=4012)
+        assert self.runner.call_public_method(self.contract_id, "compact_terminal_escrows", ctx, 0, 10) == 0
+        assert self.runner.call_view_method(self.contract_id, "get_counters").count_archived == 2
+
+        archived = self.runner.call_view_method(self.contract_id, "get_archived_escrow", e0)
+        assert archived.status == STATUS_EXECUTED
+        assert archived.closed_timestamp == 4005
+        assert len(archived.terms_fingerprint) == 16
+        archived = self.runner.call_view_method(self.contract_id, "get_archived_escrow", e2)
+        assert archived.status == STATUS_CANCELLED
+        assert archived.closed_timestamp == 4008
+        assert self.runner.call_view_method(self.contract_id, "get_archived_escrow", e1).status == -1
+
+        # Lookups still report the final status; archived escrows cannot be acted on
+        assert self._status(e0) == STATUS_EXECUTED
+        assert self.runner.call_view_method(self.contract_id, "get_escrow_exists", e2)
+        assert self.runner.call_view_method(self.contract_id, "get_escrow", e2).is_cancelled
+        with pytest.raises(InvalidEscrow):
+            self._accept(self.genesis, e2, ts=4012)
+
+        # Live escrows are untouched
+        self._accept(self.genesis, e1, ts=4013)
+        assert self._status(e1) == STATUS_ACCEPTED
+        assert self._status(e3) == STATUS_OPEN
+
+    def test_ute_14_open_escrows_batch(self):
+        ladder = [
+            EscrowTerms(self.token_m, 10, self.token_t, 20, 0, None),
+            EscrowTerms(self.token_m, 20, self.token_t, 38, 0, None),
+            EscrowTerms(self.token_m, 30, self.token_t, 55, 5000 + 120, self.bob),
+        ]
+        ctx = self.create_context(caller_id=self.alice, timestamp=5000)
+        first = self.runner.call_public_method(self.contract_id, "open_escrows_batch", ctx, ladder)
+        ids = [first, first + 1, first + 2]
+        assert [self._status(e) for e in ids] == [STATUS_OPEN] * 3
+        assert self._open_book_ids(5001) == [first + 1, first]
+        full = self.runner.call_view_method(self.contract_id, "get_escrow_full", first + 2, 5001)
+        assert full.is_directed and full.open_expiry_timestamp == 5120
+        counters = self.runner.call_view_method(self.contract_id, "get_counters")
+        assert counters.total_escrows == first + 3
+        assert (counters.count_public, counters.count_directed) == (2, 1)
+
+        # Funded batch: one aggregated deposit funds every maker side
+        ctx = self.create_context(
+            caller_id=self.alice,
+            timestamp=5002,
+            actions=[NCDepositAction(token_uid=self.token_m, amount=60)],
+        )
+        with pytest.raises(InvalidActions):
+            self.runner.call_public_method(self.contract_id, "open_escrows_batch", ctx, ladder)
+        ctx = self.create_context(
+            caller_id=self.alice,
+            timestamp=5002,
+            actions=[NCDepositAction(token_uid=self.token_m, amount=59)],
+        )
+        first = self.runner.call_public_method(
+            self.contract_id, "open_escrows_batch", ctx, ladder[:2] + [ladder[2]._replace(maker_amount=29)]
+        )
+        assert [self._status(e) for e in (first, first + 1, first + 2)] == [STATUS_FUNDED_MAKER] * 3
+        # Funded public escrows are listed next to the unfunded ones, directed ones are not
+        assert self._open_book_ids(5003) == [first - 2, first + 1, first - 3, first]
+
+        # A taker completes one escrow of the funded ladder
+        self._accept(self.bob, first + 1, ts=5003)
+        assert self._open_book_ids(5004) == [first - 2, first - 3, first]
+        self._fund_taker(self.bob, first + 1, 38, ts=5004)
+        assert self._status(first + 1) == STATUS_FUNDED_BOTH
+
+        # Invalid entries reject the whole batch
+        ctx = self.create_context(caller_id=self.alice, timestamp=5005)
+        with pytest.raises(InvalidConfig):
+            self.runner.call_public_method(
+                self.contract_id, "open_escrows_batch", ctx,
+                [ladder[0], EscrowTerms(self.token_m, 1, self.token_t, 1, 5005 + 10, None)],
+            )
+        with pytest.raises(InvalidConfig):
+            self.runner.call_public_method(self.contract_id, "open_escrows_batch", ctx, [])
+
+    def _fill_partial(self, taker: Address, fill_id: int, fill_amount: int, pay: int, receive: int, ts: int) -> None:
+        ctx = self.create_context(
+            caller_id=taker,
+            timestamp=ts,
+            actions=[
+                NCDepositAction(token_uid=self.token_t, amount=pay),
+                NCWithdrawalAction(token_uid=self.token_m, amount=receive),
+            ],
+        )
+        self.runner.call_public_method(self.contract_id, "fill_partial_escrow", ctx, fill_id, fill_amount)
+
+    def test_ute_15_partial_fill_escrow(self):
+        ctx = self.create_context(
+            caller_id=self.alice,
+            timestamp=6000,
+            actions=[NCDepositAction(token_uid=self.token_m, amount=1000)],
+        )
+        fill_id = self.runner.call_public_method(
+            self.contract_id, "open_partial_fill_escrow", ctx, self.token_t, 1500, 100, 0
+        )
+
+        # 333 at 1.5 costs ceil(499.5) = 500; fees are ceil(1% of each leg)
+        quote = self.runner.call_view_method(self.contract_id, "get_partial_fill_quote", fill_id, 333)
+        assert (quote.taker_pay, quote.maker_fee, quote.taker_fee) == (500, 4, 5)
+        assert (quote.taker_net_receive, quote.maker_net_receive) == (329, 495)
+        with pytest.raises(InvalidActions):
+            self._fill_partial(self.bob, fill_id, 333, 499, 329, ts=6001)
+        self._fill_partial(self.bob, fill_id, 333, 500, 329, ts=6001)
+
+        with pytest.raises(InvalidConfig):
+            self._fill_partial(self.genesis, fill_id, 50, 75, 49, ts=6002)   # below min_fill_amount
+
+        # The final fill takes the remainder; cumulative rounding makes the total exactly 1500
+        quote = self.runner.call_view_method(self.contract_id, "get_partial_fill_quote", fill_id, 667)
+        assert quote.taker_pay == 1000
+        self._fill_partial(self.genesis, fill_id, 667, 1000, quote.taker_net_receive, ts=6003)
+
+        order = self.runner.call_view_method(self.contract_id, "get_partial_fill_escrow", fill_id, 6003)
+        assert order.status == STATUS_EXECUTED
+        assert order.remaining_maker_amount == 0
+        assert (order.filled_maker_amount, order.filled_taker_amount) == (1000, 1500)
+        assert order.fill_count == 2 and order.last_fill_timestamp == 6003
+        assert order.maker_claimable == 495 + quote.maker_net_receive
+        assert self.runner.call_view_method(self.contract_id, "get_protocol_fee_balance", self.token_m) == 4 + quote.maker_fee
+
+        with pytest.raises(Unauthorized):
+            ctx = self.create_context(
+                caller_id=self.bob,
+                timestamp=6004,
+                actions=[NCWithdrawalAction(token_uid=self.token_t, amount=order.maker_claimable)],
+            )
+            self.runner.call_public_method(self.contract_id, "claim_partial_fill_proceeds", ctx, fill_id)
+        ctx = self.create_context(
+            caller_id=self.alice,
+            timestamp=6004,
+            actions=[NCWithdrawalAction(token_uid=self.token_t, amount=order.maker_claimable)],
+        )
+        self.runner.call_public_method(self.contract_id, "claim_partial_fill_proceeds", ctx, fill_id)
+
+        # A second order is cancelled after one fill; the maker takes back the unfilled size
+        ctx = self.create_context(
+            caller_id=self.alice,
+            timestamp=6005,
+            actions=[NCDepositAction(token_uid=self.token_m, amount=400)],
+        )
+        fill_id = self.runner.call_public_method(
+            self.contract_id, "open_partial_fill_escrow", ctx, self.token_t, 400, 100, 0
+        )
+        self._fill_partial(self.bob, fill_id, 100, 100, 99, ts=6006)
+        ctx = self.create_context(
+            caller_id=self.alice,
+            timestamp=6007,
+            actions=[NCWithdrawalAction(token_uid=self.token_m, amount=300)],
+        )
+        self.runner.call_public_method(self.contract_id, "cancel_partial_fill_escrow", ctx, fill_id)
+        assert self.runner.call_view_method(self.contract_id, "get_partial_fill_escrow", fill_id, 6007).status == STATUS_CANCELLED
+        with pytest.raises(InvalidEscrow):
+            self._fill_partial(self.bob, fill_id, 100, 100, 99, ts=6008)
+
+    def test_ute_16_sweep_protocol_fees(self):
+        escrow_id = self._open_public(self.alice, 100, 125, ts=7000)
+        self._accept(self.bob, escrow_id, ts=7001)
+        self._fund_maker(self.alice, escrow_id, 100, ts=7002)
+        self._fund_taker(self.bob, escrow_id, 125, ts=7003)
+        self._withdraw(self.alice, escrow_id, self.token_t, 123, ts=7004)
+        self._withdraw(self.bob, escrow_id, self.token_m, 99, ts=7005)
+
+        balances = self.runner.call_view_method(self.contract_id, "get_protocol_fee_balances")
+        assert sorted((b.token_uid, b.amount) for b in balances) == sorted(
+            [(self.token_m.hex(), 1), (self.token_t.hex(), 2)]
+        )
+
+        sweep = [
+            NCWithdrawalAction(token_uid=self.token_m, amount=1),
+            NCWithdrawalAction(token_uid=self.token_t, amount=2),
+        ]
+        ctx = self.create_context(caller_id=self.alice, timestamp=7006, actions=sweep)
+        with pytest.raises(Unauthorized):
+            self.runner.call_public_method(self.contract_id, "sweep_protocol_fees", ctx)
+        ctx = self.create_context(
+            caller_id=self.fee_recipient,
+            timestamp=7006,
+            actions=[sweep[0], NCWithdrawalAction(token_uid=self.token_t, amount=1)],
+        )
+        with pytest.raises(InvalidActions):
+            self.runner.call_public_method(self.contract_id, "sweep_protocol_fees", ctx)
+
+        ctx = self.create_context(caller_id=self.fee_recipient, timestamp=7006, actions=sweep)
+        self.runner.call_public_method(self.contract_id, "sweep_protocol_fees", ctx)
+        assert self.runner.call_view_method(self.contract_id, "get_protocol_fee_balances") == []
+        assert self.runner.call_view_method(self.contract_id, "get_protocol_fee_balance", self.token_t) == 0
+
+        # Nothing left to sweep
+        ctx = self.create_context(caller_id=self.fee_recipient, timestamp=7007, actions=[sweep[0]])
+        with pytest.raises(InvalidEscrow):
+            self.runner.call_public_method(self.contract_id, "sweep_protocol_fees", ctx)
+
+    def test_ute_17_fast_paths(self):
+        ctx = self.create_context(
+            caller_id=self.alice,
+            timestamp=8000,
+            actions=[NCDepositAction(token_uid=self.token_m, amount=100)],
+        )
+        escrow_id = self.runner.call_public_method(
+            self.contract_id, "open_funded_escrow", ctx, self.token_m, 100, self.token_t, 125, 0
+        )
+        assert self._status(escrow_id) == STATUS_FUNDED_MAKER
+
+        taker_actions = [
+            NCDepositAction(token_uid=self.token_t, amount=125),
+            NCWithdrawalAction(token_uid=self.token_m, amount=99),
+        ]
+        ctx = self.create_context(caller_id=self.alice, timestamp=8001, actions=taker_actions)
+        with pytest.raises(InvalidConfig):
+            self.runner.call_public_method(self.contract_id, "accept_fund_and_withdraw", ctx, escrow_id)
+        ctx = self.create_context(
+            caller_id=self.bob,
+            timestamp=8001,
+            actions=[taker_actions[0], NCWithdrawalAction(token_uid=self.token_m, amount=100)],
+        )
+        with pytest.raises(InvalidActions):
+            self.runner.call_public_method(self.contract_id, "accept_fund_and_withdraw", ctx, escrow_id)
+
+        ctx = self.create_context(caller_id=self.bob, timestamp=8001, actions=taker_actions)
+        self.runner.call_public_method(self.contract_id, "accept_fund_and_withdraw", ctx, escrow_id)
+        full = self.runner.call_view_method(self.contract_id, "get_escrow_full", escrow_id, 8001)
+        assert full.status == STATUS_FUNDED_BOTH
+        assert full.taker_withdrawn and not full.maker_withdrawn
+        assert escrow_id in self.runner.call_view_method(
+            self.contract_id, "get_taker_escrow_ids_page", self.bob, 0, 10
+        ).ids
+
+        # The maker settles with the regular withdraw
+        self._withdraw(self.alice, escrow_id, self.token_t, 123, ts=8002)
+        assert self._status(escrow_id) == STATUS_EXECUTED
+
+        # Directed variant: only the directed taker may take it
+        ctx = self.create_context(
+            caller_id=self.alice,
+            timestamp=8003,
+            actions=[NCDepositAction(token_uid=self.token_m, amount=100)],
+        )
+        escrow_id = self.runner.call_public_method(
+            self.contract_id, "open_funded_escrow_directed", ctx, self.token_m, 100, self.token_t, 125, 0, self.bob
+        )
+        ctx = self.create_context(caller_id=self.genesis, timestamp=8004, actions=taker_actions)
+        with pytest.raises(Unauthorized):
+            self.runner.call_public_method(self.contract_id, "accept_fund_and_withdraw", ctx, escrow_id)
+
+        # Unfunded escrows cannot be taken in one call
+        open_id = self._open_public(self.alice, 100, 125, ts=8005)
+        ctx = self.create_context(caller_id=self.bob, timestamp=8006, actions=taker_actions)
+        with pytest.raises(InvalidEscrow):
+            self.runner.call_public_method(self.contract_id, "accept_fund_and_withdraw", ctx, open_id)
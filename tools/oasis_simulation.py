@@ -0,0 +1,514 @@
+"""Off-chain Monte Carlo treasury-solvency simulator for the Oasis blueprint.
+
+Sizes the owner HTR deposit (``owner_deposit``) against the 6/9/12 month bonus
+schedule and the impermanent-loss compensation paid on ``close_position``.
+
+The simulator reproduces the integer math of ``Oasis`` and of the HTR/token_b
+``DozerPoolManager`` pool it provides liquidity to (fees, protocol-fee LP minting,
+windowed TWAP, add/remove liquidity) and runs many price paths at once. Each
+state variable is a NumPy array with one entry per path; amounts use ``object``
+dtype so every operation is exact Python integer arithmetic, while only the
+arbitrage trade sizes that drive the pool along a price path use floats.
+
+This is not a blueprint and is never deployed. Run it directly::
+
+    python tools/oasis_simulation.py --paths 20000 --owner-deposit 10000000000
+
+Each step the pool is arbitraged towards a geometric Brownian motion target
+price of token_b in HTR, scheduled user deposits are made, and positions are
+closed as soon as their timelock expires. The HTR treasury is treated as
+unlimited; the peak cumulative outflow is the owner deposit that would have been
+required for no deposit to fail with "Not enough balance".
+"""
+
+import argparse
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+# Constants mirrored from oasis.py
+PRECISION = 10**20
+PRICE_PRECISION = 10**8
+MONTHS_IN_SECONDS = 60 * 60 * 24 * 30
+BONUS_MULTIPLIER = {6: 1000, 9: 1500, 12: 2000}  # Basis points per timelock in months
+
+# Constants mirrored from dozer_pool_manager.py
+MINIMUM_LIQUIDITY = 10**3
+FEE_DENOMINATOR = 1000
+DEFAULT_PROTOCOL_FEE = 40  # Percentage of the swap fee minted to the pool owner as LP
+DEFAULT_TWAP_WINDOW = 14400
+
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+
+_isqrt = np.frompyfunc(math.isqrt, 1, 1)
+
+
+class ScheduledDeposit(NamedTuple):
+    """A single user's deposit into Oasis."""
+
+    step: int  # Simulation step at which the deposit is made (>= 1)
+    amount: int  # Token_b sent to user_deposit, before the Oasis protocol fee
+    timelock: int  # Lock period in months (6, 9 or 12)
+
+
+class SimulationConfig(NamedTuple):
+    """Initial pool state, deposit schedule and price process for a simulation."""
+
+    reserve_htr: int  # Initial HTR reserve of the HTR/token_b pool
+    reserve_b: int  # Initial token_b reserve of the HTR/token_b pool
+    deposits: list[ScheduledDeposit]
+    n_steps: int  # Number of steps; must cover every deposit's unlock time
+    volatility: float = 0.8  # Annualized volatility of the token_b price in HTR
+    drift: float = 0.0  # Annualized drift of the token_b price in HTR
+    step_seconds: int = 24 * 60 * 60
+    start_timestamp: int = 1_700_000_000  # Pool creation timestamp
+    pool_fee: int = 3  # Pool fee numerator (over FEE_DENOMINATOR)
+    oasis_protocol_fee: int = 0  # Oasis protocol fee in thousandths
+    twap_window: int = DEFAULT_TWAP_WINDOW
+    dozer_protocol_fee: int = DEFAULT_PROTOCOL_FEE
+
+
+class SimulationResult(NamedTuple):
+    """Per-path outcome of a simulation batch. Every array has shape (n_paths,) unless noted."""
+
+    required_treasury: np.ndarray  # Peak cumulative HTR outflow from the Oasis treasury
+    final_net_cost: np.ndarray  # HTR the treasury is down after every position closed
+    total_bonus: np.ndarray  # HTR bonus credited to users
+    total_il_compensation: np.ndarray  # HTR paid as impermanent-loss compensation
+    user_il_compensation: np.ndarray  # Shape (n_deposits, n_paths): loss_htr per position
+    user_closed_balance_b: np.ndarray  # Shape (n_deposits, n_paths): token_b returned per position
+    final_price: np.ndarray  # Final pool spot price of token_b in HTR (float)
+
+
+class SimulationSummary(NamedTuple):
+    """Distribution of treasury shortfall for a given owner deposit."""
+
+    owner_deposit: int
+    n_paths: int
+    shortfall_probability: float  # Fraction of paths where required_treasury > owner_deposit
+    shortfall_mean: float
+    shortfall_quantiles: dict[float, int]
+    required_treasury_quantiles: dict[float, int]
+    final_net_cost_quantiles: dict[float, int]
+
+
+def _ints(values, n_paths: int) -> np.ndarray:
+    """Object array of Python ints, broadcasting a scalar to n_paths entries."""
+    if np.isscalar(values):
+        out = np.empty(n_paths, dtype=object)
+        out[:] = int(values)
+        return out
+    return np.array([int(v) for v in values], dtype=object)
+
+
+def _ceil_div(numerator: np.ndarray, denominator: int) -> np.ndarray:
+    return (numerator + denominator - 1) // denominator
+
+
+def arbitrage_trade(
+    reserve_htr: np.ndarray,
+    reserve_b: np.ndarray,
+    target_price: np.ndarray,
+    pool_fee: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Swap inputs that move the pool spot price of token_b in HTR to target_price.
+
+    Returns (htr_in, b_in); for each path at most one of them is nonzero. Sizes are
+    computed in floating point and truncated, so the resulting price is approximate.
+    """
+    r_htr = reserve_htr.astype(float)
+    r_b = reserve_b.astype(float)
+    k = r_htr * r_b
+    gamma = (FEE_DENOMINATOR - pool_fee) / FEE_DENOMINATOR
+
+    htr_in = np.maximum(np.sqrt(k * target_price) - r_htr, 0.0) / gamma
+    b_in = np.maximum(np.sqrt(k / target_price) - r_b, 0.0) / gamma
+    return (
+        np.floor(htr_in).astype(np.int64).astype(object),
+        np.floor(b_in).astype(np.int64).astype(object),
+    )
+
+
+class _PoolArrays:
+    """Vectorized state of the HTR/token_b DozerPoolManager pool.
+
+    HTR is always token_a, since its UID sorts before every other token.
+    """
+
+    def __init__(self, config: SimulationConfig, n_paths: int) -> None:
+        reserve_a = int(config.reserve_htr)
+        reserve_b = int(config.reserve_b)
+        root = math.isqrt(reserve_a * reserve_b)
+
+        self.fee = config.pool_fee
+        self.protocol_fee = config.dozer_protocol_fee
+        self.twap_window = config.twap_window
+        self.reserve_a = _ints(reserve_a, n_paths)
+        self.reserve_b = _ints(reserve_b, n_paths)
+        self.total_liquidity = _ints(root * PRECISION + root * MINIMUM_LIQUIDITY, n_paths)
+        self.oasis_liquidity = _ints(0, n_paths)
+        self.price_a_window_sum = _ints(
+            (reserve_b * PRICE_PRECISION) // reserve_a * config.twap_window, n_paths
+        )
+        self.price_b_window_sum = _ints(
+            (reserve_a * PRICE_PRECISION) // reserve_b * config.twap_window, n_paths
+        )
+        self.block_timestamp_last = _ints(config.start_timestamp, n_paths)
+
+    def _window_sums(self, timestamp: int) -> tuple[np.ndarray, np.ndarray]:
+        """Mirror of DozerPoolManager._calculate_window_sums at the current spot price."""
+        elapsed = timestamp - self.block_timestamp_last
+        price_a_now = (self.reserve_b * PRICE_PRECISION) // self.reserve_a
+        price_b_now = (self.reserve_a * PRICE_PRECISION) // self.reserve_b
+
+        time_remaining = np.maximum(self.twap_window - elapsed, 0)
+        time_weight_new = np.minimum(elapsed, self.twap_window)
+        sum_a = price_a_now * time_weight_new + (self.price_a_window_sum * time_remaining) // self.twap_window
+        sum_b = price_b_now * time_weight_new + (self.price_b_window_sum * time_remaining) // self.twap_window
+
+        moved = elapsed > 0
+        return (
+            np.where(moved, sum_a, self.price_a_window_sum),
+            np.where(moved, sum_b, self.price_b_window_sum),
+        )
+
+    def update_twap(self, timestamp: int, mask: np.ndarray) -> None:
+        """Mirror of DozerPoolManager._update_twap for the paths in mask."""
+        mask = mask & (self.block_timestamp_last != timestamp)
+        sum_a, sum_b = self._window_sums(timestamp)
+        self.price_a_window_sum = np.where(mask, sum_a, self.price_a_window_sum)
+        self.price_b_window_sum = np.where(mask, sum_b, self.price_b_window_sum)
+        self.block_timestamp_last = np.where(mask, timestamp, self.block_timestamp_last)
+
+    def twap_b_in_htr(self, timestamp: int) -> np.ndarray:
+        """Mirror of get_twap_price(HTR, token_b, ...): HTR per token_b, PRICE_PRECISION scaled."""
+        return self._window_sums(timestamp)[1] // self.twap_window
+
+    def swap(self, timestamp: int, htr_in: np.ndarray, b_in: np.ndarray) -> None:
+        """Mirror of DozerPoolManager._swap; paths with no input are left untouched."""
+        traded = (htr_in > 0) | (b_in > 0)
+        self.update_twap(timestamp, traded)
+
+        in_is_htr = htr_in > 0
+        amount_in = np.where(in_is_htr, htr_in, b_in)
+        reserve_in = np.where(in_is_htr, self.reserve_a, self.reserve_b)
+        reserve_out = np.where(in_is_htr, self.reserve_b, self.reserve_a)
+
+        a = FEE_DENOMINATOR - self.fee
+        amount_out = (reserve_out * amount_in * a) // (reserve_in * FEE_DENOMINATOR + amount_in * a)
+
+        # _process_swap_fees: protocol fee is minted as LP from the pre-swap reserves
+        fee_amount = _ceil_div(amount_in * self.fee, FEE_DENOMINATOR)
+        protocol_product = fee_amount * self.protocol_fee
+        protocol_fee_amount = np.where(
+            (protocol_product > 0) & (protocol_product < 100), 1, protocol_product // 100
+        )
+        product_before = self.reserve_a * self.reserve_b
+        product_after = np.where(
+            in_is_htr,
+            (self.reserve_a + protocol_fee_amount) * self.reserve_b,
+            self.reserve_a * (self.reserve_b + protocol_fee_amount),
+        )
+        self.total_liquidity = self.total_liquidity + (
+            _isqrt(product_after) - _isqrt(product_before)
+        ) * PRECISION
+
+        self.reserve_a = np.where(in_is_htr, self.reserve_a + amount_in, self.reserve_a - amount_out)
+        self.reserve_b = np.where(in_is_htr, self.reserve_b - amount_out, self.reserve_b + amount_in)
+
+    def oasis_amounts(self) -> tuple[np.ndarray, np.ndarray]:
+        """Mirror of user_info(oasis, pool_key): (token0Amount, token1Amount) owned by Oasis."""
+        return (
+            self.reserve_a * self.oasis_liquidity // self.total_liquidity,
+            self.reserve_b * self.oasis_liquidity // self.total_liquidity,
+        )
+
+    def add_liquidity(self, timestamp: int, htr_amount: np.ndarray, b_amount: np.ndarray) -> np.ndarray:
+        """Mirror of DozerPoolManager.add_liquidity by Oasis; returns the token_b change."""
+        self.update_twap(timestamp, np.full(len(htr_amount), True))
+
+        optimal_b = htr_amount * self.reserve_b // self.reserve_a
+        # Oasis quotes htr_amount from b_amount at the same reserves, so token_a always limits
+        assert (optimal_b <= b_amount).all(), "token_a must be the limiting factor"
+
+        self.oasis_liquidity = self.oasis_liquidity + self.total_liquidity * htr_amount // self.reserve_a
+        self.total_liquidity = self.total_liquidity + self.total_liquidity * htr_amount // self.reserve_a
+        self.reserve_a = self.reserve_a + htr_amount
+        self.reserve_b = self.reserve_b + optimal_b
+        return b_amount - optimal_b
+
+    def remove_liquidity(self, timestamp: int, htr_amount: np.ndarray, b_amount: np.ndarray) -> None:
+        """Mirror of DozerPoolManager.remove_liquidity by Oasis (no change is returned)."""
+        self.update_twap(timestamp, np.full(len(htr_amount), True))
+
+        optimal_b = htr_amount * self.reserve_b // self.reserve_a
+        assert (optimal_b == b_amount).all(), "Oasis withdraws exactly the quoted token_b"
+
+        liquidity_decrease = (self.total_liquidity * htr_amount + self.reserve_a - 1) // self.reserve_a
+        self.oasis_liquidity = self.oasis_liquidity - liquidity_decrease
+        self.total_liquidity = self.total_liquidity - liquidity_decrease
+        self.reserve_a = self.reserve_a - htr_amount
+        self.reserve_b = self.reserve_b - optimal_b
+
+
+class _OasisArrays:
+    """Vectorized state of the Oasis contract, one user per scheduled deposit."""
+
+    def __init__(self, config: SimulationConfig, n_paths: int) -> None:
+        n_users = len(config.deposits)
+        self.protocol_fee = config.oasis_protocol_fee
+        self.htr_balance = _ints(0, n_paths)  # Relative to the owner deposit
+        self.min_htr_balance = _ints(0, n_paths)
+        self.total_liquidity = _ints(0, n_paths)
+        self.total_bonus = _ints(0, n_paths)
+        self.total_il_compensation = _ints(0, n_paths)
+        self.user_liquidity = [_ints(0, n_paths) for _ in range(n_users)]
+        self.user_deposit_b = [_ints(0, n_paths) for _ in range(n_users)]
+        self.user_balance_htr = [_ints(0, n_paths) for _ in range(n_users)]
+        self.user_balance_b = [_ints(0, n_paths) for _ in range(n_users)]
+        self.user_il_compensation = [_ints(0, n_paths) for _ in range(n_users)]
+        self.user_closed_balance_b = [_ints(0, n_paths) for _ in range(n_users)]
+
+    def user_deposit(self, pool: _PoolArrays, timestamp: int, user: int, deposit: ScheduledDeposit) -> None:
+        """Mirror of Oasis.user_deposit for a first deposit by a new user."""
+        amount = deposit.amount
+        fee_amount = (amount * self.protocol_fee + 999) // 1000
+        deposit_amount = amount - fee_amount
+        assert deposit_amount > 0, "Deposit amount must be greater than 0"
+
+        htr_amount = deposit_amount * pool.reserve_a // pool.reserve_b
+        token_price_in_htr = pool.twap_b_in_htr(timestamp)
+        htr_amount_for_bonus = (deposit_amount * token_price_in_htr) // PRICE_PRECISION
+        bonus = (htr_amount_for_bonus * BONUS_MULTIPLIER[deposit.timelock]) // 10000
+
+        _, oasis_lp_amount_b = pool.oasis_amounts()
+        first = self.total_liquidity == 0
+        liquidity_increase = np.where(
+            first,
+            deposit_amount * PRECISION,
+            self.total_liquidity * deposit_amount // np.where(first, 1, oasis_lp_amount_b),
+        )
+        self.user_liquidity[user] = self.user_liquidity[user] + liquidity_increase
+        self.total_liquidity = self.total_liquidity + liquidity_increase
+
+        self.htr_balance = self.htr_balance - bonus - htr_amount
+        self.min_htr_balance = np.minimum(self.min_htr_balance, self.htr_balance)
+        self.total_bonus = self.total_bonus + bonus
+        self.user_balance_htr[user] = self.user_balance_htr[user] + bonus
+        self.user_deposit_b[user] = self.user_deposit_b[user] + deposit_amount
+
+        deposit_b = _ints(deposit_amount, len(htr_amount))
+        cashback = pool.add_liquidity(timestamp, htr_amount, deposit_b)
+        self.user_balance_b[user] = self.user_balance_b[user] + cashback
+
+    def close_position(self, pool: _PoolArrays, timestamp: int, user: int) -> None:
+        """Mirror of Oasis.close_position."""
+        oasis_lp_htr, _ = pool.oasis_amounts()
+        token_b_price_in_htr = pool.twap_b_in_htr(timestamp)
+
+        user_lp_htr = np.where(
+            self.total_liquidity > 0,
+            self.user_liquidity[user] * oasis_lp_htr // np.where(self.total_liquidity > 0, self.total_liquidity, 1),
+            0,
+        )
+        user_lp_b = user_lp_htr * pool.reserve_b // pool.reserve_a
+        max_withdraw_b = user_lp_b + self.user_balance_b[user]
+
+        loss = np.maximum(self.user_deposit_b[user] - max_withdraw_b, 0)
+        loss_htr = np.minimum((loss * token_b_price_in_htr) // PRICE_PRECISION, user_lp_htr)
+
+        pool.remove_liquidity(timestamp, user_lp_htr, user_lp_b)
+
+        self.htr_balance = self.htr_balance + user_lp_htr - loss_htr
+        self.total_il_compensation = self.total_il_compensation + loss_htr
+        self.user_il_compensation[user] = loss_htr
+        self.user_closed_balance_b[user] = self.user_balance_b[user] + user_lp_b
+        self.total_liquidity = self.total_liquidity - self.user_liquidity[user]
+        self.user_liquidity[user] = _ints(0, len(user_lp_htr))
+
+
+def _validate_config(config: SimulationConfig) -> None:
+    for deposit in config.deposits:
+        if deposit.timelock not in BONUS_MULTIPLIER:
+            raise ValueError(f"Invalid timelock value: {deposit.timelock}")
+        if deposit.step < 1:
+            raise ValueError("Deposits must be scheduled at step 1 or later")
+        unlock_step = deposit.step + _ceil_steps(deposit.timelock * MONTHS_IN_SECONDS, config.step_seconds)
+        if unlock_step > config.n_steps:
+            raise ValueError(
+                f"n_steps={config.n_steps} does not cover the unlock of a deposit at step {deposit.step}"
+            )
+
+
+def _ceil_steps(seconds: int, step_seconds: int) -> int:
+    return (seconds + step_seconds - 1) // step_seconds
+
+
+def gbm_price_paths(
+    config: SimulationConfig, n_paths: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Target prices of token_b in HTR with shape (n_steps, n_paths)."""
+    dt = config.step_seconds / SECONDS_PER_YEAR
+    shocks = rng.standard_normal((config.n_steps, n_paths))
+    log_returns = (config.drift - 0.5 * config.volatility**2) * dt + config.volatility * math.sqrt(dt) * shocks
+    initial_price = config.reserve_htr / config.reserve_b
+    return initial_price * np.exp(np.cumsum(log_returns, axis=0))
+
+
+def simulate(
+    config: SimulationConfig,
+    n_paths: int,
+    seed: int | None = None,
+    target_prices: np.ndarray | None = None,
+) -> SimulationResult:
+    """Run one batch of price paths through the pool and Oasis.
+
+    Within each step, positions whose timelock expired are closed first, then the
+    step's deposits are made, then the pool is arbitraged to the step's target price.
+
+    Args:
+        config: Pool, schedule and price process configuration
+        n_paths: Number of paths simulated together
+        seed: Seed for the GBM price paths
+        target_prices: Optional explicit target prices with shape (n_steps, n_paths)
+
+    Returns:
+        SimulationResult with one entry per path
+    """
+    _validate_config(config)
+    if target_prices is None:
+        target_prices = gbm_price_paths(config, n_paths, np.random.default_rng(seed))
+    if target_prices.shape != (config.n_steps, n_paths):
+        raise ValueError(f"target_prices must have shape {(config.n_steps, n_paths)}")
+
+    pool = _PoolArrays(config, n_paths)
+    oasis = _OasisArrays(config, n_paths)
+
+    deposits_by_step: dict[int, list[int]] = {}
+    closes_by_step: dict[int, list[int]] = {}
+    for user, deposit in enumerate(config.deposits):
+        deposits_by_step.setdefault(deposit.step, []).append(user)
+        unlock_step = deposit.step + _ceil_steps(deposit.timelock * MONTHS_IN_SECONDS, config.step_seconds)
+        closes_by_step.setdefault(unlock_step, []).append(user)
+
+    for step in range(1, config.n_steps + 1):
+        timestamp = config.start_timestamp + step * config.step_seconds
+        for user in closes_by_step.get(step, []):
+            oasis.close_position(pool, timestamp, user)
+        for user in deposits_by_step.get(step, []):
+            oasis.user_deposit(pool, timestamp, user, config.deposits[user])
+        htr_in, b_in = arbitrage_trade(
+            pool.reserve_a, pool.reserve_b, target_prices[step - 1], config.pool_fee
+        )
+        pool.swap(timestamp, htr_in, b_in)
+
+    return SimulationResult(
+        required_treasury=-oasis.min_htr_balance,
+        final_net_cost=-oasis.htr_balance,
+        total_bonus=oasis.total_bonus,
+        total_il_compensation=oasis.total_il_compensation,
+        user_il_compensation=np.array(oasis.user_il_compensation, dtype=object).reshape(
+            len(config.deposits), n_paths
+        ),
+        user_closed_balance_b=np.array(oasis.user_closed_balance_b, dtype=object).reshape(
+            len(config.deposits), n_paths
+        ),
+        final_price=pool.reserve_a.astype(float) / pool.reserve_b.astype(float),
+    )
+
+
+def run_batches(
+    config: SimulationConfig, n_paths: int, batch_size: int = 5000, seed: int | None = None
+) -> SimulationResult:
+    """Run n_paths in batches of batch_size and concatenate the results."""
+    rng = np.random.default_rng(seed)
+    results: list[SimulationResult] = []
+    remaining = n_paths
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        results.append(simulate(config, size, seed=int(rng.integers(2**63))))
+        remaining -= size
+
+    return SimulationResult(
+        *(
+            np.concatenate([getattr(r, field) for r in results], axis=-1)
+            for field in SimulationResult._fields
+        )
+    )
+
+
+def summarize(
+    result: SimulationResult,
+    owner_deposit: int,
+    quantiles: tuple[float, ...] = (0.5, 0.9, 0.95, 0.99),
+) -> SimulationSummary:
+    """Distribution of the treasury shortfall max(0, required_treasury - owner_deposit)."""
+    required = result.required_treasury.astype(float)
+    shortfall = np.maximum(required - owner_deposit, 0.0)
+
+    def q(values: np.ndarray) -> dict[float, int]:
+        return {p: int(np.quantile(values, p)) for p in quantiles}
+
+    return SimulationSummary(
+        owner_deposit=owner_deposit,
+        n_paths=len(required),
+        shortfall_probability=float((shortfall > 0).mean()),
+        shortfall_mean=float(shortfall.mean()),
+        shortfall_quantiles=q(shortfall),
+        required_treasury_quantiles=q(required),
+        final_net_cost_quantiles=q(result.final_net_cost.astype(float)),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--owner-deposit", type=int, required=True, help="Owner HTR deposit in cents")
+    parser.add_argument("--reserve-htr", type=int, default=1_000_000_00)
+    parser.add_argument("--reserve-b", type=int, default=7_000_000_00)
+    parser.add_argument("--volatility", type=float, default=0.8)
+    parser.add_argument("--drift", type=float, default=0.0)
+    parser.add_argument("--deposit-amount", type=int, default=1_000_00)
+    parser.add_argument("--deposits-per-day", type=int, default=1)
+    parser.add_argument("--deposit-days", type=int, default=90)
+    parser.add_argument("--timelock", type=int, choices=sorted(BONUS_MULTIPLIER), default=6)
+    parser.add_argument("--oasis-protocol-fee", type=int, default=0)
+    args = parser.parse_args()
+
+    deposits = [
+        ScheduledDeposit(step=day, amount=args.deposit_amount, timelock=args.timelock)
+        for day in range(1, args.deposit_days + 1)
+        for _ in range(args.deposits_per_day)
+    ]
+    lock_days = _ceil_steps(args.timelock * MONTHS_IN_SECONDS, 24 * 60 * 60)
+    config = SimulationConfig(
+        reserve_htr=args.reserve_htr,
+        reserve_b=args.reserve_b,
+        deposits=deposits,
+        n_steps=args.deposit_days + lock_days,
+        volatility=args.volatility,
+        drift=args.drift,
+        oasis_protocol_fee=args.oasis_protocol_fee,
+    )
+
+    summary = summarize(
+        run_batches(config, args.paths, batch_size=args.batch_size, seed=args.seed),
+        args.owner_deposit,
+    )
+    print(f"paths: {summary.n_paths}")
+    print(f"owner deposit: {summary.owner_deposit}")
+    print(f"P(shortfall): {summary.shortfall_probability:.4f}")
+    print(f"mean shortfall: {summary.shortfall_mean:.0f}")
+    for label, values in (
+        ("shortfall", summary.shortfall_quantiles),
+        ("required treasury", summary.required_treasury_quantiles),
+        ("final net cost", summary.final_net_cost_quantiles),
+    ):
+        print(label + ": " + ", ".join(f"p{int(p * 100)}={v}" for p, v in values.items()))
+
+
+if __name__ == "__main__":
+    main()